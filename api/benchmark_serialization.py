@@ -0,0 +1,147 @@
+"""
+Benchmark de la sérialisation des listes : objets ORM + modèles Pydantic contre
+lignes Core encodées directement (api/serialization.py).
+
+Une base neuve est remplie d'un catalogue synthétique (rows fournisseurs et rows
+associations verre-symbole) ; chaque liste est lue puis sérialisée en JSON :
+- orm : un objet ORM puis un modèle Pydantic par ligne (from_orm), encodés par
+  le modèle de réponse (comportement d'avant le chemin rapide)
+- core-json : colonnes du modèle de réponse en lignes Core, module json
+- core-orjson : mêmes lignes, orjson
+
+Usage :
+    python -m api.benchmark_serialization --rows 100000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api import serialization
+from api.routes.fournisseurs import FournisseurResponse
+from api.routes.verres_symboles import VerreSymboleResponse
+from database.config.database import Base, create_async_db_engine, create_db_engine
+from database.models.base import Fournisseur, Gamme, SymboleTag, Verre, VerreSymbole
+
+SYMBOLES_PAR_VERRE = 50
+
+# Liste -> (modèle SQLAlchemy, modèle de réponse)
+LISTS = {
+    "fournisseurs": (Fournisseur, FournisseurResponse),
+    "associations": (VerreSymbole, VerreSymboleResponse),
+}
+
+
+def seed(db_path: Path, rows: int) -> None:
+    """Crée la base avec rows fournisseurs et rows associations."""
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    verres = -(-rows // SYMBOLES_PAR_VERRE)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Fournisseur),
+            [{"nom": f"Fournisseur {i:06d}"} for i in range(rows)],
+        )
+        connection.execute(insert(Gamme), [{"id": 1, "nom": "Gamme"}])
+        connection.execute(
+            insert(Verre),
+            [
+                {"nom": f"Verre {i}", "fournisseur_id": 1, "gamme_id": 1}
+                for i in range(verres)
+            ],
+        )
+        connection.execute(
+            insert(SymboleTag),
+            [{"nom": f"symbole {i}"} for i in range(SYMBOLES_PAR_VERRE)],
+        )
+        connection.execute(
+            insert(VerreSymbole),
+            [
+                {
+                    "verre_id": i // SYMBOLES_PAR_VERRE + 1,
+                    "symbole_id": i % SYMBOLES_PAR_VERRE + 1,
+                    "score_confiance": (i % 1000) / 1000,
+                    "est_valide": i % 3 == 0,
+                    "valide_par": "opticien" if i % 3 == 0 else None,
+                }
+                for i in range(rows)
+            ],
+        )
+    engine.dispose()
+
+
+async def serialize_orm(db: AsyncSession, model, response_model) -> bytes:
+    """Objets ORM, un modèle Pydantic par ligne, encodés par la réponse."""
+    objects = (await db.scalars(select(model).order_by(model.id))).all()
+    items = [response_model.model_validate(o, from_attributes=True) for o in objects]
+    return TypeAdapter(List[response_model]).dump_json(items)
+
+
+async def serialize_core(db: AsyncSession, model, response_model) -> bytes:
+    """Colonnes du modèle de réponse en lignes Core, encodées directement."""
+    statement = serialization.select_fields(model, response_model)
+    return await serialization.fetch_json(db, statement.order_by(model.id))
+
+
+async def _measure(db_path: Path, mode: str, repeat: int) -> dict:
+    """Meilleur débit (lignes/s) de chaque liste sur repeat essais."""
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{db_path}")
+    serialize = serialize_orm if mode == "orm" else serialize_core
+    orjson = serialization.orjson
+    if mode == "core-json":
+        serialization.orjson = None
+    results = {}
+    try:
+        for name, (model, response_model) in LISTS.items():
+            timings, body = [], b""
+            for _ in range(repeat):
+                async with AsyncSession(engine) as db:
+                    start = time.perf_counter()
+                    body = await serialize(db, model, response_model)
+                    timings.append(time.perf_counter() - start)
+            results[name] = {"seconds": min(timings), "bytes": len(body)}
+    finally:
+        serialization.orjson = orjson
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--modes", nargs="+", default=["orm", "core-json", "core-orjson"]
+    )
+    args = parser.parse_args()
+    if serialization.orjson is None and "core-orjson" in args.modes:
+        print("orjson non installé : mode core-orjson ignoré")
+        args.modes.remove("core-orjson")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "benchmark_serialization.db"
+        seed(db_path, args.rows)
+        results = {
+            mode: asyncio.run(_measure(db_path, mode, args.repeat))
+            for mode in args.modes
+        }
+
+    print(f"{'Liste':<14}{'Mode':<13}{'Lignes/s':>12}{'Temps (ms)':>12}{'Octets':>12}")
+    for name in LISTS:
+        for mode, result in results.items():
+            seconds = result[name]["seconds"]
+            print(
+                f"{name:<14}{mode:<13}{args.rows / seconds:>12.0f}"
+                f"{seconds * 1000:>12.0f}{result[name]['bytes']:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Outils communs des routes d'écriture en masse (POST .../bulk).
+
+Une requête bulk contient jusqu'à BULK_MAX_ITEMS éléments :
+- les clés étrangères sont vérifiées par une seule requête IN par table
+- les éléments valides sont insérés en une transaction (executemany Core)
+- la réponse donne le statut de chaque élément, dans l'ordre de la requête
+
+Variable d'environnement : BULK_MAX_ITEMS (défaut 1000)
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi import status
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 1000))
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+async def existing_ids(db: AsyncSession, model, ids: Iterable[int]) -> Set[int]:
+    """
+    Ids de model présents en base, en une requête IN.
+
+    Args:
+        db (AsyncSession): Session de base de données
+        model: Modèle SQLAlchemy (colonne id)
+        ids (Iterable[int]): Ids à vérifier (None ignorés)
+
+    Returns:
+        Set[int]: Ids existants
+    """
+    wanted = {i for i in ids if i is not None}
+    if not wanted:
+        return set()
+    return set((await db.scalars(select(model.id).where(model.id.in_(wanted)))).all())
+
+
+class BulkResults:
+    """Statut de chaque élément d'une requête bulk."""
+
+    def __init__(self, size: int):
+        self._results: Dict[int, BulkItemResult] = {}
+        self.size = size
+
+    def fail(self, index: int, detail: str, code: int = status.HTTP_404_NOT_FOUND):
+        self._results[index] = BulkItemResult(index=index, status=code, detail=detail)
+
+    def pending(self) -> List[int]:
+        """Index des éléments encore valides."""
+        return [i for i in range(self.size) if i not in self._results]
+
+    def created(self, indices: List[int], ids: List[int]) -> None:
+        for index, new_id in zip(indices, ids):
+            self._results[index] = BulkItemResult(
+                index=index, status=status.HTTP_201_CREATED, id=new_id
+            )
+
+    def response(self) -> BulkResponse:
+        results = [self._results[i] for i in range(self.size)]
+        created = sum(r.status == status.HTTP_201_CREATED for r in results)
+        return BulkResponse(
+            created=created, failed=len(results) - created, results=results
+        )
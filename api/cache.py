@@ -0,0 +1,290 @@
+"""
+Cache des tables de référence (fournisseurs, gammes, séries, matériaux,
+traitements).
+
+Les réponses JSON déjà sérialisées des listes et des lectures par id sont
+conservées en mémoire (ou dans Redis avec CACHE_BACKEND=redis), avec leur ETag :
+- une requête en cache ne touche ni la base ni les modèles Pydantic
+- If-None-Match permet au client de recevoir un 304 sans corps
+- les routes POST/PUT/DELETE d'une table invalident son espace de noms et
+  incrémentent son numéro de génération : une réponse lue en base avant une
+  invalidation n'est pas mise en cache après elle
+
+Variables d'environnement :
+- CACHE_BACKEND : memory (défaut), redis ou none
+- CACHE_TTL : durée de vie d'une entrée en secondes (défaut 300, 0 = illimitée),
+  filet de sécurité quand plusieurs processus partagent la base
+- REDIS_URL : URL du serveur Redis (défaut redis://redis:6379/0)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300.0
+DEFAULT_REDIS_URL = "redis://redis:6379/0"
+LIST_KEY = "list"
+
+
+class MemoryBackend:
+    """Entrées en mémoire du processus, par espace de noms."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Tuple[float, bytes]]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if self.ttl and time.monotonic() > expires:
+            return None
+        return value
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def set(
+        self, namespace: str, key: str, value: bytes, generation: Optional[int] = None
+    ) -> bool:
+        with self._lock:
+            if generation is not None and generation != self._generations.get(
+                namespace, 0
+            ):
+                return False
+            self._entries.setdefault(namespace, {})[key] = (
+                time.monotonic() + self.ttl,
+                value,
+            )
+            return True
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._entries.pop(namespace, None)
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Entrées partagées entre processus : un hash Redis par espace de noms."""
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, ttl: float = DEFAULT_TTL):
+        import redis  # Dépendance optionnelle, seulement avec CACHE_BACKEND=redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+
+    def _hash(self, namespace: str) -> str:
+        return f"cache:{namespace}"
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"cache-generation:{namespace}"
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self._client.hget(self._hash(namespace), key)
+
+    def generation(self, namespace: str) -> int:
+        return int(self._client.get(self._generation_key(namespace)) or 0)
+
+    def set(
+        self, namespace: str, key: str, value: bytes, generation: Optional[int] = None
+    ) -> bool:
+        with self._client.pipeline() as pipeline:
+            try:
+                # Transaction annulée si une invalidation a lieu entre-temps
+                pipeline.watch(self._generation_key(namespace))
+                current = int(pipeline.get(self._generation_key(namespace)) or 0)
+                if generation is not None and generation != current:
+                    return False
+                pipeline.multi()
+                pipeline.hset(self._hash(namespace), key, value)
+                if self.ttl:
+                    pipeline.expire(self._hash(namespace), int(self.ttl))
+                pipeline.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    def invalidate(self, namespace: str) -> None:
+        pipeline = self._client.pipeline()
+        pipeline.delete(self._hash(namespace))
+        pipeline.incr(self._generation_key(namespace))
+        pipeline.execute()
+
+    def clear(self) -> None:
+        for name in self._client.scan_iter("cache:*"):
+            self._client.delete(name)
+
+
+class ReferenceCache:
+    """
+    Réponses JSON sérialisées et leur ETag.
+
+    Args:
+        backend: MemoryBackend, RedisBackend ou None (cache désactivé)
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def get(self, namespace: str, key: Any) -> Optional[Tuple[str, bytes]]:
+        """Retourne (etag, corps) ou None si absent."""
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(namespace, str(key))
+        except Exception as e:
+            logger.warning(f"Lecture du cache impossible: {str(e)}")
+            return None
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def generation(self, namespace: str) -> Optional[int]:
+        """Numéro de génération d'une table (None si le cache est indisponible)."""
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.generation(namespace)
+        except Exception as e:
+            logger.warning(f"Lecture du cache impossible: {str(e)}")
+            return None
+
+    def set(
+        self, namespace: str, key: Any, body: bytes, generation: Optional[int] = None
+    ) -> str:
+        """
+        Enregistre un corps de réponse et retourne son ETag.
+
+        Args:
+            namespace (str): Table de référence
+            key: Clé de l'entrée
+            body (bytes): Corps JSON
+            generation (int, optional): Génération lue avant de charger body ;
+                si la table a été invalidée depuis, body n'est pas enregistré
+        """
+        etag = make_etag(body)
+        if self.backend is not None:
+            try:
+                self.backend.set(
+                    namespace, str(key), etag.encode() + b"\n" + body, generation
+                )
+            except Exception as e:
+                logger.warning(f"Écriture du cache impossible: {str(e)}")
+        return etag
+
+    def invalidate(self, namespace: str) -> None:
+        """Oublie toutes les entrées d'une table (liste et lectures par id)."""
+        if self.backend is not None:
+            try:
+                self.backend.invalidate(namespace)
+            except Exception as e:
+                logger.warning(f"Invalidation du cache impossible: {str(e)}")
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def make_etag(body: bytes) -> str:
+    """ETag fort : empreinte du corps de la réponse."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne etag (ou *)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+def create_cache() -> ReferenceCache:
+    """Crée le cache selon CACHE_BACKEND."""
+    backend_name = os.getenv("CACHE_BACKEND", "memory").lower()
+    ttl = float(os.getenv("CACHE_TTL", DEFAULT_TTL))
+    if backend_name == "none":
+        return ReferenceCache(None)
+    if backend_name == "redis":
+        try:
+            return ReferenceCache(
+                RedisBackend(os.getenv("REDIS_URL", DEFAULT_REDIS_URL), ttl)
+            )
+        except ImportError:
+            logger.warning("Module redis absent : cache en mémoire utilisé")
+    elif backend_name != "memory":
+        raise ValueError(f"CACHE_BACKEND inconnu: {backend_name}")
+    return ReferenceCache(MemoryBackend(ttl))
+
+
+reference_cache = create_cache()
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    """TypeAdapter d'un modèle de réponse, construit une seule fois."""
+    return TypeAdapter(response_model)
+
+
+def serialize(response_model: Any, value: Any) -> bytes:
+    """Sérialise des objets ORM en JSON avec le modèle de réponse de la route."""
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+async def cached_response(
+    request: Request,
+    namespace: str,
+    key: Any,
+    response_model: Any,
+    load: Callable[[], Awaitable[Any]],
+) -> Response:
+    """
+    Répond depuis le cache, ou charge, sérialise et met en cache la réponse.
+
+    Args:
+        request (Request): Requête (en-tête If-None-Match)
+        namespace (str): Table de référence (espace de noms du cache)
+        key: Clé de l'entrée (LIST_KEY ou id)
+        response_model: Modèle Pydantic de la réponse
+        load: Coroutine qui lit les objets en base (lève HTTPException si absent),
+            ou directement le corps JSON (bytes, voir api/serialization.py)
+
+    Returns:
+        Response: 304 si l'ETag du client est à jour, sinon le JSON et son ETag
+    """
+    entry = reference_cache.get(namespace, key)
+    if entry is None:
+        # Lue avant la requête : une écriture concurrente l'incrémente
+        generation = reference_cache.generation(namespace)
+        value = await load()
+        body = value if isinstance(value, bytes) else serialize(response_model, value)
+        etag = reference_cache.set(namespace, key, body, generation)
+    else:
+        etag, body = entry
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,213 @@
+"""
+Test de charge des lectures concurrentes de l'API.
+
+Les mêmes requêtes (page de verres, verre par id, gammes) sont envoyées par
+des clients concurrents, en deux modes :
+- async : la session asynchrone de l'API (aiosqlite), la boucle d'événements
+  reste libre pendant les requêtes SQL
+- sync : une session synchrone appelée depuis les routes async, qui bloque la
+  boucle d'événements pendant chaque requête SQL (comportement d'avant le
+  passage à AsyncSession)
+
+Usage :
+    python -m api.load_test --concurrency 32 --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from api.routes import gammes, verres
+from database.config.database import (
+    AsyncSessionLocal,
+    Base,
+    create_async_db_engine,
+    create_db_engine,
+    get_async_db,
+)
+from database.models.base import Fournisseur, Gamme, Verre
+
+
+class BlockingSession:
+    """Session synchrone exposée avec l'interface d'AsyncSession."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def add(self, obj):
+        self._session.add(obj)
+
+    async def commit(self):
+        self._session.commit()
+
+    async def rollback(self):
+        self._session.rollback()
+
+    async def refresh(self, obj):
+        self._session.refresh(obj)
+
+    async def delete(self, obj):
+        self._session.delete(obj)
+
+    async def get(self, model, ident):
+        return self._session.get(model, ident)
+
+    async def scalar(self, statement):
+        return self._session.scalar(statement)
+
+    async def scalars(self, statement):
+        return self._session.scalars(statement)
+
+    async def execute(self, statement):
+        return self._session.execute(statement)
+
+
+def seed(db_path: Path, rows: int) -> None:
+    """Crée la base de test avec rows verres."""
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Fournisseur),
+            [{"id": i, "nom": f"Fournisseur {i}"} for i in range(20)],
+        )
+        connection.execute(insert(Gamme), [{"id": 1, "nom": "Gamme"}])
+        connection.execute(
+            insert(Verre),
+            [
+                {
+                    "nom": f"Verre {i}",
+                    "indice": 1.5 + (i % 25) / 100,
+                    "fournisseur_id": i % 20,
+                    "gamme_id": 1,
+                }
+                for i in range(rows)
+            ],
+        )
+    engine.dispose()
+
+
+def build_app(db_path: Path, mode: str) -> FastAPI:
+    """Application de test avec les routes de lecture sur db_path."""
+    app = FastAPI()
+    app.include_router(verres.router, prefix="/api")
+    app.include_router(gammes.router, prefix="/api")
+
+    if mode == "async":
+        engine = create_async_db_engine(f"sqlite+aiosqlite:///{db_path}")
+
+        async def override():
+            async with AsyncSessionLocal(bind=engine) as session:
+                yield session
+
+    else:
+        engine = create_db_engine(f"sqlite:///{db_path}")
+        factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+        async def override():
+            session = factory()
+            try:
+                yield BlockingSession(session)
+            finally:
+                session.close()
+
+    app.dependency_overrides[get_async_db] = override
+    app.state.engine = engine
+    return app
+
+
+async def run_load(
+    app: FastAPI, concurrency: int, total: int, rows: int
+) -> Dict[str, float]:
+    """
+    Envoie total requêtes avec concurrency clients simultanés.
+
+    Returns:
+        Dict[str, float]: Débit (requêtes/s), latences p50 et p95 (ms), erreurs
+    """
+    paths = [
+        "/api/verres?limit=50",
+        "/api/verre/{id}",
+        "/api/gammes",
+    ]
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)].format(id=1 + (i * 7919) % rows))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_s": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "errors": errors,
+    }
+
+
+async def _run_mode(db_path: Path, mode: str, concurrency: int, total: int, rows: int):
+    app = build_app(db_path, mode)
+    try:
+        return await run_load(app, concurrency, total, rows)
+    finally:
+        if mode == "async":
+            await app.state.engine.dispose()
+        else:
+            app.state.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge des lectures de l'API")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "load_test.db"
+        seed(db_path, args.rows)
+        for mode in args.modes:
+            results[mode] = asyncio.run(
+                _run_mode(db_path, mode, args.concurrency, args.requests, args.rows)
+            )
+
+    print(
+        f"{'Mode':<8}{'Requêtes/s':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'Erreurs':>9}"
+    )
+    for mode, result in results.items():
+        print(
+            f"{mode:<8}{result['requests_per_s']:>12.0f}{result['p50_ms']:>10.1f}"
+            f"{result['p95_ms']:>10.1f}{result['errors']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
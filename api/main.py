@@ -13,6 +13,7 @@ from api.routes.detection import router as detection_router
 from api.routes.fournisseurs import router as fournisseur_router
 from api.routes.gammes import router as gamme_router
 from api.routes.materiaux import router as materiau_router
+from api.routes.search import router as search_router
 from api.routes.series import router as serie_router
 from api.routes.symboles import router as symbole_router
 from api.routes.traitements import router as traitement_router
@@ -92,6 +93,7 @@ app.include_router(materiau_router)
 app.include_router(serie_router)
 app.include_router(traitement_router)
 app.include_router(verre_router)
+app.include_router(search_router)
 app.include_router(detection_router, prefix="/api")
 app.include_router(symbole_router)
 app.include_router(verre_symbole_router)
@@ -1,14 +1,23 @@
 import io
 import logging
-from typing import Optional, Set
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
 
 import torch
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.dependencies.auth import verify_auth
+from database.config.database import get_async_db
+from database.models.base import SymboleTag
+from model.drift_monitor import start_monitor
 from model.infer_siamese import load_templates, predict_symbol
+from model.localize import detect_symbols
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -21,20 +30,47 @@ ALLOWED_EXTENSIONS: Set[str] = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff"
 
 # Variable globale pour les templates
 templates = None
+# Surveillance de la dérive des détections (démarrée avec le modèle)
+monitor = None
+
+
+# Modèles de réponse
+class Detection(BaseModel):
+    symbol: str
+    similarity: float
+    is_confident: bool
+    box: List[int]  # [x, y, largeur, hauteur] en pixels
 
 
-# Modèle de réponse
 class DetectionResponse(BaseModel):
     image_path: str
     predicted_symbol: Optional[str]
     similarity_score: float
     is_confident: bool
     message: str
+    detections: List[Detection] = []
+
+
+class MetricsResponse(BaseModel):
+    monitoring: bool
+    detections_logged: int = 0
+    window: int = 0
+    window_start: Optional[float] = None
+    status: Optional[str] = None
+    updated_at: Optional[float] = None
+    drift: Optional[Dict[str, Any]] = None
+
+
+class TemplateRegistrationResponse(BaseModel):
+    symbole_id: int
+    symbol: str
+    added: int
+    total_templates: int
 
 
 def init_model():
-    """Initialise le modèle et les templates"""
-    global templates
+    """Initialise le modèle, les templates et la surveillance de dérive"""
+    global templates, monitor
 
     logger.info("Initialisation du modèle de détection...")
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -51,6 +87,17 @@ def init_model():
         logger.error(f"Erreur lors du chargement du modèle: {str(e)}")
         raise
 
+    if os.getenv("DRIFT_MONITOR", "1") == "1" and monitor is None:
+        try:
+            monitor = start_monitor(
+                templates,
+                Path(os.getenv("DRIFT_LOG_DIR", "model/monitoring")),
+                interval=float(os.getenv("DRIFT_INTERVAL", "60")),
+            )
+        except Exception as e:
+            # La détection reste disponible sans surveillance
+            logger.warning(f"Surveillance de dérive désactivée: {str(e)}")
+
 
 def is_valid_image_extension(filename: str) -> bool:
     """Vérifie si l'extension du fichier est autorisée"""
@@ -68,7 +115,8 @@ async def detect_image(file: UploadFile = File(...)):
         file: Image à analyser (formats supportés: JPG, JPEG, PNG, GIF, BMP, TIFF)
 
     Returns:
-        DetectionResponse: Résultat de la détection avec le symbole et le score de confiance
+        DetectionResponse: Résultat de la détection avec le symbole et le score de confiance,
+            ainsi que tous les symboles localisés dans l'image (detections)
     """
     global templates
     if templates is None:
@@ -114,11 +162,10 @@ async def detect_image(file: UploadFile = File(...)):
                 f"Détection terminée. Symbole: {predicted_symbol}, Score: {similarity_score:.2%}"
             )
 
-            # Vérification du seuil de confiance (utilise le même seuil que le modèle)
-            is_confident = similarity_score >= templates.similarity_threshold
-            logger.info(
-                f"Confiance suffisante: {is_confident} (seuil: {templates.similarity_threshold})"
-            )
+            # Vérification du seuil de confiance (seuil calibré du symbole s'il existe)
+            threshold = templates.threshold_for(predicted_symbol)
+            is_confident = similarity_score >= threshold
+            logger.info(f"Confiance suffisante: {is_confident} (seuil: {threshold})")
 
             message = (
                 "Détection réussie"
@@ -126,12 +173,24 @@ async def detect_image(file: UploadFile = File(...)):
                 else "Confiance insuffisante dans la détection"
             )
 
+            # Localisation de tous les symboles (photo ou schéma complet)
+            try:
+                detections = [
+                    Detection(**detection)
+                    for detection in detect_symbols(templates, image)
+                ]
+                logger.info(f"{len(detections)} symbole(s) localisé(s)")
+            except Exception as e:
+                logger.warning(f"Localisation impossible: {str(e)}")
+                detections = []
+
             response = DetectionResponse(
                 image_path=temp_path,
                 predicted_symbol=predicted_symbol,
                 similarity_score=similarity_score,
                 is_confident=is_confident,
                 message=message,
+                detections=detections,
             )
             logger.info(f"Réponse préparée: {response.dict()}")
             return response
@@ -156,3 +215,93 @@ async def detect_image(file: UploadFile = File(...)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la détection: {str(e)}",
         )
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics():
+    """
+    Indicateurs de dérive des détections récentes par rapport au dataset
+    d'entraînement (calculés en tâche de fond, sans coût pour /detect)
+
+    Returns:
+        MetricsResponse: Nombre de détections journalisées et dérive
+    """
+    if monitor is None:
+        return MetricsResponse(monitoring=False)
+    return MetricsResponse(monitoring=True, **monitor.report)
+
+
+@router.post(
+    "/symboles/{symbole_id}/templates",
+    response_model=TemplateRegistrationResponse,
+    tags=["Symboles"],
+)
+async def register_templates(
+    symbole_id: int,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
+):
+    """
+    Ajoute une ou plusieurs images de référence pour un symbole.
+
+    Les images sont prétraitées et encodées, puis ajoutées à la matrice des
+    templates en mémoire et au cache sur disque, sans recalculer les templates
+    existants ni redémarrer le service. Le nom du symbole (SymboleTag.nom) est
+    utilisé comme nom de template.
+
+    Args:
+        symbole_id: Identifiant du symbole
+        files: Images de référence
+
+    Returns:
+        TemplateRegistrationResponse: Nombre de templates ajoutés et total du symbole
+    """
+    global templates
+    if templates is None:
+        init_model()
+
+    symbole = await db.get(SymboleTag, symbole_id)
+    if not symbole:
+        raise HTTPException(status_code=404, detail="Symbole non trouvé")
+
+    images, sources = [], []
+    for file in files:
+        if not is_valid_image_extension(file.filename):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Format de fichier non supporté: {file.filename}",
+            )
+        contents = await file.read()
+        try:
+            image = Image.open(io.BytesIO(contents))
+            image.load()
+        except (UnidentifiedImageError, OSError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Le fichier {file.filename} n'est pas une image valide",
+            )
+        images.append(image)
+        sources.append(file.filename)
+
+    try:
+        # Encodage hors de la boucle d'événements : la détection reste disponible
+        added = await run_in_threadpool(
+            templates.add_templates, symbole.nom, images, sources
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not added:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aucun symbole exploitable dans les images envoyées",
+        )
+
+    logger.info(f"{added} template(s) ajouté(s) pour le symbole '{symbole.nom}'")
+    return TemplateRegistrationResponse(
+        symbole_id=symbole_id,
+        symbol=symbole.nom,
+        added=added,
+        total_templates=templates.template_symbols.count(symbole.nom),
+    )
@@ -1,13 +1,15 @@
 # api/routes/fournisseurs.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, validator
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import LIST_KEY, cached_response, reference_cache
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, select_fields
+from database.config.database import get_async_db
 from database.models.base import Fournisseur
 
 
@@ -33,14 +35,23 @@ class FournisseurResponse(FournisseurBase):
 
 router = APIRouter()
 
+# Espace de noms du cache (api/cache.py)
+CACHE_NAMESPACE = "fournisseurs"
+
 
 # Routes GET (non protégées)
 @router.get("/fournisseurs", response_model=List[FournisseurResponse])
-def get_fournisseurs(db: Session = Depends(get_db)):
+async def get_fournisseurs(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        return await fetch_json(
+            db, select_fields(Fournisseur, FournisseurResponse).order_by(Fournisseur.id)
+        )
+
     try:
-        fournisseurs = db.query(Fournisseur).all()
-        return [FournisseurResponse.from_orm(f) for f in fournisseurs]
-    except SQLAlchemyError as e:
+        return await cached_response(
+            request, CACHE_NAMESPACE, LIST_KEY, List[FournisseurResponse], load
+        )
+    except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de l'accès à la base de données",
@@ -49,17 +60,22 @@ def get_fournisseurs(db: Session = Depends(get_db)):
 
 # Obtenir un fournisseur par ID
 @router.get("/fournisseurs/{fournisseur_id}", response_model=FournisseurResponse)
-def get_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
-    try:
-        fournisseur = (
-            db.query(Fournisseur).filter(Fournisseur.id == fournisseur_id).first()
-        )
+async def get_fournisseur(
+    fournisseur_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    async def load():
+        fournisseur = await db.get(Fournisseur, fournisseur_id)
         if fournisseur is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Fournisseur non trouvé"
             )
-        return FournisseurResponse.from_orm(fournisseur)
-    except SQLAlchemyError as e:
+        return fournisseur
+
+    try:
+        return await cached_response(
+            request, CACHE_NAMESPACE, fournisseur_id, FournisseurResponse, load
+        )
+    except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de l'accès à la base de données",
@@ -74,17 +90,18 @@ def get_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
 )
 async def create_fournisseur(
     fournisseur: FournisseurBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
         db_fournisseur = Fournisseur(nom=fournisseur.nom)
         db.add(db_fournisseur)
-        db.commit()
-        db.refresh(db_fournisseur)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_fournisseur)
         return FournisseurResponse.from_orm(db_fournisseur)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la création du fournisseur: {str(e)}",
@@ -95,24 +112,23 @@ async def create_fournisseur(
 async def update_fournisseur(
     fournisseur_id: int,
     fournisseur: FournisseurBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_fournisseur = (
-            db.query(Fournisseur).filter(Fournisseur.id == fournisseur_id).first()
-        )
+        db_fournisseur = await db.get(Fournisseur, fournisseur_id)
         if db_fournisseur is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Fournisseur non trouvé"
             )
 
         db_fournisseur.nom = fournisseur.nom
-        db.commit()
-        db.refresh(db_fournisseur)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_fournisseur)
         return FournisseurResponse.from_orm(db_fournisseur)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la modification du fournisseur: {str(e)}",
@@ -121,22 +137,23 @@ async def update_fournisseur(
 
 @router.delete("/fournisseurs/{fournisseur_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_fournisseur(
-    fournisseur_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    fournisseur_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_fournisseur = (
-            db.query(Fournisseur).filter(Fournisseur.id == fournisseur_id).first()
-        )
+        db_fournisseur = await db.get(Fournisseur, fournisseur_id)
         if db_fournisseur is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Fournisseur non trouvé"
             )
 
-        db.delete(db_fournisseur)
-        db.commit()
+        await db.delete(db_fournisseur)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression du fournisseur: {str(e)}",
@@ -1,13 +1,15 @@
 # api/routes/gammes.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import LIST_KEY, cached_response, reference_cache
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, select_fields
+from database.config.database import get_async_db
 from database.models.base import Gamme
 
 
@@ -27,12 +29,22 @@ class GammeResponse(GammeBase):
 
 router = APIRouter()
 
+# Espace de noms du cache (api/cache.py)
+CACHE_NAMESPACE = "gammes"
+
 
 # Routes GET (non protégées)
 @router.get("/gammes", response_model=List[GammeResponse])
-def get_gammes(db: Session = Depends(get_db)):
+async def get_gammes(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        return await fetch_json(
+            db, select_fields(Gamme, GammeResponse).order_by(Gamme.id)
+        )
+
     try:
-        return db.query(Gamme).all()
+        return await cached_response(
+            request, CACHE_NAMESPACE, LIST_KEY, List[GammeResponse], load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,14 +53,21 @@ def get_gammes(db: Session = Depends(get_db)):
 
 
 @router.get("/gammes/{gamme_id}", response_model=GammeResponse)
-def get_gamme(gamme_id: int, db: Session = Depends(get_db)):
-    try:
-        gamme = db.query(Gamme).filter(Gamme.id == gamme_id).first()
+async def get_gamme(
+    gamme_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    async def load():
+        gamme = await db.get(Gamme, gamme_id)
         if gamme is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Gamme non trouvée"
             )
         return gamme
+
+    try:
+        return await cached_response(
+            request, CACHE_NAMESPACE, gamme_id, GammeResponse, load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,16 +80,19 @@ def get_gamme(gamme_id: int, db: Session = Depends(get_db)):
     "/gammes", response_model=GammeResponse, status_code=status.HTTP_201_CREATED
 )
 async def create_gamme(
-    gamme: GammeBase, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    gamme: GammeBase,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
         db_gamme = Gamme(**gamme.dict())
         db.add(db_gamme)
-        db.commit()
-        db.refresh(db_gamme)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_gamme)
         return db_gamme
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la création de la gamme: {str(e)}",
@@ -81,11 +103,11 @@ async def create_gamme(
 async def update_gamme(
     gamme_id: int,
     gamme: GammeBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_gamme = db.query(Gamme).filter(Gamme.id == gamme_id).first()
+        db_gamme = await db.get(Gamme, gamme_id)
         if db_gamme is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Gamme non trouvée"
@@ -94,11 +116,12 @@ async def update_gamme(
         for key, value in gamme.dict().items():
             setattr(db_gamme, key, value)
 
-        db.commit()
-        db.refresh(db_gamme)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_gamme)
         return db_gamme
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour de la gamme: {str(e)}",
@@ -107,20 +130,23 @@ async def update_gamme(
 
 @router.delete("/gammes/{gamme_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_gamme(
-    gamme_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    gamme_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_gamme = db.query(Gamme).filter(Gamme.id == gamme_id).first()
+        db_gamme = await db.get(Gamme, gamme_id)
         if db_gamme is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Gamme non trouvée"
             )
 
-        db.delete(db_gamme)
-        db.commit()
+        await db.delete(db_gamme)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression de la gamme: {str(e)}",
@@ -1,13 +1,15 @@
 # api/routes/materiaux.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import LIST_KEY, cached_response, reference_cache
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, select_fields
+from database.config.database import get_async_db
 from database.models.base import Materiau
 
 
@@ -27,12 +29,22 @@ class MateriauResponse(MateriauBase):
 
 router = APIRouter()
 
+# Espace de noms du cache (api/cache.py)
+CACHE_NAMESPACE = "materiaux"
+
 
 # Routes GET (non protégées)
 @router.get("/materiaux", response_model=List[MateriauResponse])
-def get_materiaux(db: Session = Depends(get_db)):
+async def get_materiaux(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        return await fetch_json(
+            db, select_fields(Materiau, MateriauResponse).order_by(Materiau.id)
+        )
+
     try:
-        return db.query(Materiau).all()
+        return await cached_response(
+            request, CACHE_NAMESPACE, LIST_KEY, List[MateriauResponse], load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,14 +53,21 @@ def get_materiaux(db: Session = Depends(get_db)):
 
 
 @router.get("/materiaux/{materiau_id}", response_model=MateriauResponse)
-def get_materiau(materiau_id: int, db: Session = Depends(get_db)):
-    try:
-        materiau = db.query(Materiau).filter(Materiau.id == materiau_id).first()
+async def get_materiau(
+    materiau_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    async def load():
+        materiau = await db.get(Materiau, materiau_id)
         if materiau is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Materiau non trouvé"
             )
         return materiau
+
+    try:
+        return await cached_response(
+            request, CACHE_NAMESPACE, materiau_id, MateriauResponse, load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,16 +80,19 @@ def get_materiau(materiau_id: int, db: Session = Depends(get_db)):
     "/materiaux", response_model=MateriauResponse, status_code=status.HTTP_201_CREATED
 )
 async def create_materiau(
-    materiau: MateriauBase, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    materiau: MateriauBase,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
         db_materiau = Materiau(**materiau.dict())
         db.add(db_materiau)
-        db.commit()
-        db.refresh(db_materiau)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_materiau)
         return db_materiau
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la création du materiau",
@@ -81,11 +103,11 @@ async def create_materiau(
 async def update_materiau(
     materiau_id: int,
     materiau: MateriauBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_materiau = db.query(Materiau).filter(Materiau.id == materiau_id).first()
+        db_materiau = await db.get(Materiau, materiau_id)
         if db_materiau is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Materiau non trouvé"
@@ -94,11 +116,12 @@ async def update_materiau(
         for key, value in materiau.dict().items():
             setattr(db_materiau, key, value)
 
-        db.commit()
-        db.refresh(db_materiau)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_materiau)
         return db_materiau
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la mise à jour du materiau",
@@ -107,20 +130,23 @@ async def update_materiau(
 
 @router.delete("/materiaux/{materiau_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_materiau(
-    materiau_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    materiau_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_materiau = db.query(Materiau).filter(Materiau.id == materiau_id).first()
+        db_materiau = await db.get(Materiau, materiau_id)
         if db_materiau is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Materiau non trouvé"
             )
 
-        db.delete(db_materiau)
-        db.commit()
+        await db.delete(db_materiau)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
         return None
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la suppression du materiau",
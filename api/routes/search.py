@@ -0,0 +1,169 @@
+# api/routes/search.py
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.routes.verres import FacetValue, VerreFilters
+from database.config.database import get_async_db
+from database.models.base import Fournisseur, Gamme, Materiau, Serie, Verre
+from database.models.search import BM25_WEIGHTS, fts_query, fts_table, verres_fts
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Facettes : nom de la facette -> (table de référence, clé étrangère du verre)
+FACETS = {
+    "fournisseur": (Fournisseur, Verre.fournisseur_id),
+    "gamme": (Gamme, Verre.gamme_id),
+    "serie": (Serie, Verre.serie_id),
+    "materiau": (Materiau, Verre.materiau_id),
+}
+
+
+class SearchHit(BaseModel):
+    id: int
+    nom: str
+    variante: Optional[str] = None
+    indice: Optional[float] = None
+    fournisseur: Optional[str] = None
+    gamme: Optional[str] = None
+    serie: Optional[str] = None
+    materiau: Optional[str] = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    total: int
+    results: List[SearchHit]
+    facets: Dict[str, List[FacetValue]]
+
+
+router = APIRouter()
+
+
+def search_statements(match: str, filters: VerreFilters, limit: int, offset: int):
+    """
+    Requêtes de la recherche : résultats classés, total et facettes.
+
+    Args:
+        match (str): Expression MATCH FTS5 (voir fts_query)
+        filters (VerreFilters): Filtres appliqués aux verres trouvés
+        limit (int): Nombre de résultats
+        offset (int): Nombre de résultats sautés
+
+    Returns:
+        Tuple[Select, Select, Select]: Résultats, total, facettes (une seule
+            requête UNION ALL pour toutes les facettes)
+    """
+    matched = fts_table.op("MATCH")(match)
+    ranked = (
+        select(
+            verres_fts.c.rowid.label("verre_id"),
+            func.bm25(fts_table, *BM25_WEIGHTS).label("rank"),
+        )
+        .where(matched)
+        .subquery("ranked")
+    )
+    results = (
+        select(
+            Verre.id,
+            Verre.nom,
+            Verre.variante,
+            Verre.indice,
+            Fournisseur.nom.label("fournisseur"),
+            Gamme.nom.label("gamme"),
+            Serie.nom.label("serie"),
+            Materiau.nom.label("materiau"),
+            # bm25() est négatif : plus il est petit, meilleur est le verre
+            (-ranked.c.rank).label("score"),
+        )
+        .join_from(ranked, Verre, Verre.id == ranked.c.verre_id)
+        .outerjoin(Fournisseur, Fournisseur.id == Verre.fournisseur_id)
+        .outerjoin(Gamme, Gamme.id == Verre.gamme_id)
+        .outerjoin(Serie, Serie.id == Verre.serie_id)
+        .outerjoin(Materiau, Materiau.id == Verre.materiau_id)
+        .where(*filters.conditions())
+        .order_by(ranked.c.rank, Verre.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+    matches = (
+        select(
+            Verre.id,
+            Verre.fournisseur_id,
+            Verre.gamme_id,
+            Verre.serie_id,
+            Verre.materiau_id,
+        )
+        .join(verres_fts, verres_fts.c.rowid == Verre.id)
+        .where(matched, *filters.conditions())
+        .cte("matches")
+    )
+    total = select(func.count()).select_from(matches)
+    facets = union_all(
+        *(
+            select(
+                literal(name).label("facet"),
+                model.id.label("id"),
+                model.nom.label("value"),
+                func.count().label("count"),
+            )
+            .join_from(matches, model, model.id == matches.c[key.key])
+            .group_by(model.id)
+            for name, (model, key) in FACETS.items()
+        )
+    )
+    return results, total, facets
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_verres(
+    q: str = Query(..., min_length=1, description="Texte recherché (préfixes)"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0),
+    filters: VerreFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Recherche plein texte dans les verres (nom, variante, fournisseur, gamme,
+    série, matériau), classée par BM25, avec le nombre de verres trouvés par
+    valeur de chaque facette.
+    """
+    match = fts_query(q)
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La recherche doit contenir au moins un mot",
+        )
+
+    results, total, facets = search_statements(match, filters, limit, offset)
+    try:
+        hits = (await db.execute(results)).mappings().all()
+        count = await db.scalar(total)
+        facet_rows = (await db.execute(facets)).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=(
+                "Index de recherche indisponible (alembic upgrade head ou "
+                f"python -m database.scripts.build_search_index): {str(e)}"
+            ),
+        )
+
+    facet_values = {name: [] for name in FACETS}
+    for facet, value_id, value, facet_count in sorted(
+        facet_rows, key=lambda r: (-r[3], r[2])
+    ):
+        facet_values[facet].append(
+            FacetValue(id=value_id, value=value, count=facet_count)
+        )
+    return SearchResponse(
+        total=count,
+        results=[SearchHit(**hit) for hit in hits],
+        facets=facet_values,
+    )
@@ -1,13 +1,15 @@
 # api/routes/series.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import LIST_KEY, cached_response, reference_cache
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, select_fields
+from database.config.database import get_async_db
 from database.models.base import Serie
 
 
@@ -27,12 +29,22 @@ class SerieResponse(SerieBase):
 
 router = APIRouter()
 
+# Espace de noms du cache (api/cache.py)
+CACHE_NAMESPACE = "series"
+
 
 # Routes GET (non protégées)
 @router.get("/series", response_model=List[SerieResponse])
-def get_series(db: Session = Depends(get_db)):
+async def get_series(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        return await fetch_json(
+            db, select_fields(Serie, SerieResponse).order_by(Serie.id)
+        )
+
     try:
-        return db.query(Serie).all()
+        return await cached_response(
+            request, CACHE_NAMESPACE, LIST_KEY, List[SerieResponse], load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -41,14 +53,21 @@ def get_series(db: Session = Depends(get_db)):
 
 
 @router.get("/series/{serie_id}", response_model=SerieResponse)
-def get_serie(serie_id: int, db: Session = Depends(get_db)):
-    try:
-        serie = db.query(Serie).filter(Serie.id == serie_id).first()
+async def get_serie(
+    serie_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    async def load():
+        serie = await db.get(Serie, serie_id)
         if serie is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Serie non trouvée"
             )
         return serie
+
+    try:
+        return await cached_response(
+            request, CACHE_NAMESPACE, serie_id, SerieResponse, load
+        )
     except SQLAlchemyError:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,16 +80,19 @@ def get_serie(serie_id: int, db: Session = Depends(get_db)):
     "/series", response_model=SerieResponse, status_code=status.HTTP_201_CREATED
 )
 async def create_serie(
-    serie: SerieBase, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    serie: SerieBase,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
         db_serie = Serie(**serie.dict())
         db.add(db_serie)
-        db.commit()
-        db.refresh(db_serie)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_serie)
         return db_serie
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la création de la serie",
@@ -81,11 +103,11 @@ async def create_serie(
 async def update_serie(
     serie_id: int,
     serie: SerieBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_serie = db.query(Serie).filter(Serie.id == serie_id).first()
+        db_serie = await db.get(Serie, serie_id)
         if db_serie is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Serie non trouvée"
@@ -94,11 +116,12 @@ async def update_serie(
         for key, value in serie.dict().items():
             setattr(db_serie, key, value)
 
-        db.commit()
-        db.refresh(db_serie)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_serie)
         return db_serie
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la mise à jour de la serie",
@@ -107,20 +130,23 @@ async def update_serie(
 
 @router.delete("/series/{serie_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_serie(
-    serie_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    serie_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_serie = db.query(Serie).filter(Serie.id == serie_id).first()
+        db_serie = await db.get(Serie, serie_id)
         if db_serie is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Serie non trouvée"
             )
 
-        db.delete(db_serie)
-        db.commit()
+        await db.delete(db_serie)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
         return None
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors de la suppression de la serie",
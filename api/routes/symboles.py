@@ -2,10 +2,11 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, json_response, select_fields
+from database.config.database import get_async_db
 from database.models.base import SymboleTag
 
 router = APIRouter()
@@ -37,29 +38,28 @@ class Symbole(SymboleBase):
 
 # Routes CRUD
 @router.get("/symboles/", response_model=List[Symbole], tags=["Symboles"])
-def get_symboles(
+async def get_symboles(
     skip: int = Query(0, description="Nombre d'éléments à sauter"),
     limit: int = Query(100, description="Nombre maximum d'éléments à retourner"),
     search: Optional[str] = Query(None, description="Terme de recherche pour le nom"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Récupère la liste des symboles avec pagination et recherche optionnelle.
     """
-    query = db.query(SymboleTag)
+    query = select_fields(SymboleTag, Symbole).order_by(SymboleTag.id)
 
     if search:
-        query = query.filter(SymboleTag.nom.ilike(f"%{search}%"))
+        query = query.where(SymboleTag.nom.ilike(f"%{search}%"))
 
-    symboles = query.offset(skip).limit(limit).all()
-    return [Symbole.from_orm(s) for s in symboles]
+    return json_response(await fetch_json(db, query.offset(skip).limit(limit)))
 
 
 @router.post("/symboles/", response_model=Symbole, tags=["Symboles"])
-def create_symbole(
+async def create_symbole(
     symbole: SymboleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
@@ -69,10 +69,10 @@ def create_symbole(
     db.add(db_symbole)
 
     try:
-        db.commit()
-        db.refresh(db_symbole)
+        await db.commit()
+        await db.refresh(db_symbole)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Impossible de créer le symbole : {str(e)}",
@@ -82,31 +82,31 @@ def create_symbole(
 
 
 @router.get("/symboles/{symbole_id}", response_model=Symbole, tags=["Symboles"])
-def get_symbole(
+async def get_symbole(
     symbole_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Récupère un symbole par son ID.
     """
-    symbole = db.query(SymboleTag).filter(SymboleTag.id == symbole_id).first()
+    symbole = await db.get(SymboleTag, symbole_id)
     if not symbole:
         raise HTTPException(status_code=404, detail="Symbole non trouvé")
     return Symbole.from_orm(symbole)
 
 
 @router.put("/symboles/{symbole_id}", response_model=Symbole, tags=["Symboles"])
-def update_symbole(
+async def update_symbole(
     symbole_id: int,
     symbole: SymboleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Met à jour un symbole existant.
     """
-    db_symbole = db.query(SymboleTag).filter(SymboleTag.id == symbole_id).first()
+    db_symbole = await db.get(SymboleTag, symbole_id)
     if not db_symbole:
         raise HTTPException(status_code=404, detail="Symbole non trouvé")
 
@@ -114,10 +114,10 @@ def update_symbole(
         setattr(db_symbole, key, value)
 
     try:
-        db.commit()
-        db.refresh(db_symbole)
+        await db.commit()
+        await db.refresh(db_symbole)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Impossible de mettre à jour le symbole : {str(e)}",
@@ -127,23 +127,23 @@ def update_symbole(
 
 
 @router.delete("/symboles/{symbole_id}", tags=["Symboles"])
-def delete_symbole(
+async def delete_symbole(
     symbole_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Supprime un symbole.
     """
-    symbole = db.query(SymboleTag).filter(SymboleTag.id == symbole_id).first()
+    symbole = await db.get(SymboleTag, symbole_id)
     if not symbole:
         raise HTTPException(status_code=404, detail="Symbole non trouvé")
 
     try:
-        db.delete(symbole)
-        db.commit()
+        await db.delete(symbole)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Impossible de supprimer le symbole : {str(e)}",
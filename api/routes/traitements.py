@@ -1,13 +1,15 @@
 # api/routes/traitements.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, validator
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import LIST_KEY, cached_response, reference_cache
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, select_fields
+from database.config.database import get_async_db
 from database.models.base import Traitement
 
 
@@ -37,15 +39,22 @@ class TraitementResponse(TraitementBase):
 
 router = APIRouter()
 
+# Espace de noms du cache (api/cache.py)
+CACHE_NAMESPACE = "traitements"
+
 
 # Routes GET (non protégées)
 @router.get("/traitements", response_model=List[TraitementResponse])
-def get_traitements(db: Session = Depends(get_db)):
+async def get_traitements(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def load():
+        return await fetch_json(
+            db, select_fields(Traitement, TraitementResponse).order_by(Traitement.id)
+        )
+
     try:
-        traitements = db.query(Traitement).all()
-        return [
-            TraitementResponse(id=t.id, nom=t.nom, type=t.type) for t in traitements
-        ]
+        return await cached_response(
+            request, CACHE_NAMESPACE, LIST_KEY, List[TraitementResponse], load
+        )
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,15 +63,20 @@ def get_traitements(db: Session = Depends(get_db)):
 
 
 @router.get("/traitements/{traitement_id}", response_model=TraitementResponse)
-def get_traitement(traitement_id: int, db: Session = Depends(get_db)):
-    try:
-        traitement = db.query(Traitement).filter(Traitement.id == traitement_id).first()
+async def get_traitement(
+    traitement_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    async def load():
+        traitement = await db.get(Traitement, traitement_id)
         if traitement is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Traitement non trouvé"
             )
-        return TraitementResponse(
-            id=traitement.id, nom=traitement.nom, type=traitement.type
+        return traitement
+
+    try:
+        return await cached_response(
+            request, CACHE_NAMESPACE, traitement_id, TraitementResponse, load
         )
     except SQLAlchemyError as e:
         raise HTTPException(
@@ -79,19 +93,20 @@ def get_traitement(traitement_id: int, db: Session = Depends(get_db)):
 )
 async def create_traitement(
     traitement: TraitementBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
         db_traitement = Traitement(nom=traitement.nom, type=traitement.type)
         db.add(db_traitement)
-        db.commit()
-        db.refresh(db_traitement)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_traitement)
         return TraitementResponse(
             id=db_traitement.id, nom=db_traitement.nom, type=db_traitement.type
         )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la création du traitement: {str(e)}",
@@ -102,13 +117,11 @@ async def create_traitement(
 async def update_traitement(
     traitement_id: int,
     traitement: TraitementBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_traitement = (
-            db.query(Traitement).filter(Traitement.id == traitement_id).first()
-        )
+        db_traitement = await db.get(Traitement, traitement_id)
         if db_traitement is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Traitement non trouvé"
@@ -116,13 +129,14 @@ async def update_traitement(
 
         db_traitement.nom = traitement.nom
         db_traitement.type = traitement.type
-        db.commit()
-        db.refresh(db_traitement)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
+        await db.refresh(db_traitement)
         return TraitementResponse(
             id=db_traitement.id, nom=db_traitement.nom, type=db_traitement.type
         )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour du traitement: {str(e)}",
@@ -131,22 +145,23 @@ async def update_traitement(
 
 @router.delete("/traitements/{traitement_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_traitement(
-    traitement_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    traitement_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_traitement = (
-            db.query(Traitement).filter(Traitement.id == traitement_id).first()
-        )
+        db_traitement = await db.get(Traitement, traitement_id)
         if db_traitement is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Traitement non trouvé"
             )
 
-        db.delete(db_traitement)
-        db.commit()
+        await db.delete(db_traitement)
+        await db.commit()
+        reference_cache.invalidate(CACHE_NAMESPACE)
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression du traitement: {str(e)}",
@@ -1,14 +1,43 @@
 # api/routes/verres.py
-from typing import List, Optional
+import csv
+import io
+import json
+from enum import Enum
+from typing import Annotated, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import (
+    Integer,
+    cast,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
 
+from api.bulk import BULK_MAX_ITEMS, BulkResponse, BulkResults, existing_ids
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
-from database.models.base import Traitement, Verre
+from database.config.database import get_async_db
+from database.models.base import (
+    Fournisseur,
+    Gamme,
+    Materiau,
+    Serie,
+    SymboleTag,
+    Traitement,
+    Verre,
+    VerreSymbole,
+    verres_traitements,
+)
+from database.models.facets import verres_facets
 
 
 # Modèle Pydantic pour les traitements
@@ -48,17 +77,382 @@ class VerreResponse(VerreBase):
 
 router = APIRouter()
 
+# Taille de page par défaut et maximale de GET /verres
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class VerreFilters:
+    """
+    Filtres de la liste des verres, appliqués côté serveur.
+    Chaque filtre correspond à un index de la table verres (idx_verres_*).
+    """
+
+    def __init__(
+        self,
+        fournisseur_id: Optional[int] = Query(None, description="Fournisseur"),
+        gamme_id: Optional[int] = Query(None, description="Gamme"),
+        materiau_id: Optional[int] = Query(None, description="Matériau"),
+        indice_min: Optional[float] = Query(None, description="Indice minimal"),
+        indice_max: Optional[float] = Query(None, description="Indice maximal"),
+        nom: Optional[str] = Query(
+            None, min_length=1, description="Début du nom (sensible à la casse)"
+        ),
+    ):
+        self.fournisseur_id = fournisseur_id
+        self.gamme_id = gamme_id
+        self.materiau_id = materiau_id
+        self.indice_min = indice_min
+        self.indice_max = indice_max
+        self.nom = nom
+
+    def conditions(self) -> list:
+        """Conditions SQL des filtres renseignés."""
+        conditions = []
+        if self.fournisseur_id is not None:
+            conditions.append(Verre.fournisseur_id == self.fournisseur_id)
+        if self.gamme_id is not None:
+            conditions.append(Verre.gamme_id == self.gamme_id)
+        if self.materiau_id is not None:
+            conditions.append(Verre.materiau_id == self.materiau_id)
+        if self.indice_min is not None:
+            conditions.append(Verre.indice >= self.indice_min)
+        if self.indice_max is not None:
+            conditions.append(Verre.indice <= self.indice_max)
+        if self.nom:
+            # Intervalle [préfixe, préfixe suivant[ : utilise idx_verres_nom,
+            # contrairement à LIKE (insensible à la casse sous SQLite)
+            upper = self.nom[:-1] + chr(ord(self.nom[-1]) + 1)
+            conditions += [Verre.nom >= self.nom, Verre.nom < upper]
+        return conditions
+
+    def apply(self, query: Select) -> Select:
+        """Ajoute les filtres renseignés à une requête sur Verre."""
+        return query.where(*self.conditions())
+
 
 # Routes GET (non protégées)
 @router.get("/verres", response_model=List[VerreResponse])
-async def get_verres(db: Session = Depends(get_db)):
-    verres = db.query(Verre).all()
+async def get_verres(
+    response: Response,
+    after: Optional[int] = Query(
+        None, description="Curseur : id du dernier verre de la page précédente"
+    ),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Nombre maximum de verres retournés",
+    ),
+    full_list: bool = Query(
+        False,
+        alias="all",
+        description="Liste complète sans pagination (compatibilité)",
+    ),
+    filters: VerreFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Liste des verres, paginée par curseur sur l'id (keyset).
+
+    Les verres sont triés par id ; la page suivante s'obtient avec
+    ?after=<valeur de l'en-tête X-Next-Cursor>. L'en-tête est absent sur la
+    dernière page. Les traitements sont chargés en une requête par page
+    (selectinload) plutôt que par jointure sur toute la table.
+    """
+    query = filters.apply(
+        select(Verre).options(selectinload(Verre.traitements))
+    ).order_by(Verre.id)
+    if full_list:
+        return (await db.scalars(query)).all()
+
+    if after is not None:
+        query = query.where(Verre.id > after)
+    # Un verre de plus pour savoir s'il existe une page suivante
+    verres = (await db.scalars(query.limit(limit + 1))).all()
+    if len(verres) > limit:
+        verres = verres[:limit]
+        response.headers["X-Next-Cursor"] = str(verres[-1].id)
     return verres
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+# Nombre de lignes lues par aller-retour du curseur pendant un export
+EXPORT_BATCH_SIZE = 1000
+# Séparateur des listes agrégées par group_concat (caractère de contrôle US)
+_LIST_SEPARATOR = "\x1f"
+
+EXPORT_COLUMNS = [
+    "id",
+    "nom",
+    "variante",
+    "hauteur_min",
+    "hauteur_max",
+    "indice",
+    "url_gravure",
+    "url_source",
+    "fournisseur",
+    "gamme",
+    "serie",
+    "materiau",
+    "traitements",
+    "symboles",
+]
+
+
+def export_statement(filters: VerreFilters):
+    """
+    Requête d'export : une ligne par verre, avec les noms des entités liées.
+
+    Traitements et symboles validés sont agrégés par des sous-requêtes corrélées
+    (clé primaire de verres_traitements, idx_verres_symboles_verre_symbole) :
+    pas de multiplication des lignes, chaque verre est lu une seule fois.
+    """
+    traitements = (
+        select(func.group_concat(Traitement.nom, _LIST_SEPARATOR))
+        .join(verres_traitements, verres_traitements.c.traitement_id == Traitement.id)
+        .where(verres_traitements.c.verre_id == Verre.id)
+        .scalar_subquery()
+    )
+    symboles = (
+        select(func.group_concat(SymboleTag.nom, _LIST_SEPARATOR))
+        .join(VerreSymbole, VerreSymbole.symbole_id == SymboleTag.id)
+        .where(VerreSymbole.verre_id == Verre.id, VerreSymbole.est_valide.is_(True))
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Verre.id,
+            Verre.nom,
+            Verre.variante,
+            Verre.hauteur_min,
+            Verre.hauteur_max,
+            Verre.indice,
+            Verre.url_gravure,
+            Verre.url_source,
+            Fournisseur.nom.label("fournisseur"),
+            Gamme.nom.label("gamme"),
+            Serie.nom.label("serie"),
+            Materiau.nom.label("materiau"),
+            traitements.label("traitements"),
+            symboles.label("symboles"),
+        )
+        .outerjoin(Fournisseur, Verre.fournisseur_id == Fournisseur.id)
+        .outerjoin(Gamme, Verre.gamme_id == Gamme.id)
+        .outerjoin(Serie, Verre.serie_id == Serie.id)
+        .outerjoin(Materiau, Verre.materiau_id == Materiau.id)
+        .where(*filters.conditions())
+        .order_by(Verre.id)
+    )
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return sorted(value.split(_LIST_SEPARATOR)) if value else []
+
+
+async def iter_export_rows(
+    engine: AsyncEngine, filters: VerreFilters, batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[List[dict]]:
+    """
+    Parcourt le catalogue par lots avec un curseur côté serveur.
+
+    Args:
+        engine: Moteur asynchrone de la base
+        filters: Filtres de la liste des verres
+        batch_size: Nombre de lignes par lot (yield_per)
+
+    Yields:
+        List[dict]: Lot de verres (colonnes EXPORT_COLUMNS)
+    """
+    async with engine.connect() as connection:
+        result = await connection.stream(
+            export_statement(filters).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.mappings().partitions():
+            rows = []
+            for row in partition:
+                row = dict(row)
+                row["traitements"] = _split_list(row["traitements"])
+                row["symboles"] = _split_list(row["symboles"])
+                rows.append(row)
+            yield rows
+
+
+async def stream_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    """Un objet JSON par ligne, un morceau de réponse par lot."""
+    async for rows in batches:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+async def stream_csv(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    """CSV avec en-tête ; les listes sont jointes par « | »."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # L'en-tête part immédiatement, avant la première lecture en base
+    yield buffer.getvalue()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [
+                [
+                    "|".join(row[c]) if isinstance(row[c], list) else row[c]
+                    for c in EXPORT_COLUMNS
+                ]
+                for row in rows
+            ]
+        )
+        yield buffer.getvalue()
+
+
+@router.get("/verres/export")
+async def export_verres(
+    format: ExportFormat = Query(ExportFormat.ndjson, description="ndjson ou csv"),
+    filters: VerreFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Export complet du catalogue en flux (NDJSON ou CSV).
+
+    Chaque verre est exporté avec son fournisseur, sa gamme, sa série, son
+    matériau, ses traitements et ses symboles validés. Les lignes sont lues par
+    lots de EXPORT_BATCH_SIZE et envoyées au fur et à mesure : la mémoire utilisée
+    ne dépend pas de la taille de la table.
+    """
+    # Le flux ouvre sa propre connexion : la session de la requête peut être
+    # fermée avant la fin de l'envoi
+    bind = db.bind
+    if isinstance(bind, AsyncConnection):
+        bind = bind.engine
+    batches = iter_export_rows(bind, filters)
+    if format == ExportFormat.csv:
+        content, media_type = stream_csv(batches), "text/csv; charset=utf-8"
+    else:
+        content, media_type = stream_ndjson(batches), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="verres.{format.value}"'
+        },
+    )
+
+
+# Facettes du catalogue : nom -> (table de référence, colonne de verres) ;
+# l'indice n'a pas de table de référence
+CATALOGUE_FACETS = {
+    "fournisseur": (Fournisseur, Verre.fournisseur_id),
+    "gamme": (Gamme, Verre.gamme_id),
+    "materiau": (Materiau, Verre.materiau_id),
+    "indice": (None, Verre.indice),
+}
+
+
+class FacetValue(BaseModel):
+    id: Optional[int] = None
+    value: str
+    count: int
+
+
+class FacetsResponse(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetValue]]
+
+
+def summary_facets_statement():
+    """
+    Facettes lues dans la synthèse verres_facets (tenue à jour par triggers) :
+    une ligne par valeur, sans parcourir verres.
+    """
+    summary = verres_facets.c
+    parts = []
+    for name, (model, _) in CATALOGUE_FACETS.items():
+        if model is None:
+            part = select(literal(name), null(), summary.cle, summary.nombre).where(
+                summary.facette == name
+            )
+        else:
+            part = (
+                select(literal(name), model.id, model.nom, summary.nombre)
+                .join(model, model.id == cast(summary.cle, Integer))
+                .where(summary.facette == name)
+            )
+        parts.append(part)
+    return union_all(*parts)
+
+
+def live_facets_statement(filters: VerreFilters):
+    """Facettes des verres filtrés : COUNT groupés sur les index idx_verres_*."""
+    conditions = filters.conditions()
+    parts = []
+    for name, (model, column) in CATALOGUE_FACETS.items():
+        if model is None:
+            key = func.printf("%.2f", column)
+            part = (
+                select(literal(name), null(), key, func.count())
+                .where(column.is_not(None), *conditions)
+                .group_by(key)
+            )
+        else:
+            part = (
+                select(literal(name), model.id, model.nom, func.count())
+                .join_from(Verre, model, model.id == column)
+                .where(*conditions)
+                .group_by(model.id)
+            )
+        parts.append(part)
+    return union_all(*parts)
+
+
+@router.get("/verres/facets", response_model=FacetsResponse)
+async def get_verres_facets(
+    filters: VerreFilters = Depends(), db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Nombre de verres par fournisseur, gamme, matériau et indice (barre de
+    filtres). Sans filtre, les compteurs viennent de la table de synthèse.
+    """
+    if filters.conditions():
+        statement = live_facets_statement(filters)
+    else:
+        statement = summary_facets_statement()
+    try:
+        rows = (await db.execute(statement)).all()
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=(
+                "Synthèse des facettes indisponible (alembic upgrade head): "
+                f"{str(e)}"
+            ),
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du calcul des facettes: {str(e)}",
+        )
+
+    facets = {name: [] for name in CATALOGUE_FACETS}
+    for name, value_id, value, count in rows:
+        facets[name].append(FacetValue(id=value_id, value=value, count=count))
+    for name, values in facets.items():
+        if name == "indice":
+            values.sort(key=lambda v: float(v.value))
+        else:
+            values.sort(key=lambda v: (-v.count, v.value))
+    # Chaque verre a un fournisseur : le total est la somme de cette facette
+    total = sum(v.count for v in facets["fournisseur"])
+    return FacetsResponse(total=total, facets=facets)
+
+
 @router.get("/verre/{verre_id}", response_model=VerreResponse)
-async def get_verre(verre_id: int, db: Session = Depends(get_db)):
-    verre = db.query(Verre).filter(Verre.id == verre_id).first()
+async def get_verre(verre_id: int, db: AsyncSession = Depends(get_async_db)):
+    verre = await db.get(Verre, verre_id)
     if verre is None:
         raise HTTPException(status_code=404, detail="Verre non trouvé")
     return verre
@@ -69,31 +463,98 @@ async def get_verre(verre_id: int, db: Session = Depends(get_db)):
     "/verres", response_model=VerreResponse, status_code=status.HTTP_201_CREATED
 )
 async def create_verre(
-    verre: VerreBase, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    verre: VerreBase,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
         db_verre = Verre(**verre.dict())
         db.add(db_verre)
-        db.commit()
-        db.refresh(db_verre)
+        await db.commit()
+        await db.refresh(db_verre)
         return db_verre
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la création du verre: {str(e)}",
         )
 
 
+# Clés étrangères d'un verre et table de référence de chacune
+VERRE_REFERENCES = {
+    "fournisseur_id": Fournisseur,
+    "gamme_id": Gamme,
+    "materiau_id": Materiau,
+    "serie_id": Serie,
+}
+# Colonnes NOT NULL de verres, optionnelles dans VerreBase
+REQUIRED_VERRE_FIELDS = ["nom", "fournisseur_id", "gamme_id"]
+
+
+@router.post(
+    "/verres/bulk",
+    response_model=BulkResponse,
+    status_code=status.HTTP_207_MULTI_STATUS,
+)
+async def create_verres_bulk(
+    verres: Annotated[
+        List[VerreBase], Body(), Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    ],
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
+):
+    """
+    Crée jusqu'à BULK_MAX_ITEMS verres en une transaction. Les verres dont un
+    champ obligatoire manque (422) ou dont une référence n'existe pas (404)
+    sont écartés ; les autres sont créés (201, avec leur id).
+    """
+    results = BulkResults(len(verres))
+    rows = [verre.dict() for verre in verres]
+
+    for index, row in enumerate(rows):
+        missing = [key for key in REQUIRED_VERRE_FIELDS if row[key] is None]
+        if missing:
+            results.fail(
+                index,
+                f"Champs obligatoires manquants: {', '.join(missing)}",
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+    try:
+        # Une requête IN par table de référence
+        for key, model in VERRE_REFERENCES.items():
+            found = await existing_ids(db, model, (row[key] for row in rows))
+            for index in results.pending():
+                if rows[index][key] is not None and rows[index][key] not in found:
+                    results.fail(index, f"{model.__name__} {rows[index][key]} absent")
+
+        pending = results.pending()
+        if pending:
+            ids = await db.scalars(
+                insert(Verre).returning(Verre.id, sort_by_parameter_order=True),
+                [rows[index] for index in pending],
+            )
+            results.created(pending, ids.all())
+            await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la création des verres: {str(e)}",
+        )
+    return results.response()
+
+
 @router.put("/verres/{verre_id}", response_model=VerreResponse)
 async def update_verre(
     verre_id: int,
     verre: VerreBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     try:
-        db_verre = db.query(Verre).filter(Verre.id == verre_id).first()
+        db_verre = await db.get(Verre, verre_id)
         if db_verre is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Verre non trouvé"
@@ -102,11 +563,11 @@ async def update_verre(
         for key, value in verre.dict(exclude_unset=True).items():
             setattr(db_verre, key, value)
 
-        db.commit()
-        db.refresh(db_verre)
+        await db.commit()
+        await db.refresh(db_verre)
         return db_verre
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la mise à jour du verre: {str(e)}",
@@ -115,20 +576,22 @@ async def update_verre(
 
 @router.delete("/verres/{verre_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_verre(
-    verre_id: int, db: Session = Depends(get_db), _: str = Depends(verify_auth)
+    verre_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_auth),
 ):
     try:
-        db_verre = db.query(Verre).filter(Verre.id == verre_id).first()
+        db_verre = await db.get(Verre, verre_id)
         if db_verre is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Verre non trouvé"
             )
 
-        db.delete(db_verre)
-        db.commit()
+        await db.delete(db_verre)
+        await db.commit()
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la suppression du verre: {str(e)}",
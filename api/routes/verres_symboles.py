@@ -1,13 +1,16 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.bulk import BULK_MAX_ITEMS, BulkResponse, BulkResults, existing_ids
 from api.dependencies.auth import verify_auth
-from database.config.database import get_db
+from api.serialization import fetch_json, json_response, select_fields
+from database.config.database import get_async_db
 from database.models.base import SymboleTag, Verre, VerreSymbole
 
 router = APIRouter()
@@ -52,37 +55,33 @@ class VerreSymboleResponse(VerreSymboleBase):
     response_model=VerreSymboleResponse,
     tags=["Associations Verres-Symboles"],
 )
-def create_verre_symbole(
+async def create_verre_symbole(
     verre_id: int,
     association: VerreSymboleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     username: str = Depends(verify_auth),
 ):
     """
     Crée une nouvelle association entre un verre et un symbole.
     """
     # Vérifier que le verre existe
-    verre = db.query(Verre).filter(Verre.id == verre_id).first()
+    verre = await db.get(Verre, verre_id)
     if not verre:
         raise HTTPException(status_code=404, detail="Verre non trouvé")
 
     # Vérifier que le symbole existe
-    symbole = (
-        db.query(SymboleTag).filter(SymboleTag.id == association.symbole_id).first()
-    )
+    symbole = await db.get(SymboleTag, association.symbole_id)
     if not symbole:
         raise HTTPException(status_code=404, detail="Symbole non trouvé")
 
     # Vérifier si l'association existe déjà
-    existing = (
-        db.query(VerreSymbole)
-        .filter(
+    existing = await db.scalar(
+        select(VerreSymbole).where(
             and_(
                 VerreSymbole.verre_id == verre_id,
                 VerreSymbole.symbole_id == association.symbole_id,
             )
         )
-        .first()
     )
 
     if existing:
@@ -100,10 +99,10 @@ def create_verre_symbole(
     db.add(db_association)
 
     try:
-        db.commit()
-        db.refresh(db_association)
+        await db.commit()
+        await db.refresh(db_association)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400, detail=f"Impossible de créer l'association : {str(e)}"
         )
@@ -111,35 +110,115 @@ def create_verre_symbole(
     return VerreSymboleResponse.from_orm(db_association)
 
 
+@router.post(
+    "/verres/symboles/bulk",
+    response_model=BulkResponse,
+    status_code=status.HTTP_207_MULTI_STATUS,
+    tags=["Associations Verres-Symboles"],
+)
+async def create_verres_symboles_bulk(
+    associations: Annotated[
+        List[VerreSymboleCreate],
+        Body(),
+        Field(min_length=1, max_length=BULK_MAX_ITEMS),
+    ],
+    db: AsyncSession = Depends(get_async_db),
+    username: str = Depends(verify_auth),
+):
+    """
+    Crée jusqu'à BULK_MAX_ITEMS associations (prédictions du modèle pour tout un
+    catalogue) en une transaction. Verre ou symbole absent : 404 ; association
+    déjà existante ou répétée dans la requête : 409 ; sinon 201.
+    """
+    results = BulkResults(len(associations))
+    try:
+        verres = await existing_ids(db, Verre, (a.verre_id for a in associations))
+        symboles = await existing_ids(
+            db, SymboleTag, (a.symbole_id for a in associations)
+        )
+        # Couples déjà en base : verre_id IN (...) parcourt l'index unique, un IN
+        # sur les couples (verre_id, symbole_id) le lirait en entier
+        existing = set(
+            (
+                await db.execute(
+                    select(VerreSymbole.verre_id, VerreSymbole.symbole_id).where(
+                        VerreSymbole.verre_id.in_(verres),
+                        VerreSymbole.symbole_id.in_(symboles),
+                    )
+                )
+            ).all()
+        )
+
+        for index, association in enumerate(associations):
+            pair = (association.verre_id, association.symbole_id)
+            if association.verre_id not in verres:
+                results.fail(index, "Verre non trouvé")
+            elif association.symbole_id not in symboles:
+                results.fail(index, "Symbole non trouvé")
+            elif pair in existing:
+                results.fail(
+                    index, "Cette association existe déjà", status.HTTP_409_CONFLICT
+                )
+            else:
+                existing.add(pair)
+
+        pending = results.pending()
+        if pending:
+            rows = [
+                {
+                    "verre_id": associations[i].verre_id,
+                    "symbole_id": associations[i].symbole_id,
+                    "score_confiance": associations[i].score_confiance,
+                    "est_valide": associations[i].est_valide,
+                    "valide_par": username if associations[i].est_valide else None,
+                }
+                for i in pending
+            ]
+            ids = await db.scalars(
+                insert(VerreSymbole).returning(
+                    VerreSymbole.id, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            results.created(pending, ids.all())
+            await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Impossible de créer les associations : {str(e)}",
+        )
+    return results.response()
+
+
 @router.get(
     "/verres/{verre_id}/symboles/",
     response_model=List[VerreSymboleResponse],
     tags=["Associations Verres-Symboles"],
 )
-def get_symboles_for_verre(
+async def get_symboles_for_verre(
     verre_id: int,
     skip: int = Query(0, description="Nombre d'éléments à sauter"),
     limit: int = Query(100, description="Nombre maximum d'éléments à retourner"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Récupère tous les symboles associés à un verre.
     """
     # Vérifier que le verre existe
-    verre = db.query(Verre).filter(Verre.id == verre_id).first()
+    verre = await db.get(Verre, verre_id)
     if not verre:
         raise HTTPException(status_code=404, detail="Verre non trouvé")
 
-    associations = (
-        db.query(VerreSymbole)
-        .filter(VerreSymbole.verre_id == verre_id)
+    query = (
+        select_fields(VerreSymbole, VerreSymboleResponse)
+        .where(VerreSymbole.verre_id == verre_id)
+        .order_by(VerreSymbole.id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
-
-    return [VerreSymboleResponse.from_orm(a) for a in associations]
+    return json_response(await fetch_json(db, query))
 
 
 @router.put(
@@ -147,24 +226,22 @@ def get_symboles_for_verre(
     response_model=VerreSymboleResponse,
     tags=["Associations Verres-Symboles"],
 )
-def validate_verre_symbole(
+async def validate_verre_symbole(
     verre_id: int,
     symbole_id: int,
     update: VerreSymboleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Valide ou invalide une association verre-symbole.
     """
-    association = (
-        db.query(VerreSymbole)
-        .filter(
+    association = await db.scalar(
+        select(VerreSymbole).where(
             and_(
                 VerreSymbole.verre_id == verre_id, VerreSymbole.symbole_id == symbole_id
             )
         )
-        .first()
     )
 
     if not association:
@@ -175,10 +252,10 @@ def validate_verre_symbole(
     association.updated_at = datetime.utcnow()
 
     try:
-        db.commit()
-        db.refresh(association)
+        await db.commit()
+        await db.refresh(association)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Impossible de mettre à jour l'association : {str(e)}",
@@ -190,33 +267,31 @@ def validate_verre_symbole(
 @router.delete(
     "/verres/{verre_id}/symboles/{symbole_id}", tags=["Associations Verres-Symboles"]
 )
-def delete_verre_symbole(
+async def delete_verre_symbole(
     verre_id: int,
     symbole_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: str = Depends(verify_auth),
 ):
     """
     Supprime une association verre-symbole.
     """
-    association = (
-        db.query(VerreSymbole)
-        .filter(
+    association = await db.scalar(
+        select(VerreSymbole).where(
             and_(
                 VerreSymbole.verre_id == verre_id, VerreSymbole.symbole_id == symbole_id
             )
         )
-        .first()
     )
 
     if not association:
         raise HTTPException(status_code=404, detail="Association non trouvée")
 
     try:
-        db.delete(association)
-        db.commit()
+        await db.delete(association)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400, detail=f"Impossible de supprimer l'association : {str(e)}"
         )
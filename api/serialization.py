@@ -0,0 +1,82 @@
+"""
+Sérialisation JSON rapide des listes lues en base.
+
+Les routes de liste lisent seulement les colonnes de leur modèle de réponse, en
+lignes Core (sans objet ORM ni modèle Pydantic par ligne), et les encodent
+directement en JSON : orjson s'il est installé, sinon le module json standard.
+Les valeurs viennent de la base et ont été validées à l'écriture ; le JSON
+produit est identique à celui du modèle de réponse.
+"""
+
+import datetime
+import json
+from typing import Any, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import orjson  # Dépendance optionnelle
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> str:
+    """Types non natifs du module json : dates au format ISO 8601."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode une valeur en JSON compact (UTF-8).
+
+    Args:
+        value: Listes, dictionnaires, scalaires et dates
+
+    Returns:
+        bytes: Document JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def select_fields(model, response_model: Type[BaseModel]) -> Select:
+    """
+    select() des seules colonnes de model exposées par response_model.
+
+    Args:
+        model: Modèle SQLAlchemy
+        response_model: Modèle Pydantic de la réponse (noms des colonnes)
+
+    Returns:
+        Select: Requête Core, colonnes dans l'ordre des champs du modèle
+    """
+    return select(*(getattr(model, name) for name in response_model.model_fields))
+
+
+async def fetch_json(db: AsyncSession, statement: Select) -> bytes:
+    """
+    Exécute une requête et encode ses lignes en liste d'objets JSON.
+
+    Args:
+        db (AsyncSession): Session de base de données
+        statement (Select): Requête (voir select_fields)
+
+    Returns:
+        bytes: Liste JSON, un objet par ligne
+    """
+    result = await db.execute(statement)
+    keys = list(result.keys())
+    return dumps([dict(zip(keys, row)) for row in result])
+
+
+def json_response(body: bytes) -> Response:
+    """Réponse JSON déjà encodée (aucune validation par response_model)."""
+    return Response(content=body, media_type="application/json")
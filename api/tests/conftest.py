@@ -1,23 +1,34 @@
+import re
 from unittest.mock import MagicMock
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
-
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+from api.cache import reference_cache
 from api.dependencies.auth import verify_auth
 from api.routes import (
     detection,
     fournisseurs,
     gammes,
     materiaux,
+    search,
     series,
     symboles,
     traitements,
     verres,
     verres_symboles,
 )
-from database.config.database import get_db
+from database.config.database import get_async_db
+from database.models.base import Base
+from database.models.facets import create_facet_summary
+from database.models.search import create_search_index
 
 
 class MockSession(MagicMock):
@@ -94,12 +105,125 @@ class MockSession(MagicMock):
         return MockQuery(self, model_name)
 
 
+class AsyncSessionAdapter:
+    """
+    Expose la session mockée avec l'interface d'AsyncSession.
+
+    Les appels sont délégués à MockSession : les assertions des tests sur
+    db_session (add, commit, refresh...) restent valables. get, scalar et scalars
+    appliquent aux objets stockés les conditions WHERE de la requête (voir
+    _matches).
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def add(self, obj):
+        self._session.add(obj)
+
+    def add_all(self, objects):
+        self._session.add_all(objects)
+
+    async def commit(self):
+        self._session.commit()
+
+    async def rollback(self):
+        self._session.rollback()
+
+    async def refresh(self, obj):
+        self._session.refresh(obj)
+
+    async def delete(self, obj):
+        self._session.delete(obj)
+
+    async def flush(self):
+        self._session.flush()
+
+    async def execute(self, statement):
+        return self._session.execute(statement)
+
+    def _select(self, statement):
+        objects = self._session.query(_entity(statement)).all()
+        return [obj for obj in objects if _matches(obj, statement.whereclause)]
+
+    async def get(self, model, ident):
+        return await self.scalar(select(model).where(model.id == ident))
+
+    async def scalar(self, statement):
+        return _MockScalars(self._select(statement)).first()
+
+    async def scalars(self, statement):
+        return _MockScalars(self._select(statement))
+
+
+class _MockScalars:
+    """Résultat de AsyncSessionAdapter.scalars."""
+
+    def __init__(self, objects):
+        self._objects = objects
+
+    def all(self):
+        return self._objects
+
+    def first(self):
+        return self._objects[0] if self._objects else None
+
+    def unique(self):
+        return self
+
+
+def _entity(statement):
+    """Modèle interrogé par une requête select()."""
+    return statement.column_descriptions[0]["entity"]
+
+
+def _like(pattern, value, flags=0):
+    regex = "".join(
+        ".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern
+    )
+    return value is not None and re.fullmatch(regex, value, flags) is not None
+
+
+# Opérateurs SQL évalués par _matches : (valeur de l'objet, valeur de la requête)
+_OPERATORS = {
+    operators.eq: lambda a, b: a == b,
+    operators.ne: lambda a, b: a != b,
+    operators.gt: lambda a, b: a is not None and a > b,
+    operators.ge: lambda a, b: a is not None and a >= b,
+    operators.lt: lambda a, b: a is not None and a < b,
+    operators.le: lambda a, b: a is not None and a <= b,
+    operators.in_op: lambda a, b: a in b,
+    operators.not_in_op: lambda a, b: a not in b,
+    operators.is_: lambda a, b: a is b,
+    operators.is_not: lambda a, b: a is not b,
+    operators.like_op: lambda a, b: _like(b, a),
+    operators.ilike_op: lambda a, b: _like(b, a, re.IGNORECASE),
+}
+
+
+def _matches(obj, clause):
+    """
+    Évalue une condition WHERE sur un objet mocké : conjonctions (and_) de
+    comparaisons entre une colonne du modèle et une valeur.
+    """
+    if clause is None:
+        return True
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        return all(_matches(obj, c) for c in clause.clauses)
+    if not isinstance(clause, BinaryExpression) or clause.operator not in _OPERATORS:
+        raise NotImplementedError(f"Condition non gérée par le mock : {clause}")
+    right = clause.right
+    expected = right.effective_value if isinstance(right, BindParameter) else None
+    return _OPERATORS[clause.operator](getattr(obj, clause.left.key), expected)
+
+
 # Configuration de l'application de test
 @pytest.fixture
 def app():
     """Fixture pour l'application FastAPI."""
     app = FastAPI()
     app.include_router(verres.router, prefix="/api")
+    app.include_router(search.router, prefix="/api")
     app.include_router(traitements.router, prefix="/api")
     app.include_router(materiaux.router, prefix="/api")
     app.include_router(gammes.router, prefix="/api")
@@ -130,15 +254,63 @@ def auth_headers():
 def client(app, db_session, mocker):
     """Configure le client de test avec les dépendances mockées."""
 
-    def override_get_db():
-        return db_session
+    async def override_get_async_db():
+        yield AsyncSessionAdapter(db_session)
 
     # Mock de l'authentification
     mocker.patch("api.auth.auth.verify_token", return_value="test_user")
+    # Le cache des tables de référence ne doit pas survivre d'un test à l'autre
+    reference_cache.clear()
 
     # Override des dépendances
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[verify_auth] = lambda: "test_user"
+
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    """Fichier d'une base SQLite de test."""
+    return tmp_path / "verres_test.db"
+
+
+@pytest.fixture
+def sqlite_session(sqlite_path):
+    """Session synchrone sur une base SQLite temporaire, pour préparer les données."""
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    Base.metadata.create_all(bind=engine)
+    # Objets créés par les migrations Alembic (hors Base.metadata)
+    with engine.begin() as connection:
+        create_search_index(connection)
+        create_facet_summary(connection)
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_async_engine(sqlite_path, sqlite_session):
+    """Moteur asynchrone sur la même base que sqlite_session."""
+    # NullPool : TestClient peut ouvrir une boucle d'événements par requête
+    return create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", poolclass=NullPool)
+
+
+@pytest.fixture
+def sqlite_client(app, sqlite_async_engine):
+    """Client de test branché sur la base SQLite temporaire (requêtes SQL réelles)."""
+
+    async def override_get_async_db():
+        async with AsyncSession(sqlite_async_engine, expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
     app.dependency_overrides[verify_auth] = lambda: "test_user"
+    reference_cache.clear()
 
     client = TestClient(app)
     yield client
@@ -0,0 +1,22 @@
+import asyncio
+
+from api import serialization
+from api.benchmark_serialization import LISTS, _measure, seed
+
+
+def test_benchmark_modes_produce_same_json(tmp_path):
+    """Exécution courte du benchmark : même JSON quel que soit le mode."""
+    db_path = tmp_path / "benchmark.db"
+    seed(db_path, rows=120)
+    orjson = serialization.orjson
+
+    results = {
+        mode: asyncio.run(_measure(db_path, mode, repeat=1))
+        for mode in ("orm", "core-json", "core-orjson")
+    }
+
+    assert serialization.orjson is orjson
+    for name in LISTS:
+        sizes = {result[name]["bytes"] for result in results.values()}
+        assert len(sizes) == 1
+        assert all(result[name]["seconds"] > 0 for result in results.values())
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from fastapi import Request, status
+
+from api.cache import (
+    LIST_KEY,
+    MemoryBackend,
+    ReferenceCache,
+    _adapter,
+    cached_response,
+    etag_matches,
+    make_etag,
+    reference_cache,
+)
+from database.models.base import Fournisseur, Traitement
+
+
+class TestReferenceCache:
+    def test_list_is_served_from_cache(self, sqlite_client, sqlite_session):
+        sqlite_session.add(Fournisseur(nom="Essilor"))
+        sqlite_session.commit()
+        first = sqlite_client.get("/api/fournisseurs")
+
+        # Écriture directe en base : le cache n'est pas invalidé
+        sqlite_session.add(Fournisseur(nom="Hoya"))
+        sqlite_session.commit()
+        second = sqlite_client.get("/api/fournisseurs")
+
+        assert first.status_code == status.HTTP_200_OK
+        assert [f["nom"] for f in second.json()] == ["Essilor"]
+        assert second.headers["etag"] == first.headers["etag"]
+
+    def test_if_none_match_returns_304(self, sqlite_client, sqlite_session):
+        sqlite_session.add(Traitement(nom="Crizal", type="antireflet"))
+        sqlite_session.commit()
+        etag = sqlite_client.get("/api/traitements/1").headers["etag"]
+
+        response = sqlite_client.get(
+            "/api/traitements/1", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_write_routes_invalidate(self, sqlite_client):
+        sqlite_client.post("/api/gammes", json={"nom": "Varilux"})
+        before = sqlite_client.get("/api/gammes")
+        etag = before.headers["etag"]
+
+        sqlite_client.put("/api/gammes/1", json={"nom": "Varilux X"})
+        by_id = sqlite_client.get("/api/gammes/1", headers={"If-None-Match": etag})
+        sqlite_client.post("/api/gammes", json={"nom": "Eyezen"})
+        after = sqlite_client.get("/api/gammes", headers={"If-None-Match": etag})
+
+        assert by_id.json() == {"id": 1, "nom": "Varilux X"}
+        assert after.status_code == status.HTTP_200_OK
+        assert [g["nom"] for g in after.json()] == ["Varilux X", "Eyezen"]
+
+        sqlite_client.delete("/api/gammes/2")
+        assert len(sqlite_client.get("/api/gammes").json()) == 1
+
+    def test_not_found_is_not_cached(self, sqlite_client, sqlite_session):
+        assert sqlite_client.get("/api/series/1").status_code == 404
+        sqlite_client.post("/api/series", json={"nom": "Série 1"})
+        assert sqlite_client.get("/api/series/1").status_code == 200
+
+
+class TestCacheBackend:
+    def test_memory_backend_ttl(self):
+        backend = MemoryBackend(ttl=0.05)
+        backend.set("gammes", "list", b"[]")
+        assert backend.get("gammes", "list") == b"[]"
+        time.sleep(0.06)
+        assert backend.get("gammes", "list") is None
+
+    def test_etag_round_trip(self):
+        cache = ReferenceCache(MemoryBackend())
+        etag = cache.set("gammes", 1, b'{"id":1}')
+
+        assert cache.get("gammes", 1) == (etag, b'{"id":1}')
+        assert etag == make_etag(b'{"id":1}')
+        assert etag_matches(f'W/"autre", {etag}', etag)
+        assert not etag_matches('"autre"', etag)
+        cache.invalidate("gammes")
+        assert cache.get("gammes", 1) is None
+
+    def test_stale_generation_is_not_stored(self):
+        backend = MemoryBackend()
+        generation = backend.generation("gammes")
+        backend.invalidate("gammes")
+
+        assert not backend.set("gammes", "list", b"[]", generation)
+        assert backend.get("gammes", "list") is None
+        assert backend.set("gammes", "list", b"[]", backend.generation("gammes"))
+
+    def test_invalidation_during_load(self):
+        """Une écriture pendant la lecture en base : la réponse n'est pas gardée"""
+
+        async def load():
+            reference_cache.invalidate("gammes")
+            return b'[{"id":1,"nom":"Varilux"}]'
+
+        request = Request({"type": "http", "headers": []})
+        response = asyncio.run(cached_response(request, "gammes", LIST_KEY, None, load))
+
+        assert response.body == b'[{"id":1,"nom":"Varilux"}]'
+        assert reference_cache.get("gammes", LIST_KEY) is None
+
+    def test_type_adapter_is_reused(self):
+        assert _adapter(int) is _adapter(int)
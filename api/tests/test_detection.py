@@ -112,3 +112,164 @@ class TestDetection:
         data = response.json()
         assert data["is_confident"] is True
         assert data["predicted_symbol"] == "test_symbol"
+
+    def test_detect_returns_localized_detections(self, client, mocker):
+        # Prédicteur mocké et localisation mockée
+        predictor = mocker.MagicMock()
+        predictor.threshold_for.return_value = 0.65
+        mocker.patch("api.routes.detection.templates", predictor)
+        mocker.patch(
+            "api.routes.detection.predict_symbol", return_value=("test_symbol", 0.8)
+        )
+        detect = mocker.patch(
+            "api.routes.detection.detect_symbols",
+            return_value=[
+                {
+                    "symbol": "test_symbol",
+                    "similarity": 0.9,
+                    "is_confident": True,
+                    "box": [10, 20, 30, 40],
+                },
+                {
+                    "symbol": "autre",
+                    "similarity": 0.4,
+                    "is_confident": False,
+                    "box": [50, 60, 20, 20],
+                },
+            ],
+        )
+
+        response = client.post(
+            "/api/detect",
+            files={"file": ("test.png", create_test_image(), "image/png")},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        detect.assert_called_once()
+        assert data["predicted_symbol"] == "test_symbol"
+        assert [d["symbol"] for d in data["detections"]] == ["test_symbol", "autre"]
+        assert data["detections"][0]["box"] == [10, 20, 30, 40]
+
+    def test_detect_localization_failure_keeps_prediction(self, client, mocker):
+        predictor = mocker.MagicMock()
+        predictor.threshold_for.return_value = 0.65
+        mocker.patch("api.routes.detection.templates", predictor)
+        mocker.patch(
+            "api.routes.detection.predict_symbol", return_value=("test_symbol", 0.8)
+        )
+        mocker.patch(
+            "api.routes.detection.detect_symbols", side_effect=RuntimeError("boom")
+        )
+
+        response = client.post(
+            "/api/detect",
+            files={"file": ("test.png", create_test_image(), "image/png")},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["predicted_symbol"] == "test_symbol"
+        assert data["detections"] == []
+
+
+class TestTemplateRegistration:
+    def test_register_templates(self, client, db_session, auth_headers, mocker):
+        from database.models.base import SymboleTag
+
+        symbole = SymboleTag(nom="nouveau_symbole", description="Test")
+        db_session.add(symbole)
+
+        predictor = mocker.MagicMock()
+        predictor.add_templates.return_value = 2
+        predictor.template_symbols = ["autre", "nouveau_symbole", "nouveau_symbole"]
+        mocker.patch("api.routes.detection.templates", predictor)
+
+        response = client.post(
+            f"/api/symboles/{symbole.id}/templates",
+            headers=auth_headers,
+            files=[
+                ("files", ("a.png", create_test_image(), "image/png")),
+                ("files", ("b.png", create_test_image(), "image/png")),
+            ],
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data == {
+            "symbole_id": symbole.id,
+            "symbol": "nouveau_symbole",
+            "added": 2,
+            "total_templates": 2,
+        }
+        symbol, images, sources = predictor.add_templates.call_args[0]
+        assert symbol == "nouveau_symbole"
+        assert len(images) == 2
+        assert sources == ["a.png", "b.png"]
+
+    def test_register_templates_unknown_symbol(self, client, auth_headers, mocker):
+        mocker.patch("api.routes.detection.templates", mocker.MagicMock())
+        response = client.post(
+            "/api/symboles/999/templates",
+            headers=auth_headers,
+            files=[("files", ("a.png", create_test_image(), "image/png"))],
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_register_templates_invalid_image(
+        self, client, db_session, auth_headers, mocker
+    ):
+        from database.models.base import SymboleTag
+
+        symbole = SymboleTag(nom="nouveau_symbole")
+        db_session.add(symbole)
+        predictor = mocker.MagicMock()
+        mocker.patch("api.routes.detection.templates", predictor)
+
+        response = client.post(
+            f"/api/symboles/{symbole.id}/templates",
+            headers=auth_headers,
+            files=[("files", ("a.png", b"corrupted data", "image/png"))],
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        predictor.add_templates.assert_not_called()
+
+
+class TestMetrics:
+    def test_metrics_without_monitor(self, client, mocker):
+        mocker.patch("api.routes.detection.monitor", None)
+
+        response = client.get("/api/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["monitoring"] is False
+
+    def test_metrics_reports_drift(self, client, mocker, tmp_path):
+        import numpy as np
+
+        from model.drift_monitor import (
+            DriftMonitor,
+            EmbeddingLog,
+            embedding_statistics,
+        )
+
+        rng = np.random.default_rng(0)
+        reference = embedding_statistics(
+            rng.normal(size=(200, 8)), np.tile([0.9, 0.5], (200, 1))
+        )
+        log = EmbeddingLog(100, 8, top_k=2)
+        for _ in range(60):
+            # Embeddings décalés et scores effondrés : dérive attendue
+            log.record(rng.normal(loc=3.0, size=8), [0.3, 0.28])
+        monitor = DriftMonitor(log, reference, tmp_path)
+        monitor.run_once()
+        mocker.patch("api.routes.detection.monitor", monitor)
+
+        response = client.get("/api/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["monitoring"] is True
+        assert data["detections_logged"] == 60
+        assert data["status"] == "dérive détectée"
+        assert data["drift"]["drift_detected"] is True
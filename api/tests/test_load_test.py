@@ -0,0 +1,15 @@
+import asyncio
+
+from api.load_test import _run_mode, seed
+
+
+def test_load_test_modes(tmp_path):
+    """Exécution courte du test de charge dans les deux modes."""
+    db_path = tmp_path / "load.db"
+    seed(db_path, rows=50)
+
+    for mode in ("sync", "async"):
+        result = asyncio.run(_run_mode(db_path, mode, concurrency=4, total=30, rows=50))
+        assert result["errors"] == 0
+        assert result["requests_per_s"] > 0
+        assert result["p95_ms"] >= result["p50_ms"]
@@ -0,0 +1,194 @@
+"""
+Plans d'exécution des requêtes fréquentes (EXPLAIN QUERY PLAN).
+
+Les requêtes réellement émises par les routes et par l'import sont capturées
+sur une base SQLite remplie puis analysée (ANALYZE) ; le test échoue si l'une
+d'elles parcourt entièrement une des grandes tables (SCAN) au lieu d'utiliser
+un index (SEARCH).
+"""
+
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from database.models.base import (
+    Fournisseur,
+    Gamme,
+    Materiau,
+    Serie,
+    SymboleTag,
+    Traitement,
+    Verre,
+    VerreSymbole,
+)
+from database.scripts.import_data import check_duplicate_verre
+
+# Tables qui grossissent avec le catalogue
+LARGE_TABLES = {"verres", "verres_symboles", "verres_traitements"}
+
+
+@pytest.fixture
+def seeded(sqlite_session):
+    """Catalogue de 600 verres, traitements et symboles associés, analysé."""
+    fournisseurs = [Fournisseur(nom=f"Fournisseur {i}") for i in range(3)]
+    gammes = [Gamme(nom=f"Gamme {i}") for i in range(4)]
+    materiaux = [Materiau(nom=f"Materiau {i}") for i in range(2)]
+    series = [Serie(nom=f"Serie {i}") for i in range(2)]
+    traitements = [
+        Traitement(nom=f"Traitement {i}", type="protection") for i in range(3)
+    ]
+    symboles = [SymboleTag(nom=f"symbole {i}") for i in range(20)]
+    sqlite_session.add_all(
+        fournisseurs + gammes + materiaux + series + traitements + symboles
+    )
+    sqlite_session.flush()
+
+    for i in range(600):
+        verre = Verre(
+            nom=f"Verre {i % 150}",
+            variante=f"Variante {i % 4}",
+            indice=1.5 + (i % 5) / 10,
+            fournisseur_id=fournisseurs[i % 3].id,
+            gamme_id=gammes[i % 4].id,
+            materiau_id=materiaux[i % 2].id,
+            serie_id=series[i % 2].id,
+        )
+        verre.traitements.append(traitements[i % 3])
+        sqlite_session.add(verre)
+    sqlite_session.flush()
+    sqlite_session.add_all(
+        VerreSymbole(
+            verre_id=verre_id,
+            symbole_id=symboles[(verre_id + j) % 20].id,
+            score_confiance=0.5,
+        )
+        for verre_id in range(1, 601)
+        for j in range(3)
+    )
+    sqlite_session.commit()
+    sqlite_session.execute(text("ANALYZE"))
+    sqlite_session.commit()
+    return {"fournisseurs": fournisseurs, "gammes": gammes, "symboles": symboles}
+
+
+@pytest.fixture
+def captured(sqlite_async_engine, sqlite_session):
+    """Requêtes SELECT émises par les routes et par sqlite_session."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engines = [sqlite_async_engine.sync_engine, sqlite_session.get_bind()]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture
+def plan_client(sqlite_client):
+    """
+    Client qui renvoie les erreurs serveur en 500 : seules les requêtes SQL
+    émises comptent ici (certaines routes échouent ensuite dans from_orm).
+    """
+    return TestClient(sqlite_client.app, raise_server_exceptions=False)
+
+
+def query_plan(session, statement, parameters):
+    """Lignes (colonne detail) du plan d'exécution d'une requête capturée."""
+    rows = session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    )
+    return [row[-1] for row in rows]
+
+
+def full_scans(session, statements):
+    """
+    Parcours complets de grandes tables dans les plans des requêtes.
+
+    Returns:
+        List[Tuple[str, str]]: (requête, ligne SCAN du plan)
+    """
+    scans = []
+    for statement, parameters in statements:
+        for detail in query_plan(session, statement, parameters):
+            words = detail.split()
+            # Les alias SQLAlchemy (verres_traitements_1) désignent la même table
+            if words[0] == "SCAN" and re.sub(r"_\d+$", "", words[1]) in LARGE_TABLES:
+                scans.append((statement, detail))
+    return scans
+
+
+def assert_indexed(session, statements):
+    assert statements
+    scans = full_scans(session, statements)
+    assert not scans, "\n\n".join(f"{detail}\n{sql}" for sql, detail in scans)
+
+
+def test_verre_symbole_routes(plan_client, sqlite_session, seeded, captured):
+    symbole_id = seeded["symboles"][10].id
+    plan_client.post(
+        "/api/verres/5/symboles/",
+        json={"verre_id": 5, "symbole_id": symbole_id, "score_confiance": 0.8},
+    )
+    plan_client.get("/api/verres/5/symboles/")
+    plan_client.put(
+        f"/api/verres/5/symboles/{symbole_id}",
+        json={"est_valide": True, "valide_par": "test_user"},
+    )
+    plan_client.delete(f"/api/verres/5/symboles/{symbole_id}")
+    plan_client.post(
+        "/api/verres/symboles/bulk",
+        json=[
+            {"verre_id": i, "symbole_id": symbole_id, "score_confiance": 0.6}
+            for i in range(20, 40)
+        ],
+    )
+
+    assert_indexed(sqlite_session, captured)
+
+
+def test_verres_list(plan_client, sqlite_session, seeded, captured):
+    fournisseur_id = seeded["fournisseurs"][1].id
+    gamme_id = seeded["gammes"][2].id
+    plan_client.get("/api/verres", params={"after": 100, "limit": 20})
+    plan_client.get("/api/verres", params={"fournisseur_id": fournisseur_id})
+    plan_client.get(
+        "/api/verres",
+        params={"fournisseur_id": fournisseur_id, "gamme_id": gamme_id},
+    )
+    plan_client.get("/api/verres", params={"nom": "Verre 12"})
+    plan_client.get("/api/verres/facets")
+
+    assert_indexed(sqlite_session, captured)
+
+
+def test_check_duplicate_verre(sqlite_session, seeded, captured):
+    verre = sqlite_session.get(Verre, 42)
+    verre_data = {
+        "nom_du_verre": verre.nom,
+        "variante": verre.variante,
+        "hauteur_min": float("nan"),
+        "hauteur_max": float("nan"),
+        "indice": verre.indice,
+        "url_gravure": float("nan"),
+        "url_source": float("nan"),
+    }
+    references = (verre.fournisseur, verre.materiau, verre.gamme, verre.serie)
+    captured.clear()
+
+    check_duplicate_verre(sqlite_session, verre_data, *references)
+
+    assert_indexed(sqlite_session, captured)
+    # Recherche sur les quatre colonnes de l'index composite
+    plan = query_plan(sqlite_session, *captured[0])
+    assert any(
+        "idx_verres_fournisseur_gamme_nom (fournisseur_id=? AND gamme_id=? AND "
+        "nom=? AND variante=?)" in detail
+        for detail in plan
+    ), plan
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import status
+
+from database.models.base import Fournisseur, Gamme, Materiau, Serie, Verre
+
+
+@pytest.fixture
+def catalogue(sqlite_session):
+    """Verres indexés par les triggers FTS5 à l'insertion"""
+    essilor, hoya = Fournisseur(nom="Essilor"), Fournisseur(nom="Hoya")
+    varilux, hoyalux = Gamme(nom="Varilux"), Gamme(nom="Hoyalux")
+    comfort = Serie(nom="Comfort")
+    orma = Materiau(nom="Orma")
+    sqlite_session.add_all([essilor, hoya, varilux, hoyalux, comfort, orma])
+    sqlite_session.flush()
+
+    verres = [
+        Verre(
+            nom="Varilux Comfort Max", fournisseur_id=essilor.id, gamme_id=varilux.id
+        ),
+        Verre(
+            nom="Physio",
+            variante="Élite",
+            fournisseur_id=essilor.id,
+            gamme_id=varilux.id,
+            serie_id=comfort.id,
+            materiau_id=orma.id,
+            indice=1.6,
+        ),
+        Verre(nom="Hoyalux iD", fournisseur_id=hoya.id, gamme_id=hoyalux.id),
+        Verre(nom="Comfort Kids", fournisseur_id=hoya.id, gamme_id=hoyalux.id),
+    ]
+    sqlite_session.add_all(verres)
+    sqlite_session.commit()
+    return verres
+
+
+class TestSearch:
+    def test_ranking_and_prefix(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/search", params={"q": "comf"})
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["total"] == 3
+        # Le nom pèse plus que la série (BM25 pondéré)
+        assert body["results"][-1]["nom"] == "Physio"
+        assert body["results"][0]["score"] >= body["results"][-1]["score"]
+
+    def test_all_words_and_diacritics(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/search", params={"q": "essilor elite"})
+
+        results = response.json()["results"]
+        assert [r["nom"] for r in results] == ["Physio"]
+        assert results[0]["serie"] == "Comfort"
+        assert results[0]["materiau"] == "Orma"
+
+    def test_facets(self, sqlite_client, catalogue):
+        facets = sqlite_client.get("/api/search", params={"q": "comfort"}).json()[
+            "facets"
+        ]
+
+        assert facets["fournisseur"] == [
+            {"id": 1, "value": "Essilor", "count": 2},
+            {"id": 2, "value": "Hoya", "count": 1},
+        ]
+        assert facets["serie"] == [{"id": 1, "value": "Comfort", "count": 1}]
+
+    def test_filters_and_pagination(self, sqlite_client, catalogue):
+        params = {"q": "comfort", "fournisseur_id": catalogue[0].fournisseur_id}
+        body = sqlite_client.get("/api/search", params={**params, "limit": 1}).json()
+
+        assert body["total"] == 2
+        assert len(body["results"]) == 1
+        assert [f["value"] for f in body["facets"]["fournisseur"]] == ["Essilor"]
+
+    def test_query_without_words(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/search", params={"q": '*-"('})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,83 @@
+import datetime
+from typing import List
+
+import pytest
+from fastapi import status
+from pydantic import TypeAdapter
+
+from api import serialization
+from api.routes.verres_symboles import VerreSymboleResponse
+from database.models.base import Fournisseur, Gamme, SymboleTag, Verre, VerreSymbole
+
+ROWS = [
+    {
+        "verre_id": 1,
+        "symbole_id": 2,
+        "score_confiance": 0.85,
+        "est_valide": True,
+        "valide_par": "opticien é",
+        "id": 3,
+        "created_at": datetime.datetime(2025, 2, 17, 12, 27, 45, 262746),
+        "updated_at": datetime.datetime(2025, 2, 17, 12, 30),
+    }
+]
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+def test_dumps_matches_response_model(monkeypatch, encoder):
+    """Test que le JSON produit est celui du modèle de réponse"""
+    if encoder == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson non installé")
+    adapter = TypeAdapter(List[VerreSymboleResponse])
+
+    assert serialization.dumps(ROWS) == adapter.dump_json(adapter.validate_python(ROWS))
+
+
+def test_select_fields_follows_response_model():
+    statement = serialization.select_fields(VerreSymbole, VerreSymboleResponse)
+    assert list(statement.selected_columns.keys()) == list(
+        VerreSymboleResponse.model_fields
+    )
+
+
+def test_symboles_for_verre(sqlite_client, sqlite_session):
+    """Test la liste des associations d'un verre (lignes Core encodées)"""
+    fournisseur, gamme = Fournisseur(nom="Essilor"), Gamme(nom="Varilux")
+    symboles = [SymboleTag(nom="cercle"), SymboleTag(nom="triangle")]
+    sqlite_session.add_all([fournisseur, gamme] + symboles)
+    sqlite_session.flush()
+    verre = Verre(nom="Verre", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+    sqlite_session.add(verre)
+    sqlite_session.flush()
+    sqlite_session.add_all(
+        [
+            VerreSymbole(
+                verre_id=verre.id, symbole_id=symboles[1].id, score_confiance=0.4
+            ),
+            VerreSymbole(
+                verre_id=verre.id,
+                symbole_id=symboles[0].id,
+                score_confiance=0.9,
+                est_valide=True,
+                valide_par="test_user",
+            ),
+        ]
+    )
+    sqlite_session.commit()
+
+    response = sqlite_client.get(f"/api/verres/{verre.id}/symboles/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert [(a["id"], a["symbole_id"], a["est_valide"]) for a in body] == [
+        (1, symboles[1].id, False),
+        (2, symboles[0].id, True),
+    ]
+    assert body[1]["valide_par"] == "test_user"
+    assert datetime.datetime.fromisoformat(body[0]["created_at"])
+
+    response = sqlite_client.get("/api/symboles/", params={"search": "TRI"})
+    assert response.json() == [{"nom": "triangle", "description": None, "id": 2}]
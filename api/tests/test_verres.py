@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import MagicMock
 
 import pytest
@@ -6,7 +7,8 @@ from pydantic import BaseModel
 from sqlalchemy.exc import SQLAlchemyError
 
 from api.routes.verres import VerreBase
-from database.models.base import Verre
+from database.models.base import Traitement, Verre
+from database.models.facets import drop_facet_summary
 
 
 # Mock data
@@ -203,3 +205,296 @@ class TestDeleteVerre:
 
         # Assert
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.fixture
+def catalogue(sqlite_session):
+    """Catalogue réel : 2 fournisseurs, 2 gammes, 25 verres, 1 traitement par verre"""
+    from database.models.base import Fournisseur, Gamme, Materiau
+
+    fournisseurs = [Fournisseur(nom="Essilor"), Fournisseur(nom="Zeiss")]
+    gammes = [Gamme(nom="Varilux"), Gamme(nom="Progressive")]
+    materiau = Materiau(nom="Organique")
+    traitement = Traitement(nom="Crizal", type="protection")
+    sqlite_session.add_all(fournisseurs + gammes + [materiau, traitement])
+    sqlite_session.flush()
+
+    for i in range(25):
+        verre = Verre(
+            nom=f"{'Varilux' if i % 2 else 'Zeiss'} {i:02d}",
+            indice=1.5 + (i % 5) / 10,
+            fournisseur_id=fournisseurs[i % 2].id,
+            gamme_id=gammes[i % 2].id,
+            materiau_id=materiau.id if i < 10 else None,
+        )
+        verre.traitements.append(traitement)
+        sqlite_session.add(verre)
+    sqlite_session.commit()
+    return {"fournisseurs": fournisseurs, "gammes": gammes, "materiau": materiau}
+
+
+class TestGetVerresPagination:
+    def test_keyset_pages_cover_catalogue(self, sqlite_client, catalogue):
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 10}
+            if cursor is not None:
+                params["after"] = cursor
+            response = sqlite_client.get("/api/verres", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            assert len(page) <= 10
+            assert all(len(v["traitements"]) == 1 for v in page)
+            ids += [v["id"] for v in page]
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert ids == sorted(ids) and len(set(ids)) == 25
+
+    def test_full_list_compatibility(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/verres", params={"all": True, "limit": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 25
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_filters(self, sqlite_client, catalogue):
+        fournisseur = catalogue["fournisseurs"][1]
+        response = sqlite_client.get(
+            "/api/verres",
+            params={
+                "fournisseur_id": fournisseur.id,
+                "indice_min": 1.6,
+                "indice_max": 1.8,
+                "nom": "Vari",
+            },
+        )
+
+        verres = response.json()
+        assert verres
+        for verre in verres:
+            assert verre["fournisseur_id"] == fournisseur.id
+            assert 1.6 <= verre["indice"] <= 1.8
+            assert verre["nom"].startswith("Vari")
+
+        response = sqlite_client.get(
+            "/api/verres", params={"materiau_id": catalogue["materiau"].id}
+        )
+        assert len(response.json()) == 10
+
+    def test_limit_bounds(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/verres", params={"limit": 0})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestExportVerres:
+    @pytest.fixture
+    def symboles(self, sqlite_session, catalogue):
+        from database.models.base import SymboleTag, VerreSymbole
+
+        valide, propose = SymboleTag(nom="cercle"), SymboleTag(nom="triangle")
+        sqlite_session.add_all([valide, propose])
+        sqlite_session.flush()
+        sqlite_session.add_all(
+            [
+                VerreSymbole(
+                    verre_id=1,
+                    symbole_id=valide.id,
+                    score_confiance=0.9,
+                    est_valide=True,
+                ),
+                VerreSymbole(
+                    verre_id=1,
+                    symbole_id=propose.id,
+                    score_confiance=0.5,
+                    est_valide=False,
+                ),
+            ]
+        )
+        sqlite_session.commit()
+
+    def test_export_ndjson(self, sqlite_client, symboles):
+        import json
+
+        response = sqlite_client.get("/api/verres/export")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 25
+        assert [r["id"] for r in rows] == sorted(r["id"] for r in rows)
+        first = rows[0]
+        assert first["fournisseur"] == "Essilor"
+        assert first["gamme"] == "Varilux"
+        assert first["materiau"] == "Organique"
+        assert first["serie"] is None
+        assert first["traitements"] == ["Crizal"]
+        # Seuls les symboles validés sont exportés
+        assert first["symboles"] == ["cercle"]
+        assert rows[1]["symboles"] == []
+
+    def test_export_csv_with_filters(self, sqlite_client, catalogue):
+        import csv
+        import io
+
+        response = sqlite_client.get(
+            "/api/verres/export",
+            params={"format": "csv", "gamme_id": catalogue["gammes"][1].id},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "verres.csv" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 12
+        assert {r["gamme"] for r in rows} == {"Progressive"}
+        assert rows[0]["traitements"] == "Crizal"
+
+    def test_export_reads_by_batches(self, sqlite_async_engine, catalogue):
+        from api.routes.verres import VerreFilters, iter_export_rows
+
+        async def sizes():
+            filters = VerreFilters(None, None, None, None, None, None)
+            batches = iter_export_rows(sqlite_async_engine, filters, batch_size=10)
+            return [len(rows) async for rows in batches]
+
+        assert asyncio.run(sizes()) == [10, 10, 5]
+
+    def test_export_invalid_format(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/verres/export", params={"format": "xml"})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestVerresFacets:
+    def test_summary_facets(self, sqlite_client, catalogue):
+        response = sqlite_client.get("/api/verres/facets")
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["total"] == 25
+        assert body["facets"]["fournisseur"] == [
+            {"id": catalogue["fournisseurs"][0].id, "value": "Essilor", "count": 13},
+            {"id": catalogue["fournisseurs"][1].id, "value": "Zeiss", "count": 12},
+        ]
+        assert body["facets"]["materiau"] == [
+            {"id": catalogue["materiau"].id, "value": "Organique", "count": 10}
+        ]
+        assert [(v["value"], v["count"]) for v in body["facets"]["indice"]] == [
+            ("1.50", 5),
+            ("1.60", 5),
+            ("1.70", 5),
+            ("1.80", 5),
+            ("1.90", 5),
+        ]
+
+    def test_filtered_facets(self, sqlite_client, catalogue):
+        response = sqlite_client.get(
+            "/api/verres/facets", params={"gamme_id": catalogue["gammes"][1].id}
+        )
+
+        body = response.json()
+        assert body["total"] == 12
+        assert [v["value"] for v in body["facets"]["fournisseur"]] == ["Zeiss"]
+        assert [v["value"] for v in body["facets"]["gamme"]] == ["Progressive"]
+
+    def test_missing_summary(self, sqlite_client, sqlite_session, catalogue):
+        drop_facet_summary(sqlite_session.connection())
+        sqlite_session.commit()
+
+        response = sqlite_client.get("/api/verres/facets")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert "alembic upgrade head" in response.json()["detail"]
+
+    def test_summary_follows_crud(self, sqlite_client, catalogue):
+        created = sqlite_client.post(
+            "/api/verres",
+            json={
+                "nom": "Nouveau",
+                "indice": 1.67,
+                "fournisseur_id": catalogue["fournisseurs"][1].id,
+                "gamme_id": catalogue["gammes"][0].id,
+            },
+        ).json()
+        sqlite_client.put(
+            f"/api/verres/{created['id']}",
+            json={
+                "nom": "Nouveau",
+                "indice": 1.74,
+                "fournisseur_id": catalogue["fournisseurs"][1].id,
+                "gamme_id": catalogue["gammes"][0].id,
+                "materiau_id": catalogue["materiau"].id,
+            },
+        )
+        sqlite_client.delete("/api/verres/1")
+
+        summary = sqlite_client.get("/api/verres/facets").json()
+        # indice_min force le calcul direct sur verres
+        live = sqlite_client.get("/api/verres/facets", params={"indice_min": 0}).json()
+
+        assert summary == live
+        assert summary["total"] == 25
+        assert {"id": 2, "value": "Zeiss", "count": 13} in summary["facets"][
+            "fournisseur"
+        ]
+        assert summary["facets"]["indice"][-1] == {
+            "id": None,
+            "value": "1.90",
+            "count": 5,
+        }
+        assert {"id": None, "value": "1.74", "count": 1} in summary["facets"]["indice"]
+
+
+class TestCreateVerresBulk:
+    def test_partial_success(self, sqlite_client, sqlite_session, catalogue):
+        fournisseur_id = catalogue["fournisseurs"][0].id
+        gamme_id = catalogue["gammes"][0].id
+        response = sqlite_client.post(
+            "/api/verres/bulk",
+            json=[
+                {
+                    "nom": "Bulk 1",
+                    "fournisseur_id": fournisseur_id,
+                    "gamme_id": gamme_id,
+                },
+                {"nom": "Bulk 2", "fournisseur_id": 999, "gamme_id": gamme_id},
+                {"nom": "Bulk 3", "fournisseur_id": fournisseur_id},
+                {
+                    "nom": "Bulk 4",
+                    "fournisseur_id": fournisseur_id,
+                    "gamme_id": gamme_id,
+                    "materiau_id": catalogue["materiau"].id,
+                },
+            ],
+        )
+
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        body = response.json()
+        assert (body["created"], body["failed"]) == (2, 2)
+        assert [r["status"] for r in body["results"]] == [201, 404, 422, 201]
+        assert body["results"][1]["detail"] == "Fournisseur 999 absent"
+        assert body["results"][0]["id"] == 26
+        assert body["results"][3]["id"] == 27
+
+        sqlite_session.expire_all()
+        created = sqlite_session.get(Verre, 27)
+        assert (created.nom, created.materiau_id) == (
+            "Bulk 4",
+            catalogue["materiau"].id,
+        )
+        facets = sqlite_client.get("/api/verres/facets").json()
+        assert facets["total"] == 27
+
+    def test_limit(self, sqlite_client, catalogue):
+        from api.bulk import BULK_MAX_ITEMS
+
+        response = sqlite_client.post(
+            "/api/verres/bulk", json=[{"nom": "Bulk"}] * (BULK_MAX_ITEMS + 1)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = sqlite_client.post("/api/verres/bulk", json=[])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -132,6 +132,37 @@ def test_validate_verre_symbole(
     assert data["valide_par"] == "testuser"
 
 
+def test_delete_targets_requested_association(
+    client: TestClient,
+    db_session: Session,
+    auth_headers: Dict,
+    verre_test_data: Dict,
+    verre_symbole_test_data: Dict,
+):
+    """Test que le mock applique les conditions WHERE des requêtes"""
+    verre = Verre(**verre_test_data)
+    symboles = [SymboleTag(nom="Premier"), SymboleTag(nom="Second")]
+    db_session.add_all([verre, *symboles])
+    associations = [
+        VerreSymbole(verre_id=verre.id, symbole_id=s.id, **verre_symbole_test_data)
+        for s in symboles
+    ]
+    db_session.add_all(associations)
+
+    missing = client.delete(
+        f"/api/verres/{verre.id + 100}/symboles/{symboles[1].id}",
+        headers=auth_headers,
+    )
+    response = client.delete(
+        f"/api/verres/{verre.id}/symboles/{symboles[1].id}", headers=auth_headers
+    )
+
+    assert missing.status_code == 404
+    assert response.status_code == 200
+    remaining = db_session.query(VerreSymbole).all()
+    assert remaining == [associations[0]]
+
+
 def test_delete_verre_symbole(
     client: TestClient,
     db_session: Session,
@@ -220,3 +251,55 @@ def test_create_verre_symbole_invalid_symbole(
         f"/api/verres/{verre.id}/symboles/", headers=auth_headers, json=association_data
     )
     assert response.status_code == 404
+
+
+def test_create_verres_symboles_bulk(sqlite_client: TestClient, sqlite_session):
+    """Test la création en masse d'associations, avec statut par élément"""
+    fournisseur, gamme = Fournisseur(nom="Essilor"), Gamme(nom="Varilux")
+    sqlite_session.add_all([fournisseur, gamme])
+    sqlite_session.flush()
+    verres = [
+        Verre(nom=f"Verre {i}", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+        for i in range(2)
+    ]
+    symboles = [SymboleTag(nom="cercle"), SymboleTag(nom="triangle")]
+    sqlite_session.add_all(verres + symboles)
+    sqlite_session.flush()
+    sqlite_session.add(
+        VerreSymbole(
+            verre_id=verres[0].id, symbole_id=symboles[0].id, score_confiance=0.9
+        )
+    )
+    sqlite_session.commit()
+
+    def association(verre_id, symbole_id, est_valide=False):
+        return {
+            "verre_id": verre_id,
+            "symbole_id": symbole_id,
+            "score_confiance": 0.7,
+            "est_valide": est_valide,
+        }
+
+    response = sqlite_client.post(
+        "/api/verres/symboles/bulk",
+        json=[
+            association(verres[0].id, symboles[1].id, est_valide=True),
+            association(verres[0].id, symboles[0].id),
+            association(999, symboles[0].id),
+            association(verres[1].id, 999),
+            association(verres[1].id, symboles[0].id),
+            association(verres[1].id, symboles[0].id),
+        ],
+    )
+
+    assert response.status_code == 207
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 4)
+    assert [r["status"] for r in body["results"]] == [201, 409, 404, 404, 201, 409]
+    assert body["results"][2]["detail"] == "Verre non trouvé"
+    assert body["results"][3]["detail"] == "Symbole non trouvé"
+
+    sqlite_session.expire_all()
+    created = sqlite_session.get(VerreSymbole, body["results"][0]["id"])
+    assert (created.symbole_id, created.valide_par) == (symboles[1].id, "test_user")
+    assert sqlite_session.query(VerreSymbole).count() == 3
@@ -1,11 +1,13 @@
 import os
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from database.utils.logger import db_logger
 
@@ -37,19 +39,122 @@ def get_database_url() -> str:
     return f"sqlite:///{db_path}"
 
 
+def get_async_database_url() -> str:
+    """
+    Retourne l'URL de connexion asynchrone (pilote aiosqlite) à la même base
+
+    Returns:
+        str: URL de connexion à la base de données
+    """
+    return get_database_url().replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+
+def _is_memory_database(url: str) -> bool:
+    return ":memory:" in url or url.endswith("://") or url.endswith(":///")
+
+
+# Profils de connexion SQLite : PRAGMA appliqués à chaque nouvelle connexion et
+# taille du pool. Sélection par DB_PROFILE ("default" si absent : journal et
+# synchronisation par défaut de SQLite ; "performance" active WAL et doit être
+# choisi explicitement). Chaque valeur peut être surchargée par DB_PRAGMA_<NOM>
+# (ex. DB_PRAGMA_CACHE_SIZE=-128000), DB_POOL_SIZE et DB_MAX_OVERFLOW.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"pragmas": {}, "pool_size": 5, "max_overflow": 10},
+    "performance": {
+        "pragmas": {
+            "journal_mode": "WAL",  # Les lecteurs ne sont plus bloqués par l'écrivain
+            "synchronous": "NORMAL",  # Sûr en WAL, un fsync par checkpoint
+            "cache_size": -64000,  # 64 Mo par connexion (négatif : en Kio)
+            "mmap_size": 268435456,  # 256 Mo lus par mmap
+            "temp_store": "MEMORY",  # Tris et index temporaires en mémoire
+            "busy_timeout": 5000,  # Attente d'un verrou en ms avant erreur
+        },
+        "pool_size": 10,
+        "max_overflow": 20,
+    },
+}
+DEFAULT_PROFILE = "default"
+
+
+def get_engine_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Retourne le profil de connexion, avec les surcharges des variables
+    d'environnement
+
+    Args:
+        name (str, optional): Nom du profil (défaut : DB_PROFILE, sinon default)
+
+    Returns:
+        Dict[str, Any]: PRAGMA, pool_size et max_overflow
+    """
+    name = name or os.getenv("DB_PROFILE", DEFAULT_PROFILE)
+    if name not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Profil de base de données inconnu : {name} "
+            f"(disponibles : {', '.join(ENGINE_PROFILES)})"
+        )
+    profile = ENGINE_PROFILES[name]
+    pragmas = dict(profile["pragmas"])
+    for key, value in os.environ.items():
+        if key.startswith("DB_PRAGMA_"):
+            pragmas[key[len("DB_PRAGMA_") :].lower()] = value
+    return {
+        "name": name,
+        "pragmas": pragmas,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", profile["pool_size"])),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", profile["max_overflow"])),
+    }
+
+
+def apply_sqlite_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Exécute les PRAGMA à l'ouverture de chaque connexion du moteur
+
+    Args:
+        engine (Engine): Moteur SQLAlchemy SQLite
+        pragmas (Dict[str, Any]): PRAGMA et leur valeur
+    """
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
 # Configuration du moteur SQLAlchemy
-def create_db_engine():
+def create_db_engine(url: Optional[str] = None, profile: Optional[str] = None):
     """
     Crée et configure le moteur SQLAlchemy pour SQLite
 
+    Args:
+        url (str, optional): URL de la base (défaut : get_database_url())
+        profile (str, optional): Profil de connexion (voir ENGINE_PROFILES)
+
     Returns:
         Engine: Instance du moteur SQLAlchemy
     """
     try:
-        engine = create_engine(
-            get_database_url(), echo=False  # Mettre à True pour voir les requêtes SQL
+        url = url or get_database_url()
+        settings = get_engine_profile(profile)
+        options = {}
+        if not _is_memory_database(url):
+            # Base fichier : pool de connexions (QueuePool) dimensionné
+            options = {
+                "pool_size": settings["pool_size"],
+                "max_overflow": settings["max_overflow"],
+            }
+        # Mettre echo à True pour voir les requêtes SQL
+        engine = create_engine(url, echo=False, **options)
+        apply_sqlite_pragmas(engine, settings["pragmas"])
+        db_logger.info(
+            f"Moteur de base de données créé avec succès (profil {settings['name']})"
         )
-        db_logger.info("Moteur de base de données créé avec succès")
         return engine
     except Exception as e:
         db_logger.critical(
@@ -58,13 +163,52 @@ def create_db_engine():
         raise
 
 
-# Création du moteur
+def create_async_db_engine(url: Optional[str] = None, profile: Optional[str] = None):
+    """
+    Crée le moteur SQLAlchemy asynchrone (aiosqlite) utilisé par l'API
+
+    Args:
+        url (str, optional): URL de la base (défaut : get_async_database_url())
+        profile (str, optional): Profil de connexion (voir ENGINE_PROFILES)
+
+    Returns:
+        AsyncEngine: Instance du moteur asynchrone
+    """
+    try:
+        url = url or get_async_database_url()
+        settings = get_engine_profile(profile)
+        options = {}
+        if not _is_memory_database(url):
+            options = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": settings["pool_size"],
+                "max_overflow": settings["max_overflow"],
+            }
+        engine = create_async_engine(url, echo=False, **options)
+        # Les PRAGMA s'appliquent aux connexions du moteur synchrone sous-jacent
+        apply_sqlite_pragmas(engine.sync_engine, settings["pragmas"])
+        db_logger.info(
+            "Moteur asynchrone de base de données créé avec succès "
+            f"(profil {settings['name']})"
+        )
+        return engine
+    except Exception as e:
+        db_logger.critical(f"Erreur lors de la création du moteur asynchrone: {str(e)}")
+        raise
+
+
+# Création des moteurs : synchrone pour les scripts (database/scripts),
+# asynchrone pour les routes de l'API
 engine = create_db_engine()
+async_engine = create_async_db_engine()
 
-# Configuration de la session
+# Configuration des sessions
 SessionLocal = sessionmaker(
     bind=engine, autocommit=False, autoflush=False, expire_on_commit=False
 )
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Création de la base déclarative
 Base = declarative_base()
@@ -98,6 +242,31 @@ def get_db() -> Generator[Session, None, None]:
         db_logger.debug("Session de base de données fermée")
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Générateur asynchrone pour obtenir une session de base de données (routes de
+    l'API) : les requêtes SQL ne bloquent pas la boucle d'événements
+
+    Yields:
+        AsyncSession: Session asynchrone de base de données
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            db_logger.debug("Nouvelle session asynchrone créée")
+            yield db
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            db_logger.error(f"Erreur SQL lors de l'utilisation de la session: {str(e)}")
+            raise
+        except Exception as e:
+            await db.rollback()
+            db_logger.error(
+                f"Erreur inattendue lors de l'utilisation de la session: {str(e)}"
+            )
+            raise
+
+
 def init_database() -> None:
     """
     Initialise la base de données en créant toutes les tables
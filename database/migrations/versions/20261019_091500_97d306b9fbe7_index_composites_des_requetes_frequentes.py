@@ -0,0 +1,71 @@
+"""index composites des requêtes fréquentes
+
+Revision ID: 97d306b9fbe7
+Revises: a308ce07d0e4
+Create Date: 2026-10-19 09:15:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.utils.logger import db_logger
+
+# revision identifiers, used by Alembic.
+revision: str = "97d306b9fbe7"
+down_revision: Union[str, None] = "a308ce07d0e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Doublons (verre, symbole) : rang de chaque association dans son couple, la
+# meilleure en premier (validée, puis score le plus haut, puis la plus ancienne)
+_RANKED = """
+SELECT id, row_number() OVER (
+    PARTITION BY verre_id, symbole_id
+    ORDER BY est_valide DESC, score_confiance DESC, id
+) AS rang
+FROM verres_symboles
+"""
+
+
+def upgrade() -> None:
+    # Les bases créées par init_models() ont déjà ces index : if_not_exists
+    # Doublons éventuels : seule la meilleure association d'un couple est gardée
+    result = op.get_bind().execute(
+        sa.text(
+            "DELETE FROM verres_symboles WHERE id IN "
+            f"(SELECT id FROM ({_RANKED}) WHERE rang > 1)"
+        )
+    )
+    db_logger.info(
+        f"Associations verre-symbole en double supprimées : {result.rowcount}"
+    )
+    op.create_index(
+        "idx_verres_symboles_verre_symbole",
+        "verres_symboles",
+        ["verre_id", "symbole_id"],
+        unique=True,
+        if_not_exists=True,
+    )
+    # Préfixe de idx_verres_symboles_verre_symbole, devenu inutile
+    op.drop_index(
+        "idx_verres_symboles_verre_id", table_name="verres_symboles", if_exists=True
+    )
+    op.create_index(
+        "idx_verres_fournisseur_gamme_nom",
+        "verres",
+        ["fournisseur_id", "gamme_id", "nom", "variante"],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_verres_fournisseur_gamme_nom", table_name="verres")
+    op.create_index(
+        "idx_verres_symboles_verre_id", "verres_symboles", ["verre_id"], unique=False
+    )
+    op.drop_index("idx_verres_symboles_verre_symbole", table_name="verres_symboles")
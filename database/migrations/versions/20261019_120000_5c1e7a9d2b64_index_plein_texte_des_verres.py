@@ -0,0 +1,36 @@
+"""index plein texte des verres
+
+Revision ID: 5c1e7a9d2b64
+Revises: 97d306b9fbe7
+Create Date: 2026-10-19 12:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from database.models.search import (
+    create_search_index,
+    drop_search_index,
+    rebuild_search_index,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e7a9d2b64"
+down_revision: Union[str, None] = "97d306b9fbe7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Table FTS5 verres_fts et triggers de synchronisation, puis indexation de
+    # tous les verres (y compris si la table existait déjà)
+    connection = op.get_bind()
+    if not create_search_index(connection):
+        rebuild_search_index(connection)
+
+
+def downgrade() -> None:
+    # Triggers d'abord : ils écrivent dans verres_fts
+    drop_search_index(op.get_bind())
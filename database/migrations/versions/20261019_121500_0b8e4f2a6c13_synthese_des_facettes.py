@@ -0,0 +1,36 @@
+"""synthèse des facettes
+
+Revision ID: 0b8e4f2a6c13
+Revises: 5c1e7a9d2b64
+Create Date: 2026-10-19 12:15:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from database.models.facets import (
+    create_facet_summary,
+    drop_facet_summary,
+    rebuild_facet_summary,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0b8e4f2a6c13"
+down_revision: Union[str, None] = "5c1e7a9d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Table verres_facets et triggers de mise à jour, puis calcul des compteurs
+    # à partir des verres existants (y compris si la table existait déjà)
+    connection = op.get_bind()
+    if not create_facet_summary(connection):
+        rebuild_facet_summary(connection)
+
+
+def downgrade() -> None:
+    # Triggers d'abord : ils écrivent dans verres_facets
+    drop_facet_summary(op.get_bind())
@@ -120,7 +120,10 @@ class VerreSymbole(Base):
     symbole = relationship("SymboleTag", back_populates="verres_associations")
 
     __table_args__ = (
-        Index("idx_verres_symboles_verre_id", "verre_id"),
+        # Une association par couple : recherche par verre ou par couple
+        Index(
+            "idx_verres_symboles_verre_symbole", "verre_id", "symbole_id", unique=True
+        ),
         Index("idx_verres_symboles_symbole_id", "symbole_id"),
         Index("idx_verres_symboles_score", "score_confiance"),
     )
@@ -153,7 +156,9 @@ class Verre(Base):
         "Traitement",
         secondary=verres_traitements,
         back_populates="verres",
-        lazy="joined",  # Chargement eager pour éviter les problèmes N+1
+        # Chargement eager pour éviter les problèmes N+1 ; selectin plutôt que
+        # joined : la jointure imbriquée parcourait toute verres_traitements
+        lazy="selectin",
     )
     symboles_associations = relationship("VerreSymbole", back_populates="verre")
 
@@ -166,6 +171,14 @@ class Verre(Base):
         Index("idx_verres_fournisseur_id", "fournisseur_id"),
         Index("idx_verres_materiau_id", "materiau_id"),
         Index("idx_verres_gamme_id", "gamme_id"),
+        # Détection des doublons à l'import (check_duplicate_verre)
+        Index(
+            "idx_verres_fournisseur_gamme_nom",
+            "fournisseur_id",
+            "gamme_id",
+            "nom",
+            "variante",
+        ),
     )
 
 
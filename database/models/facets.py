@@ -0,0 +1,140 @@
+"""
+Table de synthèse des facettes du catalogue (nombre de verres par fournisseur,
+gamme, matériau et indice).
+
+verres_facets contient une ligne par valeur de facette : lire toutes les
+facettes coûte O(nombre de valeurs) et non O(nombre de verres). Des triggers
+SQLite mettent les compteurs à jour à chaque insertion, modification ou
+suppression d'un verre, quel que soit l'écrivain (routes CRUD, import CSV,
+scripts) ; la table et ses triggers sont créés et remplis par la migration
+Alembic 0b8e4f2a6c13.
+"""
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, text
+
+from database.utils.logger import db_logger
+
+FACETS_TABLE = "verres_facets"
+
+# Facette -> expression SQL de sa clé pour un verre (alias de ligne {row})
+FACET_KEYS = {
+    "fournisseur": "{row}.fournisseur_id",
+    "gamme": "{row}.gamme_id",
+    "materiau": "{row}.materiau_id",
+    # Indices des verres : valeurs à deux décimales (1.50, 1.60, 1.67...)
+    "indice": "printf('%.2f', {row}.indice)",
+}
+
+# Hors de Base.metadata : create_all() ne doit pas créer la table sans triggers
+verres_facets = Table(
+    FACETS_TABLE,
+    MetaData(),
+    Column("facette", String(20), primary_key=True),
+    Column("cle", String(50), primary_key=True),
+    Column("nombre", Integer, nullable=False),
+)
+
+
+def _column(facet: str) -> str:
+    """Colonne de verres d'où provient la facette."""
+    return "indice" if facet == "indice" else f"{facet}_id"
+
+
+def _add(row: str) -> str:
+    """Incrémente les compteurs des facettes du verre row (new)."""
+    return "\n".join(
+        f"INSERT INTO {FACETS_TABLE} (facette, cle, nombre) "
+        f"SELECT '{facet}', {key.format(row=row)}, 1 "
+        f"WHERE {row}.{_column(facet)} IS NOT NULL "
+        "ON CONFLICT (facette, cle) DO UPDATE SET nombre = nombre + 1;"
+        for facet, key in FACET_KEYS.items()
+    )
+
+
+def _remove(row: str) -> str:
+    """Décrémente les compteurs des facettes du verre row (old)."""
+    updates = "\n".join(
+        f"UPDATE {FACETS_TABLE} SET nombre = nombre - 1 "
+        f"WHERE facette = '{facet}' AND cle = {key.format(row=row)};"
+        for facet, key in FACET_KEYS.items()
+    )
+    return f"{updates}\nDELETE FROM {FACETS_TABLE} WHERE nombre <= 0;"
+
+
+_WATCHED = ", ".join(_column(facet) for facet in FACET_KEYS)
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS verres_facets_ai AFTER INSERT ON verres BEGIN
+{_add("new")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS verres_facets_au
+AFTER UPDATE OF {_WATCHED} ON verres BEGIN
+{_remove("old")}
+{_add("new")}
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS verres_facets_ad AFTER DELETE ON verres BEGIN
+{_remove("old")}
+END""",
+]
+
+TRIGGER_NAMES = ["verres_facets_ai", "verres_facets_au", "verres_facets_ad"]
+
+
+def rebuild_facet_summary(connection) -> int:
+    """
+    Recalcule tous les compteurs par des COUNT groupés sur verres.
+
+    Args:
+        connection: Connexion SQLAlchemy synchrone (SQLite)
+
+    Returns:
+        int: Nombre de valeurs de facettes
+    """
+    connection.execute(text(f"DELETE FROM {FACETS_TABLE}"))
+    for facet, key in FACET_KEYS.items():
+        key = key.format(row="verres")
+        connection.execute(
+            text(
+                f"INSERT INTO {FACETS_TABLE} (facette, cle, nombre) "
+                f"SELECT '{facet}', {key}, count(*) FROM verres "
+                f"WHERE {_column(facet)} IS NOT NULL GROUP BY {key}"
+            )
+        )
+    count = connection.execute(text(f"SELECT count(*) FROM {FACETS_TABLE}")).scalar()
+    db_logger.info(f"Synthèse des facettes reconstruite : {count} valeurs")
+    return count
+
+
+def create_facet_summary(connection) -> bool:
+    """
+    Crée la table de synthèse et ses triggers s'ils n'existent pas.
+
+    Args:
+        connection: Connexion SQLAlchemy synchrone (SQLite)
+
+    Returns:
+        bool: True si la table vient d'être créée (la synthèse est alors
+            calculée à partir des verres existants)
+    """
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FACETS_TABLE},
+    ).first()
+    verres_facets.create(connection, checkfirst=True)
+    for trigger in CREATE_TRIGGERS:
+        connection.execute(text(trigger))
+    if exists is None:
+        rebuild_facet_summary(connection)
+    return exists is None
+
+
+def drop_facet_summary(connection) -> None:
+    """
+    Supprime les triggers puis la table de synthèse.
+
+    Les triggers de verres écrivent dans verres_facets : ils sont supprimés
+    avant elle.
+    """
+    for name in TRIGGER_NAMES:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {FACETS_TABLE}"))
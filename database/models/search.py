@@ -0,0 +1,148 @@
+"""
+Index plein texte des verres (SQLite FTS5).
+
+La table virtuelle verres_fts contient, pour chaque verre (rowid = verres.id),
+son nom, sa variante et les noms de son fournisseur, de sa gamme, de sa série et
+de son matériau. Des triggers la tiennent à jour lors des écritures sur verres et
+des renommages dans les tables de référence ; la table et ses triggers sont créés
+par la migration Alembic 5c1e7a9d2b64 et peuvent être reconstruits par
+database/scripts/build_search_index.py.
+"""
+
+import re
+from typing import List
+
+from sqlalchemy import column, literal_column, table, text
+
+from database.utils.logger import db_logger
+
+FTS_TABLE = "verres_fts"
+FTS_COLUMNS = ["nom", "variante", "fournisseur", "gamme", "serie", "materiau"]
+
+# Poids BM25 de chaque colonne (ordre de FTS_COLUMNS)
+BM25_WEIGHTS = [10.0, 5.0, 2.0, 4.0, 3.0, 1.0]
+
+# Table Core pour construire les requêtes (rowid = verres.id)
+verres_fts = table(FTS_TABLE, column("rowid"), *(column(c) for c in FTS_COLUMNS))
+fts_table = literal_column(FTS_TABLE)
+
+# Colonne de clé étrangère de verres vers chaque table de référence
+_REFERENCES = {
+    "fournisseurs": "fournisseur_id",
+    "gammes": "gamme_id",
+    "series": "serie_id",
+    "materiaux": "materiau_id",
+}
+
+_INSERT_ROWS = f"""
+INSERT INTO {FTS_TABLE} (rowid, {", ".join(FTS_COLUMNS)})
+SELECT v.id, v.nom, v.variante, f.nom, g.nom, s.nom, m.nom
+FROM verres v
+LEFT JOIN fournisseurs f ON f.id = v.fournisseur_id
+LEFT JOIN gammes g ON g.id = v.gamme_id
+LEFT JOIN series s ON s.id = v.serie_id
+LEFT JOIN materiaux m ON m.id = v.materiau_id
+"""
+
+# Tokenizer sans accents ni casse ; index de préfixes de 2 et 3 caractères
+CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(FTS_COLUMNS)}, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+_VERRES_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS verres_fts_ai AFTER INSERT ON verres BEGIN
+{_INSERT_ROWS} WHERE v.id = new.id;
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS verres_fts_au AFTER UPDATE ON verres BEGIN
+DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+{_INSERT_ROWS} WHERE v.id = new.id;
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS verres_fts_ad AFTER DELETE ON verres BEGIN
+DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+END""",
+]
+
+# Renommage d'un fournisseur, d'une gamme... : réindexe ses verres
+_REFERENCE_TRIGGER = """CREATE TRIGGER IF NOT EXISTS {reference}_fts_au
+AFTER UPDATE OF nom ON {reference} BEGIN
+DELETE FROM {table} WHERE rowid IN (SELECT id FROM verres WHERE {key} = new.id);
+{insert} WHERE v.{key} = new.id;
+END"""
+
+CREATE_TRIGGERS = _VERRES_TRIGGERS + [
+    _REFERENCE_TRIGGER.format(
+        reference=reference, key=key, table=FTS_TABLE, insert=_INSERT_ROWS
+    )
+    for reference, key in _REFERENCES.items()
+]
+
+TRIGGER_NAMES = ["verres_fts_ai", "verres_fts_au", "verres_fts_ad"] + [
+    f"{reference}_fts_au" for reference in _REFERENCES
+]
+
+
+def create_search_index(connection) -> bool:
+    """
+    Crée la table FTS5 et ses triggers s'ils n'existent pas.
+
+    Args:
+        connection: Connexion SQLAlchemy synchrone (SQLite)
+
+    Returns:
+        bool: True si la table vient d'être créée (elle est alors remplie)
+    """
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+    ).first()
+    connection.execute(text(CREATE_TABLE))
+    for trigger in CREATE_TRIGGERS:
+        connection.execute(text(trigger))
+    if exists is None:
+        rebuild_search_index(connection)
+    return exists is None
+
+
+def rebuild_search_index(connection) -> int:
+    """
+    Réindexe tous les verres.
+
+    Returns:
+        int: Nombre de verres indexés
+    """
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    connection.execute(text(_INSERT_ROWS))
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    )
+    count = connection.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+    db_logger.info(f"Index de recherche reconstruit : {count} verres")
+    return count
+
+
+def drop_search_index(connection) -> None:
+    """
+    Supprime les triggers puis la table FTS5.
+
+    Les triggers sont portés par verres et les tables de référence : laissés en
+    place, ils feraient échouer toute écriture sur ces tables.
+    """
+    for name in TRIGGER_NAMES:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def fts_query(search: str) -> str:
+    """
+    Convertit une saisie libre en requête FTS5 : chaque mot devient un préfixe
+    et tous les mots sont requis.
+
+    Args:
+        search (str): Texte saisi (ex. "varilux comf")
+
+    Returns:
+        str: Expression MATCH (ex. '"varilux"* "comf"*'), vide si aucun mot
+    """
+    tokens: List[str] = re.findall(r"\w+", search.lower())
+    return " ".join(f'"{token}"*' for token in tokens)
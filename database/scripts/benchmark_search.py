@@ -0,0 +1,188 @@
+"""
+Benchmark de la recherche de verres : index FTS5 contre balayage LIKE '%terme%'.
+
+Une base neuve est remplie de verres synthétiques ; chaque requête est exécutée
+avec MATCH (classement BM25) puis avec LIKE sur les mêmes colonnes.
+
+Usage :
+    python -m database.scripts.benchmark_search --rows 100000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import func, insert, or_, select
+
+from database.config.database import Base, create_db_engine
+from database.models.base import Fournisseur, Gamme, Materiau, Serie, Verre
+from database.models.search import (
+    BM25_WEIGHTS,
+    create_search_index,
+    fts_query,
+    fts_table,
+    verres_fts,
+)
+
+FOURNISSEURS = ["Essilor", "Hoya", "Zeiss", "Rodenstock", "Nikon", "Shamir"]
+GAMMES = ["Varilux", "Eyezen", "Hoyalux", "Progressive", "SmartLife", "Autograph"]
+SERIES = ["Comfort", "Physio", "Liberty", "Premium", "Classic"]
+MATERIAUX = ["Orma", "Airwear", "Stylis", "Lineis", "Trivex"]
+MOTS = ["Max", "Plus", "Digital", "Drive", "Sport", "Office", "Kids", "Light"]
+
+QUERIES = ["varilux comfort", "essilor", "dig", "hoya light kids", "autograph 4242"]
+
+
+def _seed(engine, rows: int) -> None:
+    """Crée les tables et l'index FTS5 puis insère rows verres."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        create_search_index(connection)
+    rng = random.Random(0)
+    with engine.begin() as connection:
+        for model, names in (
+            (Fournisseur, FOURNISSEURS),
+            (Gamme, GAMMES),
+            (Serie, SERIES),
+            (Materiau, MATERIAUX),
+        ):
+            connection.execute(
+                insert(model), [{"id": i + 1, "nom": n} for i, n in enumerate(names)]
+            )
+        connection.execute(
+            insert(Verre),
+            [
+                {
+                    "nom": f"{rng.choice(GAMMES)} {rng.choice(SERIES)} "
+                    f"{rng.choice(MOTS)} {i}",
+                    "variante": rng.choice(MOTS),
+                    "indice": 1.5 + rng.randrange(25) / 100,
+                    "fournisseur_id": rng.randrange(len(FOURNISSEURS)) + 1,
+                    "gamme_id": rng.randrange(len(GAMMES)) + 1,
+                    "serie_id": rng.randrange(len(SERIES)) + 1,
+                    "materiau_id": rng.randrange(len(MATERIAUX)) + 1,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def fts_statement(search: str, limit: int):
+    """Recherche FTS5 : les limit meilleurs verres selon BM25."""
+    return (
+        select(verres_fts.c.rowid, func.bm25(fts_table, *BM25_WEIGHTS).label("rank"))
+        .where(fts_table.op("MATCH")(fts_query(search)))
+        .order_by("rank")
+        .limit(limit)
+    )
+
+
+def like_statement(search: str, limit: int):
+    """
+    Balayage LIKE '%mot%' : chaque mot dans l'une des colonnes indexées. Sans
+    classement possible, les limit premiers verres trouvés sont retournés.
+    """
+    columns = [
+        Verre.nom,
+        Verre.variante,
+        Fournisseur.nom,
+        Gamme.nom,
+        Serie.nom,
+        Materiau.nom,
+    ]
+    return (
+        select(Verre.id)
+        .outerjoin(Fournisseur, Fournisseur.id == Verre.fournisseur_id)
+        .outerjoin(Gamme, Gamme.id == Verre.gamme_id)
+        .outerjoin(Serie, Serie.id == Verre.serie_id)
+        .outerjoin(Materiau, Materiau.id == Verre.materiau_id)
+        .where(
+            *(or_(*(c.ilike(f"%{word}%") for c in columns)) for word in search.split())
+        )
+        .limit(limit)
+    )
+
+
+def count_statement(statement):
+    """Nombre total de verres trouvés (total et facettes de /search)."""
+    return select(func.count()).select_from(
+        statement.limit(None).order_by(None).subquery()
+    )
+
+
+def _median_ms(connection, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(statement).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run_benchmark(db_path: Path, rows: int = 100000, repeat: int = 5) -> List[Dict]:
+    """
+    Mesure, pour chaque requête de QUERIES, la latence médiane des deux
+    méthodes : page de 20 résultats et comptage de tous les résultats.
+
+    Args:
+        db_path (Path): Fichier de la base (créé)
+        rows (int): Nombre de verres
+        repeat (int): Nombre d'exécutions de chaque requête
+
+    Returns:
+        List[Dict]: Latences en ms et nombre de verres trouvés, par requête
+    """
+    engine = create_db_engine(f"sqlite:///{db_path}", profile="performance")
+    _seed(engine, rows)
+
+    results = []
+    with engine.connect() as connection:
+        for search in QUERIES:
+            fts, like = fts_statement(search, 20), like_statement(search, 20)
+            results.append(
+                {
+                    "query": search,
+                    "matches": connection.execute(count_statement(fts)).scalar(),
+                    "fts_page_ms": _median_ms(connection, fts, repeat),
+                    "like_page_ms": _median_ms(connection, like, repeat),
+                    "fts_count_ms": _median_ms(
+                        connection, count_statement(fts), repeat
+                    ),
+                    "like_count_ms": _median_ms(
+                        connection, count_statement(like), repeat
+                    ),
+                }
+            )
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark de la recherche : FTS5 contre LIKE"
+    )
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmark(Path(tmp) / "search.db", args.rows, args.repeat)
+
+    print(
+        f"{'Requête':<18}{'Trouvés':>9}{'FTS page':>10}{'LIKE page':>11}"
+        f"{'FTS total':>11}{'LIKE total':>12}  (ms)"
+    )
+    for r in results:
+        print(
+            f"{r['query']:<18}{r['matches']:>9}{r['fts_page_ms']:>10.2f}"
+            f"{r['like_page_ms']:>11.2f}{r['fts_count_ms']:>11.2f}"
+            f"{r['like_count_ms']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark de lectures/écritures concurrentes sur SQLite, par profil de connexion.
+
+Chaque profil est mesuré sur une base neuve : des threads lecteurs enchaînent des
+requêtes filtrées sur verres pendant que des threads écrivains insèrent des
+verres (une transaction par insertion).
+
+Usage :
+    python -m database.scripts.benchmark_sqlite --duration 10 --readers 8 --writers 2
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from database.config.database import Base, create_db_engine
+from database.models.base import Fournisseur, Gamme, Verre
+
+
+def _seed(engine, rows: int) -> None:
+    """Crée les tables et insère rows verres."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Fournisseur), [{"id": 1, "nom": "Fournisseur"}])
+        connection.execute(insert(Gamme), [{"id": 1, "nom": "Gamme"}])
+        connection.execute(
+            insert(Verre),
+            [
+                {
+                    "nom": f"Verre {i}",
+                    "indice": 1.5 + (i % 25) / 100,
+                    "fournisseur_id": 1,
+                    "gamme_id": 1,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def run_benchmark(
+    profile: str,
+    db_path: Path,
+    readers: int = 4,
+    writers: int = 2,
+    duration: float = 5.0,
+    rows: int = 5000,
+) -> Dict:
+    """
+    Mesure le débit de lectures et d'écritures concurrentes.
+
+    Args:
+        profile (str): Profil de connexion (database.config.database.ENGINE_PROFILES)
+        db_path (Path): Fichier de la base (créé)
+        readers (int): Nombre de threads lecteurs
+        writers (int): Nombre de threads écrivains
+        duration (float): Durée de la mesure en secondes
+        rows (int): Nombre de verres initiaux
+
+    Returns:
+        Dict: Opérations par seconde et nombre d'erreurs de verrou
+    """
+    engine = create_db_engine(f"sqlite:///{db_path}", profile=profile)
+    _seed(engine, rows)
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    query = (
+        select(Verre.id, Verre.nom, Verre.indice)
+        .where(Verre.indice.between(1.55, 1.6))
+        .order_by(Verre.id.desc())
+        .limit(50)
+    )
+
+    def reader():
+        done = errors = 0
+        with engine.connect() as connection:
+            while not stop.is_set():
+                try:
+                    connection.execute(query).fetchall()
+                    connection.rollback()  # Termine la transaction de lecture
+                    done += 1
+                except OperationalError:
+                    connection.rollback()
+                    errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer():
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        insert(Verre),
+                        {
+                            "nom": f"Nouveau {done}",
+                            "indice": 1.6,
+                            "fournisseur_id": 1,
+                            "gamme_id": 1,
+                        },
+                    )
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads: List[threading.Thread] = [
+        threading.Thread(target=reader) for _ in range(readers)
+    ] + [threading.Thread(target=writer) for _ in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "reads_per_s": counts["reads"] / elapsed,
+        "writes_per_s": counts["writes"] / elapsed,
+        "lock_errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark SQLite concurrent, avec et sans profil de performance"
+    )
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--profiles", nargs="+", default=["default", "performance"])
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles:
+            results.append(
+                run_benchmark(
+                    profile,
+                    Path(tmp) / f"{profile}.db",
+                    args.readers,
+                    args.writers,
+                    args.duration,
+                    args.rows,
+                )
+            )
+
+    print(f"{'Profil':<14}{'Lectures/s':>12}{'Écritures/s':>13}{'Erreurs':>9}")
+    for result in results:
+        print(
+            f"{result['profile']:<14}{result['reads_per_s']:>12.0f}"
+            f"{result['writes_per_s']:>13.1f}{result['lock_errors']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Crée (si besoin) et reconstruit l'index plein texte des verres (FTS5).
+
+À lancer une fois sur une base existante ; ensuite, les triggers tiennent
+l'index à jour.
+
+Usage :
+    python -m database.scripts.build_search_index
+"""
+
+from database.config.database import engine
+from database.models.search import create_search_index, rebuild_search_index
+
+
+def main():
+    with engine.begin() as connection:
+        if not create_search_index(connection):
+            rebuild_search_index(connection)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
+import asyncio
 import os
 
 import pytest
-from sqlalchemy import text
+from sqlalchemy import select, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from database.config.database import (
     Base,
     check_database_connection,
+    create_async_db_engine,
     create_db_engine,
+    get_async_database_url,
     get_database_url,
     get_db,
+    get_engine_profile,
     init_database,
 )
 
@@ -90,3 +94,112 @@ def test_database_session_commit():
         assert db.is_active
     finally:
         db.close()
+
+
+def _pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_performance_profile_pragmas(tmp_path):
+    """Test que le profil performance configure chaque connexion"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'perf.db'}", "performance")
+    try:
+        assert _pragma(engine, "journal_mode") == "wal"
+        assert _pragma(engine, "synchronous") == 1  # NORMAL
+        assert _pragma(engine, "temp_store") == 2  # MEMORY
+        assert _pragma(engine, "cache_size") == -64000
+        assert _pragma(engine, "busy_timeout") == 5000
+        assert engine.pool.size() == 10
+    finally:
+        engine.dispose()
+
+
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    """Test que le profil default n'applique aucun PRAGMA"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'default.db'}", "default")
+    try:
+        assert _pragma(engine, "journal_mode") == "delete"
+    finally:
+        engine.dispose()
+
+
+def test_default_profile_without_env(monkeypatch):
+    """Test que WAL n'est activé que sur demande (DB_PROFILE=performance)"""
+    monkeypatch.delenv("DB_PROFILE", raising=False)
+
+    profile = get_engine_profile()
+
+    assert profile["name"] == "default"
+    assert "journal_mode" not in profile["pragmas"]
+
+
+def test_engine_profile_env_overrides(monkeypatch):
+    """Test la surcharge du profil par les variables d'environnement"""
+    monkeypatch.setenv("DB_PROFILE", "performance")
+    monkeypatch.setenv("DB_PRAGMA_CACHE_SIZE", "-1000")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+
+    profile = get_engine_profile()
+
+    assert profile["pragmas"]["cache_size"] == "-1000"
+    assert profile["pragmas"]["journal_mode"] == "WAL"
+    assert profile["pool_size"] == 3
+    with pytest.raises(ValueError):
+        get_engine_profile("inconnu")
+
+
+def test_concurrent_benchmark(tmp_path):
+    """Test le benchmark lectures/écritures concurrentes (exécution courte)"""
+    from database.scripts.benchmark_sqlite import run_benchmark
+
+    result = run_benchmark(
+        "performance",
+        tmp_path / "bench.db",
+        readers=2,
+        writers=1,
+        duration=0.3,
+        rows=100,
+    )
+
+    assert result["reads_per_s"] > 0
+    assert result["writes_per_s"] > 0
+    assert result["lock_errors"] == 0
+
+
+def test_get_async_database_url():
+    """Test que l'URL asynchrone vise la même base avec le pilote aiosqlite"""
+    url = get_async_database_url()
+    assert url.startswith("sqlite+aiosqlite:///")
+    assert url.replace("+aiosqlite", "") == get_database_url()
+
+
+def test_async_engine_profile(tmp_path):
+    """Test le moteur asynchrone : PRAGMA du profil et aller-retour de session"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from database.models.base import Fournisseur
+
+    async def scenario():
+        engine = create_async_db_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", "performance"
+        )
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+                journal_mode = (
+                    await connection.execute(text("PRAGMA journal_mode"))
+                ).scalar()
+            async with AsyncSession(engine) as session:
+                session.add(Fournisseur(nom="Essilor"))
+                await session.commit()
+                noms = (await session.scalars(select(Fournisseur.nom))).all()
+            return journal_mode, noms, engine.pool.size()
+        finally:
+            await engine.dispose()
+
+    journal_mode, noms, pool_size = asyncio.run(scenario())
+
+    assert journal_mode == "wal"
+    assert noms == ["Essilor"]
+    assert pool_size == 10
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import text
+
+from database.models.base import Fournisseur, Gamme, Materiau, Verre
+from database.models.facets import (
+    create_facet_summary,
+    drop_facet_summary,
+    rebuild_facet_summary,
+)
+
+
+@pytest.fixture(autouse=True)
+def facet_summary(test_db_session):
+    """Synthèse des facettes (créée par la migration 0b8e4f2a6c13 sur une vraie base)."""
+    create_facet_summary(test_db_session.connection())
+    test_db_session.commit()
+
+
+def _summary(session):
+    return session.execute(
+        text("SELECT facette, cle, nombre FROM verres_facets ORDER BY facette, cle")
+    ).all()
+
+
+def test_triggers_update_counts(test_db_session):
+    """Test la mise à jour incrémentale de la synthèse des facettes"""
+    essilor, hoya = Fournisseur(nom="Essilor"), Fournisseur(nom="Hoya")
+    gamme, materiau = Gamme(nom="Varilux"), Materiau(nom="Orma")
+    test_db_session.add_all([essilor, hoya, gamme, materiau])
+    test_db_session.flush()
+    verres = [
+        Verre(nom="A", indice=1.6, fournisseur_id=essilor.id, gamme_id=gamme.id),
+        Verre(
+            nom="B",
+            indice=1.5,
+            fournisseur_id=essilor.id,
+            gamme_id=gamme.id,
+            materiau_id=materiau.id,
+        ),
+    ]
+    test_db_session.add_all(verres)
+    test_db_session.commit()
+    assert _summary(test_db_session) == [
+        ("fournisseur", "1", 2),
+        ("gamme", "1", 2),
+        ("indice", "1.50", 1),
+        ("indice", "1.60", 1),
+        ("materiau", "1", 1),
+    ]
+
+    verres[0].fournisseur_id = hoya.id
+    verres[0].indice = None
+    test_db_session.delete(verres[1])
+    test_db_session.commit()
+    assert _summary(test_db_session) == [("fournisseur", "2", 1), ("gamme", "1", 1)]
+
+
+def test_rebuild_matches_triggers(test_db_session):
+    """Test que la reconstruction donne les mêmes compteurs que les triggers"""
+    fournisseur, gamme = Fournisseur(nom="Zeiss"), Gamme(nom="Progressive")
+    test_db_session.add_all([fournisseur, gamme])
+    test_db_session.flush()
+    test_db_session.add_all(
+        Verre(
+            nom=f"Verre {i}",
+            indice=1.5 + (i % 3) / 10,
+            fournisseur_id=fournisseur.id,
+            gamme_id=gamme.id,
+        )
+        for i in range(7)
+    )
+    test_db_session.commit()
+    incremental = _summary(test_db_session)
+
+    assert rebuild_facet_summary(test_db_session.connection()) == 5
+    assert _summary(test_db_session) == incremental
+
+
+def test_drop_facet_summary(test_db_session):
+    """Test la suppression de la synthèse : triggers puis table"""
+    fournisseur, gamme = Fournisseur(nom="Essilor"), Gamme(nom="Varilux")
+    test_db_session.add_all([fournisseur, gamme])
+    test_db_session.commit()
+
+    drop_facet_summary(test_db_session.connection())
+    # Sans triggers orphelins, les écritures sur verres restent possibles
+    test_db_session.add(
+        Verre(nom="Comfort", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+    )
+    test_db_session.commit()
+    assert (
+        test_db_session.execute(
+            text("SELECT count(*) FROM sqlite_master WHERE name LIKE 'verres_facets%'")
+        ).scalar()
+        == 0
+    )
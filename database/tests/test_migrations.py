@@ -0,0 +1,128 @@
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect
+
+from database.models.base import Base
+
+VERSIONS = Path(__file__).resolve().parents[1] / "migrations" / "versions"
+
+
+def _load_revision(revision: str):
+    """Charge le module de migration d'une révision."""
+    path = next(VERSIONS.glob(f"*_{revision}_*.py"))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(connection, step):
+    """Exécute upgrade() ou downgrade() d'une migration sur une connexion."""
+    context = MigrationContext.configure(connection)
+    with Operations.context(context):
+        step()
+
+
+def _indexes(connection, table):
+    return {index["name"] for index in inspect(connection).get_indexes(table)}
+
+
+def test_composite_indexes_migration(tmp_path):
+    """Test la migration des index composites (bases existantes et nouvelles)"""
+    migration = _load_revision("97d306b9fbe7")
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        # Base créée par init_models() : les index existent déjà
+        _run(connection, migration.upgrade)
+        _run(connection, migration.downgrade)
+        assert "idx_verres_symboles_verre_id" in _indexes(connection, "verres_symboles")
+        assert "idx_verres_fournisseur_gamme_nom" not in _indexes(connection, "verres")
+
+        # Base antérieure à la migration, avec des doublons : la meilleure
+        # association est gardée (validée, puis score le plus haut)
+        connection.exec_driver_sql(
+            "INSERT INTO verres_symboles "
+            "(verre_id, symbole_id, score_confiance, est_valide) "
+            "VALUES (1, 1, 0.4, 0), (1, 1, 0.9, 0), (1, 2, 0.8, 0), (1, 2, 0.5, 1)"
+        )
+        _run(connection, migration.upgrade)
+
+        symboles_indexes = _indexes(connection, "verres_symboles")
+        assert "idx_verres_symboles_verre_symbole" in symboles_indexes
+        assert "idx_verres_symboles_verre_id" not in symboles_indexes
+        assert "idx_verres_fournisseur_gamme_nom" in _indexes(connection, "verres")
+        assert connection.exec_driver_sql(
+            "SELECT verre_id, symbole_id, score_confiance FROM verres_symboles "
+            "ORDER BY id"
+        ).all() == [(1, 1, 0.9), (1, 2, 0.5)]
+    engine.dispose()
+
+
+def test_search_index_migration(tmp_path):
+    """Test la création et la suppression de l'index plein texte par migration"""
+    migration = _load_revision("5c1e7a9d2b64")
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO fournisseurs (nom) VALUES ('Essilor')")
+        connection.exec_driver_sql("INSERT INTO gammes (nom) VALUES ('Varilux')")
+        connection.exec_driver_sql(
+            "INSERT INTO verres (nom, fournisseur_id, gamme_id) VALUES ('Comfort', 1, 1)"
+        )
+        _run(connection, migration.upgrade)
+        # Verres existants indexés, nouveaux verres indexés par les triggers
+        connection.exec_driver_sql(
+            "INSERT INTO verres (nom, fournisseur_id, gamme_id) VALUES ('Physio', 1, 1)"
+        )
+        assert connection.exec_driver_sql(
+            "SELECT rowid FROM verres_fts WHERE verres_fts MATCH 'essilor' "
+            "ORDER BY rowid"
+        ).scalars().all() == [1, 2]
+
+        _run(connection, migration.downgrade)
+        assert not inspect(connection).has_table("verres_fts")
+        # Plus aucun trigger : les écritures restent possibles
+        connection.exec_driver_sql("UPDATE fournisseurs SET nom = 'Hoya'")
+        connection.exec_driver_sql("DELETE FROM verres")
+        assert (
+            connection.exec_driver_sql(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' "
+                "AND name LIKE '%fts%'"
+            ).scalar()
+            == 0
+        )
+    engine.dispose()
+
+
+def test_facet_summary_migration(tmp_path):
+    """Test la création et la suppression de la synthèse des facettes"""
+    migration = _load_revision("0b8e4f2a6c13")
+    engine = create_engine(f"sqlite:///{tmp_path / 'migration.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        assert not inspect(connection).has_table("verres_facets")
+        connection.exec_driver_sql("INSERT INTO fournisseurs (nom) VALUES ('Essilor')")
+        connection.exec_driver_sql("INSERT INTO gammes (nom) VALUES ('Varilux')")
+        connection.exec_driver_sql(
+            "INSERT INTO verres (nom, fournisseur_id, gamme_id) VALUES ('Comfort', 1, 1)"
+        )
+        _run(connection, migration.upgrade)
+        # Verres existants comptés, nouveaux verres comptés par les triggers
+        connection.exec_driver_sql(
+            "INSERT INTO verres (nom, fournisseur_id, gamme_id) VALUES ('Physio', 1, 1)"
+        )
+        assert connection.exec_driver_sql(
+            "SELECT facette, cle, nombre FROM verres_facets ORDER BY facette"
+        ).all() == [("fournisseur", "1", 2), ("gamme", "1", 2)]
+
+        _run(connection, migration.downgrade)
+        assert not inspect(connection).has_table("verres_facets")
+        connection.exec_driver_sql("DELETE FROM verres")
+    engine.dispose()
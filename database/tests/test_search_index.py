@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import text
+
+from database.models.base import Fournisseur, Gamme, Verre
+from database.models.search import (
+    create_search_index,
+    drop_search_index,
+    fts_query,
+    rebuild_search_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def search_index(test_db_session):
+    """Index FTS5 (créé par la migration 5c1e7a9d2b64 sur une vraie base)."""
+    create_search_index(test_db_session.connection())
+    test_db_session.commit()
+
+
+def _indexed(session, search):
+    return (
+        session.execute(
+            text(
+                "SELECT rowid FROM verres_fts WHERE verres_fts MATCH :q ORDER BY rowid"
+            ),
+            {"q": fts_query(search)},
+        )
+        .scalars()
+        .all()
+    )
+
+
+def test_fts_query():
+    """Test la conversion d'une saisie libre en requête FTS5"""
+    assert fts_query("Varilux  comf") == '"varilux"* "comf"*'
+    assert fts_query('a"b OR c') == '"a"* "b"* "or"* "c"*'
+    assert fts_query(" -* ") == ""
+
+
+def test_triggers_keep_index_in_sync(test_db_session):
+    """Test la mise à jour de l'index par les triggers"""
+    fournisseur, gamme = Fournisseur(nom="Essilor"), Gamme(nom="Varilux")
+    test_db_session.add_all([fournisseur, gamme])
+    test_db_session.flush()
+    verre = Verre(nom="Comfort", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+    test_db_session.add(verre)
+    test_db_session.commit()
+    assert _indexed(test_db_session, "essilor comfort") == [verre.id]
+
+    verre.nom = "Physio"
+    fournisseur.nom = "Hoya"
+    test_db_session.commit()
+    assert _indexed(test_db_session, "comfort") == []
+    assert _indexed(test_db_session, "hoya physio") == [verre.id]
+
+    test_db_session.delete(verre)
+    test_db_session.commit()
+    assert _indexed(test_db_session, "physio") == []
+
+
+def test_rebuild_search_index(test_db_session):
+    """Test la reconstruction complète de l'index"""
+    fournisseur, gamme = Fournisseur(nom="Zeiss"), Gamme(nom="Progressive")
+    test_db_session.add_all([fournisseur, gamme])
+    test_db_session.flush()
+    test_db_session.add_all(
+        Verre(nom=f"Verre {i}", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+        for i in range(3)
+    )
+    test_db_session.commit()
+    test_db_session.execute(text("DELETE FROM verres_fts"))
+
+    assert rebuild_search_index(test_db_session.connection()) == 3
+    assert len(_indexed(test_db_session, "zeiss")) == 3
+
+
+def test_search_benchmark(tmp_path):
+    """Test le benchmark FTS5 / LIKE (petite base)"""
+    from database.scripts.benchmark_search import QUERIES, run_benchmark
+
+    results = run_benchmark(tmp_path / "search.db", rows=500, repeat=1)
+
+    assert [r["query"] for r in results] == QUERIES
+    assert all(r["fts_count_ms"] > 0 and r["like_count_ms"] > 0 for r in results)
+
+
+def test_drop_search_index(test_db_session):
+    """Test la suppression de l'index : les écritures sur verres restent possibles"""
+    fournisseur, gamme = Fournisseur(nom="Hoya"), Gamme(nom="Hoyalux")
+    test_db_session.add_all([fournisseur, gamme])
+    test_db_session.commit()
+
+    drop_search_index(test_db_session.connection())
+    test_db_session.add(
+        Verre(nom="Verre", fournisseur_id=fournisseur.id, gamme_id=gamme.id)
+    )
+    fournisseur.nom = "Hoya Vision"
+    test_db_session.commit()
+
+    assert (
+        test_db_session.execute(
+            text("SELECT count(*) FROM sqlite_master WHERE sql LIKE '%verres_fts%'")
+        ).scalar()
+        == 0
+    )
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Augmentation des images par batch, directement sur les tenseurs d'entraînement.
+Ce module reprend les transformations de normalize_drawings.create_augmented_image
+(rotation, déformation élastique, bruit gaussien, contraste) mais :
+- Les applique au batch entier en quelques opérations tensorielles (sans GPU requis)
+- Tire de nouvelles variantes à chaque époque au lieu de variantes figées sur disque
+- Combine rotation et déformation élastique en un seul grid_sample
+"""
+
+import math
+from typing import Optional
+
+import torch
+import torch.nn.functional as F
+
+
+class BatchAugmenter:
+    """
+    Augmente un batch d'images normalisées dans [-1, 1] (tracé noir sur fond blanc).
+
+    Chaque transformation est appliquée indépendamment à chaque image avec la
+    probabilité p, comme dans l'augmentation hors ligne. Les calculs se font sur
+    l'« encre » (1 - x) / 2, nulle sur le fond : le rééchantillonnage avec remplissage
+    par zéros et l'ajustement de contraste conservent ainsi un fond blanc.
+    """
+
+    def __init__(
+        self,
+        max_angle: float = 15.0,
+        elastic_alpha: float = 2.0,
+        elastic_grid: int = 4,
+        noise_sigma: float = 15.0,
+        contrast_range: tuple = (0.8, 1.2),
+        p: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_angle (float): Angle de rotation maximal en degrés
+            elastic_alpha (float): Déplacement élastique maximal en pixels
+            elastic_grid (int): Taille de la grille grossière du champ de déplacement
+                (plus elle est petite, plus la déformation est lisse)
+            noise_sigma (float): Écart-type du bruit gaussien, en niveaux de gris (0-255)
+            contrast_range (tuple): Intervalle du facteur de contraste
+            p (float): Probabilité d'appliquer chaque transformation à une image
+            seed (int, optional): Graine du générateur aléatoire
+        """
+        self.max_angle = max_angle
+        self.elastic_alpha = elastic_alpha
+        self.elastic_grid = elastic_grid
+        self.noise_sigma = noise_sigma
+        self.contrast_range = contrast_range
+        self.p = p
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+        else:
+            self.generator.seed()
+
+    def _rand(self, *shape: int) -> torch.Tensor:
+        return torch.rand(*shape, generator=self.generator)
+
+    def _mask(self, n: int) -> torch.Tensor:
+        """Masque (N,) des images auxquelles appliquer une transformation."""
+        return (self._rand(n) < self.p).float()
+
+    def _sampling_grid(self, n: int, height: int, width: int) -> torch.Tensor:
+        """
+        Grille d'échantillonnage (N, H, W, 2) combinant rotation et déformation élastique.
+        """
+        # Rotation autour du centre (angle nul pour les images non sélectionnées)
+        angles = (self._rand(n) * 2 - 1) * math.radians(self.max_angle) * self._mask(n)
+        cos, sin = torch.cos(angles), torch.sin(angles)
+        theta = torch.zeros(n, 2, 3)
+        theta[:, 0, 0] = cos
+        theta[:, 0, 1] = -sin * height / width
+        theta[:, 1, 0] = sin * width / height
+        theta[:, 1, 1] = cos
+        grid = F.affine_grid(theta, (n, 1, height, width), align_corners=False)
+
+        # Champ de déplacement lisse : bruit grossier interpolé à la taille de l'image
+        coarse = self._rand(n, 2, self.elastic_grid, self.elastic_grid) * 2 - 1
+        field = F.interpolate(
+            coarse, size=(height, width), mode="bicubic", align_corners=True
+        )
+        # Pixels -> coordonnées normalisées de grid_sample
+        scale = torch.tensor([2.0 / width, 2.0 / height]).view(1, 2, 1, 1)
+        field = field * self.elastic_alpha * scale * self._mask(n).view(n, 1, 1, 1)
+        return grid + field.permute(0, 2, 3, 1)
+
+    @torch.no_grad()
+    def __call__(self, images: torch.Tensor) -> torch.Tensor:
+        """
+        Retourne une version augmentée du batch.
+
+        Args:
+            images (torch.Tensor): Batch (N, 1, H, W) normalisé dans [-1, 1]
+
+        Returns:
+            torch.Tensor: Batch augmenté, mêmes forme, device et plage de valeurs
+        """
+        device = images.device
+        n, _, height, width = images.shape
+        ink = (1.0 - images.float().cpu()) / 2.0
+
+        # Rotation + déformation élastique en un seul rééchantillonnage
+        grid = self._sampling_grid(n, height, width)
+        ink = F.grid_sample(
+            ink, grid, mode="bilinear", padding_mode="zeros", align_corners=False
+        )
+
+        # Contraste : intensité du tracé multipliée par un facteur aléatoire
+        low, high = self.contrast_range
+        factors = low + (high - low) * self._rand(n)
+        mask = self._mask(n)
+        factors = (factors * mask + (1.0 - mask)).view(n, 1, 1, 1)
+        ink = ink * factors
+
+        # Bruit gaussien
+        sigma = self.noise_sigma / 255.0 * self._mask(n).view(n, 1, 1, 1)
+        ink = ink + sigma * torch.randn(ink.shape, generator=self.generator)
+
+        images_out = 1.0 - 2.0 * ink.clamp_(0.0, 1.0)
+        return images_out.to(device=device, dtype=images.dtype)
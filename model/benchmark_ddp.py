@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'entraînement distribué (DDP, backend gloo) sur CPU.
+Ce script :
+- Lance N processus locaux pour chaque valeur de N demandée
+- Entraîne SiameseNetwork sur des paires synthétiques via SiameseTrainer
+- Mesure le débit global (paires/seconde) en fonction du nombre de processus
+
+Usage :
+    python -m model.benchmark_ddp [nb_paires] [taille_batch] [nb_processus ...]
+    python -m model.benchmark_ddp 4096 32 1 2 4 8
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+
+from model.siamese_model import ContrastiveLoss, SiameseNetwork
+from model.train_siamese import SiameseTrainer
+
+
+def find_free_port() -> int:
+    """Retourne un port TCP libre sur localhost pour le rendez-vous gloo."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_synthetic_pairs(num_pairs: int, image_size: int = 64) -> TensorDataset:
+    """
+    Génère un dataset de paires aléatoires normalisées dans [-1, 1].
+
+    Args:
+        num_pairs (int): Nombre de paires
+        image_size (int): Taille des images carrées
+
+    Returns:
+        TensorDataset: Paires (img1, img2, label)
+    """
+    generator = torch.Generator().manual_seed(0)
+    shape = (num_pairs, 1, image_size, image_size)
+    img1 = torch.rand(shape, generator=generator) * 2 - 1
+    img2 = torch.rand(shape, generator=generator) * 2 - 1
+    labels = torch.randint(0, 2, (num_pairs,), generator=generator).float()
+    return TensorDataset(img1, img2, labels)
+
+
+def _worker(
+    rank: int,
+    world_size: int,
+    port: int,
+    num_pairs: int,
+    batch_size: int,
+    results,
+):
+    """Processus d'entraînement d'un rang : une époque de chauffe puis une mesurée."""
+    os.environ["MASTER_ADDR"] = "127.0.0.1"
+    os.environ["MASTER_PORT"] = str(port)
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // world_size))
+    torch.manual_seed(0)
+
+    dataset = make_synthetic_pairs(num_pairs)
+    sampler = DistributedSampler(dataset, shuffle=True)
+    loader = DataLoader(dataset, batch_size=batch_size, sampler=sampler)
+
+    model = SiameseNetwork()
+    trainer = SiameseTrainer(
+        model,
+        ContrastiveLoss(),
+        optim.Adam(model.parameters(), lr=0.001),
+        torch.device("cpu"),
+        Path(tempfile.gettempdir()) / "benchmark_ddp",
+        distributed=True,
+    )
+
+    # Chauffe (allocations, buckets DDP)
+    sampler.set_epoch(0)
+    trainer.train_epoch(loader)
+
+    dist.barrier()
+    start = time.perf_counter()
+    sampler.set_epoch(1)
+    trainer.train_epoch(loader)
+    dist.barrier()
+    elapsed = time.perf_counter() - start
+
+    if rank == 0:
+        # Le sampler complète la dernière partition : chaque rang voit len(sampler) paires
+        results[world_size] = (len(sampler) * world_size, elapsed)
+
+    dist.destroy_process_group()
+
+
+def run_benchmark(
+    world_sizes: List[int], num_pairs: int = 4096, batch_size: int = 32
+) -> dict:
+    """
+    Exécute le benchmark pour chaque nombre de processus.
+
+    Args:
+        world_sizes (List[int]): Nombres de processus à tester
+        num_pairs (int): Nombre de paires synthétiques par époque
+        batch_size (int): Taille de batch par processus
+
+    Returns:
+        dict: {nb_processus: paires/seconde}
+    """
+    manager = mp.Manager()
+    results = manager.dict()
+    for world_size in world_sizes:
+        mp.spawn(
+            _worker,
+            args=(world_size, find_free_port(), num_pairs, batch_size, results),
+            nprocs=world_size,
+            join=True,
+        )
+
+    return {ws: samples / elapsed for ws, (samples, elapsed) in sorted(results.items())}
+
+
+def main():
+    num_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    world_sizes = [int(n) for n in sys.argv[3:]] or [1, 2, 4]
+
+    print(f"CPU disponibles : {os.cpu_count()}")
+    print(f"Paires par époque : {num_pairs}, batch par processus : {batch_size}\n")
+
+    throughputs = run_benchmark(world_sizes, num_pairs, batch_size)
+    baseline = throughputs.get(min(throughputs))
+
+    print(f"{'Processus':>10} | {'Paires/s':>10} | {'Accélération':>12}")
+    print("-" * 38)
+    for world_size, throughput in throughputs.items():
+        print(
+            f"{world_size:>10} | {throughput:>10.1f} | {throughput / baseline:>11.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark du débit d'inférence du réseau siamois sur CPU.
+Compare, pour plusieurs tailles de batch, les combinaisons :
+- Précision : fp32 / bf16 (autocast)
+- Format mémoire : NCHW / channels_last
+
+Pour chaque configuration, le script mesure le débit (images/seconde) de
+SiamesePredictor.embed et l'écart des embeddings par rapport à fp32 NCHW.
+
+Usage :
+    python -m model.benchmark_inference [taille_batch ...]
+    python -m model.benchmark_inference 1 32 256
+"""
+
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import torch
+import torch.nn.functional as F
+
+from model.infer_siamese import SiamesePredictor
+from model.siamese_model import PRECISIONS, SiameseNetwork
+
+CONFIGURATIONS: List[Tuple[str, bool]] = [
+    (precision, channels_last)
+    for precision in PRECISIONS
+    for channels_last in (False, True)
+]
+
+
+def measure_throughput(
+    predictor: SiamesePredictor, batch: torch.Tensor, min_duration: float = 1.0
+) -> float:
+    """
+    Mesure le débit d'embedding d'un batch.
+
+    Args:
+        predictor: Prédicteur configuré
+        batch: Batch d'images (N, 1, 64, 64)
+        min_duration: Durée minimale de mesure en secondes
+
+    Returns:
+        float: Images par seconde
+    """
+    # Chauffe (sélection des noyaux oneDNN, allocations)
+    for _ in range(3):
+        predictor.embed(batch)
+
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        predictor.embed(batch)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_duration:
+            return iterations * batch.size(0) / elapsed
+
+
+def run_benchmark(batch_sizes: List[int]) -> Dict[Tuple[str, bool, int], dict]:
+    """
+    Exécute le benchmark pour toutes les configurations et tailles de batch.
+
+    Args:
+        batch_sizes: Tailles de batch à tester
+
+    Returns:
+        Dict: {(précision, channels_last, batch): {"throughput", "min_cosine"}}
+    """
+    torch.manual_seed(0)
+    device = torch.device("cpu")
+    model = SiameseNetwork().eval()
+    state_dict = model.state_dict()
+
+    results = {}
+    for batch_size in batch_sizes:
+        batch = torch.rand(batch_size, 1, 64, 64) * 2 - 1
+        reference = None
+        for precision, channels_last in CONFIGURATIONS:
+            network = SiameseNetwork()
+            network.load_state_dict(state_dict)
+            predictor = SiamesePredictor(
+                network, device, precision=precision, channels_last=channels_last
+            )
+
+            embeddings = predictor.embed(batch)
+            if reference is None:
+                reference = embeddings
+            min_cosine = F.cosine_similarity(embeddings, reference).min().item()
+
+            results[(precision, channels_last, batch_size)] = {
+                "throughput": measure_throughput(predictor, batch),
+                "min_cosine": min_cosine,
+            }
+    return results
+
+
+def main():
+    batch_sizes = [int(b) for b in sys.argv[1:]] or [1, 32, 256]
+    print(f"Threads PyTorch : {torch.get_num_threads()}\n")
+
+    results = run_benchmark(batch_sizes)
+
+    print(
+        f"| {'Précision':<9} | {'Format':<13} | {'Batch':>5} "
+        f"| {'Images/s':>9} | {'Cos. min vs fp32':>16} |"
+    )
+    print(f"|{'-' * 11}|{'-' * 15}|{'-' * 7}|{'-' * 11}|{'-' * 18}|")
+    for (precision, channels_last, batch_size), metrics in results.items():
+        memory_format = "channels_last" if channels_last else "NCHW"
+        print(
+            f"| {precision:<9} | {memory_format:<13} | {batch_size:>5} "
+            f"| {metrics['throughput']:>9.0f} | {metrics['min_cosine']:>16.5f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
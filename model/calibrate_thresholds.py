@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Calibration des seuils de décision par symbole.
+Ce script permet de :
+- Encoder une seule fois les images du split de validation (même prétraitement
+  qu'à l'inférence)
+- Calculer la similarité de chaque image avec chaque symbole, sur l'échelle de
+  l'inférence (1 - distance / 2)
+- Balayer les seuils de tous les symboles à la fois (courbes précision-rappel
+  vectorisées) et retenir, pour chacun, le seuil de meilleur F1
+- Enregistrer les seuils dans le cache des templates (index.json), relus par
+  SiamesePredictor au démarrage
+
+Usage :
+    python -m model.calibrate_thresholds --split val
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from model.packed_dataset import HEADER_FILE, PackedDataset
+from model.template_index import TemplateIndex
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+
+def pr_sweep(
+    scores: np.ndarray,
+    groups: np.ndarray,
+    correct: np.ndarray,
+    positives: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Seuil de meilleur F1 de chaque groupe, pour tous les groupes en une passe.
+
+    Les échantillons sont triés par groupe puis par score décroissant ; des
+    sommes cumulées donnent précision et rappel à chaque seuil candidat.
+
+    Args:
+        scores (np.ndarray): Score de chaque échantillon (N,)
+        groups (np.ndarray): Groupe (symbole prédit) de chaque échantillon (N,)
+        correct (np.ndarray): True si la prédiction de l'échantillon est correcte
+        positives (np.ndarray): Nombre d'échantillons à retrouver par groupe
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Groupes présents, seuil et F1
+            de chacun
+    """
+    if not len(scores):
+        return np.empty(0, dtype=int), np.empty(0), np.empty(0)
+    order = np.lexsort((-scores, groups))
+    group_sorted = groups[order]
+    score_sorted = scores[order]
+    correct_sorted = correct[order].astype(np.int64)
+
+    new_group = np.r_[True, group_sorted[1:] != group_sorted[:-1]]
+    starts = np.flatnonzero(new_group)
+    sizes = np.diff(np.r_[starts, len(scores)])
+
+    cumulative = np.cumsum(correct_sorted)
+    before = np.r_[0, cumulative[starts[1:] - 1]]
+    true_positives = cumulative - np.repeat(before, sizes)
+    accepted = np.arange(len(scores)) - np.repeat(starts, sizes) + 1
+
+    precision = true_positives / accepted
+    recall = true_positives / np.maximum(positives[group_sorted], 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f1 = np.where(
+            precision + recall > 0,
+            2 * precision * recall / (precision + recall),
+            0.0,
+        )
+
+    # Un seuil ne peut séparer deux scores égaux : seul le dernier d'une série
+    # de scores identiques est un point de coupure valide
+    last_of_ties = np.r_[(score_sorted[1:] != score_sorted[:-1]) | new_group[1:], True]
+    f1 = np.where(last_of_ties, f1, -1.0)
+
+    # Meilleur F1 de chaque groupe (le tri conserve les bornes des groupes)
+    best = np.lexsort((-f1, group_sorted))[starts]
+    return group_sorted[starts], score_sorted[best], f1[best]
+
+
+def calibrate(
+    symbol_names: List[str],
+    similarities: np.ndarray,
+    labels: List[str],
+    min_samples: int = 5,
+) -> Tuple[Dict[str, float], float, Dict[str, float]]:
+    """
+    Calcule les seuils de similarité par symbole et le seuil global.
+
+    Une image est acceptée pour un symbole s'il est son plus proche et que la
+    similarité atteint le seuil ; le F1 de chaque symbole est calculé sur ces
+    décisions.
+
+    Args:
+        symbol_names (List[str]): Nom de chaque colonne de similarities
+        similarities (np.ndarray): Meilleure similarité par symbole (N, S)
+        labels (List[str]): Vrai symbole de chaque image (éventuellement inconnu
+            des templates : l'image ne doit alors être acceptée par aucun symbole)
+        min_samples (int): Nombre minimal d'images d'un symbole pour le calibrer
+
+    Returns:
+        Tuple: Seuils par symbole, seuil global, F1 de chaque symbole calibré
+    """
+    index = {name: i for i, name in enumerate(symbol_names)}
+    label_ids = np.array([index.get(label, -1) for label in labels], dtype=np.int64)
+    predicted = similarities.argmax(axis=1)
+    scores = similarities[np.arange(len(similarities)), predicted]
+    correct = predicted == label_ids
+
+    positives = np.bincount(label_ids[label_ids >= 0], minlength=len(symbol_names))
+    groups, thresholds, f1 = pr_sweep(scores, predicted, correct, positives)
+
+    symbol_thresholds, symbol_f1 = {}, {}
+    for group, threshold, score in zip(groups.tolist(), thresholds, f1):
+        if positives[group] >= min_samples:
+            symbol_thresholds[symbol_names[group]] = float(threshold)
+            symbol_f1[symbol_names[group]] = float(score)
+
+    # Seuil global : un seul groupe, pour les symboles non calibrés
+    _, global_threshold, _ = pr_sweep(
+        scores,
+        np.zeros(len(scores), dtype=np.int64),
+        correct,
+        np.array([positives.sum()]),
+    )
+    default = float(global_threshold[0]) if len(global_threshold) else None
+    return symbol_thresholds, default, symbol_f1
+
+
+def load_split_images(
+    dataset_path: Path, split: str = "val"
+) -> Tuple[List[Image.Image], List[str]]:
+    """
+    Charge les images d'un split et leur symbole.
+
+    Args:
+        dataset_path (Path): Dossier {split}/{symbole}/*.png ou dataset packé
+        split (str): Nom du split
+
+    Returns:
+        Tuple[List[Image.Image], List[str]]: Images et symbole de chaque image
+    """
+    dataset_path = Path(dataset_path)
+    if (dataset_path / HEADER_FILE).exists():
+        packed = PackedDataset(dataset_path)
+        indices = packed.indices(split)
+        images = [Image.fromarray(np.array(packed.images[i])) for i in indices]
+        return images, [packed.classes[packed.labels[i]] for i in indices]
+
+    paths = sorted((dataset_path / split).glob("*/*.png"))
+    return [Image.open(p) for p in paths], [p.parent.name for p in paths]
+
+
+def calibrate_predictor(
+    predictor,
+    images: List[Image.Image],
+    labels: List[str],
+    templates_dir: Optional[Path] = None,
+    min_samples: int = 5,
+    batch_size: int = 256,
+) -> Tuple[Dict[str, float], float]:
+    """
+    Encode le jeu de validation, calibre les seuils et les applique au prédicteur.
+
+    Args:
+        predictor (SiamesePredictor): Prédicteur avec les templates chargés
+        images (List[Image.Image]): Images de validation
+        labels (List[str]): Symbole de chaque image
+        templates_dir (Path, optional): Dossier du cache où enregistrer les seuils
+        min_samples (int): Nombre minimal d'images d'un symbole pour le calibrer
+        batch_size (int): Nombre d'images par forward
+
+    Returns:
+        Tuple[Dict[str, float], float]: Seuils par symbole et seuil global
+    """
+    embeddings, kept = predictor.embed_images(images, batch_size)
+    if not kept:
+        raise ValueError("Aucune image de validation exploitable")
+    names, similarities = predictor.symbol_similarities(embeddings)
+    if similarities is None:
+        raise ValueError("Aucun template chargé")
+
+    thresholds, default, f1 = calibrate(
+        names,
+        similarities.cpu().numpy(),
+        [labels[i] for i in kept],
+        min_samples,
+    )
+    for name in sorted(thresholds):
+        logging.info(f"- {name}: seuil {thresholds[name]:.4f} (F1 {f1[name]:.3f})")
+    logging.info(
+        f"{len(thresholds)}/{len(names)} symboles calibrés sur {len(kept)} images, "
+        f"seuil global {default:.4f}"
+    )
+
+    predictor.symbol_thresholds = thresholds
+    predictor.similarity_threshold = default
+
+    if templates_dir is not None:
+        index = TemplateIndex.load(templates_dir)
+        if index is None:
+            raise FileNotFoundError(
+                f"Cache des templates absent dans {templates_dir} "
+                "(python -m model.create_templates)"
+            )
+        index.save_thresholds(templates_dir, thresholds, default)
+        logging.info(f"Seuils enregistrés dans {templates_dir}")
+    return thresholds, default
+
+
+def main():
+    from model.infer_siamese import load_templates
+
+    parser = argparse.ArgumentParser(description="Calibration des seuils par symbole")
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        default=Path("model/dataset"),
+        help="Dossier du dataset ou dataset packé",
+    )
+    parser.add_argument("--split", default="val")
+    parser.add_argument("--templates-dir", type=Path, default=Path("model/templates"))
+    parser.add_argument("--min-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    predictor = load_templates()
+    images, labels = load_split_images(args.dataset, args.split)
+    logging.info(f"{len(images)} images de validation ({args.split})")
+    calibrate_predictor(predictor, images, labels, args.templates_dir, args.min_samples)
+
+
+if __name__ == "__main__":
+    main()
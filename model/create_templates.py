@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 """
 Script utilitaire pour créer le dossier de templates.
-Copie une image de référence pour chaque symbole depuis le jeu d'entraînement.
+Pour chaque symbole du jeu d'entraînement, retient l'image la plus représentative
+(médoïde des embeddings) et met en cache les embeddings des templates.
 """
+
 import logging
 import os
 import shutil
@@ -11,6 +13,13 @@ from pathlib import Path
 import numpy as np
 from PIL import Image, ImageOps
 
+from model.template_index import (
+    EMBEDDINGS_FILE,
+    INDEX_FILE,
+    TemplateIndex,
+    checkpoint_fingerprint,
+)
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 
@@ -81,57 +90,155 @@ def normalize_image(image_path, target_size=64):
         return None
 
 
-def create_normalized_templates():
+def select_medoid(embeddings: np.ndarray) -> int:
+    """
+    Choisit l'image la plus représentative d'un symbole : celle dont l'embedding
+    est le plus proche du centroïde de la classe.
+
+    Args:
+        embeddings (np.ndarray): Embeddings (N, dimension) des candidats
+
+    Returns:
+        int: Indice du candidat retenu
+    """
+    centroid = embeddings.mean(axis=0, keepdims=True)
+    return int(np.argmin(np.linalg.norm(embeddings - centroid, axis=1)))
+
+
+def _load_predictor(model_path: Path):
+    """Charge le prédicteur utilisé pour encoder les candidats, ou None sans modèle."""
+    # Import local : le prédicteur charge torch et le modèle siamois
+    import torch
+
+    from model.infer_siamese import SiamesePredictor, load_model
+
+    if not model_path.exists():
+        return None
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return SiamesePredictor(load_model(model_path, device), device)
+
+
+def create_normalized_templates(
+    dataset_dir: Path = Path("model/dataset/train"),
+    templates_dir: Path = Path("model/templates"),
+    model_path: Path = Path("model/models/best_model.pth"),
+    batch_size: int = 256,
+    predictor=None,
+):
     """
     Crée des templates normalisés pour tous les symboles.
+
+    Toutes les images candidates d'un symbole sont normalisées puis encodées par
+    batch avec le checkpoint courant ; le template retenu est le médoïde de la
+    classe. Les embeddings des templates sont écrits en même temps dans le cache
+    (index.json, embeddings.f32) relu par l'API au démarrage.
+    Sans checkpoint, la première image valide est retenue et aucun cache n'est écrit.
+
+    Args:
+        dataset_dir (Path): Dossier des images d'entraînement ({symbole}/*.png)
+        templates_dir (Path): Dossier des templates à créer
+        model_path (Path): Checkpoint utilisé pour encoder les candidats
+        batch_size (int): Nombre d'images par forward
+        predictor (SiamesePredictor, optional): Prédicteur déjà chargé
     """
-    # Chemins des dossiers
-    dataset_dir = Path("model/dataset/train")
-    templates_dir = Path("model/templates")
+    dataset_dir, templates_dir = Path(dataset_dir), Path(templates_dir)
+    model_path = Path(model_path)
 
     # Créer le dossier des templates s'il n'existe pas
     templates_dir.mkdir(parents=True, exist_ok=True)
 
+    if predictor is None:
+        predictor = _load_predictor(model_path)
+    if predictor is None:
+        logging.warning(
+            f"Modèle non trouvé ({model_path}) : première image valide retenue, "
+            "embeddings non mis en cache"
+        )
+        for name in (INDEX_FILE, EMBEDDINGS_FILE):
+            (templates_dir / name).unlink(missing_ok=True)
+
+    embeddings, rows = [], []
+
     # Pour chaque symbole dans le dataset
-    for symbol_dir in dataset_dir.iterdir():
+    for symbol_dir in sorted(dataset_dir.iterdir()):
         if not symbol_dir.is_dir():
             continue
 
         symbol_name = symbol_dir.name
-        print(f"Traitement du symbole: {symbol_name}")
-
-        # Créer le dossier du template
-        template_dir = templates_dir / symbol_name
-        template_dir.mkdir(exist_ok=True)
+        logging.info(f"Traitement du symbole: {symbol_name}")
 
-        # Essayer toutes les images jusqu'à en trouver une qui fonctionne
-        success = False
-        for image_path in symbol_dir.glob("*.png"):
+        # Normaliser toutes les images candidates
+        candidates, images = [], []
+        for image_path in sorted(symbol_dir.glob("*.png")):
             template = normalize_image(image_path)
             if template is not None:
-                # Sauvegarder le template
-                template_path = template_dir / "template.png"
-                template.save(template_path)
-                print(f"Template créé: {template_path}")
-                success = True
-                break
-
-        if not success:
-            print(f"Impossible de créer un template pour {symbol_name}")
-
+                candidates.append(image_path)
+                images.append(template)
+                if predictor is None:
+                    break
+
+        chosen, embedding = None, None
+        if predictor is None:
+            chosen = 0 if images else None
+        else:
+            candidate_embeddings, kept = predictor.embed_images(images, batch_size)
+            if kept:
+                candidate_embeddings = candidate_embeddings.cpu().numpy()
+                best = select_medoid(candidate_embeddings)
+                chosen, embedding = kept[best], candidate_embeddings[best]
+
+        if chosen is None:
+            logging.warning(f"Impossible de créer un template pour {symbol_name}")
+            continue
 
-def verify_templates():
+        # Sauvegarder le template
+        template_dir = templates_dir / symbol_name
+        template_dir.mkdir(exist_ok=True)
+        template_path = template_dir / "template.png"
+        images[chosen].save(template_path)
+        logging.info(
+            f"Template créé: {template_path} (source: {candidates[chosen].name})"
+        )
+
+        if embedding is not None:
+            embeddings.append(embedding)
+            rows.append(
+                {
+                    "symbol": symbol_name,
+                    "source": candidates[chosen].as_posix(),
+                    "file": f"{symbol_name}/template.png",
+                }
+            )
+
+    if predictor is not None and rows:
+        checkpoint = checkpoint_fingerprint(model_path) if model_path.exists() else None
+        TemplateIndex(np.stack(embeddings), rows, checkpoint).save(templates_dir)
+        logging.info(f"{len(rows)} embeddings de templates mis en cache")
+
+
+def verify_templates(
+    templates_dir: Path = Path("model/templates"),
+    dataset_dir: Path = Path("model/dataset/train"),
+    model_path: Path = Path("model/models/best_model.pth"),
+):
     """
     Vérifie que tous les templates sont présents et conformes.
+
+    Si le checkpoint existe, vérifie aussi le cache des embeddings : un symbole
+    sans embedding valide pour ce checkpoint est signalé comme invalide (l'API
+    devrait alors recalculer les embeddings au démarrage).
+
+    Returns:
+        Tuple[List[str], List[str]]: Symboles sans template, symboles invalides
     """
-    templates_dir = Path("model/templates")
-    dataset_dir = Path("model/dataset/train")
+    templates_dir, dataset_dir = Path(templates_dir), Path(dataset_dir)
+    model_path = Path(model_path)
 
     # Vérifier que chaque symbole a un template
     missing_templates = []
     invalid_templates = []
 
-    for symbol_dir in dataset_dir.iterdir():
+    for symbol_dir in sorted(dataset_dir.iterdir()):
         if not symbol_dir.is_dir():
             continue
 
@@ -150,6 +257,27 @@ def verify_templates():
         except:
             invalid_templates.append(symbol_name)
 
+    if model_path.exists():
+        symbols = [
+            d.name
+            for d in sorted(dataset_dir.iterdir())
+            if d.is_dir() and d.name not in missing_templates + invalid_templates
+        ]
+        try:
+            index = TemplateIndex.load(templates_dir)
+        except ValueError as e:
+            logging.warning(f"Cache des embeddings illisible: {e}")
+            index = None
+        if index is None:
+            logging.warning("Cache des embeddings absent")
+            invalid_templates.extend(symbols)
+        else:
+            problems = index.validate(checkpoint=checkpoint_fingerprint(model_path))
+            for problem in problems:
+                logging.warning(f"Cache des embeddings: {problem}")
+            cached = set() if problems else set(index.symbols)
+            invalid_templates.extend(s for s in symbols if s not in cached)
+
     return missing_templates, invalid_templates
 
 
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Rapport de statistiques du dataset avant entraînement.
+Ce module calcule en un seul passage, par blocs d'images (sans charger tout le
+dataset en mémoire) :
+- Le nombre d'images par split et par classe, et des poids d'équilibrage des classes
+- Les statistiques d'intensité des pixels (moyenne, écart-type, histogramme), pour
+  vérifier le choix de Normalize(mean=0.5, std=0.5)
+- Le taux de quasi-doublons (pHash), dont les doublons partagés entre splits
+
+Le rapport est écrit en JSON (dataset_report.json) et en HTML (dataset_report.html).
+Les poids de classes peuvent être relus par generate_pairs.py (--report).
+
+Usage :
+    python -m model.dataset_report model/dataset
+    python -m model.dataset_report model/dataset.pack
+"""
+
+import argparse
+import html
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from model.dedup import compute_hashes, find_duplicate_clusters, load_images
+from model.packed_dataset import HEADER_FILE, PackedDataset
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+REPORT_JSON = "dataset_report.json"
+REPORT_HTML = "dataset_report.html"
+
+# Seuil (niveau de gris) en dessous duquel un pixel est considéré comme de l'encre
+INK_THRESHOLD = 128
+
+
+def iter_chunks(
+    dataset_path: Path, chunk_size: int = 1024, image_size: int = 64
+) -> Iterator[Tuple[np.ndarray, List[str], List[str]]]:
+    """
+    Parcourt le dataset par blocs d'images.
+
+    Args:
+        dataset_path (Path): Dossier {split}/{classe}/*.png ou dataset packé
+        chunk_size (int): Nombre d'images par bloc
+        image_size (int): Taille des images (dossier uniquement)
+
+    Yields:
+        Tuple[np.ndarray, List[str], List[str]]: Images uint8 (n, H, W), classe et
+            split de chaque image
+    """
+    dataset_path = Path(dataset_path)
+    if (dataset_path / HEADER_FILE).exists():
+        packed = PackedDataset(dataset_path)
+        for start in range(0, len(packed), chunk_size):
+            stop = min(start + chunk_size, len(packed))
+            yield (
+                packed.images[start:stop],
+                [packed.classes[i] for i in packed.labels[start:stop]],
+                [packed.split_names[i] for i in packed.splits[start:stop]],
+            )
+        return
+
+    entries = [
+        (path, split_dir.name, path.parent.name)
+        for split_dir in sorted(dataset_path.iterdir())
+        if split_dir.is_dir() and split_dir.name != "cache"
+        for path in sorted(split_dir.glob("*/*.png"))
+    ]
+    for start in range(0, len(entries), chunk_size):
+        chunk = entries[start : start + chunk_size]
+        yield (
+            load_images([path for path, _, _ in chunk], image_size),
+            [category for _, _, category in chunk],
+            [split for _, split, _ in chunk],
+        )
+
+
+class DatasetStats:
+    """
+    Accumulateur des statistiques du dataset, mis à jour bloc par bloc.
+
+    Seuls des compteurs, des sommes et une empreinte de 8 octets par image sont
+    conservés entre les blocs.
+    """
+
+    def __init__(self, hash_method: str = "phash"):
+        self.hash_method = hash_method
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.pixel_count = 0
+        self.pixel_sum = 0.0
+        self.pixel_sum_sq = 0.0
+        self.histogram = np.zeros(256, dtype=np.int64)
+        # Somme par classe de l'intensité moyenne et du taux d'encre des images
+        self.class_intensity: Dict[str, float] = {}
+        self.class_ink: Dict[str, float] = {}
+        self.hashes: List[np.ndarray] = []
+        self.labels: List[str] = []
+        self.splits: List[str] = []
+
+    def update(self, images: np.ndarray, labels: List[str], splits: List[str]):
+        """
+        Ajoute un bloc d'images.
+
+        Args:
+            images (np.ndarray): Images uint8 (n, H, W)
+            labels (List[str]): Classe de chaque image
+            splits (List[str]): Split de chaque image
+        """
+        images = np.asarray(images, dtype=np.uint8)
+        if not len(images):
+            return
+        flat = images.reshape(len(images), -1)
+
+        # Réductions vectorisées sur tout le bloc
+        self.histogram += np.bincount(flat.ravel(), minlength=256)
+        image_sums = flat.sum(axis=1, dtype=np.int64)
+        self.pixel_sum += float(image_sums.sum())
+        self.pixel_sum_sq += float(np.einsum("ij,ij->", flat, flat, dtype=np.float64))
+        self.pixel_count += flat.size
+        image_means = image_sums / (flat.shape[1] * 255.0)
+        ink_ratios = (flat < INK_THRESHOLD).mean(axis=1)
+
+        names, inverse = np.unique(np.asarray(labels), return_inverse=True)
+        intensity = np.bincount(inverse, weights=image_means, minlength=len(names))
+        ink = np.bincount(inverse, weights=ink_ratios, minlength=len(names))
+        for name, value, ratio in zip(names.tolist(), intensity, ink):
+            self.class_intensity[name] = self.class_intensity.get(name, 0.0) + value
+            self.class_ink[name] = self.class_ink.get(name, 0.0) + ratio
+
+        for (split, label), count in Counter(zip(splits, labels)).items():
+            split_counts = self.counts.setdefault(split, {})
+            split_counts[label] = split_counts.get(label, 0) + count
+
+        self.hashes.append(compute_hashes(images, self.hash_method))
+        self.labels.extend(labels)
+        self.splits.extend(splits)
+
+    def class_totals(self) -> Dict[str, int]:
+        """Nombre d'images par classe, tous splits confondus."""
+        totals: Dict[str, int] = {}
+        for split_counts in self.counts.values():
+            for label, count in split_counts.items():
+                totals[label] = totals.get(label, 0) + count
+        return dict(sorted(totals.items()))
+
+    def duplicates(self, max_distance: int = 4) -> Dict:
+        """Taux de quasi-doublons, global, par classe et entre splits."""
+        total = len(self.labels)
+        if not total:
+            return {"max_distance": max_distance, "rate": 0.0, "duplicates": 0}
+        clusters = find_duplicate_clusters(np.concatenate(self.hashes), max_distance)
+        cluster_sizes = np.bincount(clusters)
+        duplicated = cluster_sizes[clusters] > 1
+
+        labels = np.asarray(self.labels)
+        per_class = {}
+        for name in sorted(set(self.labels)):
+            in_class = labels == name
+            per_class[name] = float(duplicated[in_class].mean())
+
+        # Clusters présents dans plusieurs splits (fuite entre train et test)
+        split_ids = np.unique(np.asarray(self.splits), return_inverse=True)[1].ravel()
+        pairs = np.unique(np.stack([clusters, split_ids], axis=1), axis=0)
+        leaking = int((np.bincount(pairs[:, 0]) > 1).sum())
+
+        return {
+            "max_distance": max_distance,
+            "method": self.hash_method,
+            # Images en trop : toutes les images d'un cluster sauf une
+            "duplicates": int(total - len(cluster_sizes)),
+            "rate": float((total - len(cluster_sizes)) / total),
+            "per_class": per_class,
+            "cross_split_clusters": leaking,
+        }
+
+    def report(self, max_distance: int = 4, weight_split: str = "train") -> Dict:
+        """
+        Construit le rapport final.
+
+        Args:
+            max_distance (int): Distance de Hamming maximale des quasi-doublons
+            weight_split (str): Split utilisé pour les poids de classes (tous les
+                splits s'il est absent)
+
+        Returns:
+            Dict: Rapport sérialisable en JSON
+        """
+        totals = self.class_totals()
+        mean = self.pixel_sum / max(self.pixel_count, 1) / 255.0
+        variance = self.pixel_sum_sq / max(self.pixel_count, 1) / 255.0**2 - mean**2
+        std = float(np.sqrt(max(variance, 0.0)))
+
+        weight_counts = self.counts.get(weight_split, totals)
+        return {
+            "images": len(self.labels),
+            "splits": {
+                split: dict(sorted(counts.items()))
+                for split, counts in sorted(self.counts.items())
+            },
+            "classes": {
+                name: {
+                    "count": count,
+                    "mean_intensity": self.class_intensity[name] / count,
+                    "ink_ratio": self.class_ink[name] / count,
+                }
+                for name, count in totals.items()
+            },
+            "class_weights": class_weights(weight_counts),
+            "intensity": {
+                "mean": mean,
+                "std": std,
+                # Valeurs après Normalize(mean=0.5, std=0.5)
+                "normalized_mean": (mean - 0.5) / 0.5,
+                "normalized_std": std / 0.5,
+                "histogram": self.histogram.tolist(),
+            },
+            "duplicates": self.duplicates(max_distance),
+        }
+
+
+def class_weights(counts: Dict[str, int]) -> Dict[str, float]:
+    """
+    Poids d'équilibrage des classes, inversement proportionnels à leur effectif
+    et de moyenne 1 (une classe deux fois plus rare pèse deux fois plus).
+
+    Args:
+        counts (Dict[str, int]): Nombre d'images par classe
+
+    Returns:
+        Dict[str, float]: Poids de chaque classe
+    """
+    counts = {name: count for name, count in counts.items() if count > 0}
+    if not counts:
+        return {}
+    total = sum(counts.values())
+    return {
+        name: total / (len(counts) * count) for name, count in sorted(counts.items())
+    }
+
+
+def load_class_weights(report_path: Path) -> Dict[str, float]:
+    """Relit les poids de classes d'un rapport dataset_report.json."""
+    with open(report_path, encoding="utf-8") as f:
+        return json.load(f)["class_weights"]
+
+
+def write_html(report: Dict, path: Path):
+    """
+    Écrit un résumé HTML compact du rapport.
+
+    Args:
+        report (Dict): Rapport produit par DatasetStats.report
+        path (Path): Fichier HTML
+    """
+    split_names = list(report["splits"])
+    duplicates = report["duplicates"]
+    intensity = report["intensity"]
+
+    rows = []
+    for name, stats in report["classes"].items():
+        cells = [html.escape(name)]
+        cells += [str(report["splits"][s].get(name, 0)) for s in split_names]
+        cells += [
+            str(stats["count"]),
+            f"{report['class_weights'].get(name, 0.0):.2f}",
+            f"{stats['mean_intensity']:.3f}",
+            f"{stats['ink_ratio']:.1%}",
+            f"{duplicates.get('per_class', {}).get(name, 0.0):.1%}",
+        ]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    header = (
+        ["Classe"]
+        + [html.escape(s) for s in split_names]
+        + ["Total", "Poids", "Intensité", "Encre", "Doublons"]
+    )
+
+    content = f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Rapport du dataset</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 2px 8px; text-align: right; }}
+td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>Rapport du dataset</h1>
+<ul>
+<li>Images : {report["images"]}, classes : {len(report["classes"])}</li>
+<li>Intensité : moyenne {intensity["mean"]:.3f}, écart-type {intensity["std"]:.3f}
+ (après Normalize(0.5, 0.5) : {intensity["normalized_mean"]:.3f} ±
+ {intensity["normalized_std"]:.3f})</li>
+<li>Quasi-doublons : {duplicates["duplicates"]} ({duplicates["rate"]:.1%}),
+ clusters partagés entre splits : {duplicates.get("cross_split_clusters", 0)}</li>
+</ul>
+<table>
+<tr>{"".join(f"<th>{h}</th>" for h in header)}</tr>
+{chr(10).join(rows)}
+</table>
+</body>
+</html>
+"""
+    Path(path).write_text(content, encoding="utf-8")
+
+
+def generate_report(
+    dataset_path: Path,
+    output_dir: Optional[Path] = None,
+    chunk_size: int = 1024,
+    max_distance: int = 4,
+    hash_method: str = "phash",
+) -> Dict:
+    """
+    Calcule le rapport en un passage et l'écrit en JSON et en HTML.
+
+    Args:
+        dataset_path (Path): Dossier {split}/{classe}/*.png ou dataset packé
+        output_dir (Path, optional): Dossier de sortie (défaut : dataset_path)
+        chunk_size (int): Nombre d'images lues par bloc
+        max_distance (int): Distance de Hamming maximale des quasi-doublons
+        hash_method (str): "phash" ou "dhash"
+
+    Returns:
+        Dict: Le rapport
+    """
+    output_dir = Path(output_dir or dataset_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stats = DatasetStats(hash_method)
+    for images, labels, splits in iter_chunks(dataset_path, chunk_size):
+        stats.update(images, labels, splits)
+    report = stats.report(max_distance)
+
+    with open(output_dir / REPORT_JSON, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    write_html(report, output_dir / REPORT_HTML)
+
+    logging.info(
+        f"{report['images']} images, {len(report['classes'])} classes, "
+        f"intensité {report['intensity']['mean']:.3f} ± "
+        f"{report['intensity']['std']:.3f}, "
+        f"{report['duplicates']['rate']:.1%} de quasi-doublons -> {output_dir}"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapport de statistiques du dataset")
+    parser.add_argument(
+        "dataset",
+        type=Path,
+        nargs="?",
+        default=Path("model/dataset"),
+        help="Dossier du dataset ou dataset packé",
+    )
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--max-distance", type=int, default=4)
+    args = parser.parse_args()
+    generate_report(args.dataset, args.output_dir, args.chunk_size, args.max_distance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Détection des quasi-doublons d'images de gravures par hachage perceptuel.
+Ce module permet de :
+- Calculer des empreintes 64 bits (dHash, pHash) par batch, sur les tableaux 64x64
+- Retrouver les images proches (distance de Hamming) avec un BK-tree, sans comparer
+  toutes les paires
+- Regrouper les quasi-doublons en clusters (union-find), utilisés par split_dataset.py
+  pour garder chaque cluster du même côté de la séparation
+
+Usage :
+    python -m model.dedup model/gravures_normalisees --max-distance 6
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+
+# Nombre de bits à 1 de chaque octet (popcount vectorisé, compatible numpy < 2)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _pool(images: np.ndarray, size) -> torch.Tensor:
+    """Réduit un batch uint8 (N, H, W) par moyenne de blocs à la taille demandée."""
+    tensor = torch.from_numpy(np.array(images, dtype=np.float32)).unsqueeze(1)
+    return F.adaptive_avg_pool2d(tensor, size).squeeze(1)
+
+
+def _pack_bits(bits: torch.Tensor) -> np.ndarray:
+    """Convertit des bits (N, 64) en entiers uint64 (bit de poids fort en premier)."""
+    packed = np.packbits(bits.numpy().astype(np.uint8), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def dhash(images: np.ndarray) -> np.ndarray:
+    """
+    Empreinte par différence : signe du gradient horizontal sur une vignette 8x9.
+
+    Args:
+        images (np.ndarray): Images en niveaux de gris uint8 (N, H, W)
+
+    Returns:
+        np.ndarray: Empreintes uint64 (N,)
+    """
+    small = _pool(images, (HASH_SIZE, HASH_SIZE + 1))
+    bits = small[:, :, 1:] > small[:, :, :-1]
+    return _pack_bits(bits.reshape(len(images), -1))
+
+
+def _dct_matrix(n: int) -> torch.Tensor:
+    """Matrice de la DCT-II orthonormée de taille n."""
+    k = torch.arange(n, dtype=torch.float32).unsqueeze(1)
+    i = torch.arange(n, dtype=torch.float32).unsqueeze(0)
+    matrix = torch.cos(torch.pi * (2 * i + 1) * k / (2 * n)) * (2.0 / n) ** 0.5
+    matrix[0] /= 2**0.5
+    return matrix
+
+
+def phash(images: np.ndarray) -> np.ndarray:
+    """
+    Empreinte perceptuelle : basses fréquences de la DCT d'une vignette 32x32,
+    comparées à leur médiane (hors composante continue).
+
+    Args:
+        images (np.ndarray): Images en niveaux de gris uint8 (N, H, W)
+
+    Returns:
+        np.ndarray: Empreintes uint64 (N,)
+    """
+    small = _pool(images, (PHASH_SIZE, PHASH_SIZE))
+    dct = _dct_matrix(PHASH_SIZE)
+    # DCT 2D de tout le batch : D @ X @ D^T
+    coefficients = dct @ small @ dct.T
+    low = coefficients[:, :HASH_SIZE, :HASH_SIZE].reshape(len(images), -1)
+    median = low[:, 1:].median(dim=1, keepdim=True).values
+    return _pack_bits(low > median)
+
+
+HASH_FUNCTIONS = {"dhash": dhash, "phash": phash}
+
+
+def compute_hashes(
+    images: np.ndarray, method: str = "phash", batch_size: int = 4096
+) -> np.ndarray:
+    """
+    Calcule les empreintes d'un grand nombre d'images par batch.
+
+    Args:
+        images (np.ndarray): Images uint8 (N, H, W), éventuellement en memmap
+        method (str): "dhash" ou "phash"
+        batch_size (int): Nombre d'images par batch
+
+    Returns:
+        np.ndarray: Empreintes uint64 (N,)
+    """
+    if method not in HASH_FUNCTIONS:
+        raise ValueError(
+            f"Méthode inconnue : {method} (attendu : {list(HASH_FUNCTIONS)})"
+        )
+    hash_function = HASH_FUNCTIONS[method]
+    return np.concatenate(
+        [
+            hash_function(images[start : start + batch_size])
+            for start in range(0, len(images), batch_size)
+        ]
+        or [np.empty(0, dtype=np.uint64)]
+    )
+
+
+def hamming_distance(a, b) -> np.ndarray:
+    """
+    Distance de Hamming entre empreintes uint64 (avec diffusion numpy).
+
+    Args:
+        a: Empreinte(s) uint64
+        b: Empreinte(s) uint64
+
+    Returns:
+        np.ndarray: Nombre de bits différents
+    """
+    xor = np.bitwise_xor(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64))
+    bytes_view = np.ascontiguousarray(xor)[..., None].view(np.uint8)
+    return _POPCOUNT_TABLE[bytes_view].sum(axis=-1, dtype=np.int64)
+
+
+class BKTree:
+    """
+    Arbre de Burkhard-Keller sur la distance de Hamming.
+
+    Chaque nœud range ses enfants par distance ; l'inégalité triangulaire limite
+    l'exploration aux enfants dont la distance est dans [d - rayon, d + rayon].
+    """
+
+    def __init__(self):
+        # Nœud : [empreinte, liste des indices, {distance: nœud enfant}]
+        self.root = None
+        self.size = 0
+
+    def add(self, value: int, index: int):
+        """
+        Ajoute une empreinte.
+
+        Args:
+            value (int): Empreinte 64 bits
+            index (int): Indice de l'image associée
+        """
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [index], {}]
+            return
+        node = self.root
+        while True:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                node[1].append(index)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [index], {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> List[int]:
+        """
+        Retourne les indices des empreintes à distance <= radius.
+
+        Args:
+            value (int): Empreinte recherchée
+            radius (int): Distance de Hamming maximale
+
+        Returns:
+            List[int]: Indices trouvés
+        """
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node_value, indices, children = stack.pop()
+            distance = (node_value ^ value).bit_count()
+            if distance <= radius:
+                found.extend(indices)
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def _find(parents: np.ndarray, i: int) -> int:
+    """Racine d'un élément dans l'union-find (avec compression de chemin)."""
+    root = i
+    while parents[root] != root:
+        root = parents[root]
+    while parents[i] != root:
+        parents[i], i = root, parents[i]
+    return root
+
+
+def find_duplicate_clusters(hashes: np.ndarray, max_distance: int = 6) -> np.ndarray:
+    """
+    Regroupe les empreintes proches en clusters (fermeture transitive).
+
+    Les empreintes identiques ne sont insérées qu'une fois dans le BK-tree.
+
+    Args:
+        hashes (np.ndarray): Empreintes uint64 (N,)
+        max_distance (int): Distance de Hamming maximale entre deux quasi-doublons
+
+    Returns:
+        np.ndarray: Numéro de cluster de chaque image (N,), numérotés à partir de 0
+    """
+    unique, inverse = np.unique(hashes, return_inverse=True)
+    parents = np.arange(len(unique))
+
+    tree = BKTree()
+    for i, value in enumerate(unique.tolist()):
+        for j in tree.query(value, max_distance):
+            root_i, root_j = _find(parents, i), _find(parents, j)
+            if root_i != root_j:
+                parents[max(root_i, root_j)] = min(root_i, root_j)
+        tree.add(value, i)
+
+    roots = np.array([_find(parents, i) for i in range(len(unique))], dtype=np.int64)
+    _, labels = np.unique(roots[inverse.ravel()], return_inverse=True)
+    return labels.ravel()
+
+
+def load_images(paths: List[Path], image_size: int = 64) -> np.ndarray:
+    """
+    Charge des images en niveaux de gris au format (N, image_size, image_size).
+
+    Args:
+        paths (List[Path]): Fichiers image
+        image_size (int): Taille des vignettes (redimensionnées si nécessaire)
+
+    Returns:
+        np.ndarray: Images uint8 ; une image illisible est laissée blanche
+    """
+    images = np.full((len(paths), image_size, image_size), 255, dtype=np.uint8)
+    for i, path in enumerate(paths):
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            logging.warning(f"Impossible de lire : {path}")
+            continue
+        if image.shape != (image_size, image_size):
+            image = cv2.resize(
+                image, (image_size, image_size), interpolation=cv2.INTER_AREA
+            )
+        images[i] = image
+    return images
+
+
+def cluster_files(
+    paths: List[Path],
+    method: str = "phash",
+    max_distance: int = 6,
+    image_size: int = 64,
+) -> np.ndarray:
+    """
+    Calcule le cluster de quasi-doublons de chaque fichier.
+
+    Args:
+        paths (List[Path]): Fichiers à analyser
+        method (str): "dhash" ou "phash"
+        max_distance (int): Distance de Hamming maximale
+        image_size (int): Taille de chargement des images
+
+    Returns:
+        np.ndarray: Numéro de cluster de chaque fichier, dans l'ordre de paths
+    """
+    hashes = compute_hashes(load_images(paths, image_size), method)
+    return find_duplicate_clusters(hashes, max_distance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Détection des quasi-doublons")
+    parser.add_argument("input_dir", type=Path, help="Dossier d'images (récursif)")
+    parser.add_argument("--method", choices=list(HASH_FUNCTIONS), default="phash")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--report", type=Path, default=None, help="Rapport JSON")
+    args = parser.parse_args()
+
+    paths = sorted(
+        p
+        for pattern in ("*.png", "*.jpg", "*.jpeg")
+        for p in args.input_dir.rglob(pattern)
+    )
+    labels = cluster_files(paths, args.method, args.max_distance)
+
+    groups: Dict[int, List[str]] = {}
+    for path, label in zip(paths, labels.tolist()):
+        groups.setdefault(label, []).append(path.relative_to(args.input_dir).as_posix())
+    duplicates = [group for group in groups.values() if len(group) > 1]
+    logging.info(
+        f"{len(paths)} images, {len(groups)} clusters, "
+        f"{sum(len(g) - 1 for g in duplicates)} quasi-doublon(s)"
+    )
+
+    report_path = args.report or args.input_dir / "duplicates.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "method": args.method,
+                "max_distance": args.max_distance,
+                "clusters": duplicates,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    logging.info(f"Rapport écrit dans {report_path}")
+
+
+if __name__ == "__main__":
+    main()
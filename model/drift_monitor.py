@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Surveillance de la dérive des embeddings en production.
+Ce module permet de :
+- Journaliser l'embedding et les meilleurs scores de chaque détection dans un
+  tampon circulaire de taille fixe (tableaux numpy préalloués, aucune allocation
+  sur le chemin de la requête)
+- Recopier périodiquement le tampon dans des fichiers memmap (model/monitoring)
+- Comparer les détections récentes aux statistiques des embeddings du dataset
+  d'entraînement (centroïde, variance, distribution des scores) dans une tâche
+  de fond, et exposer le résultat (route /api/metrics)
+
+Une dérive des embeddings signale des photos dégradées (caméra, éclairage) ; une
+baisse du meilleur score ou de l'écart entre les deux meilleurs symboles signale
+plutôt des symboles absents des templates (nouvelle famille de gravures).
+
+Usage (statistiques de référence, à relancer après chaque réentraînement) :
+    python -m model.drift_monitor --split train
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+REFERENCE_FILE = "drift_reference.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+SCORES_FILE = "scores.f32"
+TIMESTAMPS_FILE = "timestamps.f64"
+STATE_FILE = "state.json"
+
+# Seuils d'alerte
+PSI_ALERT = 0.2  # Indice de stabilité de la distribution des scores
+SHIFT_ALERT = 0.5  # Déplacement du centroïde, relatif à la dispersion de référence
+MIN_SAMPLES = 50  # Nombre minimal de détections pour calculer la dérive
+
+SCORE_BINS = np.linspace(0.0, 1.0, 21)
+
+
+class EmbeddingLog:
+    """
+    Tampon circulaire des embeddings et scores des détections.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        embedding_dim: int,
+        top_k: int = 5,
+        checkpoint: Optional[str] = None,
+    ):
+        """
+        Args:
+            capacity (int): Nombre de détections conservées (les plus récentes)
+            embedding_dim (int): Dimension des embeddings
+            top_k (int): Nombre de scores conservés par détection
+            checkpoint (str, optional): Empreinte du checkpoint qui a produit les
+                embeddings (un tampon d'un autre checkpoint n'est pas relu)
+        """
+        self.capacity = capacity
+        self.embedding_dim = embedding_dim
+        self.top_k = top_k
+        self.checkpoint = checkpoint
+        self.embeddings = np.zeros((capacity, embedding_dim), dtype=np.float32)
+        self.scores = np.full((capacity, top_k), np.nan, dtype=np.float32)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        # Nombre total de détections enregistrées / recopiées sur disque
+        self.total = 0
+        self.flushed = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def record(self, embedding, scores):
+        """
+        Enregistre une détection (copie dans la case suivante du tampon).
+
+        Args:
+            embedding: Embedding de l'image (embedding_dim,)
+            scores: Meilleures similarités, par ordre décroissant
+        """
+        k = min(len(scores), self.top_k)
+        with self._lock:
+            slot = self.total % self.capacity
+            self.embeddings[slot] = embedding
+            self.scores[slot, :k] = scores[:k]
+            self.scores[slot, k:] = np.nan
+            self.timestamps[slot] = time.time()
+            self.total += 1
+
+    def _slots(self, start: int, stop: int) -> np.ndarray:
+        """Cases du tampon des enregistrements start à stop (exclu)."""
+        start = max(start, stop - self.capacity)
+        return np.arange(start, stop) % self.capacity
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Copie du contenu du tampon, du plus ancien au plus récent.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Embeddings, scores, horodatages
+        """
+        with self._lock:
+            slots = self._slots(0, self.total)
+            return (
+                self.embeddings[slots],
+                self.scores[slots],
+                self.timestamps[slots],
+            )
+
+    def flush(self, log_dir: Path):
+        """
+        Recopie les nouvelles détections dans les fichiers memmap de log_dir.
+
+        Args:
+            log_dir (Path): Dossier des fichiers du tampon
+        """
+        log_dir = Path(log_dir)
+        with self._lock:
+            total = self.total
+            slots = self._slots(self.flushed, total)
+            embeddings = self.embeddings[slots]
+            scores = self.scores[slots]
+            timestamps = self.timestamps[slots]
+        if not len(slots) and (log_dir / STATE_FILE).exists():
+            return
+
+        log_dir.mkdir(parents=True, exist_ok=True)
+        mode = "r+" if self._matches(log_dir) else "w+"
+        for name, values, shape in [
+            (EMBEDDINGS_FILE, embeddings, (self.capacity, self.embedding_dim)),
+            (SCORES_FILE, scores, (self.capacity, self.top_k)),
+            (TIMESTAMPS_FILE, timestamps, (self.capacity,)),
+        ]:
+            mapped = np.memmap(
+                log_dir / name, dtype=values.dtype, mode=mode, shape=shape
+            )
+            mapped[slots] = values
+            mapped.flush()
+            del mapped
+
+        _write_json(log_dir / STATE_FILE, self._state(total))
+        self.flushed = total
+
+    def _state(self, total: int) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "embedding_dim": self.embedding_dim,
+            "top_k": self.top_k,
+            "checkpoint": self.checkpoint,
+            "total": total,
+        }
+
+    def _matches(self, log_dir: Path) -> bool:
+        """True si les fichiers de log_dir ont été écrits avec ce format."""
+        state = _read_json(log_dir / STATE_FILE)
+        if state is None:
+            return False
+        expected = self._state(0)
+        del expected["total"]
+        return all(state.get(k) == v for k, v in expected.items())
+
+    @classmethod
+    def open(
+        cls,
+        log_dir: Path,
+        capacity: int,
+        embedding_dim: int,
+        top_k: int = 5,
+        checkpoint: Optional[str] = None,
+    ) -> "EmbeddingLog":
+        """
+        Crée le tampon et relit les détections déjà écrites dans log_dir si elles
+        ont le même format et le même checkpoint.
+
+        Returns:
+            EmbeddingLog: Le tampon
+        """
+        log = cls(capacity, embedding_dim, top_k, checkpoint)
+        log_dir = Path(log_dir)
+        if not log._matches(log_dir):
+            return log
+        try:
+            for name, array in [
+                (EMBEDDINGS_FILE, log.embeddings),
+                (SCORES_FILE, log.scores),
+                (TIMESTAMPS_FILE, log.timestamps),
+            ]:
+                array[:] = np.fromfile(log_dir / name, dtype=array.dtype).reshape(
+                    array.shape
+                )
+        except (OSError, ValueError) as e:
+            logging.warning(f"Tampon de surveillance illisible, ignoré: {e}")
+            return cls(capacity, embedding_dim, top_k, checkpoint)
+        log.total = log.flushed = _read_json(log_dir / STATE_FILE)["total"]
+        return log
+
+
+def top_scores(predictor, embeddings: torch.Tensor, top_k: int = 5) -> np.ndarray:
+    """
+    Meilleures similarités par symbole de chaque embedding (ordre décroissant).
+
+    Args:
+        predictor (SiamesePredictor): Prédicteur avec les templates chargés
+        embeddings (torch.Tensor): Embeddings (N, embedding_dim)
+        top_k (int): Nombre de scores par embedding
+
+    Returns:
+        np.ndarray: Scores (N, top_k), NaN s'il y a moins de top_k symboles
+    """
+    _, similarities = predictor.symbol_similarities(embeddings)
+    scores = np.full((len(embeddings), top_k), np.nan, dtype=np.float32)
+    if similarities is not None:
+        k = min(top_k, similarities.shape[1])
+        scores[:, :k] = similarities.topk(k, dim=1).values.cpu().numpy()
+    return scores
+
+
+def embedding_statistics(embeddings: np.ndarray, scores: np.ndarray) -> Dict:
+    """
+    Statistiques d'un ensemble de détections, comparables entre elles.
+
+    Args:
+        embeddings (np.ndarray): Embeddings (N, embedding_dim)
+        scores (np.ndarray): Meilleures similarités (N, top_k)
+
+    Returns:
+        Dict: Centroïde, écart-type par dimension, histogramme du meilleur score,
+            moyennes du meilleur score et de l'écart avec le deuxième
+    """
+    top1 = scores[:, 0]
+    margin = scores[:, 0] - scores[:, 1] if scores.shape[1] > 1 else top1
+    histogram, _ = np.histogram(np.clip(top1, 0.0, 1.0), bins=SCORE_BINS)
+    return {
+        "count": int(len(embeddings)),
+        "mean": embeddings.mean(axis=0).tolist(),
+        "std": embeddings.std(axis=0).tolist(),
+        "score_histogram": (histogram / max(len(top1), 1)).tolist(),
+        "top1_mean": float(np.nanmean(top1)),
+        "margin_mean": float(np.nanmean(margin)),
+    }
+
+
+def population_stability_index(reference: np.ndarray, current: np.ndarray) -> float:
+    """
+    Indice de stabilité (PSI) entre deux histogrammes normalisés.
+    Usuellement : < 0.1 stable, 0.1 à 0.2 modéré, > 0.2 dérive significative.
+    """
+    eps = 1e-4
+    reference = np.maximum(np.asarray(reference), eps)
+    current = np.maximum(np.asarray(current), eps)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+def compute_drift(reference: Dict, embeddings: np.ndarray, scores: np.ndarray) -> Dict:
+    """
+    Compare les détections récentes aux statistiques de référence.
+
+    Args:
+        reference (Dict): Statistiques du dataset d'entraînement (embedding_statistics)
+        embeddings (np.ndarray): Embeddings récents (N, embedding_dim)
+        scores (np.ndarray): Meilleurs scores récents (N, top_k)
+
+    Returns:
+        Dict: Indicateurs de dérive et alerte
+    """
+    current = embedding_statistics(embeddings, scores)
+    ref_mean = np.asarray(reference["mean"])
+    ref_std = np.asarray(reference["std"])
+    spread = max(float(np.sqrt(np.sum(ref_std**2))), 1e-6)
+
+    # Déplacement du centroïde relatif à la dispersion globale de référence
+    shift = np.linalg.norm(np.asarray(current["mean"]) - ref_mean)
+    centroid_shift = float(shift / spread)
+    variance_ratio = float(np.sum(np.asarray(current["std"]) ** 2) / spread**2)
+    score_psi = population_stability_index(
+        reference["score_histogram"], current["score_histogram"]
+    )
+    return {
+        "samples": current["count"],
+        "centroid_shift": centroid_shift,
+        "variance_ratio": variance_ratio,
+        "score_psi": score_psi,
+        "top1_mean": current["top1_mean"],
+        "reference_top1_mean": reference["top1_mean"],
+        "margin_mean": current["margin_mean"],
+        "reference_margin_mean": reference["margin_mean"],
+        "drift_detected": bool(score_psi > PSI_ALERT or centroid_shift > SHIFT_ALERT),
+    }
+
+
+def load_reference(
+    templates_dir: Path, checkpoint: Optional[str] = None
+) -> Optional[Dict]:
+    """
+    Relit les statistiques de référence si elles correspondent au checkpoint.
+
+    Args:
+        templates_dir (Path): Dossier des templates
+        checkpoint (str, optional): Empreinte du checkpoint chargé
+
+    Returns:
+        Dict: Statistiques de référence, ou None si absentes ou périmées
+    """
+    reference = _read_json(Path(templates_dir) / REFERENCE_FILE)
+    if reference is None:
+        return None
+    if checkpoint is not None and reference.get("checkpoint") != checkpoint:
+        logging.warning("Statistiques de dérive calculées avec un autre checkpoint")
+        return None
+    return reference
+
+
+class DriftMonitor:
+    """
+    Tâche de fond : recopie le tampon sur disque et recalcule la dérive.
+    """
+
+    def __init__(
+        self,
+        log: EmbeddingLog,
+        reference: Optional[Dict],
+        log_dir: Path,
+        interval: float = 60.0,
+    ):
+        """
+        Args:
+            log (EmbeddingLog): Tampon alimenté par les détections
+            reference (Dict, optional): Statistiques du dataset d'entraînement
+            log_dir (Path): Dossier des fichiers memmap du tampon
+            interval (float): Période de la tâche, en secondes
+        """
+        self.log = log
+        self.reference = reference
+        self.log_dir = Path(log_dir)
+        self.interval = interval
+        self.report: Dict = {"detections_logged": log.total, "drift": None}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict:
+        """Recopie le tampon, recalcule la dérive et met à jour le rapport."""
+        self.log.flush(self.log_dir)
+        embeddings, scores, timestamps = self.log.snapshot()
+
+        drift = None
+        if self.reference is None:
+            status = "statistiques de référence absentes"
+        elif len(embeddings) < MIN_SAMPLES:
+            status = f"moins de {MIN_SAMPLES} détections"
+        else:
+            drift = compute_drift(self.reference, embeddings, scores)
+            status = "dérive détectée" if drift["drift_detected"] else "stable"
+            if drift["drift_detected"]:
+                logging.warning(
+                    "Dérive des détections : "
+                    f"PSI des scores {drift['score_psi']:.3f}, "
+                    f"déplacement du centroïde {drift['centroid_shift']:.3f}"
+                )
+
+        # Remplacement en un seul attribut : la route lit un rapport complet
+        self.report = {
+            "detections_logged": self.log.total,
+            "window": len(embeddings),
+            "window_start": float(timestamps[0]) if len(timestamps) else None,
+            "updated_at": time.time(),
+            "status": status,
+            "drift": drift,
+        }
+        return self.report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Erreur de la surveillance de dérive: {e}")
+
+    def start(self):
+        """Démarre la tâche de fond (thread démon)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="drift-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Arrête la tâche et recopie les dernières détections."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.log.flush(self.log_dir)
+
+
+def start_monitor(
+    predictor,
+    log_dir: Path = Path("model/monitoring"),
+    capacity: int = 10000,
+    interval: float = 60.0,
+) -> DriftMonitor:
+    """
+    Branche un tampon sur le prédicteur et démarre la surveillance.
+
+    Args:
+        predictor (SiamesePredictor): Prédicteur avec les templates chargés
+        log_dir (Path): Dossier des fichiers memmap du tampon
+        capacity (int): Nombre de détections conservées
+        interval (float): Période de recopie et de calcul, en secondes
+
+    Returns:
+        DriftMonitor: La surveillance démarrée
+    """
+    matrix = predictor.template_matrix
+    embedding_dim = matrix.shape[1] if matrix is not None else 128
+    log = EmbeddingLog.open(
+        log_dir, capacity, embedding_dim, checkpoint=predictor.checkpoint
+    )
+    reference = None
+    if predictor.templates_dir is not None:
+        reference = load_reference(predictor.templates_dir, predictor.checkpoint)
+    if reference is None:
+        logging.warning(
+            "Pas de statistiques de référence : python -m model.drift_monitor"
+        )
+
+    monitor = DriftMonitor(log, reference, log_dir, interval)
+    predictor.monitor = log
+    monitor.start()
+    return monitor
+
+
+def build_reference(predictor, images, batch_size: int = 256) -> Dict:
+    """
+    Statistiques de référence des embeddings d'un ensemble d'images.
+
+    Args:
+        predictor (SiamesePredictor): Prédicteur avec les templates chargés
+        images (List[Image.Image]): Images du dataset d'entraînement
+        batch_size (int): Nombre d'images par forward
+
+    Returns:
+        Dict: Statistiques (embedding_statistics) et empreinte du checkpoint
+    """
+    embeddings, kept = predictor.embed_images(images, batch_size)
+    if not kept:
+        raise ValueError("Aucune image exploitable")
+    scores = top_scores(predictor, embeddings)
+    reference = embedding_statistics(embeddings.cpu().numpy(), scores)
+    reference["checkpoint"] = predictor.checkpoint
+    return reference
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, content: Dict):
+    """Écrit un fichier JSON de manière atomique."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def main():
+    from model.calibrate_thresholds import load_split_images
+    from model.infer_siamese import load_templates
+
+    parser = argparse.ArgumentParser(
+        description="Statistiques de référence pour la surveillance de dérive"
+    )
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        default=Path("model/dataset"),
+        help="Dossier du dataset ou dataset packé",
+    )
+    parser.add_argument("--split", default="train")
+    parser.add_argument(
+        "--max-images",
+        type=int,
+        default=5000,
+        help="Nombre maximal d'images tirées au hasard",
+    )
+    args = parser.parse_args()
+
+    predictor = load_templates()
+    images, _ = load_split_images(args.dataset, args.split)
+    if len(images) > args.max_images:
+        rng = np.random.default_rng(0)
+        images = [images[i] for i in rng.choice(len(images), args.max_images, False)]
+    logging.info(f"{len(images)} images ({args.split})")
+
+    reference = build_reference(predictor, images)
+    _write_json(predictor.templates_dir / REFERENCE_FILE, reference)
+    logging.info(
+        f"Statistiques enregistrées dans {predictor.templates_dir / REFERENCE_FILE} "
+        f"(meilleur score moyen {reference['top1_mean']:.3f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
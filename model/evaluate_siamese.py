@@ -7,6 +7,7 @@ Permet de :
 - Déterminer le seuil optimal de décision
 - Calculer les métriques (précision, rappel, F1-score)
 """
+
 import logging
 from pathlib import Path
 from typing import List, Tuple
@@ -15,10 +16,12 @@ import matplotlib.pyplot as plt
 import numpy as np
 import torch
 import torch.nn.functional as F
-from siamese_model import SiameseNetwork
 from sklearn.metrics import f1_score, precision_recall_curve
 from torch.utils.data import DataLoader
-from train_siamese import PairDataset
+
+from model.image_store import ImageStore, IndexedPairDataset
+from model.packed_dataset import PackedDataset
+from model.siamese_model import SiameseNetwork, distance_to_similarity
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -69,6 +72,47 @@ class SiameseEvaluator:
 
         return np.array(distances), np.array(labels)
 
+    def embed_store(self, store: ImageStore, batch_size: int = 256) -> np.ndarray:
+        """
+        Calcule une seule fois l'embedding de chaque image du store.
+
+        Args:
+            store: Store des images du jeu évalué
+            batch_size: Nombre d'images par forward
+
+        Returns:
+            np.ndarray: Embeddings de forme (len(store), embedding_size)
+        """
+        embeddings = []
+        with torch.no_grad():
+            for start in range(0, len(store), batch_size):
+                batch = store.tensors(slice(start, start + batch_size))
+                embeddings.append(
+                    self.model.forward_once(batch.to(self.device)).float().cpu()
+                )
+        return torch.cat(embeddings).numpy()
+
+    def compute_pair_distances(
+        self, dataset: IndexedPairDataset, embeddings: np.ndarray = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Version vectorisée de compute_distances_and_labels : chaque image n'est
+        encodée qu'une fois, les distances des paires sont obtenues par indexation.
+
+        Args:
+            dataset: Paires indexées dans un ImageStore
+            embeddings: Embeddings du store (calculés si absents)
+
+        Returns:
+            Tuple contenant les distances et les labels
+        """
+        if embeddings is None:
+            embeddings = self.embed_store(dataset.store)
+        diff = embeddings[dataset.idx1] - embeddings[dataset.idx2]
+        # Même epsilon que F.pairwise_distance
+        distances = np.linalg.norm(diff + 1e-6, axis=1)
+        return distances, dataset.labels
+
     def find_optimal_threshold(
         self, distances: np.ndarray, labels: np.ndarray
     ) -> Tuple[float, float]:
@@ -82,9 +126,8 @@ class SiameseEvaluator:
         Returns:
             Tuple contenant le seuil optimal et le F1-score correspondant
         """
-        # Conversion des distances en scores de similarité (1 - distance normalisée)
-        max_dist = np.max(distances)
-        scores = 1 - distances / max_dist
+        # Conversion des distances en scores de similarité, à l'échelle de l'inférence
+        scores = distance_to_similarity(distances)
 
         # Calcul de la courbe précision-rappel
         precisions, recalls, thresholds = precision_recall_curve(labels, scores)
@@ -117,8 +160,7 @@ class SiameseEvaluator:
             best_threshold: Seuil optimal trouvé
             output_path: Chemin où sauvegarder le graphique
         """
-        max_dist = np.max(distances)
-        scores = 1 - distances / max_dist
+        scores = distance_to_similarity(distances)
 
         precisions, recalls, thresholds = precision_recall_curve(labels, scores)
 
@@ -152,8 +194,7 @@ class SiameseEvaluator:
         Returns:
             Dict contenant les différentes métriques
         """
-        max_dist = np.max(distances)
-        scores = 1 - distances / max_dist
+        scores = distance_to_similarity(distances)
         predictions = (scores >= threshold).astype(int)
 
         accuracy = np.mean(predictions == labels)
@@ -180,11 +221,11 @@ def main():
     Point d'entrée principal du script.
     """
     # Paramètres
-    BATCH_SIZE = 32
     IMAGE_SIZE = 64
 
     # Chemins
     dataset_dir = Path("model/dataset")
+    packed_path = Path("model/dataset.pack")  # utilisé s'il existe
     pairs_dir = Path("model/pairs")
     model_dir = Path("model/models")
     output_dir = Path("model/evaluation")
@@ -195,29 +236,27 @@ def main():
     logging.info(f"Utilisation du device: {device}")
 
     # Chargement du modèle
-    model = SiameseNetwork()
     checkpoint = torch.load(model_dir / "best_model.pth")
+    model = SiameseNetwork(embedding_dim=checkpoint.get("embedding_dim", 128))
     model.load_state_dict(checkpoint["model_state_dict"])
     logging.info(f"Modèle chargé depuis l'époque {checkpoint['epoch']}")
 
-    # Chargement des données de test
-    test_dataset = PairDataset(
-        pairs_dir / "test_pairs.csv", dataset_dir, image_size=IMAGE_SIZE
-    )
-    test_loader = DataLoader(
-        test_dataset,
-        batch_size=BATCH_SIZE,
-        shuffle=False,
-        num_workers=4,
-        pin_memory=True,
-    )
+    # Chargement des données de test (images décodées une fois, en cache uint8)
+    test_csv = pairs_dir / "test_pairs.csv"
+    if packed_path.exists():
+        store = PackedDataset(packed_path).image_store()
+    else:
+        store = ImageStore.from_pair_csvs(
+            [test_csv], dataset_dir, dataset_dir / "cache" / "test_images", IMAGE_SIZE
+        )
+    test_dataset = IndexedPairDataset(store, test_csv)
 
     # Évaluation
     evaluator = SiameseEvaluator(model, device)
 
     # Calcul des distances et récupération des labels
     logging.info("Calcul des distances entre paires...")
-    distances, labels = evaluator.compute_distances_and_labels(test_loader)
+    distances, labels = evaluator.compute_pair_distances(test_dataset)
 
     # Recherche du seuil optimal
     logging.info("Recherche du seuil optimal...")
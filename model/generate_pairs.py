@@ -7,13 +7,19 @@ Ce script parcourt les dossiers train/val/test et génère des paires d'images :
 Les paires sont équilibrées (autant de positives que de négatives) et
 sauvegardées dans des fichiers CSV pour chaque ensemble de données.
 """
+
+import argparse
 import csv
 import logging
 import os
 import random
 from itertools import combinations
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from model.dataset_report import load_class_weights
+from model.packed_dataset import PackedDataset
+from model.split_dataset import load_split_manifest
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +30,15 @@ class PairGenerator:
     Classe gérant la génération de paires d'images pour l'entraînement du réseau siamois.
     """
 
-    def __init__(self, dataset_dir: Path, output_dir: Path, splits: List[str]):
+    def __init__(
+        self,
+        dataset_dir: Path,
+        output_dir: Path,
+        splits: List[str],
+        manifest: Optional[Path] = None,
+        packed: Optional[Path] = None,
+        class_weights: Optional[Dict[str, float]] = None,
+    ):
         """
         Initialise le générateur de paires.
 
@@ -32,7 +46,26 @@ class PairGenerator:
             dataset_dir (Path): Chemin vers le dossier contenant les sous-dossiers train/val/test
             output_dir (Path): Chemin vers le dossier où sauvegarder les fichiers CSV
             splits (List[str]): Liste des splits à générer ('train', 'val', 'test')
+            manifest (Path, optional): Manifeste dataset_split.json ; les images sont
+                alors lues dans le dossier source du manifeste et les chemins des CSV
+                sont relatifs à ce dossier (dataset_dir est ignoré)
+            packed (Path, optional): Dataset packé ; les chemins des CSV sont ceux
+                enregistrés dans le dataset packé (dataset_dir est ignoré)
+            class_weights (Dict[str, float], optional): Poids d'échantillonnage des
+                classes (dataset_report.py) ; le nombre de paires positives d'une
+                classe et sa probabilité d'apparaître dans une paire négative sont
+                proportionnels à son poids. Par défaut, toutes les classes ont le
+                même poids.
         """
+        self.manifest_splits = None
+        if manifest is not None:
+            dataset_dir, self.manifest_splits = load_split_manifest(manifest)
+        elif packed is not None:
+            pack = PackedDataset(packed)
+            dataset_dir = pack.path
+            self.manifest_splits = {
+                split: pack.category_paths(split) for split in pack.split_names
+            }
         self.dataset_dir = dataset_dir
         self.output_dir = output_dir
 
@@ -40,6 +73,25 @@ class PairGenerator:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         self.splits = splits
+        self.class_weights = class_weights
+
+    def category_weights(self, categories: List[str]) -> List[float]:
+        """
+        Poids des catégories d'un split, normalisés à une moyenne de 1.
+
+        Args:
+            categories (List[str]): Catégories présentes dans le split
+
+        Returns:
+            List[float]: Poids de chaque catégorie (1 sans class_weights)
+        """
+        if not self.class_weights:
+            return [1.0] * len(categories)
+        # Une catégorie absente des poids garde le poids moyen
+        default = sum(self.class_weights.values()) / len(self.class_weights)
+        weights = [self.class_weights.get(c, default) for c in categories]
+        mean = sum(weights) / len(weights)
+        return [w / mean for w in weights]
 
     def get_category_images(self, split_dir: Path) -> Dict[str, List[Path]]:
         """
@@ -59,6 +111,25 @@ class PairGenerator:
                     categories[category_dir.name] = images
         return categories
 
+    def get_split_images(self, split: str) -> Dict[str, List[Path]]:
+        """
+        Récupère les images par catégorie d'un split, depuis le manifeste ou le
+        dataset packé s'il est fourni, sinon depuis le dossier du split.
+
+        Args:
+            split (str): Nom du split ('train', 'val' ou 'test')
+
+        Returns:
+            Dict[str, List[Path]]: Dictionnaire {catégorie: liste des chemins d'images}
+        """
+        if self.manifest_splits is None:
+            return self.get_category_images(self.dataset_dir / split)
+        return {
+            category: [self.dataset_dir / path for path in paths]
+            for category, paths in self.manifest_splits[split].items()
+            if paths
+        }
+
     def generate_positive_pairs(
         self, images: List[Path], num_pairs: int
     ) -> List[Tuple[Path, Path]]:
@@ -97,10 +168,16 @@ class PairGenerator:
         """
         negative_pairs = []
         category_names = list(categories.keys())
+        weights = self.category_weights(category_names)
 
         while len(negative_pairs) < num_pairs:
             # Sélectionne deux catégories différentes au hasard
-            cat1, cat2 = random.sample(category_names, 2)
+            if self.class_weights:
+                cat1, cat2 = random.choices(category_names, weights=weights, k=2)
+                if cat1 == cat2:
+                    continue
+            else:
+                cat1, cat2 = random.sample(category_names, 2)
 
             # Sélectionne une image aléatoire de chaque catégorie
             img1 = random.choice(categories[cat1])
@@ -118,15 +195,16 @@ class PairGenerator:
             split (str): Nom du split ('train', 'val' ou 'test')
             pairs_per_category (int): Nombre de paires positives à générer par catégorie
         """
-        split_dir = self.dataset_dir / split
-        categories = self.get_category_images(split_dir)
+        categories = self.get_split_images(split)
 
         all_pairs = []  # Liste pour stocker toutes les paires avec leurs labels
         total_positive_pairs = 0
 
         # Génère les paires positives pour chaque catégorie
-        for category, images in categories.items():
-            positive_pairs = self.generate_positive_pairs(images, pairs_per_category)
+        weights = self.category_weights(list(categories))
+        for (category, images), weight in zip(categories.items(), weights):
+            num_pairs = max(1, round(pairs_per_category * weight))
+            positive_pairs = self.generate_positive_pairs(images, num_pairs)
             all_pairs.extend((img1, img2, 1) for img1, img2 in positive_pairs)
             total_positive_pairs += len(positive_pairs)
 
@@ -172,10 +250,40 @@ def main():
     """
     Point d'entrée principal
     """
+    parser = argparse.ArgumentParser(description="Génération des paires")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Manifeste dataset_split.json (split_dataset.py --mode manifest)",
+    )
+    parser.add_argument(
+        "--packed",
+        type=Path,
+        default=None,
+        help="Dataset packé (python -m model.packed_dataset)",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Rapport dataset_report.json : paires pondérées par classe",
+    )
+    parser.add_argument(
+        "--splits",
+        nargs="+",
+        default=["train", "val", "test"],
+        help="Splits à traiter (val : recherche d'hyperparamètres)",
+    )
+    args = parser.parse_args()
+
     generator = PairGenerator(
         dataset_dir=Path("model/dataset"),
         output_dir=Path("model/pairs"),
-        splits=["train", "test"],  # Changé 'val' en 'test'
+        splits=args.splits,
+        manifest=args.manifest,
+        packed=args.packed,
+        class_weights=load_class_weights(args.report) if args.report else None,
     )
     generator.generate_all_pairs()
 
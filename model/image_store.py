@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Stockage en mémoire des images du dataset sous forme de tableau uint8.
+Ce module permet de :
+- Charger une seule fois toutes les images référencées par les fichiers de paires
+- Mettre ce tableau en cache sur disque (.npy) et le relire en memmap, en lecture
+  seule et partagé entre processus via le cache de pages
+- Exposer les paires sous forme d'indices dans ce tableau (IndexedPairDataset)
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+from PIL import Image
+from torch.utils.data import Dataset
+
+from model.split_dataset import load_split_manifest
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+
+def normalize_key(path: str) -> str:
+    """Clé canonique d'une image (chemin relatif avec séparateurs '/')."""
+    return str(path).replace("\\", "/")
+
+
+def to_model_tensor(images: np.ndarray) -> torch.Tensor:
+    """
+    Convertit un batch uint8 (N, H, W) en tensor normalisé (N, 1, H, W).
+
+    Applique la même normalisation que l'entraînement :
+    ToTensor (division par 255) puis Normalize(mean=0.5, std=0.5).
+
+    Args:
+        images (np.ndarray): Images en niveaux de gris uint8
+
+    Returns:
+        torch.Tensor: Batch float32 dans [-1, 1]
+    """
+    # Copie : les vues memmap sont en lecture seule
+    tensor = torch.from_numpy(np.array(images, dtype=np.uint8)).float()
+    return (tensor.unsqueeze(1) / 255.0 - 0.5) / 0.5
+
+
+class ImageStore:
+    """
+    Tableau uint8 (N, H, W) de toutes les images, indexé par chemin relatif.
+    """
+
+    def __init__(self, images: np.ndarray, paths: List[str]):
+        """
+        Args:
+            images (np.ndarray): Images uint8 de forme (N, H, W)
+            paths (List[str]): Chemin relatif de chaque image
+        """
+        if len(images) != len(paths):
+            raise ValueError("Le nombre d'images et de chemins doit être identique")
+        self.images = images
+        self.paths = [normalize_key(p) for p in paths]
+        self.index: Dict[str, int] = {p: i for i, p in enumerate(self.paths)}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def index_of(self, path: str) -> int:
+        """Retourne l'indice d'une image à partir de son chemin relatif."""
+        return self.index[normalize_key(path)]
+
+    def tensors(self, indices) -> torch.Tensor:
+        """Retourne les images demandées sous forme de batch normalisé."""
+        return to_model_tensor(self.images[indices])
+
+    @classmethod
+    def build(
+        cls, root_dir: Path, relative_paths: Iterable[str], image_size: int = 64
+    ) -> "ImageStore":
+        """
+        Charge les images depuis le disque.
+
+        Args:
+            root_dir (Path): Dossier racine des chemins relatifs
+            relative_paths (Iterable[str]): Chemins des images à charger
+            image_size (int): Taille des images (redimensionnées si nécessaire)
+
+        Returns:
+            ImageStore: Le store construit
+        """
+        paths = sorted({normalize_key(p) for p in relative_paths})
+        images = np.empty((len(paths), image_size, image_size), dtype=np.uint8)
+        for i, path in enumerate(paths):
+            image = Image.open(Path(root_dir) / path).convert("L")
+            if image.size != (image_size, image_size):
+                image = image.resize((image_size, image_size), Image.Resampling.LANCZOS)
+            images[i] = np.asarray(image)
+        logging.info(f"{len(paths)} images chargées depuis {root_dir}")
+        return cls(images, paths)
+
+    def save(self, cache_path: Path):
+        """
+        Sauvegarde le store : <cache>.npy pour les pixels, <cache>.json pour les chemins.
+
+        Args:
+            cache_path (Path): Chemin du cache, sans extension
+        """
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(cache_path.with_suffix(".npy"), self.images)
+        with open(cache_path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump({"paths": self.paths}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, cache_path: Path, mmap: bool = True) -> "ImageStore":
+        """
+        Relit un store sauvegardé.
+
+        Args:
+            cache_path (Path): Chemin du cache, sans extension
+            mmap (bool): Si True, les pixels sont projetés en mémoire en lecture seule
+
+        Returns:
+            ImageStore: Le store chargé
+        """
+        cache_path = Path(cache_path)
+        images = np.load(
+            cache_path.with_suffix(".npy"), mmap_mode="r" if mmap else None
+        )
+        with open(cache_path.with_suffix(".json"), encoding="utf-8") as f:
+            paths = json.load(f)["paths"]
+        return cls(images, paths)
+
+    @classmethod
+    def from_pair_csvs(
+        cls,
+        csv_files: Iterable[Path],
+        root_dir: Path,
+        cache_path: Path,
+        image_size: int = 64,
+    ) -> "ImageStore":
+        """
+        Retourne le store des images référencées par des fichiers de paires,
+        en réutilisant le cache s'il couvre toutes ces images.
+
+        Args:
+            csv_files (Iterable[Path]): Fichiers CSV de paires
+            root_dir (Path): Dossier racine des chemins des CSV
+            cache_path (Path): Chemin du cache, sans extension
+            image_size (int): Taille des images
+
+        Returns:
+            ImageStore: Le store (en memmap si relu depuis le cache)
+        """
+        needed = set()
+        for csv_file in csv_files:
+            pairs = pd.read_csv(csv_file)
+            needed.update(normalize_key(p) for p in pairs.iloc[:, 0])
+            needed.update(normalize_key(p) for p in pairs.iloc[:, 1])
+
+        return cls._cached(cache_path, root_dir, needed, image_size)
+
+    @classmethod
+    def from_split_manifest(
+        cls,
+        manifest_path: Path,
+        cache_path: Path,
+        splits: Optional[Iterable[str]] = None,
+        image_size: int = 64,
+    ) -> "ImageStore":
+        """
+        Retourne le store des images d'un manifeste de séparation, sans copie
+        préalable des fichiers dans des dossiers train/val/test.
+
+        Args:
+            manifest_path (Path): Manifeste dataset_split.json
+            cache_path (Path): Chemin du cache, sans extension
+            splits (Iterable[str], optional): Splits à charger (tous par défaut)
+            image_size (int): Taille des images
+
+        Returns:
+            ImageStore: Le store, indexé par chemin relatif au dossier source
+        """
+        root_dir, manifest = load_split_manifest(manifest_path)
+        needed = {
+            normalize_key(path)
+            for split in (splits or manifest)
+            for paths in manifest[split].values()
+            for path in paths
+        }
+        return cls._cached(cache_path, root_dir, needed, image_size)
+
+    @classmethod
+    def _cached(
+        cls, cache_path: Path, root_dir: Path, needed: set, image_size: int
+    ) -> "ImageStore":
+        """Relit le cache s'il couvre toutes les images demandées, sinon le reconstruit."""
+        cache_path = Path(cache_path)
+        if cache_path.with_suffix(".npy").exists():
+            store = cls.load(cache_path)
+            if needed.issubset(store.index):
+                return store
+            logging.info("Cache d'images incomplet, reconstruction")
+
+        store = cls.build(root_dir, needed, image_size)
+        store.save(cache_path)
+        return cls.load(cache_path)
+
+
+class IndexedPairDataset(Dataset):
+    """
+    Dataset de paires décrites par des indices dans un ImageStore.
+    Retourne les mêmes tenseurs que PairDataset, sans décodage PNG.
+    """
+
+    def __init__(self, store: ImageStore, csv_file: Path):
+        """
+        Args:
+            store (ImageStore): Store contenant toutes les images des paires
+            csv_file (Path): Fichier CSV de paires (chemins relatifs au store)
+        """
+        pairs = pd.read_csv(csv_file)
+        self.store = store
+        self.idx1 = np.array([store.index_of(p) for p in pairs.iloc[:, 0]])
+        self.idx2 = np.array([store.index_of(p) for p in pairs.iloc[:, 1]])
+        self.labels = pairs.iloc[:, 2].to_numpy(dtype=np.float32)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        img1 = to_model_tensor(self.store.images[self.idx1[idx]][None])[0]
+        img2 = to_model_tensor(self.store.images[self.idx2[idx]][None])[0]
+        return img1, img2, torch.tensor(self.labels[idx])
@@ -7,10 +7,14 @@ Permet de :
 - Comparer avec une base de templates
 - Identifier le symbole le plus proche
 """
+
 import json
 import logging
+import os
+import shutil
+import threading
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -19,7 +23,14 @@ import torch.nn.functional as F
 from PIL import Image, ImageOps
 from torchvision import transforms
 
-from model.siamese_model import SiameseNetwork
+from model.siamese_model import (
+    SiameseNetwork,
+    autocast_context,
+    check_precision,
+    distance_to_similarity,
+    to_memory_format,
+)
+from model.template_index import TemplateIndex, checkpoint_fingerprint
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +47,8 @@ class SiamesePredictor:
         device: torch.device,
         image_size: int = 64,
         similarity_threshold: float = 0.4488,
+        precision: str = "fp32",
+        channels_last: bool = False,
     ):
         """
         Initialise le prédicteur.
@@ -45,13 +58,33 @@ class SiamesePredictor:
             device: Device sur lequel effectuer les calculs
             image_size: Taille des images après redimensionnement
             similarity_threshold: Seuil de similarité (déterminé lors de l'évaluation)
+            precision: "fp32" ou "bf16" (autocast du forward)
+            channels_last: Si True, poids et entrées au format channels_last
         """
+        self.precision = check_precision(precision)
+        self.channels_last = channels_last
         self.model = model.to(device)
+        if channels_last:
+            self.model = self.model.to(memory_format=torch.channels_last)
         self.device = device
         self.similarity_threshold = similarity_threshold
         self.image_size = image_size
         self.model.eval()
 
+        # Empreinte du checkpoint chargé (permet de réutiliser le cache des templates)
+        self.checkpoint: Optional[str] = None
+        self.templates: Dict[str, Path] = {}
+        self.templates_dir: Optional[Path] = None
+        # Matrice des embeddings des templates et symbole de chaque ligne, remplacées
+        # ensemble (un seul attribut) pour que les lectures concurrentes restent
+        # cohérentes pendant un ajout
+        self._template_bank: Tuple[Optional[torch.Tensor], List[str]] = (None, [])
+        self._template_lock = threading.Lock()
+        # Seuils calibrés par symbole (similarity_threshold pour les autres)
+        self.symbol_thresholds: Dict[str, float] = {}
+        # Tampon des détections pour la surveillance de dérive (drift_monitor.py)
+        self.monitor = None
+
         # Transformations de base (comme pendant l'entraînement)
         self.transform = transforms.Compose(
             [
@@ -129,24 +162,154 @@ class SiamesePredictor:
         image = Image.open(image_path)
         return self.preprocess_image(image)
 
+    def embed(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Calcule les embeddings d'un batch d'images prétraitées.
+
+        Args:
+            batch: Tensor (N, 1, H, W) normalisé
+
+        Returns:
+            torch.Tensor: Embeddings float32 de forme (N, embedding_size)
+        """
+        batch = to_memory_format(batch.to(self.device), self.channels_last)
+        with torch.no_grad(), autocast_context(self.device, self.precision):
+            embeddings = self.model.forward_once(batch)
+        return embeddings.float()
+
+    def embed_images(
+        self, images: List[Image.Image], batch_size: int = 256
+    ) -> Tuple[torch.Tensor, List[int]]:
+        """
+        Prétraite et encode une liste d'images par batch.
+
+        Args:
+            images: Images PIL
+            batch_size: Nombre d'images par forward
+
+        Returns:
+            Tuple[torch.Tensor, List[int]]: Embeddings des images exploitables et
+                leurs indices dans la liste (les images vides sont ignorées)
+        """
+        tensors, kept = [], []
+        for i, image in enumerate(images):
+            tensor = self.preprocess_image(image)
+            if tensor is not None:
+                tensors.append(tensor)
+                kept.append(i)
+        if not tensors:
+            return torch.empty(0, 0), []
+        batch = torch.cat(tensors)
+        embeddings = torch.cat(
+            [
+                self.embed(batch[start : start + batch_size])
+                for start in range(0, len(batch), batch_size)
+            ]
+        )
+        return embeddings, kept
+
     def compare_images(
         self, img1_tensor: torch.Tensor, img2_tensor: torch.Tensor
     ) -> float:
         """Compare deux images en utilisant le modèle siamois."""
         with torch.no_grad():
             # Passe les deux images dans le modèle siamois
-            output1 = self.model.forward_once(img1_tensor)
-            output2 = self.model.forward_once(img2_tensor)
+            output1 = self.embed(img1_tensor)
+            output2 = self.embed(img2_tensor)
 
             # Calcule la distance euclidienne (comme pendant l'entraînement)
             distance = F.pairwise_distance(output1, output2).item()
 
             # Convertit la distance en similarité (0 à 1)
-            max_dist = 2.0  # Distance maximale possible avec des vecteurs normalisés
-            similarity = 1 - (distance / max_dist)
+            # Distance maximale possible de 2 avec des vecteurs normalisés
+            similarity = distance_to_similarity(distance)
 
             return similarity
 
+    @property
+    def template_matrix(self) -> Optional[torch.Tensor]:
+        """Embeddings des templates (une ligne par template)."""
+        return self._template_bank[0]
+
+    @property
+    def template_symbols(self) -> List[str]:
+        """Symbole de chaque ligne de template_matrix."""
+        return self._template_bank[1]
+
+    def threshold_for(self, symbol: Optional[str]) -> float:
+        """Seuil de confiance d'un symbole (calibré s'il existe, sinon global)."""
+        return self.symbol_thresholds.get(symbol, self.similarity_threshold)
+
+    def template_similarities(self, embedding: torch.Tensor) -> Dict[str, float]:
+        """
+        Similarité d'un embedding avec chaque symbole, en un seul calcul matriciel.
+
+        Args:
+            embedding: Embedding (1, embedding_size) de l'image
+
+        Returns:
+            Dict[str, float]: Meilleure similarité de chaque symbole
+        """
+        matrix, symbols = self._template_bank
+        if matrix is None or not symbols:
+            return {}
+        distances = torch.cdist(embedding, matrix)[0]
+        # Convertit la distance en similarité (0 à 1), comme compare_images
+        row_similarities = distance_to_similarity(distances).tolist()
+
+        similarities: Dict[str, float] = {}
+        for symbol, similarity in zip(symbols, row_similarities):
+            if similarity > similarities.get(symbol, -float("inf")):
+                similarities[symbol] = similarity
+        return similarities
+
+    def symbol_similarities(
+        self, embeddings: torch.Tensor
+    ) -> Tuple[List[str], Optional[torch.Tensor]]:
+        """
+        Meilleure similarité de chaque embedding avec chaque symbole, en un seul
+        calcul matriciel (un symbole peut avoir plusieurs lignes de templates).
+
+        Args:
+            embeddings: Embeddings (N, embedding_size)
+
+        Returns:
+            Tuple[List[str], torch.Tensor]: Noms des symboles et similarités (N, S)
+        """
+        matrix, symbols = self._template_bank
+        if matrix is None or not symbols:
+            return [], None
+        similarities = distance_to_similarity(torch.cdist(embeddings, matrix))
+
+        names = list(dict.fromkeys(symbols))
+        columns = torch.tensor(
+            [names.index(s) for s in symbols], device=similarities.device
+        ).expand_as(similarities)
+        per_symbol = torch.full(
+            (len(embeddings), len(names)), -float("inf"), device=similarities.device
+        ).scatter_reduce(1, columns, similarities, reduce="amax")
+        return names, per_symbol
+
+    def classify_embeddings(
+        self, embeddings: torch.Tensor
+    ) -> List[Tuple[Optional[str], float]]:
+        """
+        Symbole le plus proche de chaque embedding d'un batch.
+
+        Args:
+            embeddings: Embeddings (N, embedding_size)
+
+        Returns:
+            List[Tuple[str, float]]: (symbole, similarité) de chaque embedding
+        """
+        names, per_symbol = self.symbol_similarities(embeddings)
+        if per_symbol is None:
+            return [(None, 0.0)] * len(embeddings)
+        best_similarity, best_index = per_symbol.max(dim=1)
+        return [
+            (names[i], s) for i, s in zip(best_index.tolist(), best_similarity.tolist())
+        ]
+
     def find_closest_symbol(self, image_path: Path) -> Tuple[str, float]:
         """Trouve le symbole le plus proche pour une nouvelle image."""
         # Charge et prétraite l'image d'entrée
@@ -155,47 +318,199 @@ class SiamesePredictor:
         if input_tensor is None:
             return None, 0.0
 
-        # Compare avec tous les templates
-        best_symbol = None
-        best_similarity = -1
-        similarities = {}
-
-        for symbol_name, template_path in self.templates.items():
-            # Charge et prétraite le template
-            template = Image.open(template_path)
-            template_tensor = self.preprocess_image(template)
-            if template_tensor is None:
-                continue
-
-            # Compare les images
-            similarity = self.compare_images(input_tensor, template_tensor)
-            similarities[symbol_name] = similarity
-
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_symbol = symbol_name
+        # Compare avec tous les templates (embeddings précalculés)
+        embedding = self.embed(input_tensor)
+        similarities = self.template_similarities(embedding)
+        if not similarities:
+            return None, 0.0
+        best_symbol = max(similarities, key=similarities.get)
+        best_similarity = similarities[best_symbol]
 
         # Affiche les similarités pour le débogage
-        print("\nSimilarités avec les templates:")
-        for symbol, similarity in sorted(
-            similarities.items(), key=lambda x: x[1], reverse=True
-        )[
-            :5
-        ]:  # Top 5 seulement
-            print(f"- {symbol}: {similarity:.2%}")
+        top = sorted(similarities.items(), key=lambda x: x[1], reverse=True)[:5]
+        logging.debug(
+            "Similarités avec les templates: "
+            + ", ".join(f"{symbol}: {similarity:.2%}" for symbol, similarity in top)
+        )
+        if self.monitor is not None:
+            # Simple copie dans un tampon préalloué
+            self.monitor.record(embedding[0].float().cpu().numpy(), [s for _, s in top])
 
         return best_symbol, best_similarity
 
     def load_templates(self, templates_dir: Path):
-        """Charge tous les templates depuis un dossier."""
+        """
+        Charge tous les templates depuis un dossier, ainsi que leurs embeddings.
+
+        Les embeddings sont lus dans le cache du dossier (index.json, embeddings.f32)
+        s'il a été calculé avec le checkpoint chargé ; sinon ils sont calculés en un
+        seul passage par batch (tous les fichiers template*.png de chaque symbole),
+        puis mis en cache si l'empreinte du checkpoint est connue.
+        """
+        self.templates_dir = Path(templates_dir)
         self.templates = {}
-        for symbol_dir in templates_dir.iterdir():
+        for symbol_dir in sorted(templates_dir.iterdir()):
             if symbol_dir.is_dir():
                 template_files = list(symbol_dir.glob("template.png"))
                 if template_files:
                     self.templates[symbol_dir.name] = template_files[0]
                     logging.info(f"Template ajouté pour le symbole '{symbol_dir.name}'")
 
+        try:
+            index = TemplateIndex.load(templates_dir) if self.checkpoint else None
+        except ValueError as e:
+            logging.warning(f"Cache des templates illisible: {e}")
+            index = None
+        problems = (
+            index.validate(symbols=list(self.templates), checkpoint=self.checkpoint)
+            if index is not None
+            else ["cache absent"]
+        )
+        if not problems:
+            rows = [i for i, s in enumerate(index.symbols) if s in self.templates]
+            matrix = torch.from_numpy(index.embeddings[rows]).to(self.device)
+            self._template_bank = (matrix, [index.symbols[i] for i in rows])
+            logging.info(f"{len(rows)} embeddings de templates lus depuis le cache")
+            self.symbol_thresholds = index.thresholds
+            if index.default_threshold is not None:
+                self.similarity_threshold = index.default_threshold
+            if index.thresholds:
+                logging.info(f"{len(index.thresholds)} seuils calibrés par symbole")
+            return
+
+        logging.info(
+            f"Cache des templates inutilisable ({'; '.join(problems)}), "
+            "calcul des embeddings"
+        )
+        files = [
+            (symbol, path)
+            for symbol in self.templates
+            for path in sorted((templates_dir / symbol).glob("template*.png"))
+        ]
+        embeddings, kept = self.embed_images([Image.open(p) for _, p in files])
+        self._template_bank = (
+            embeddings if kept else None,
+            [files[i][0] for i in kept],
+        )
+
+        if self.checkpoint and kept:
+            rows = [
+                {
+                    "symbol": files[i][0],
+                    "source": files[i][1].relative_to(templates_dir).as_posix(),
+                    "file": files[i][1].relative_to(templates_dir).as_posix(),
+                }
+                for i in kept
+            ]
+            # Les seuils calibrés restent valables tant que le checkpoint est le même
+            same_checkpoint = index is not None and index.checkpoint == self.checkpoint
+            TemplateIndex(
+                embeddings.cpu().numpy(),
+                rows,
+                self.checkpoint,
+                index.thresholds if same_checkpoint else None,
+                index.default_threshold if same_checkpoint else None,
+            ).save(templates_dir)
+            logging.info(f"{len(rows)} embeddings de templates mis en cache")
+
+    def add_templates(
+        self,
+        symbol: str,
+        images: List[Image.Image],
+        sources: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Ajoute des templates pour un symbole, nouveau ou existant, sans recalculer
+        les embeddings des templates existants ni interrompre les prédictions.
+
+        Les images sont encodées hors verrou, puis enregistrées dans le dossier des
+        templates (<symbole>/template.png pour un nouveau symbole, puis
+        template_<n>.png) et ajoutées en fin de cache ; en cas d'échec, aucune
+        image n'est laissée dans le dossier. La matrice en mémoire est remplacée
+        en une seule affectation.
+
+        Args:
+            symbol: Nom du symbole (nom du dossier de templates)
+            images: Images de référence
+            sources: Origine de chaque image (nom du fichier envoyé)
+
+        Returns:
+            int: Nombre de templates ajoutés (les images sans dessin sont ignorées)
+        """
+        if Path(symbol).name != symbol or symbol in ("", ".", ".."):
+            raise ValueError(f"Nom de symbole invalide : {symbol!r}")
+        sources = sources or [f"image_{i}" for i in range(len(images))]
+        embeddings, kept = self.embed_images(images)
+        if not kept:
+            return 0
+
+        with self._template_lock:
+            if self.templates_dir is not None:
+                self._save_templates(symbol, images, sources, kept, embeddings)
+                self.templates.setdefault(
+                    symbol, self.templates_dir / symbol / "template.png"
+                )
+            else:
+                self.templates.setdefault(symbol, Path(sources[kept[0]]))
+
+            matrix, symbols = self._template_bank
+            embeddings = embeddings.to(self.device)
+            matrix = embeddings if matrix is None else torch.cat([matrix, embeddings])
+            self._template_bank = (matrix, symbols + [symbol] * len(kept))
+
+        logging.info(f"{len(kept)} template(s) ajouté(s) pour le symbole '{symbol}'")
+        return len(kept)
+
+    def _save_templates(
+        self,
+        symbol: str,
+        images: List[Image.Image],
+        sources: List[str],
+        kept: List[int],
+        embeddings: torch.Tensor,
+    ):
+        """
+        Enregistre les images retenues de add_templates et les ajoute au cache.
+
+        Le cache est relu et vérifié avant d'écrire la moindre image ; si
+        l'écriture d'une image ou l'ajout au cache échoue, les images déjà
+        écrites sont supprimées. Appelé sous _template_lock.
+        """
+        # Ajout en fin de cache s'il correspond au checkpoint chargé ; sinon le
+        # cache sera reconstruit au prochain chargement
+        index = TemplateIndex.load(self.templates_dir) if self.checkpoint else None
+        if index is not None and index.validate(
+            checkpoint=self.checkpoint, embedding_dim=embeddings.shape[1]
+        ):
+            index = None
+        array = embeddings.cpu().numpy()
+
+        symbol_dir = self.templates_dir / symbol
+        created = not symbol_dir.exists()
+        symbol_dir.mkdir(parents=True, exist_ok=True)
+        number = len(list(symbol_dir.glob("template*.png")))
+        rows, written = [], []
+        try:
+            for i in kept:
+                name = "template.png" if number == 0 else f"template_{number}.png"
+                while (symbol_dir / name).exists():
+                    number += 1
+                    name = f"template_{number}.png"
+                images[i].convert("L").save(symbol_dir / name)
+                written.append(symbol_dir / name)
+                number += 1
+                rows.append(
+                    {"symbol": symbol, "source": sources[i], "file": f"{symbol}/{name}"}
+                )
+            if index is not None:
+                index.append(self.templates_dir, array, rows)
+        except Exception:
+            for path in written:
+                path.unlink(missing_ok=True)
+            if created:
+                shutil.rmtree(symbol_dir, ignore_errors=True)
+            raise
+
     def predict(self, image_path: Path) -> Dict:
         """Prédit le symbole pour une nouvelle image."""
         symbol, similarity = self.find_closest_symbol(image_path)
@@ -204,7 +519,7 @@ class SiamesePredictor:
             "image_path": str(image_path),
             "predicted_symbol": symbol,
             "similarity_score": similarity,
-            "is_confident": similarity >= self.similarity_threshold,
+            "is_confident": similarity >= self.threshold_for(symbol),
         }
 
 
@@ -225,13 +540,12 @@ def main():
     logging.info(f"Utilisation du device: {device}")
 
     # Chargement du modèle
-    model = SiameseNetwork()
-    checkpoint = torch.load(model_dir / "best_model.pth")
-    model.load_state_dict(checkpoint["model_state_dict"])
-    logging.info(f"Modèle chargé depuis l'époque {checkpoint['epoch']}")
+    model_path = model_dir / "best_model.pth"
+    model = load_model(model_path, device)
 
     # Création du prédicteur
     predictor = SiamesePredictor(model, device, IMAGE_SIZE)
+    predictor.checkpoint = checkpoint_fingerprint(model_path)
 
     # Chargement des templates
     logging.info("Chargement des templates...")
@@ -250,17 +564,54 @@ def main():
             logging.error(f"Image non trouvée : {image_path}")
     else:
         logging.info(
-            "Aucune image fournie. Usage : python infer_siamese.py <chemin_image>"
+            "Aucune image fournie. Usage : python -m model.infer_siamese <chemin_image>"
         )
 
 
-def load_templates():
+def load_model(model_path: Path, device: torch.device) -> SiameseNetwork:
+    """
+    Charge le réseau siamois depuis un checkpoint.
+
+    Args:
+        model_path: Fichier du checkpoint (dictionnaire d'entraînement ou state dict)
+        device: Device de chargement
+
+    Returns:
+        SiameseNetwork: Le modèle en mode évaluation
+    """
+    if not model_path.exists():
+        raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
+
+    checkpoint = torch.load(model_path, map_location=device)
+    if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
+        model = SiameseNetwork(embedding_dim=checkpoint.get("embedding_dim", 128))
+        model.load_state_dict(checkpoint["model_state_dict"])
+        logging.info(f"Modèle chargé depuis l'époque {checkpoint['epoch']}")
+    else:
+        model = SiameseNetwork()
+        model.load_state_dict(checkpoint)
+        logging.info("Modèle chargé")
+
+    model.eval()  # Mettre le modèle en mode évaluation
+    return model
+
+
+def load_templates(precision: str = None, channels_last: bool = None):
     """
     Charge les templates et retourne un prédicteur initialisé.
 
+    Args:
+        precision: "fp32" ou "bf16" (défaut : variable MODEL_PRECISION, sinon fp32)
+        channels_last: Format mémoire channels_last (défaut : MODEL_CHANNELS_LAST=1)
+
     Returns:
         SiamesePredictor: Instance du prédicteur initialisé avec les templates
     """
+    if precision is None:
+        precision = os.getenv("MODEL_PRECISION", "fp32")
+    if channels_last is None:
+        channels_last = os.getenv("MODEL_CHANNELS_LAST", "0") == "1"
+
     # Paramètres
     IMAGE_SIZE = 64
 
@@ -274,26 +625,24 @@ def load_templates():
     logging.info(f"Utilisation du device: {device}")
 
     # Chargement du modèle
-    model = SiameseNetwork()
     model_path = model_dir / "best_model.pth"
-
-    if not model_path.exists():
-        raise FileNotFoundError(f"Modèle non trouvé : {model_path}")
-
-    checkpoint = torch.load(model_path, map_location=device)
-    if isinstance(checkpoint, dict) and "model_state_dict" in checkpoint:
-        model.load_state_dict(checkpoint["model_state_dict"])
-        logging.info(f"Modèle chargé depuis l'époque {checkpoint['epoch']}")
-    else:
-        model.load_state_dict(checkpoint)
-        logging.info("Modèle chargé")
-
-    model.eval()  # Mettre le modèle en mode évaluation
+    model = load_model(model_path, device)
 
     # Création du prédicteur
-    predictor = SiamesePredictor(model, device, IMAGE_SIZE)
-
-    # Chargement des templates
+    predictor = SiamesePredictor(
+        model,
+        device,
+        IMAGE_SIZE,
+        precision=precision,
+        channels_last=channels_last,
+    )
+    try:
+        predictor.checkpoint = checkpoint_fingerprint(model_path)
+    except OSError as e:
+        # Sans empreinte, le cache des templates est ignoré
+        logging.warning(f"Empreinte du checkpoint indisponible: {e}")
+
+    # Chargement des templates (embeddings lus depuis le cache s'il est à jour)
     logging.info("Chargement des templates...")
     predictor.load_templates(templates_dir)
 
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Localisation des gravures dans une photo complète (schéma de verre, photo fournisseur).
+Ce module permet de :
+- Proposer des régions candidates par composantes connexes (OpenCV), filtrées de
+  manière vectorisée sur le tableau des statistiques
+- Classifier toutes les régions en un seul forward par batch avec SiamesePredictor
+- Retourner plusieurs détections avec leurs boîtes
+
+Usage :
+    python -m model.localize photo.png
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+
+def propose_regions(
+    image: np.ndarray,
+    min_size: int = 10,
+    max_area_ratio: float = 0.25,
+    max_aspect: float = 8.0,
+    merge_distance: Optional[int] = None,
+    max_regions: int = 64,
+) -> np.ndarray:
+    """
+    Propose des régions candidates contenant chacune un symbole.
+
+    Les traits proches sont fusionnés par dilatation, puis chaque composante connexe
+    devient une région. Les régions trop petites, trop allongées (traits, cotes) ou
+    trop grandes (contour du verre) sont écartées.
+
+    Args:
+        image (np.ndarray): Image en niveaux de gris uint8 (H, W), dessin sombre
+            sur fond clair
+        min_size (int): Plus grand côté minimal d'une région, en pixels
+        max_area_ratio (float): Surface maximale de la boîte, relative à l'image
+        max_aspect (float): Rapport maximal entre le grand et le petit côté
+        merge_distance (int, optional): Distance de fusion des traits (défaut : 1 %
+            du plus petit côté de l'image, au moins 2 pixels)
+        max_regions (int): Nombre maximal de régions retournées (les plus grandes)
+
+    Returns:
+        np.ndarray: Boîtes (N, 4) au format (x, y, largeur, hauteur), int32
+    """
+    boxes, _, _ = _propose_from_ink(
+        ink_mask(image),
+        min_size,
+        max_area_ratio,
+        max_aspect,
+        merge_distance,
+        max_regions,
+    )
+    return boxes
+
+
+def ink_mask(image: np.ndarray) -> np.ndarray:
+    """Masque de l'encre (255) par seuillage d'Otsu d'une image en niveaux de gris."""
+    _, ink = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return ink
+
+
+def _propose_from_ink(
+    ink: np.ndarray,
+    min_size: int = 10,
+    max_area_ratio: float = 0.25,
+    max_aspect: float = 8.0,
+    merge_distance: Optional[int] = None,
+    max_regions: int = 64,
+):
+    """Composantes connexes du masque d'encre ; retourne (boîtes, labels, ids)."""
+    height, width = ink.shape
+    if merge_distance is None:
+        merge_distance = max(2, round(min(height, width) * 0.01))
+    kernel = np.ones((2 * merge_distance + 1, 2 * merge_distance + 1), np.uint8)
+    merged = cv2.dilate(ink, kernel) if merge_distance > 0 else ink
+
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(merged, connectivity=8)
+    # La composante 0 est le fond
+    ids = np.arange(1, len(stats))
+    stats = stats[1:]
+    x, y, w, h = (stats[:, i] for i in range(4))
+
+    # Retire la marge ajoutée par la dilatation
+    x0 = np.clip(x + merge_distance, 0, width - 1)
+    y0 = np.clip(y + merge_distance, 0, height - 1)
+    w = np.maximum(np.minimum(x + w - merge_distance, width) - x0, 1)
+    h = np.maximum(np.minimum(y + h - merge_distance, height) - y0, 1)
+
+    long_side = np.maximum(w, h)
+    short_side = np.minimum(w, h)
+    keep = (
+        (long_side >= min_size)
+        & (w * h <= max_area_ratio * height * width)
+        & (long_side <= max_aspect * short_side)
+    )
+    boxes = np.stack([x0, y0, w, h], axis=1)[keep].astype(np.int32)
+    ids = ids[keep]
+
+    # Les plus grandes régions d'abord
+    order = np.argsort(-(boxes[:, 2] * boxes[:, 3]), kind="stable")[:max_regions]
+    return boxes[order], labels, ids[order]
+
+
+def crop_regions(
+    ink: np.ndarray, labels: np.ndarray, ids: np.ndarray, boxes: np.ndarray
+) -> List[Image.Image]:
+    """
+    Découpe chaque région sans les traits des régions voisines.
+
+    Returns:
+        List[Image.Image]: Une image par région, dessin noir sur fond blanc
+    """
+    crops = []
+    for region_id, (x, y, w, h) in zip(ids.tolist(), boxes.tolist()):
+        mask = (labels[y : y + h, x : x + w] == region_id) & (
+            ink[y : y + h, x : x + w] > 0
+        )
+        crops.append(Image.fromarray(np.where(mask, 0, 255).astype(np.uint8)))
+    return crops
+
+
+def detect_symbols(
+    predictor,
+    image: Image.Image,
+    batch_size: int = 256,
+    **proposal_options,
+) -> List[Dict]:
+    """
+    Localise et identifie tous les symboles d'une image.
+
+    Toutes les régions proposées sont classifiées en un seul passage par batch
+    (un forward par tranche de batch_size régions).
+
+    Args:
+        predictor (SiamesePredictor): Prédicteur avec les templates chargés
+        image (Image.Image): Photo ou schéma complet
+        batch_size (int): Nombre de régions par forward
+        **proposal_options: Options transmises à propose_regions
+
+    Returns:
+        List[Dict]: Détections {"symbol", "similarity", "is_confident", "box"},
+            triées par similarité décroissante ; box = [x, y, largeur, hauteur]
+    """
+    ink = ink_mask(np.asarray(image.convert("L")))
+    boxes, labels, ids = _propose_from_ink(ink, **proposal_options)
+    if not len(boxes):
+        return []
+
+    embeddings, kept = predictor.embed_images(
+        crop_regions(ink, labels, ids, boxes), batch_size
+    )
+    if not kept:
+        return []
+
+    detections = [
+        {
+            "symbol": symbol,
+            "similarity": similarity,
+            "is_confident": similarity >= predictor.threshold_for(symbol),
+            "box": boxes[i].tolist(),
+        }
+        for i, (symbol, similarity) in zip(
+            kept, predictor.classify_embeddings(embeddings)
+        )
+        if symbol is not None
+    ]
+    detections.sort(key=lambda d: d["similarity"], reverse=True)
+    return detections
+
+
+def main():
+    from model.infer_siamese import load_templates
+
+    parser = argparse.ArgumentParser(description="Localisation des gravures")
+    parser.add_argument("image", type=Path, help="Photo ou schéma à analyser")
+    parser.add_argument("--max-regions", type=int, default=64)
+    args = parser.parse_args()
+
+    predictor = load_templates()
+    detections = detect_symbols(
+        predictor, Image.open(args.image), max_regions=args.max_regions
+    )
+    print(json.dumps(detections, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
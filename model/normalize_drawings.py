@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import json
+import logging
 import os
-import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import cv2
 import numpy as np
 
 
-def apply_random_rotation(image, max_angle=15):
+def apply_random_rotation(image, max_angle=15, rng=None):
     """Applique une rotation aléatoire à l'image"""
-    angle = np.random.uniform(-max_angle, max_angle)
+    rng = rng if rng is not None else np.random
+    angle = rng.uniform(-max_angle, max_angle)
     height, width = image.shape[:2]
     center = (width // 2, height // 2)
     rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
@@ -23,17 +30,19 @@ def apply_random_rotation(image, max_angle=15):
     return rotated
 
 
-def add_gaussian_noise(image, mean=0, sigma=15):
+def add_gaussian_noise(image, mean=0, sigma=15, rng=None):
     """Ajoute du bruit gaussien à l'image"""
-    noise = np.random.normal(mean, sigma, image.shape).astype(np.uint8)
+    rng = rng if rng is not None else np.random
+    noise = rng.normal(mean, sigma, image.shape).astype(np.uint8)
     noisy_image = cv2.add(image, noise)
     return noisy_image
 
 
-def adjust_contrast(image, factor=None):
+def adjust_contrast(image, factor=None, rng=None):
     """Ajuste le contraste de l'image"""
+    rng = rng if rng is not None else np.random
     if factor is None:
-        factor = np.random.uniform(0.8, 1.2)
+        factor = rng.uniform(0.8, 1.2)
     adjusted = cv2.convertScaleAbs(image, alpha=factor, beta=0)
     return adjusted
 
@@ -43,8 +52,8 @@ def apply_elastic_deformation(image, alpha=500, sigma=20, random_state=None):
     if random_state is None:
         random_state = np.random.RandomState(None)
     shape = image.shape
-    dx = random_state.rand(*shape) * 2 - 1
-    dy = random_state.rand(*shape) * 2 - 1
+    dx = random_state.random(shape) * 2 - 1
+    dy = random_state.random(shape) * 2 - 1
     dx = cv2.GaussianBlur(dx, (0, 0), sigma)
     dy = cv2.GaussianBlur(dy, (0, 0), sigma)
     x, y = np.meshgrid(np.arange(shape[1]), np.arange(shape[0]))
@@ -60,23 +69,30 @@ def apply_elastic_deformation(image, alpha=500, sigma=20, random_state=None):
     )
 
 
-def create_augmented_image(image, output_size=64):
-    """Crée une version augmentée de l'image avec des transformations aléatoires"""
+def create_augmented_image(image, output_size=64, rng=None):
+    """
+    Crée une version augmentée de l'image avec des transformations aléatoires.
+    rng (np.random.Generator, optionnel) rend le tirage reproductible ;
+    à défaut, le générateur global de numpy est utilisé.
+    """
+    rng = rng if rng is not None else np.random
     # Appliquer les transformations dans un ordre aléatoire
     transforms = [
-        lambda img: apply_random_rotation(img),
-        lambda img: add_gaussian_noise(img),
-        lambda img: adjust_contrast(img),
-        lambda img: apply_elastic_deformation(img),
+        lambda img: apply_random_rotation(img, rng=rng),
+        lambda img: add_gaussian_noise(img, rng=rng),
+        lambda img: adjust_contrast(img, rng=rng),
+        lambda img: apply_elastic_deformation(
+            img, random_state=rng if rng is not np.random else None
+        ),
     ]
 
     # Mélanger l'ordre des transformations
-    np.random.shuffle(transforms)
+    rng.shuffle(transforms)
 
     # Appliquer les transformations
     augmented = image.copy()
     for transform in transforms:
-        if np.random.random() > 0.5:  # 50% de chance d'appliquer chaque transformation
+        if rng.random() > 0.5:  # 50% de chance d'appliquer chaque transformation
             augmented = transform(augmented)
 
     return augmented
@@ -107,10 +123,12 @@ def center_and_resize(img, output_size=64, threshold=True):
     )  # on inverse si le tracé est noir (0) sur fond blanc (255)
     # coords est un tableau de points (x, y). On veut minX, maxX, minY, maxY
     if coords is not None:
-        x_min = np.min(coords[:, :, 0])
-        x_max = np.max(coords[:, :, 0])
-        y_min = np.min(coords[:, :, 1])
-        y_max = np.max(coords[:, :, 1])
+        # (N, 1, 2) ou (N, 2) selon la version d'OpenCV
+        coords = coords.reshape(-1, 2)
+        x_min = np.min(coords[:, 0])
+        x_max = np.max(coords[:, 0])
+        y_min = np.min(coords[:, 1])
+        y_max = np.max(coords[:, 1])
     else:
         # cas extrême : image blanche ou noire complète
         # On renvoie juste une image vide
@@ -135,88 +153,252 @@ def center_and_resize(img, output_size=64, threshold=True):
     return canvas
 
 
-def process_images_in_folder(
-    input_folder, output_folder, output_size=64, num_augmentations=5
-):
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_seed(seed, relative_path):
+    """Graine propre à un fichier : indépendante du worker qui le traite."""
+    return [seed, zlib.crc32(relative_path.encode("utf-8"))]
+
+
+def _output_names(category, idx, num_augmentations):
+    """Sorties d'une source, relatives au dossier de sortie (format POSIX)."""
+    names = [f"{category}/{category}_{idx:02d}.png"]
+    names += [
+        f"{category}/{category}_{idx:02d}_aug{aug_idx + 1}.png"
+        for aug_idx in range(num_augmentations)
+    ]
+    return names
+
+
+def _list_tasks(input_folder, num_augmentations):
     """
-    Parcourt récursivement input_folder et ses sous-dossiers, lit chaque fichier image,
-    applique center_and_resize, et crée plusieurs versions augmentées.
+    Liste les fichiers à traiter, avec les sorties que chacun doit produire.
+
+    Le numéro de chaque sortie est attribué dans l'ordre trié des fichiers de
+    chaque dossier, avant tout traitement, afin que les noms de sortie ne
+    dépendent pas de la répartition entre workers. Ajouter ou supprimer un
+    fichier décale donc les numéros des suivants.
     """
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-    # Parcourir tous les sous-dossiers
+    tasks = []
     for subdir, _, files in os.walk(input_folder):
         if not files:  # Ignorer les dossiers vides
             continue
-
         # Obtenir le nom du dossier parent (catégorie)
         category = os.path.basename(subdir)
-
-        # Créer le dossier de sortie correspondant
-        category_output = os.path.join(output_folder, category)
-        if not os.path.exists(category_output):
-            os.makedirs(category_output)
-
-        # Traiter chaque image dans le dossier
         idx = 1
         for filename in sorted(files):
             input_path = os.path.join(subdir, filename)
-
-            # Vérifier si c'est un fichier image
             if not os.path.isfile(input_path):
                 continue
+            relative = Path(os.path.relpath(input_path, input_folder)).as_posix()
+            outputs = _output_names(category, idx, num_augmentations)
+            tasks.append((relative, input_path, outputs))
+            idx += 1
+    return tasks
 
-            # Lire l'image
-            img = cv2.imread(input_path)
-            if img is None:
-                print(f"[WARN] Impossible de lire : {input_path}")
-                continue
 
-            # Traiter l'image originale
-            processed = center_and_resize(img, output_size=output_size, threshold=True)
+def _process_file(task, output_folder, output_size, seed):
+    """
+    Normalise une image et crée ses versions augmentées.
+
+    Returns:
+        list: Sorties écrites, relatives à output_folder (vide si l'image est
+            illisible)
+    """
+    relative, input_path, outputs = task
+    img = cv2.imread(input_path)
+    if img is None:
+        logging.warning(f"Impossible de lire : {input_path}")
+        return []
 
-            # Sauvegarder l'image originale normalisée
-            new_filename = f"{category}_{idx:02d}.png"
-            output_path = os.path.join(category_output, new_filename)
-            cv2.imwrite(output_path, processed)
-            print(f"[INFO] Image originale traitée : {output_path}")
+    original, augmentations = outputs[0], outputs[1:]
+    os.makedirs(os.path.dirname(os.path.join(output_folder, original)), exist_ok=True)
+    rng = np.random.default_rng(_file_seed(seed, relative))
 
-            # Créer et sauvegarder les versions augmentées
-            for aug_idx in range(num_augmentations):
-                augmented = create_augmented_image(processed, output_size)
-                aug_filename = f"{category}_{idx:02d}_aug{aug_idx+1}.png"
-                aug_output_path = os.path.join(category_output, aug_filename)
-                cv2.imwrite(aug_output_path, augmented)
-                print(f"[INFO] Image augmentée créée : {aug_output_path}")
+    # Sauvegarder l'image originale normalisée
+    processed = center_and_resize(img, output_size=output_size, threshold=True)
+    cv2.imwrite(os.path.join(output_folder, original), processed)
+
+    # Créer et sauvegarder les versions augmentées
+    for aug_output in augmentations:
+        augmented = create_augmented_image(processed, output_size, rng=rng)
+        cv2.imwrite(os.path.join(output_folder, aug_output), augmented)
+    logging.debug(f"{input_path} -> {len(outputs)} fichier(s)")
+    return outputs
+
+
+def load_manifest(output_folder, params):
+    """
+    Charge le manifeste des fichiers déjà traités.
+    Un manifeste produit avec d'autres paramètres est ignoré (reconstruction complète).
+    """
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("params") != params:
+        logging.info("Paramètres modifiés : tous les fichiers seront retraités")
+        return {}
+    return manifest.get("files", {})
 
-            idx += 1
+
+def save_manifest(output_folder, params, files):
+    """Écrit le manifeste de manière atomique."""
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "files": files}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _is_up_to_date(entry, stat, outputs, output_folder):
+    """
+    Vrai si la source n'a pas changé, que ses sorties sont celles que cette
+    exécution écrirait (numéro inchangé) et qu'elles existent toutes.
+    """
+    return (
+        entry is not None
+        and entry["size"] == stat.st_size
+        and entry["mtime"] == stat.st_mtime
+        and entry["outputs"] == outputs
+        and all(os.path.exists(os.path.join(output_folder, p)) for p in outputs)
+    )
+
+
+def process_images_in_folder(
+    input_folder,
+    output_folder,
+    output_size=64,
+    num_augmentations=5,
+    num_workers=1,
+    seed=0,
+    force=False,
+):
+    """
+    Parcourt récursivement input_folder et ses sous-dossiers, lit chaque fichier image,
+    applique center_and_resize, et crée plusieurs versions augmentées.
+
+    Un manifeste (output_folder/manifest.json) mémorise, pour chaque source, sa taille,
+    sa date de modification et les fichiers produits (relatifs à output_folder) :
+    les sources inchangées dont le numéro n'a pas bougé sont ignorées lors des
+    exécutions suivantes, et les sorties qui n'appartiennent plus à aucune source
+    sont effacées.
+
+    Args:
+        input_folder (str): Dossier d'entrée (un sous-dossier par catégorie)
+        output_folder (str): Dossier de sortie
+        output_size (int): Taille des images produites
+        num_augmentations (int): Nombre de versions augmentées par image
+        num_workers (int): Nombre de processus (1 = traitement séquentiel)
+        seed (int): Graine des augmentations (combinée au chemin de chaque fichier)
+        force (bool): Si True, retraite tous les fichiers
+
+    Returns:
+        dict: Nombre de fichiers traités, ignorés et supprimés
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    params = {
+        "output_size": output_size,
+        "num_augmentations": num_augmentations,
+        "seed": seed,
+    }
+    previous = {} if force else load_manifest(output_folder, params)
+
+    files = {}
+    pending = []
+    tasks = _list_tasks(input_folder, num_augmentations)
+    for task in tasks:
+        relative, input_path, outputs = task
+        stat = os.stat(input_path)
+        entry = previous.get(relative)
+        if _is_up_to_date(entry, stat, outputs, output_folder):
+            files[relative] = entry
+        else:
+            pending.append((task, stat))
+    skipped = len(files)
+
+    # Sorties des sources disparues ou renumérotées que plus aucune source
+    # n'écrira (les autres sont réécrites par leur nouvelle source)
+    removed = set(previous) - {task[0] for task in tasks}
+    expected = {path for task in tasks for path in task[2]}
+    for relative, entry in previous.items():
+        if relative in files:
+            continue
+        for path in set(entry["outputs"]) - expected:
+            path = os.path.join(output_folder, path)
+            if os.path.exists(path):
+                os.remove(path)
+
+    worker = partial(
+        _process_file,
+        output_folder=output_folder,
+        output_size=output_size,
+        seed=seed,
+    )
+    task_list = [task for task, _ in pending]
+    try:
+        with contextlib.ExitStack() as stack:
+            if num_workers > 1 and len(pending) > 1:
+                # Fichiers répartis par paquets entre les processus
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=num_workers)
+                )
+                chunksize = max(1, len(pending) // (num_workers * 4))
+                results = executor.map(worker, task_list, chunksize=chunksize)
+            else:
+                results = map(worker, task_list)
+            for (task, stat), outputs in zip(pending, results):
+                if outputs:
+                    files[task[0]] = {
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "outputs": outputs,
+                    }
+    finally:
+        # Le travail déjà effectué est conservé même en cas d'interruption
+        save_manifest(output_folder, params, files)
+
+    summary = {"processed": len(pending), "skipped": skipped, "removed": len(removed)}
+    logging.info(
+        f"{summary['processed']} image(s) traitée(s), {summary['skipped']} inchangée(s), "
+        f"{summary['removed']} supprimée(s) -> {output_folder}"
+    )
+    return summary
 
 
 if __name__ == "__main__":
     """
     Usage :
         python normalize_drawings.py /chemin/vers/images /chemin/vers/output [64] [5]
+            [--workers N] [--seed S] [--force]
     - 1er argument : dossier d'entrée contenant les sous-dossiers d'images
     - 2ème argument : dossier de sortie
     - 3ème argument (optionnel) : taille de sortie (défaut=64)
     - 4ème argument (optionnel) : nombre d'augmentations par image (défaut=5)
     """
-    if len(sys.argv) < 3:
-        print(
-            "Usage: python normalize_drawings.py <input_folder> <output_folder> [output_size] [num_augmentations]"
-        )
-        sys.exit(1)
-    input_folder = sys.argv[1]
-    output_folder = sys.argv[2]
-    output_size = 64
-    num_augmentations = 5
-    if len(sys.argv) > 3:
-        output_size = int(sys.argv[3])
-    if len(sys.argv) > 4:
-        num_augmentations = int(sys.argv[4])
+    parser = argparse.ArgumentParser(description="Normalisation des dessins")
+    parser.add_argument("input_folder")
+    parser.add_argument("output_folder")
+    parser.add_argument("output_size", type=int, nargs="?", default=64)
+    parser.add_argument("num_augmentations", type=int, nargs="?", default=5)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Graine des augmentations")
+    parser.add_argument(
+        "--force", action="store_true", help="Ignore le manifeste et retraite tout"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
     process_images_in_folder(
-        input_folder,
-        output_folder,
-        output_size=output_size,
-        num_augmentations=num_augmentations,
+        args.input_folder,
+        args.output_folder,
+        output_size=args.output_size,
+        num_augmentations=args.num_augmentations,
+        num_workers=args.workers,
+        seed=args.seed,
+        force=args.force,
     )
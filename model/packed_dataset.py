@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Format de dataset compact : tout le corpus de gravures dans quelques fichiers.
+Un dataset packé est un dossier contenant :
+- header.json : taille des images, noms des classes, noms des splits, nombre d'images
+- images.u8   : pixels uint8 de toutes les images (N x H x W), lus via np.memmap
+- labels.i32  : indice de classe de chaque image (int32)
+- splits.u8   : indice de split de chaque image (uint8)
+- paths.txt   : chemin relatif d'origine de chaque image, un par ligne
+
+Les ajouts écrivent à la fin des fichiers, puis mettent à jour le nombre d'images
+et la taille de paths.txt dans header.json (écriture atomique) : un ajout interrompu
+est ignoré à la lecture et tronqué au prochain ajout.
+
+Usage :
+    python -m model.packed_dataset model/dataset model/dataset.pack
+"""
+
+import argparse
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from model.image_store import ImageStore, normalize_key
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+FORMAT_VERSION = 1
+DEFAULT_SPLITS = ["train", "val", "test"]
+
+HEADER_FILE = "header.json"
+IMAGES_FILE = "images.u8"
+LABELS_FILE = "labels.i32"
+SPLITS_FILE = "splits.u8"
+PATHS_FILE = "paths.txt"
+
+
+class PackedDataset:
+    """
+    Dataset packé, ouvert en lecture (memmap) et extensible par ajout.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Ouvre un dataset packé existant.
+
+        Args:
+            path (Path): Dossier du dataset packé
+        """
+        self.path = Path(path)
+        with open(self.path / HEADER_FILE, encoding="utf-8") as f:
+            self.header = json.load(f)
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Version de format non supportée : {self.header['version']}"
+            )
+        self._load_arrays()
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        image_size: int = 64,
+        splits: Optional[List[str]] = None,
+    ) -> "PackedDataset":
+        """
+        Crée un dataset packé vide.
+
+        Args:
+            path (Path): Dossier à créer
+            image_size (int): Taille (carrée) des images
+            splits (List[str], optional): Noms des splits (train/val/test par défaut)
+
+        Returns:
+            PackedDataset: Le dataset créé
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in [IMAGES_FILE, LABELS_FILE, SPLITS_FILE, PATHS_FILE]:
+            (path / name).write_bytes(b"")
+        header = {
+            "version": FORMAT_VERSION,
+            "image_size": image_size,
+            "classes": [],
+            "splits": list(splits or DEFAULT_SPLITS),
+            "count": 0,
+            "paths_size": 0,
+        }
+        _write_header(path, header)
+        return cls(path)
+
+    @property
+    def image_size(self) -> int:
+        return self.header["image_size"]
+
+    @property
+    def classes(self) -> List[str]:
+        return self.header["classes"]
+
+    @property
+    def split_names(self) -> List[str]:
+        return self.header["splits"]
+
+    def __len__(self):
+        return self.header["count"]
+
+    def _load_arrays(self):
+        """Projette les fichiers en mémoire, limités au nombre d'images validé."""
+        count = len(self)
+        size = self.image_size
+        if count:
+            self.images = np.memmap(
+                self.path / IMAGES_FILE,
+                dtype=np.uint8,
+                mode="r",
+                shape=(count, size, size),
+            )
+            self.labels = np.memmap(
+                self.path / LABELS_FILE, dtype=np.int32, mode="r", shape=(count,)
+            )
+            self.splits = np.memmap(
+                self.path / SPLITS_FILE, dtype=np.uint8, mode="r", shape=(count,)
+            )
+        else:
+            self.images = np.empty((0, size, size), dtype=np.uint8)
+            self.labels = np.empty(0, dtype=np.int32)
+            self.splits = np.empty(0, dtype=np.uint8)
+        with open(self.path / PATHS_FILE, "rb") as f:
+            text = f.read(self.header["paths_size"]).decode("utf-8")
+        self.paths = text.splitlines()
+
+    def append(
+        self,
+        images: np.ndarray,
+        labels: Iterable[str],
+        splits: Iterable[str],
+        paths: Iterable[str],
+    ):
+        """
+        Ajoute des images à la fin du dataset, sans réécrire l'existant.
+
+        Args:
+            images (np.ndarray): Images uint8 (N, H, W)
+            labels (Iterable[str]): Nom de classe de chaque image (ajouté si nouveau)
+            splits (Iterable[str]): Split de chaque image
+            paths (Iterable[str]): Chemin relatif de chaque image
+        """
+        images = np.ascontiguousarray(images, dtype=np.uint8)
+        labels, splits, paths = list(labels), list(splits), list(paths)
+        if images.shape[1:] != (self.image_size, self.image_size):
+            raise ValueError(
+                f"Images de forme {images.shape[1:]}, attendu "
+                f"({self.image_size}, {self.image_size})"
+            )
+        if not len(images) == len(labels) == len(splits) == len(paths):
+            raise ValueError(
+                "images, labels, splits et paths doivent avoir la même longueur"
+            )
+        unknown = set(splits) - set(self.split_names)
+        if unknown:
+            raise ValueError(f"Splits inconnus : {sorted(unknown)}")
+
+        header = dict(self.header)
+        classes = list(header["classes"])
+        class_index = {name: i for i, name in enumerate(classes)}
+        for label in labels:
+            if label not in class_index:
+                class_index[label] = len(classes)
+                classes.append(label)
+        split_index = {name: i for i, name in enumerate(self.split_names)}
+
+        count = len(self)
+        pixels = self.image_size * self.image_size
+        label_ids = np.array([class_index[label] for label in labels], dtype=np.int32)
+        split_ids = np.array([split_index[split] for split in splits], dtype=np.uint8)
+        path_bytes = "".join(normalize_key(p) + "\n" for p in paths).encode("utf-8")
+        blobs = [
+            (IMAGES_FILE, count * pixels, images.tobytes()),
+            (LABELS_FILE, count * 4, label_ids.tobytes()),
+            (SPLITS_FILE, count, split_ids.tobytes()),
+            (PATHS_FILE, header["paths_size"], path_bytes),
+        ]
+        # Libère les projections avant d'écrire dans les fichiers
+        self.images = self.labels = self.splits = None
+        for name, valid_size, data in blobs:
+            _append_bytes(self.path / name, valid_size, data)
+
+        # Le nouveau nombre d'images n'est publié qu'une fois les données écrites
+        header["classes"] = classes
+        header["count"] = count + len(images)
+        header["paths_size"] += len(path_bytes)
+        _write_header(self.path, header)
+        self.header = header
+        self._load_arrays()
+
+    def indices(self, split: str) -> np.ndarray:
+        """Indices des images d'un split."""
+        return np.flatnonzero(self.splits == self.split_names.index(split))
+
+    def category_paths(self, split: str) -> Dict[str, List[str]]:
+        """
+        Chemins des images d'un split, par classe.
+
+        Args:
+            split (str): Nom du split
+
+        Returns:
+            Dict[str, List[str]]: {classe: chemins relatifs}
+        """
+        categories: Dict[str, List[str]] = {}
+        for i in self.indices(split):
+            categories.setdefault(self.classes[self.labels[i]], []).append(
+                self.paths[i]
+            )
+        return categories
+
+    def image_store(self) -> ImageStore:
+        """
+        Vue ImageStore du dataset (pixels en memmap), utilisable par
+        IndexedPairDataset et SiameseEvaluator.embed_store.
+        """
+        return ImageStore(self.images, self.paths)
+
+
+def _write_header(path: Path, header: Dict):
+    """Écrit header.json de manière atomique."""
+    tmp_path = path / (HEADER_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path / HEADER_FILE)
+
+
+def _append_bytes(file_path: Path, valid_size: int, data: bytes):
+    """Tronque un éventuel ajout interrompu puis écrit data en fin de fichier."""
+    with open(file_path, "r+b") as f:
+        f.truncate(valid_size)
+        f.seek(valid_size)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def pack_directory(
+    dataset_dir: Path,
+    output_path: Path,
+    image_size: int = 64,
+    batch_size: int = 1024,
+) -> PackedDataset:
+    """
+    Convertit un dataset model/dataset/{split}/{classe}/*.png en dataset packé.
+
+    Les chemins enregistrés sont relatifs à dataset_dir ("train/classe/image.png"),
+    comme dans les fichiers de paires. Les images déjà présentes dans le dataset packé
+    sont ignorées : relancer la conversion n'ajoute que les nouvelles images.
+
+    Args:
+        dataset_dir (Path): Dossier contenant les sous-dossiers de splits
+        output_path (Path): Dossier du dataset packé
+        image_size (int): Taille des images
+        batch_size (int): Nombre d'images écrites par ajout
+
+    Returns:
+        PackedDataset: Le dataset packé
+    """
+    dataset_dir = Path(dataset_dir)
+    if (Path(output_path) / HEADER_FILE).exists():
+        packed = PackedDataset(output_path)
+    else:
+        splits = sorted(
+            d.name for d in dataset_dir.iterdir() if d.is_dir() and d.name != "cache"
+        )
+        packed = PackedDataset.create(output_path, image_size, splits)
+    known = set(packed.paths)
+
+    entries = [
+        (path.relative_to(dataset_dir).as_posix(), split, path.parent.name)
+        for split in packed.split_names
+        if (dataset_dir / split).is_dir()
+        for path in sorted((dataset_dir / split).glob("*/*.png"))
+    ]
+    entries = [entry for entry in entries if entry[0] not in known]
+
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start : start + batch_size]
+        images = np.empty((len(batch), image_size, image_size), dtype=np.uint8)
+        for i, (relative, _, _) in enumerate(batch):
+            image = Image.open(dataset_dir / relative).convert("L")
+            if image.size != (image_size, image_size):
+                image = image.resize((image_size, image_size), Image.Resampling.LANCZOS)
+            images[i] = np.asarray(image)
+        packed.append(
+            images,
+            labels=[category for _, _, category in batch],
+            splits=[split for _, split, _ in batch],
+            paths=[relative for relative, _, _ in batch],
+        )
+
+    logging.info(
+        f"{len(entries)} image(s) ajoutée(s), {len(packed)} au total, "
+        f"{len(packed.classes)} classes -> {output_path}"
+    )
+    return packed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion en dataset packé")
+    parser.add_argument(
+        "dataset_dir", type=Path, nargs="?", default=Path("model/dataset")
+    )
+    parser.add_argument(
+        "output", type=Path, nargs="?", default=Path("model/dataset.pack")
+    )
+    parser.add_argument("--image-size", type=int, default=64)
+    args = parser.parse_args()
+    pack_directory(args.dataset_dir, args.output, args.image_size)
+
+
+if __name__ == "__main__":
+    main()
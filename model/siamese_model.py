@@ -4,11 +4,88 @@ Implémentation d'un réseau siamois pour la reconnaissance de symboles gravés.
 Ce module définit :
 - L'architecture du réseau siamois basée sur un CNN
 - La fonction de perte contrastive pour l'entraînement
+- Les options de précision (fp32 / bf16) et de format mémoire communes
+  à l'entraînement et à l'inférence
 """
+
+import contextlib
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+# Précisions de calcul supportées (bf16 via autocast)
+PRECISIONS = {"fp32": None, "bf16": torch.bfloat16}
+
+
+def check_precision(precision: str) -> str:
+    """
+    Vérifie qu'une précision de calcul est supportée.
+
+    Args:
+        precision (str): "fp32" ou "bf16"
+
+    Returns:
+        str: La précision validée
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"Précision inconnue : {precision} (attendu : {', '.join(PRECISIONS)})"
+        )
+    return precision
+
+
+def autocast_context(device: torch.device, precision: str):
+    """
+    Contexte d'autocast correspondant à la précision demandée.
+
+    Args:
+        device (torch.device): Device des calculs
+        precision (str): "fp32" (aucun autocast) ou "bf16"
+
+    Returns:
+        Context manager à utiliser autour du forward
+    """
+    dtype = PRECISIONS[check_precision(precision)]
+    if dtype is None:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=device.type, dtype=dtype)
+
+
+def to_memory_format(tensor: torch.Tensor, channels_last: bool) -> torch.Tensor:
+    """
+    Convertit un batch NCHW au format channels_last si demandé.
+
+    Args:
+        tensor (torch.Tensor): Batch d'images (N, C, H, W)
+        channels_last (bool): Si True, utilise torch.channels_last
+
+    Returns:
+        torch.Tensor: Batch au format mémoire demandé
+    """
+    if channels_last:
+        return tensor.contiguous(memory_format=torch.channels_last)
+    return tensor
+
+
+# Distance maximale entre deux embeddings normalisés L2 (vecteurs opposés)
+MAX_DISTANCE = 2.0
+
+
+def distance_to_similarity(distances):
+    """
+    Convertit une distance euclidienne entre embeddings en similarité (0 à 1).
+
+    Même échelle à l'évaluation, à la calibration des seuils et à l'inférence.
+
+    Args:
+        distances: Distance(s) (float, np.ndarray ou torch.Tensor)
+
+    Returns:
+        Similarité(s) 1 - distance / MAX_DISTANCE, du même type
+    """
+    return 1 - distances / MAX_DISTANCE
+
 
 class SiameseNetwork(nn.Module):
     """
@@ -19,12 +96,13 @@ class SiameseNetwork(nn.Module):
     deux branches du réseau (poids partagés).
     """
 
-    def __init__(self, input_channels: int = 1):
+    def __init__(self, input_channels: int = 1, embedding_dim: int = 128):
         """
         Initialise l'architecture du réseau.
 
         Args:
             input_channels (int): Nombre de canaux des images d'entrée (1 pour niveaux de gris)
+            embedding_dim (int): Dimension de l'embedding de sortie
         """
         super(SiameseNetwork, self).__init__()
 
@@ -38,7 +116,7 @@ class SiameseNetwork(nn.Module):
 
         # Couches fully connected
         self.fc1 = nn.Linear(128 * 8 * 8, 512)
-        self.fc2 = nn.Linear(512, 128)
+        self.fc2 = nn.Linear(512, embedding_dim)
 
         # Dropout pour la régularisation
         self.dropout = nn.Dropout(0.3)
@@ -72,7 +150,8 @@ class SiameseNetwork(nn.Module):
         x = F.max_pool2d(x, 2)  # 16x16 -> 8x8
 
         # Aplatissement et couches fully connected
-        x = x.view(x.size(0), -1)  # (batch_size, 128*8*8)
+        # flatten (et non view) : compatible avec le format channels_last
+        x = torch.flatten(x, 1)  # (batch_size, 128*8*8)
         x = self.dropout(x)
         x = F.relu(self.fc1(x))
         x = self.dropout(x)
@@ -6,23 +6,90 @@ et les répartit en trois ensembles :
 - Entraînement (70%)
 - Validation (15%)
 - Test (15%)
-Les images sont soit déplacées physiquement dans des dossiers correspondants,
-soit référencées dans un fichier JSON avec leurs labels et leur attribution.
+Les images sont soit copiées ou liées (liens physiques, à défaut symboliques) dans des
+dossiers correspondants, soit référencées dans un manifeste JSON avec leurs labels et
+leur attribution. La répartition est déterministe pour une graine donnée.
 """
+
+import argparse
 import json
 import logging
 import os
 import random
 import shutil
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from model.dedup import HASH_FUNCTIONS, cluster_files
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 
+SPLITS = ["train", "val", "test"]
+SPLIT_MODES = ["copy", "link", "manifest"]
+MANIFEST_NAME = "dataset_split.json"
+
+
+def link_file(source: Path, dest: Path) -> str:
+    """
+    Crée dest comme lien physique vers source, ou lien symbolique si le lien physique
+    est impossible (systèmes de fichiers différents, système sans liens physiques).
+
+    Args:
+        source (Path): Fichier existant
+        dest (Path): Lien à créer (remplacé s'il pointe vers un autre fichier)
+
+    Returns:
+        str: "existing", "hardlink" ou "symlink"
+    """
+    if dest.exists() or dest.is_symlink():
+        if dest.exists() and os.path.samefile(source, dest):
+            return "existing"
+        dest.unlink()
+    try:
+        os.link(source, dest)
+        return "hardlink"
+    except OSError:
+        os.symlink(source.resolve(), dest)
+        return "symlink"
+
+
+def load_split_manifest(
+    manifest_path: Path, root_dir: Optional[Path] = None
+) -> Tuple[Path, Dict[str, Dict[str, List[str]]]]:
+    """
+    Lit un manifeste de séparation.
+
+    Args:
+        manifest_path (Path): Fichier dataset_split.json
+        root_dir (Path, optional): Dossier des images ; par défaut celui enregistré
+            dans le manifeste (ou le dossier du manifeste pour l'ancien format, une
+            simple liste de catégories)
+
+    Returns:
+        Tuple[Path, Dict]: Dossier racine et {split: {catégorie: [chemins relatifs]}}
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        categories = manifest
+        root = manifest_path.parent
+    else:
+        categories = manifest["categories"]
+        root = Path(manifest["root"])
+
+    splits = {split: {} for split in SPLITS}
+    for info in categories:
+        for split in SPLITS:
+            splits[split][info["category"]] = [
+                p.replace("\\", "/") for p in info.get(split, [])
+            ]
+    return Path(root_dir) if root_dir is not None else root, splits
+
 
 class DatasetSplitter:
     """
@@ -36,6 +103,10 @@ class DatasetSplitter:
         train_ratio: float = 0.7,
         val_ratio: float = 0.15,
         use_json: bool = True,
+        mode: Optional[str] = None,
+        seed: int = 42,
+        dedup_distance: Optional[int] = None,
+        dedup_method: str = "phash",
     ):
         """
         Initialise le splitter avec les paramètres de séparation.
@@ -46,13 +117,30 @@ class DatasetSplitter:
             train_ratio (float): Proportion d'images pour l'entraînement (défaut: 0.7)
             val_ratio (float): Proportion d'images pour la validation (défaut: 0.15)
             use_json (bool): Si True, crée un fichier JSON au lieu de déplacer les fichiers
+                (équivaut à mode="manifest", et à mode="copy" sinon)
+            mode (str, optional): "copy" (copie des fichiers), "link" (liens physiques,
+                à défaut symboliques) ou "manifest" (manifeste JSON seul) ;
+                prioritaire sur use_json
+            seed (int): Graine de la répartition (combinée au nom de chaque catégorie)
+            dedup_distance (int, optional): Si renseigné, les quasi-doublons (distance
+                de Hamming des empreintes <= dedup_distance) sont regroupés et chaque
+                groupe est affecté en entier au même split
+            dedup_method (str): Empreinte utilisée, "phash" ou "dhash"
         """
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.train_ratio = train_ratio
         self.val_ratio = val_ratio
         self.test_ratio = 1.0 - train_ratio - val_ratio
-        self.use_json = use_json
+        self.mode = mode or ("manifest" if use_json else "copy")
+        if self.mode not in SPLIT_MODES:
+            raise ValueError(f"Mode inconnu : {self.mode} (attendu : {SPLIT_MODES})")
+        self.use_json = self.mode == "manifest"
+        self.seed = seed
+        if dedup_method not in HASH_FUNCTIONS:
+            raise ValueError(f"Empreinte inconnue : {dedup_method}")
+        self.dedup_distance = dedup_distance
+        self.dedup_method = dedup_method
 
         # Vérification des ratios
         if not 0.99 < (train_ratio + val_ratio + self.test_ratio) < 1.01:
@@ -62,8 +150,8 @@ class DatasetSplitter:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Création des sous-dossiers si nécessaire
-        if not use_json:
-            for split in ["train", "val", "test"]:
+        if not self.use_json:
+            for split in SPLITS:
                 (output_dir / split).mkdir(parents=True, exist_ok=True)
 
     def get_image_files(self, category_dir: Path) -> List[Path]:
@@ -76,23 +164,26 @@ class DatasetSplitter:
         Returns:
             List[Path]: Liste des chemins vers les images
         """
-        # Récupère tous les fichiers PNG dans le dossier et ses sous-dossiers
-        return list(category_dir.glob("**/*.png"))
+        # Récupère tous les fichiers PNG dans le dossier et ses sous-dossiers,
+        # triés pour que la répartition ne dépende pas de l'ordre du système de fichiers
+        return sorted(category_dir.glob("**/*.png"))
 
     def split_files(
-        self, files: List[Path]
+        self, files: List[Path], rng: Optional[random.Random] = None
     ) -> Tuple[List[Path], List[Path], List[Path]]:
         """
         Sépare une liste de fichiers en trois ensembles selon les ratios définis.
 
         Args:
             files (List[Path]): Liste des fichiers à séparer
+            rng (random.Random, optional): Générateur du mélange
+                (générateur global du module random par défaut)
 
         Returns:
             Tuple[List[Path], List[Path], List[Path]]: Listes des fichiers pour train, val et test
         """
         # Mélange aléatoire des fichiers
-        random.shuffle(files)
+        (rng or random).shuffle(files)
 
         # Calcul des indices de séparation
         n_files = len(files)
@@ -106,6 +197,52 @@ class DatasetSplitter:
 
         return train_files, val_files, test_files
 
+    def split_clusters(
+        self, files: List[Path], labels, rng: Optional[random.Random] = None
+    ) -> Tuple[List[Path], List[Path], List[Path]]:
+        """
+        Sépare des fichiers regroupés en clusters de quasi-doublons : les clusters
+        sont mélangés puis affectés en entier, du plus grand au plus petit, au
+        split le plus en dessous de sa cible (nombre de fichiers × ratio).
+
+        Un split peut rester vide si un cluster regroupe presque tous les fichiers ;
+        un avertissement est alors journalisé.
+
+        Args:
+            files (List[Path]): Liste des fichiers à séparer
+            labels: Numéro de cluster de chaque fichier
+            rng (random.Random, optional): Générateur du mélange
+
+        Returns:
+            Tuple[List[Path], List[Path], List[Path]]: Listes des fichiers pour train, val et test
+        """
+        clusters: Dict[int, List[Path]] = {}
+        for file, label in zip(files, labels):
+            clusters.setdefault(int(label), []).append(file)
+        groups = list(clusters.values())
+        (rng or random).shuffle(groups)
+        # Tri stable : à taille égale, l'ordre du mélange est conservé
+        groups.sort(key=len, reverse=True)
+
+        n_files = len(files)
+        targets = [
+            n_files * ratio
+            for ratio in (self.train_ratio, self.val_ratio, self.test_ratio)
+        ]
+        splits: Tuple[List[Path], List[Path], List[Path]] = ([], [], [])
+        for group in groups:
+            # À écart égal, train puis val puis test
+            deficits = [target - len(split) for target, split in zip(targets, splits)]
+            splits[deficits.index(max(deficits))].extend(group)
+
+        for name, target, split in zip(SPLITS, targets, splits):
+            if target >= 1 and not split:
+                logging.warning(
+                    f"Split {name} vide : {len(groups)} cluster(s) pour {n_files} "
+                    f"fichier(s), le plus grand en compte {len(groups[0])}"
+                )
+        return splits
+
     def process_category(self, category_dir: Path) -> Dict:
         """
         Traite une catégorie en séparant ses images en trois ensembles.
@@ -118,7 +255,18 @@ class DatasetSplitter:
         """
         category_name = category_dir.name
         files = self.get_image_files(category_dir)
-        train_files, val_files, test_files = self.split_files(files)
+        # Un générateur par catégorie : ajouter une catégorie ne change pas les autres
+        rng = random.Random(f"{self.seed}:{category_name}")
+        if self.dedup_distance is not None:
+            labels = cluster_files(files, self.dedup_method, self.dedup_distance)
+            duplicates = len(files) - len(set(labels.tolist()))
+            if duplicates:
+                logging.info(
+                    f"{category_name} : {duplicates} quasi-doublon(s) regroupé(s)"
+                )
+            train_files, val_files, test_files = self.split_clusters(files, labels, rng)
+        else:
+            train_files, val_files, test_files = self.split_files(files, rng)
 
         if self.use_json:
             # Création du dictionnaire pour le JSON
@@ -129,7 +277,8 @@ class DatasetSplitter:
                 "test": [str(f.relative_to(self.input_dir)) for f in test_files],
             }
         else:
-            # Déplacement physique des fichiers
+            # Copie ou liens des fichiers dans les dossiers de split
+            counts = {}
             for split_name, split_files in [
                 ("train", train_files),
                 ("val", val_files),
@@ -138,11 +287,22 @@ class DatasetSplitter:
                 split_dir = self.output_dir / split_name / category_name
                 split_dir.mkdir(parents=True, exist_ok=True)
 
+                # Retire les fichiers d'une séparation précédente
+                names = {file.name for file in split_files}
+                for stale in split_dir.iterdir():
+                    if stale.name not in names and not stale.is_dir():
+                        stale.unlink()
+
                 for file in split_files:
                     dest = split_dir / file.name
-                    shutil.copy2(file, dest)
-                    logging.info(f"Copié {file.name} vers {split_name}/{category_name}")
-
+                    if self.mode == "link":
+                        kind = link_file(file, dest)
+                    else:
+                        shutil.copy2(file, dest)
+                        kind = "copy"
+                    counts[kind] = counts.get(kind, 0) + 1
+
+            logging.info(f"{category_name} : {counts}")
             return None
 
     def process_dataset(self):
@@ -152,7 +312,7 @@ class DatasetSplitter:
         dataset_info = []
 
         # Parcours de chaque catégorie dans le dossier d'entrée
-        for category_dir in self.input_dir.iterdir():
+        for category_dir in sorted(self.input_dir.iterdir()):
             if category_dir.is_dir():
                 logging.info(f"Traitement de la catégorie : {category_dir.name}")
                 info = self.process_category(category_dir)
@@ -162,9 +322,20 @@ class DatasetSplitter:
 
         # Si on utilise JSON, sauvegarde des informations
         if self.use_json:
-            json_path = self.output_dir / "dataset_split.json"
+            json_path = self.output_dir / MANIFEST_NAME
+            manifest = {
+                "root": str(self.input_dir.resolve()),
+                "seed": self.seed,
+                "ratios": [self.train_ratio, self.val_ratio, self.test_ratio],
+                "dedup": (
+                    {"method": self.dedup_method, "max_distance": self.dedup_distance}
+                    if self.dedup_distance is not None
+                    else None
+                ),
+                "categories": dataset_info,
+            }
             with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(dataset_info, f, ensure_ascii=False, indent=2)
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
             logging.info(f"Informations de séparation sauvegardées dans {json_path}")
 
 
@@ -253,13 +424,37 @@ def main():
     """
     Point d'entrée principal du script.
     """
-    # Définition des chemins
-    input_dir = Path("model/gravures_normalisees")
-    output_dir = Path("model/dataset")
+    parser = argparse.ArgumentParser(description="Séparation du dataset")
+    parser.add_argument(
+        "--input-dir", type=Path, default=Path("model/gravures_normalisees")
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("model/dataset"))
+    parser.add_argument(
+        "--mode",
+        choices=SPLIT_MODES,
+        default="link",
+        help="copy : copie des fichiers ; link : liens physiques (symboliques à "
+        "défaut) ; manifest : dataset_split.json seul",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--dedup-distance",
+        type=int,
+        default=None,
+        help="Garde les quasi-doublons (distance de Hamming <= N) dans le même split",
+    )
+    parser.add_argument("--dedup-method", choices=list(HASH_FUNCTIONS), default="phash")
+    args = parser.parse_args()
 
     # Création du splitter et traitement du dataset
-    # use_json=False pour créer une copie physique des fichiers
-    splitter = DatasetSplitter(input_dir, output_dir, use_json=False)
+    splitter = DatasetSplitter(
+        args.input_dir,
+        args.output_dir,
+        mode=args.mode,
+        seed=args.seed,
+        dedup_distance=args.dedup_distance,
+        dedup_method=args.dedup_method,
+    )
     splitter.process_dataset()
 
 
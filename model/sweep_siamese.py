@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Recherche d'hyperparamètres du réseau siamois (grille ou tirage aléatoire).
+Ce script :
+- Construit la liste des essais à partir d'une spécification JSON
+- Met en cache les images des paires dans un ImageStore uint8 partagé en lecture
+  seule (memmap) par tous les essais
+- Exécute les essais en parallèle dans un pool de processus, avec un nombre de
+  threads limité par essai
+- Évalue chaque essai avec l'évaluateur vectorisé (meilleur F1 sur la validation)
+- Écrit un classement (leaderboard) JSON et CSV
+
+Exemple de spécification :
+    {
+        "mode": "random",
+        "num_trials": 8,
+        "epochs": 5,
+        "seed": 0,
+        "params": {
+            "margin": [0.5, 1.0, 2.0],
+            "learning_rate": {"low": 0.0001, "high": 0.01, "log": true},
+            "batch_size": [32, 64],
+            "embedding_dim": [64, 128]
+        }
+    }
+
+Usage :
+    python -m model.sweep_siamese spec.json --workers 4 --threads-per-trial 2
+"""
+
+import argparse
+import csv
+import inspect
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import torch
+import torch.optim as optim
+from torch.utils.data import DataLoader
+
+from model.evaluate_siamese import SiameseEvaluator
+from model.image_store import ImageStore, IndexedPairDataset
+from model.siamese_model import ContrastiveLoss, SiameseNetwork
+from model.train_siamese import SiameseTrainer
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO)
+
+# Valeurs utilisées pour les hyperparamètres absents de la spécification ; la marge
+# reprend celle de ContrastiveLoss pour rester comparable à un entraînement normal
+DEFAULT_PARAMS = {
+    "margin": inspect.signature(ContrastiveLoss).parameters["margin"].default,
+    "learning_rate": 0.001,
+    "batch_size": 32,
+    "embedding_dim": 128,
+}
+
+
+def expand_grid(params: Dict) -> List[Dict]:
+    """
+    Produit cartésien des valeurs de chaque hyperparamètre.
+
+    Args:
+        params (Dict): {nom: liste de valeurs}
+
+    Returns:
+        List[Dict]: Une combinaison par essai
+    """
+    names = sorted(params)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(params[name] for name in names))
+    ]
+
+
+def sample_random(params: Dict, num_trials: int, seed: int = 0) -> List[Dict]:
+    """
+    Tire des combinaisons aléatoires d'hyperparamètres.
+
+    Une liste de valeurs est tirée uniformément ; un intervalle
+    {"low", "high", "log"} est tiré uniformément (en échelle log si demandé).
+
+    Args:
+        params (Dict): Spécification des hyperparamètres
+        num_trials (int): Nombre d'essais
+        seed (int): Graine du tirage
+
+    Returns:
+        List[Dict]: Une combinaison par essai
+    """
+    rng = random.Random(seed)
+    trials = []
+    for _ in range(num_trials):
+        trial = {}
+        for name in sorted(params):
+            space = params[name]
+            if isinstance(space, dict):
+                low, high = space["low"], space["high"]
+                if space.get("log", False):
+                    trial[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    trial[name] = rng.uniform(low, high)
+            else:
+                trial[name] = rng.choice(space)
+        trials.append(trial)
+    return trials
+
+
+def build_trials(spec: Dict) -> List[Dict]:
+    """
+    Construit la liste complète des essais à partir de la spécification.
+
+    Args:
+        spec (Dict): Spécification de la recherche
+
+    Returns:
+        List[Dict]: Hyperparamètres complets de chaque essai
+    """
+    mode = spec.get("mode", "grid")
+    if mode == "grid":
+        combinations = expand_grid(spec["params"])
+    elif mode == "random":
+        combinations = sample_random(
+            spec["params"], spec.get("num_trials", 10), spec.get("seed", 0)
+        )
+    else:
+        raise ValueError(f"Mode de recherche inconnu : {mode}")
+    return [{**DEFAULT_PARAMS, **combination} for combination in combinations]
+
+
+def _init_worker(threads_per_trial: int):
+    """Limite les threads de calcul de chaque processus du pool."""
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_trial)
+    os.environ["MKL_NUM_THREADS"] = str(threads_per_trial)
+    torch.set_num_threads(threads_per_trial)
+    torch.set_num_interop_threads(1)
+
+
+def run_trial(
+    trial_id: int,
+    params: Dict,
+    store_path: Path,
+    train_csv: Path,
+    val_csv: Path,
+    epochs: int,
+    output_dir: Path,
+    seed: int = 0,
+) -> Dict:
+    """
+    Entraîne puis évalue un essai.
+
+    Args:
+        trial_id (int): Identifiant de l'essai
+        params (Dict): Hyperparamètres de l'essai
+        store_path (Path): Cache ImageStore partagé (relu en memmap)
+        train_csv (Path): Paires d'entraînement
+        val_csv (Path): Paires de validation
+        epochs (int): Nombre d'époques
+        output_dir (Path): Dossier de la recherche
+        seed (int): Graine de base
+
+    Returns:
+        Dict: Hyperparamètres et métriques de l'essai
+    """
+    if epochs < 1:
+        raise ValueError(f"epochs doit être >= 1 (reçu : {epochs})")
+    start = time.perf_counter()
+    torch.manual_seed(seed + trial_id)
+
+    store = ImageStore.load(store_path, mmap=True)
+    train_dataset = IndexedPairDataset(store, train_csv)
+    val_dataset = IndexedPairDataset(store, val_csv)
+    train_loader = DataLoader(
+        train_dataset, batch_size=int(params["batch_size"]), shuffle=True
+    )
+
+    device = torch.device("cpu")
+    model = SiameseNetwork(embedding_dim=int(params["embedding_dim"]))
+    trainer = SiameseTrainer(
+        model,
+        ContrastiveLoss(margin=params["margin"]),
+        optim.Adam(model.parameters(), lr=params["learning_rate"]),
+        device,
+        output_dir / f"trial_{trial_id:03d}",
+    )
+    for _ in range(epochs):
+        train_loss = trainer.train_epoch(train_loader)
+
+    # Objectif : meilleur F1 sur la validation, chaque image encodée une seule fois
+    evaluator = SiameseEvaluator(model, device)
+    distances, labels = evaluator.compute_pair_distances(val_dataset)
+    threshold, f1 = evaluator.find_optimal_threshold(distances, labels)
+
+    return {
+        "trial_id": trial_id,
+        **params,
+        "train_loss": float(train_loss),
+        "f1_score": float(f1),
+        "threshold": float(threshold),
+        "duration_s": time.perf_counter() - start,
+    }
+
+
+def write_leaderboard(results: List[Dict], output_dir: Path) -> Path:
+    """
+    Écrit le classement des essais (F1 décroissant) en JSON et en CSV.
+
+    Args:
+        results (List[Dict]): Résultats des essais
+        output_dir (Path): Dossier de la recherche
+
+    Returns:
+        Path: Chemin du classement JSON
+    """
+    leaderboard = sorted(results, key=lambda r: r["f1_score"], reverse=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_path = output_dir / "leaderboard.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(leaderboard, f, ensure_ascii=False, indent=2)
+
+    if leaderboard:
+        with open(
+            output_dir / "leaderboard.csv", "w", newline="", encoding="utf-8"
+        ) as f:
+            writer = csv.DictWriter(f, fieldnames=list(leaderboard[0]))
+            writer.writeheader()
+            writer.writerows(leaderboard)
+
+    return json_path
+
+
+def run_sweep(
+    spec: Dict,
+    dataset_dir: Path,
+    train_csv: Path,
+    val_csv: Path,
+    output_dir: Path,
+    max_workers: int = 2,
+    threads_per_trial: int = 1,
+) -> List[Dict]:
+    """
+    Exécute tous les essais de la spécification dans un pool de processus.
+
+    Args:
+        spec (Dict): Spécification de la recherche
+        dataset_dir (Path): Racine des chemins des fichiers de paires
+        train_csv (Path): Paires d'entraînement
+        val_csv (Path): Paires de validation
+        output_dir (Path): Dossier des résultats
+        max_workers (int): Nombre d'essais simultanés
+        threads_per_trial (int): Threads de calcul par essai
+
+    Returns:
+        List[Dict]: Classement des essais
+    """
+    trials = build_trials(spec)
+    epochs = spec.get("epochs", 5)
+    seed = spec.get("seed", 0)
+    if epochs < 1:
+        raise ValueError(f"epochs doit être >= 1 (reçu : {epochs})")
+
+    # Le store est construit une fois ici, puis relu en memmap par chaque essai
+    store_path = output_dir / "image_store"
+    ImageStore.from_pair_csvs([train_csv, val_csv], dataset_dir, store_path)
+
+    logging.info(
+        f"{len(trials)} essais, {max_workers} en parallèle, "
+        f"{threads_per_trial} thread(s) par essai"
+    )
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        # spawn : pas de fork d'un processus dont les pools de threads sont actifs
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads_per_trial,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                run_trial,
+                trial_id,
+                params,
+                store_path,
+                train_csv,
+                val_csv,
+                epochs,
+                output_dir,
+                seed,
+            ): trial_id
+            for trial_id, params in enumerate(trials)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Échec de l'essai {futures[future]}: {str(e)}")
+                continue
+            results.append(result)
+            logging.info(
+                f"Essai {result['trial_id']} terminé : F1 {result['f1_score']:.4f} "
+                f"({result['duration_s']:.1f}s)"
+            )
+            # Classement mis à jour au fil de l'eau
+            write_leaderboard(results, output_dir)
+
+    leaderboard_path = write_leaderboard(results, output_dir)
+    logging.info(f"Classement écrit dans {leaderboard_path}")
+    return sorted(results, key=lambda r: r["f1_score"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres")
+    parser.add_argument("spec", type=Path, help="Spécification JSON de la recherche")
+    parser.add_argument("--dataset-dir", type=Path, default=Path("model/dataset"))
+    parser.add_argument(
+        "--train-pairs", type=Path, default=Path("model/pairs/train_pairs.csv")
+    )
+    parser.add_argument(
+        "--val-pairs", type=Path, default=Path("model/pairs/val_pairs.csv")
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+    output_dir = args.output or Path("model/sweeps") / args.spec.stem
+
+    leaderboard = run_sweep(
+        spec,
+        args.dataset_dir,
+        args.train_pairs,
+        args.val_pairs,
+        output_dir,
+        max_workers=args.workers,
+        threads_per_trial=args.threads_per_trial,
+    )
+    for rank, result in enumerate(leaderboard[:5], start=1):
+        print(
+            f"{rank}. F1 {result['f1_score']:.4f} - margin={result['margin']}, "
+            f"lr={result['learning_rate']:.2e}, batch={result['batch_size']}, "
+            f"dim={result['embedding_dim']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Cache des embeddings des templates de symboles.
+Le dossier des templates contient, en plus des images <symbole>/template.png :
+- index.json     : dimension des embeddings, empreinte du checkpoint, description
+                   de chaque ligne (symbole, image source, fichier template) et
+                   seuils de décision calibrés (calibrate_thresholds.py)
+- embeddings.f32 : matrice float32 (N, dimension), une ligne par template
+
+Un symbole peut avoir plusieurs lignes (templates supplémentaires). Les ajouts écrivent
+à la fin de embeddings.f32 puis réécrivent index.json de manière atomique : un ajout
+interrompu est ignoré à la lecture.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+FORMAT_VERSION = 1
+
+
+def checkpoint_fingerprint(model_path: Path) -> str:
+    """
+    Empreinte SHA-256 d'un checkpoint, pour détecter un cache calculé
+    avec un autre modèle.
+
+    Args:
+        model_path (Path): Fichier du checkpoint
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TemplateIndex:
+    """
+    Matrice des embeddings des templates et description de ses lignes.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        rows: List[Dict],
+        checkpoint: Optional[str] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        default_threshold: Optional[float] = None,
+    ):
+        """
+        Args:
+            embeddings (np.ndarray): Matrice float32 (N, dimension)
+            rows (List[Dict]): Une entrée {"symbol", "source", "file"} par ligne
+            checkpoint (str, optional): Empreinte du checkpoint utilisé
+            thresholds (Dict[str, float], optional): Seuil de similarité par symbole
+            default_threshold (float, optional): Seuil des symboles non calibrés
+        """
+        if len(embeddings) != len(rows):
+            raise ValueError("Le nombre d'embeddings et de lignes doit être identique")
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.rows = rows
+        self.checkpoint = checkpoint
+        self.thresholds = dict(thresholds or {})
+        self.default_threshold = default_threshold
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def embedding_dim(self) -> int:
+        return self.embeddings.shape[1]
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbole de chaque ligne de la matrice."""
+        return [row["symbol"] for row in self.rows]
+
+    def _header(self) -> Dict:
+        return {
+            "version": FORMAT_VERSION,
+            "embedding_dim": self.embedding_dim,
+            "checkpoint": self.checkpoint,
+            "count": len(self.rows),
+            "rows": self.rows,
+            "default_threshold": self.default_threshold,
+            "thresholds": self.thresholds,
+        }
+
+    def save(self, templates_dir: Path):
+        """
+        Écrit la matrice et l'index.
+
+        Args:
+            templates_dir (Path): Dossier des templates
+        """
+        templates_dir = Path(templates_dir)
+        templates_dir.mkdir(parents=True, exist_ok=True)
+        with open(templates_dir / EMBEDDINGS_FILE, "wb") as f:
+            f.write(np.ascontiguousarray(self.embeddings).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        _write_index(templates_dir, self._header())
+
+    def append(self, templates_dir: Path, embeddings: np.ndarray, rows: List[Dict]):
+        """
+        Ajoute des lignes en fin de matrice, sans réécrire les embeddings existants.
+
+        Args:
+            templates_dir (Path): Dossier des templates
+            embeddings (np.ndarray): Nouveaux embeddings (M, dimension)
+            rows (List[Dict]): Description des nouvelles lignes
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(rows), -1)
+        if embeddings.shape[1] != self.embedding_dim:
+            raise ValueError(
+                f"Dimension {embeddings.shape[1]}, attendu {self.embedding_dim}"
+            )
+        templates_dir = Path(templates_dir)
+        valid_size = len(self.rows) * self.embedding_dim * 4
+        with open(templates_dir / EMBEDDINGS_FILE, "r+b") as f:
+            # Tronque un éventuel ajout interrompu
+            f.truncate(valid_size)
+            f.seek(valid_size)
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.embeddings = np.concatenate([self.embeddings, embeddings])
+        self.rows = self.rows + list(rows)
+        _write_index(templates_dir, self._header())
+
+    def save_thresholds(
+        self,
+        templates_dir: Path,
+        thresholds: Dict[str, float],
+        default_threshold: Optional[float] = None,
+    ):
+        """
+        Enregistre les seuils calibrés (réécrit seulement index.json).
+
+        Args:
+            templates_dir (Path): Dossier des templates
+            thresholds (Dict[str, float]): Seuil de similarité par symbole
+            default_threshold (float, optional): Seuil des symboles non calibrés
+        """
+        self.thresholds = dict(thresholds)
+        self.default_threshold = default_threshold
+        _write_index(Path(templates_dir), self._header())
+
+    @classmethod
+    def load(cls, templates_dir: Path) -> Optional["TemplateIndex"]:
+        """
+        Relit le cache s'il existe.
+
+        Args:
+            templates_dir (Path): Dossier des templates
+
+        Returns:
+            TemplateIndex: Le cache, ou None s'il est absent
+        """
+        templates_dir = Path(templates_dir)
+        index_path = templates_dir / INDEX_FILE
+        if not index_path.exists():
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != FORMAT_VERSION:
+            return None
+        count, dim = header["count"], header["embedding_dim"]
+        embeddings = np.fromfile(
+            templates_dir / EMBEDDINGS_FILE, dtype=np.float32, count=count * dim
+        )
+        if embeddings.size != count * dim:
+            raise ValueError(
+                f"{EMBEDDINGS_FILE} tronqué : {embeddings.size} valeurs, "
+                f"attendu {count * dim}"
+            )
+        return cls(
+            embeddings.reshape(count, dim),
+            header["rows"],
+            header.get("checkpoint"),
+            header.get("thresholds"),
+            header.get("default_threshold"),
+        )
+
+    def validate(
+        self,
+        symbols: Optional[List[str]] = None,
+        checkpoint: Optional[str] = None,
+        embedding_dim: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Vérifie la cohérence du cache.
+
+        Args:
+            symbols (List[str], optional): Symboles qui doivent avoir au moins une ligne
+            checkpoint (str, optional): Empreinte attendue du checkpoint
+            embedding_dim (int, optional): Dimension attendue des embeddings
+
+        Returns:
+            List[str]: Problèmes détectés (vide si le cache est valide)
+        """
+        problems = []
+        if checkpoint is not None and self.checkpoint != checkpoint:
+            problems.append("cache calculé avec un autre checkpoint")
+        if embedding_dim is not None and self.embedding_dim != embedding_dim:
+            problems.append(
+                f"dimension {self.embedding_dim} au lieu de {embedding_dim}"
+            )
+        if not np.isfinite(self.embeddings).all():
+            problems.append("embeddings non finis")
+        if symbols is not None:
+            missing = sorted(set(symbols) - set(self.symbols))
+            if missing:
+                problems.append(f"symboles sans embedding : {', '.join(missing)}")
+        return problems
+
+
+def _write_index(templates_dir: Path, header: Dict):
+    """Écrit index.json de manière atomique."""
+    tmp_path = templates_dir / (INDEX_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, templates_dir / INDEX_FILE)
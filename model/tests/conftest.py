@@ -38,6 +38,36 @@ def templates_dir(test_data_dir):
     return templates_dir
 
 
+@pytest.fixture
+def random_images():
+    """
+    Fixture pour écrire des arborescences d'images aléatoires 64x64.
+
+    Retourne write(root, layout, pattern) : layout associe un dossier relatif
+    (ex. "train/cercle") au nombre d'images à y écrire, nommées selon pattern
+    (champs category, nom du dossier, et i). Les pixels sont tirés d'un même
+    générateur de graine 0, dans l'ordre de layout ; write retourne les chemins
+    écrits, relatifs à root.
+    """
+    import numpy as np
+    from PIL import Image
+
+    def write(root, layout, pattern="{category}_{i}.png"):
+        rng = np.random.default_rng(0)
+        paths = []
+        for folder, count in layout.items():
+            (root / folder).mkdir(parents=True, exist_ok=True)
+            category = Path(folder).name
+            for i in range(count):
+                path = f"{folder}/{pattern.format(category=category, i=i)}"
+                pixels = rng.integers(0, 256, (64, 64), dtype=np.uint8)
+                Image.fromarray(pixels).save(root / path)
+                paths.append(path)
+        return paths
+
+    return write
+
+
 @pytest.fixture
 def debug_dir(test_data_dir):
     """Fixture pour le répertoire de debug"""
@@ -0,0 +1,64 @@
+import torch
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+from model.batch_augment import BatchAugmenter
+from model.siamese_model import ContrastiveLoss, SiameseNetwork
+from model.train_siamese import SiameseTrainer
+
+
+def make_batch(n=8):
+    """Crée un batch de carrés noirs sur fond blanc, normalisé dans [-1, 1]"""
+    images = torch.ones(n, 1, 64, 64)
+    images[:, :, 20:44, 20:44] = -1.0
+    return images
+
+
+class TestBatchAugmenter:
+    def test_shape_and_range(self):
+        """Test que le batch augmenté garde sa forme et sa plage de valeurs"""
+        images = make_batch()
+        augmented = BatchAugmenter(p=1.0, seed=0)(images)
+
+        assert augmented.shape == images.shape
+        assert augmented.dtype == images.dtype
+        assert augmented.min() >= -1.0 and augmented.max() <= 1.0
+        assert not torch.allclose(augmented, images)
+
+    def test_identity_when_disabled(self):
+        """Test qu'aucune transformation n'est appliquée avec p=0"""
+        images = make_batch()
+        augmented = BatchAugmenter(p=0.0, seed=0)(images)
+
+        assert torch.allclose(augmented, images, atol=1e-5)
+
+    def test_background_stays_white(self):
+        """Test que rotation et déformation ne noircissent pas les bords"""
+        augmented = BatchAugmenter(p=1.0, noise_sigma=0.0, seed=0)(make_batch())
+
+        assert torch.allclose(augmented[:, :, :4, :], torch.ones(1), atol=1e-5)
+
+    def test_reproducible_and_fresh(self):
+        """Test la reproductibilité par graine et le renouvellement des variantes"""
+        images = make_batch()
+        augmenter = BatchAugmenter(p=1.0, seed=1)
+        first = augmenter(images)
+        second = augmenter(images)
+
+        assert torch.equal(first, BatchAugmenter(p=1.0, seed=1)(images))
+        assert not torch.equal(first, second)
+
+    def test_trainer_with_augmenter(self, model_dir):
+        """Test une époque d'entraînement avec augmentation par batch"""
+        dataset = TensorDataset(make_batch(), make_batch(), torch.ones(8))
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+            augmenter=BatchAugmenter(seed=0),
+        )
+
+        assert trainer.train_epoch(DataLoader(dataset, batch_size=4)) >= 0
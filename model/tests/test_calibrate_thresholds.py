@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageDraw
+
+from model.calibrate_thresholds import calibrate, calibrate_predictor, pr_sweep
+from model.evaluate_siamese import SiameseEvaluator
+from model.infer_siamese import SiamesePredictor
+from model.siamese_model import SiameseNetwork
+from model.template_index import TemplateIndex
+
+
+def brute_force_best(scores, correct, positives):
+    """Meilleur seuil par essai de toutes les valeurs de score"""
+    best = (-1.0, None)
+    for threshold in np.unique(scores):
+        accepted = scores >= threshold
+        tp = (accepted & correct).sum()
+        precision = tp / accepted.sum()
+        recall = tp / max(positives, 1)
+        f1 = 2 * precision * recall / (precision + recall) if tp else 0.0
+        if f1 > best[0] or (f1 == best[0] and threshold > best[1]):
+            best = (f1, threshold)
+    return best
+
+
+def test_pr_sweep_matches_brute_force():
+    rng = np.random.default_rng(0)
+    n = 300
+    groups = rng.integers(0, 4, n)
+    # Scores arrondis pour créer des ex æquo
+    scores = np.round(rng.random(n), 2)
+    correct = rng.random(n) < scores
+    positives = np.bincount(groups[correct], minlength=4) + 3
+
+    found, thresholds, f1 = pr_sweep(scores, groups, correct, positives)
+
+    assert found.tolist() == [0, 1, 2, 3]
+    for group, threshold, score in zip(found, thresholds, f1):
+        in_group = groups == group
+        expected_f1, _ = brute_force_best(
+            scores[in_group], correct[in_group], positives[group]
+        )
+        assert score == pytest.approx(expected_f1)
+        # Le seuil retenu atteint bien ce F1
+        accepted = scores[in_group] >= threshold
+        tp = (accepted & correct[in_group]).sum()
+        recall = tp / positives[group]
+        precision = tp / accepted.sum()
+        assert 2 * precision * recall / (precision + recall) == pytest.approx(score)
+
+
+def test_calibrate_per_symbol_thresholds():
+    names = ["a", "b"]
+    # Colonne a : les vrais "a" ont une similarité >= 0.8, les intrus 0.7 au plus
+    similarities = np.array(
+        [
+            [0.90, 0.1],
+            [0.85, 0.1],
+            [0.80, 0.2],
+            [0.70, 0.1],  # inconnu proche de a
+            [0.65, 0.3],  # b mal classé
+            [0.1, 0.60],
+            [0.1, 0.55],
+            [0.2, 0.50],
+        ]
+    )
+    labels = ["a", "a", "a", "inconnu", "b", "b", "b", "b"]
+
+    thresholds, default, f1 = calibrate(names, similarities, labels, min_samples=3)
+
+    assert thresholds["a"] == pytest.approx(0.80)
+    assert thresholds["b"] == pytest.approx(0.50)
+    assert f1["a"] == pytest.approx(1.0)
+    assert default is not None
+
+    # Un symbole avec trop peu d'exemples garde le seuil global
+    thresholds, _, _ = calibrate(names, similarities, labels, min_samples=4)
+    assert "a" not in thresholds and "b" in thresholds
+
+
+def test_calibrate_predictor_stores_thresholds(device, templates_dir, mocker):
+    torch.manual_seed(0)
+    for name, draw_shape in [("carre", "rectangle"), ("rond", "ellipse")]:
+        img = Image.new("L", (100, 100), color=255)
+        getattr(ImageDraw.Draw(img), draw_shape)([25, 25, 75, 75], fill=0)
+        (templates_dir / name).mkdir()
+        img.save(templates_dir / name / "template.png")
+
+    predictor = SiamesePredictor(SiameseNetwork(), device)
+    predictor.checkpoint = "checkpoint"
+    predictor.load_templates(templates_dir)
+
+    images, labels = [], []
+    for i in range(6):
+        for name, draw_shape in [("carre", "rectangle"), ("rond", "ellipse")]:
+            img = Image.new("L", (100, 100), color=255)
+            getattr(ImageDraw.Draw(img), draw_shape)([20 + i, 25, 75, 70 + i], fill=0)
+            images.append(img)
+            labels.append(name)
+
+    embed_images = mocker.spy(predictor, "embed_images")
+    thresholds, default = calibrate_predictor(
+        predictor, images, labels, templates_dir, min_samples=3
+    )
+    embed_images.assert_called_once()
+
+    index = TemplateIndex.load(templates_dir)
+    assert index.thresholds == thresholds
+    assert index.default_threshold == default
+
+    # Au redémarrage, les seuils sont relus avec le cache
+    restarted = SiamesePredictor(predictor.model, device)
+    restarted.checkpoint = "checkpoint"
+    restarted.load_templates(templates_dir)
+    assert restarted.symbol_thresholds == thresholds
+    assert restarted.similarity_threshold == default
+    for name, threshold in thresholds.items():
+        assert restarted.threshold_for(name) == threshold
+    assert restarted.threshold_for("absent") == default
+
+
+def test_evaluator_uses_inference_scale(device):
+    """La similarité d'évaluation ne dépend plus de la plus grande distance"""
+    evaluator = SiameseEvaluator(SiameseNetwork(), device)
+    distances = np.array([0.2, 0.4, 1.0, 1.2])
+    labels = np.array([1, 1, 0, 0])
+
+    threshold, f1 = evaluator.find_optimal_threshold(distances, labels)
+    assert f1 == pytest.approx(1.0)
+    assert threshold == pytest.approx(1 - 0.4 / 2)
+    threshold_scaled, _ = evaluator.find_optimal_threshold(
+        np.append(distances, 1.8), np.append(labels, 0)
+    )
+    assert threshold_scaled == pytest.approx(threshold)
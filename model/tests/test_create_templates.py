@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageDraw
+
+from model.create_templates import (
+    create_normalized_templates,
+    select_medoid,
+    verify_templates,
+)
+from model.infer_siamese import SiamesePredictor
+from model.siamese_model import SiameseNetwork
+from model.template_index import EMBEDDINGS_FILE, TemplateIndex, checkpoint_fingerprint
+
+
+def _draw(path, box, ellipse=False):
+    img = Image.new("L", (100, 100), color=255)
+    draw = ImageDraw.Draw(img)
+    (draw.ellipse if ellipse else draw.rectangle)(box, fill=0)
+    img.save(path)
+
+
+@pytest.fixture
+def dataset_dir(test_data_dir):
+    """Deux symboles de trois images chacun"""
+    dataset_dir = test_data_dir / "train"
+    for symbol, ellipse in [("carre", False), ("rond", True)]:
+        symbol_dir = dataset_dir / symbol
+        symbol_dir.mkdir(parents=True)
+        for i, box in enumerate([[30, 30, 70, 70], [20, 25, 75, 80], [35, 30, 65, 72]]):
+            _draw(symbol_dir / f"{i}.png", box, ellipse)
+    return dataset_dir
+
+
+@pytest.fixture
+def checkpoint(model_dir):
+    torch.manual_seed(0)
+    model = SiameseNetwork()
+    model_path = model_dir / "best_model.pth"
+    torch.save({"epoch": 1, "model_state_dict": model.state_dict()}, model_path)
+    return model_path
+
+
+def test_select_medoid():
+    embeddings = np.array([[0.0, 0.0], [1.0, 0.0], [0.4, 0.1], [5.0, 5.0]])
+    # Centroïde (1.6, 1.275) : le point (1, 0) est le plus proche
+    assert select_medoid(embeddings) == 1
+
+
+def test_create_templates_writes_cache(dataset_dir, templates_dir, checkpoint):
+    create_normalized_templates(dataset_dir, templates_dir, checkpoint, batch_size=2)
+
+    for symbol in ["carre", "rond"]:
+        template = Image.open(templates_dir / symbol / "template.png")
+        assert template.size == (64, 64)
+
+    index = TemplateIndex.load(templates_dir)
+    assert index.symbols == ["carre", "rond"]
+    assert index.embeddings.shape == (2, 128)
+    assert index.checkpoint == checkpoint_fingerprint(checkpoint)
+    assert verify_templates(templates_dir, dataset_dir, checkpoint) == ([], [])
+
+
+def test_create_templates_without_model(dataset_dir, templates_dir, model_dir):
+    create_normalized_templates(dataset_dir, templates_dir, model_dir / "absent.pth")
+
+    assert (templates_dir / "carre" / "template.png").exists()
+    assert TemplateIndex.load(templates_dir) is None
+
+
+def test_verify_templates_detects_stale_cache(
+    dataset_dir, templates_dir, checkpoint, model_dir
+):
+    create_normalized_templates(dataset_dir, templates_dir, checkpoint)
+
+    # Un autre checkpoint invalide le cache
+    other = model_dir / "other.pth"
+    torch.save({"epoch": 2, "model_state_dict": SiameseNetwork().state_dict()}, other)
+    missing, invalid = verify_templates(templates_dir, dataset_dir, other)
+    assert missing == []
+    assert invalid == ["carre", "rond"]
+
+
+def test_predictor_uses_cache(dataset_dir, templates_dir, checkpoint, device, mocker):
+    create_normalized_templates(dataset_dir, templates_dir, checkpoint)
+    state = torch.load(checkpoint)["model_state_dict"]
+    model = SiameseNetwork()
+    model.load_state_dict(state)
+
+    predictor = SiamesePredictor(model, device)
+    predictor.checkpoint = checkpoint_fingerprint(checkpoint)
+    embed_images = mocker.spy(predictor, "embed_images")
+    predictor.load_templates(templates_dir)
+
+    embed_images.assert_not_called()
+    assert predictor.template_symbols == ["carre", "rond"]
+
+    # Le cache correspond aux embeddings recalculés
+    uncached = SiamesePredictor(model, device)
+    uncached.load_templates(templates_dir)
+    assert torch.allclose(
+        predictor.template_matrix.cpu(), uncached.template_matrix.cpu(), atol=1e-5
+    )
+
+    symbol, similarity = predictor.find_closest_symbol(dataset_dir / "rond" / "0.png")
+    assert symbol in ["carre", "rond"]
+    assert 0 <= similarity <= 1
+
+
+def test_template_index_append_and_truncation(templates_dir):
+    rows = [{"symbol": "a", "source": "a.png", "file": "a/template.png"}]
+    index = TemplateIndex(np.ones((1, 4), dtype=np.float32), rows, checkpoint="x")
+    index.save(templates_dir)
+
+    # Un ajout interrompu (données écrites, index non mis à jour) est ignoré
+    with open(templates_dir / EMBEDDINGS_FILE, "ab") as f:
+        f.write(b"\0" * 7)
+    assert len(TemplateIndex.load(templates_dir)) == 1
+
+    new_row = {"symbol": "b", "source": "b.png", "file": "b/template.png"}
+    index.append(templates_dir, np.full((1, 4), 2.0), [new_row])
+    loaded = TemplateIndex.load(templates_dir)
+    assert loaded.symbols == ["a", "b"]
+    np.testing.assert_array_equal(loaded.embeddings[1], np.full(4, 2.0))
+    assert loaded.validate(symbols=["a", "b"], checkpoint="x") == []
+    assert loaded.validate(symbols=["c"], checkpoint="y") != []
+
+    # Un fichier d'embeddings tronqué est détecté
+    with open(templates_dir / EMBEDDINGS_FILE, "r+b") as f:
+        f.truncate(20)
+    with pytest.raises(ValueError):
+        TemplateIndex.load(templates_dir)
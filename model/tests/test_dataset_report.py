@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from model.dataset_report import (
+    REPORT_HTML,
+    REPORT_JSON,
+    DatasetStats,
+    class_weights,
+    generate_report,
+    iter_chunks,
+)
+from model.generate_pairs import PairGenerator
+from model.packed_dataset import pack_directory
+
+
+@pytest.fixture
+def dataset_dir(test_data_dir, random_images):
+    """Classes déséquilibrées, avec un doublon exact partagé entre train et test"""
+    dataset_dir = test_data_dir / "dataset"
+    random_images(dataset_dir, {"train/cercle": 6, "train/croix": 2, "test/cercle": 1})
+    duplicate = Image.open(dataset_dir / "train" / "cercle" / "cercle_0.png")
+    duplicate.save(dataset_dir / "test" / "cercle" / "cercle_copie.png")
+    return dataset_dir
+
+
+def test_class_weights():
+    weights = class_weights({"a": 6, "b": 2, "vide": 0})
+    assert weights == {"a": pytest.approx(8 / 12), "b": pytest.approx(2.0)}
+
+
+def test_streaming_matches_full_pass(dataset_dir):
+    """Les statistiques par blocs sont identiques à un calcul en une fois"""
+    stats = DatasetStats()
+    all_images = []
+    for images, labels, splits in iter_chunks(dataset_dir, chunk_size=3):
+        assert len(images) <= 3
+        stats.update(images, labels, splits)
+        all_images.append(np.array(images))
+    all_images = np.concatenate(all_images) / 255.0
+
+    report = stats.report()
+    assert report["images"] == 10
+    assert report["splits"] == {
+        "test": {"cercle": 2},
+        "train": {"cercle": 6, "croix": 2},
+    }
+    assert report["intensity"]["mean"] == pytest.approx(all_images.mean())
+    assert report["intensity"]["std"] == pytest.approx(all_images.std())
+    assert sum(report["intensity"]["histogram"]) == 10 * 64 * 64
+    assert report["classes"]["croix"]["count"] == 2
+    assert report["class_weights"]["croix"] == pytest.approx(2.0)
+
+    duplicates = report["duplicates"]
+    assert duplicates["duplicates"] == 1
+    assert duplicates["cross_split_clusters"] == 1
+    assert duplicates["per_class"]["croix"] == 0.0
+
+
+def test_generate_report_from_directory_and_pack(dataset_dir, test_data_dir):
+    report = generate_report(dataset_dir, test_data_dir / "report", chunk_size=4)
+    assert (test_data_dir / "report" / REPORT_HTML).read_text().count("<tr>") == 3
+    with open(test_data_dir / "report" / REPORT_JSON) as f:
+        assert json.load(f) == report
+
+    pack_directory(dataset_dir, test_data_dir / "dataset.pack")
+    packed_report = generate_report(
+        test_data_dir / "dataset.pack", test_data_dir / "report_pack", chunk_size=4
+    )
+    assert packed_report["splits"] == report["splits"]
+    assert packed_report["intensity"]["mean"] == pytest.approx(
+        report["intensity"]["mean"]
+    )
+
+
+def test_pair_generator_class_weights(dataset_dir, test_data_dir):
+    """Les paires positives sont réparties selon les poids de classes"""
+    generator = PairGenerator(
+        dataset_dir,
+        test_data_dir / "pairs",
+        ["train"],
+        class_weights={"cercle": 1.0, "croix": 3.0},
+    )
+    generator.generate_pairs_for_split("train", pairs_per_category=10)
+
+    pairs = pd.read_csv(test_data_dir / "pairs" / "train_pairs.csv")
+    positives = pairs[pairs["same_symbol"] == 1]
+    croix = positives["image1_path"].str.contains("croix").sum()
+    # Poids normalisés : 0.5 et 1.5 -> 5 et 15 paires positives
+    assert croix == 15
+    assert len(positives) == 20
+    assert (pairs["same_symbol"] == 0).sum() == 20
@@ -0,0 +1,122 @@
+import json
+import logging
+import random
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from model.dedup import (
+    BKTree,
+    compute_hashes,
+    find_duplicate_clusters,
+    hamming_distance,
+)
+from model.split_dataset import MANIFEST_NAME, DatasetSplitter
+
+
+def make_drawings(n=20, seed=0):
+    """Crée n dessins distincts (segments aléatoires) de 64x64"""
+    rng = np.random.default_rng(seed)
+    images = np.full((n, 64, 64), 255, dtype=np.uint8)
+    for image in images:
+        for _ in range(4):
+            x1, y1, x2, y2 = (int(v) for v in rng.integers(4, 60, 4))
+            cv2.line(image, (x1, y1), (x2, y2), 0, 3)
+    return images
+
+
+class TestHashes:
+    @pytest.mark.parametrize("method", ["dhash", "phash"])
+    def test_near_duplicates_are_close(self, method):
+        """Test qu'une légère variation change peu l'empreinte"""
+        images = make_drawings()
+        shifted = np.roll(images[0], 1, axis=1)
+        hashes = compute_hashes(np.concatenate([images, shifted[None]]), method)
+
+        assert hashes.dtype == np.uint64
+        near = hamming_distance(hashes[0], hashes[-1])
+        others = hamming_distance(hashes[0], hashes[1:-1])
+        assert near <= 10
+        assert near < others.min()
+
+    def test_hamming_distance(self):
+        """Test le popcount vectorisé"""
+        a = np.array([0, 0b1011, 2**63], dtype=np.uint64)
+
+        assert hamming_distance(a, np.uint64(0)).tolist() == [0, 3, 1]
+
+    def test_bk_tree_matches_brute_force(self):
+        """Test que le BK-tree retrouve exactement les voisins de la recherche exhaustive"""
+        rng = np.random.default_rng(1)
+        base = rng.integers(0, 2**63, 50, dtype=np.uint64)
+        flips = np.uint64(1) << rng.integers(0, 64, 50).astype(np.uint64)
+        hashes = np.concatenate([base, base ^ flips])
+        tree = BKTree()
+        for i, value in enumerate(hashes.tolist()):
+            tree.add(value, i)
+
+        for query in hashes[:10].tolist():
+            expected = np.flatnonzero(hamming_distance(hashes, np.uint64(query)) <= 4)
+            assert sorted(tree.query(query, 4)) == expected.tolist()
+
+    def test_clusters(self):
+        """Test le regroupement transitif des quasi-doublons"""
+        hashes = np.array([0b0, 0b1, 0b11, 2**40 - 1, 0b0], dtype=np.uint64)
+        labels = find_duplicate_clusters(hashes, max_distance=1)
+
+        assert labels[0] == labels[1] == labels[2] == labels[4]
+        assert labels[3] != labels[0]
+
+
+class TestDedupSplit:
+    def test_duplicates_stay_together(self, test_data_dir):
+        """Test que les copies d'un même dessin sont dans le même split"""
+        input_dir = test_data_dir / "normalized" / "symbole"
+        input_dir.mkdir(parents=True)
+        images = make_drawings(10)
+        for i, image in enumerate(images):
+            cv2.imwrite(str(input_dir / f"img_{i:02d}.png"), image)
+            cv2.imwrite(str(input_dir / f"img_{i:02d}_copie.png"), np.roll(image, 1, 0))
+
+        output_dir = test_data_dir / "dataset"
+        DatasetSplitter(
+            input_dir.parent, output_dir, mode="manifest", dedup_distance=6
+        ).process_dataset()
+
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+        category = manifest["categories"][0]
+        split_of = {
+            path.split("/")[-1]: split
+            for split in ["train", "val", "test"]
+            for path in category[split]
+        }
+        assert len(split_of) == 20
+        for i in range(10):
+            assert split_of[f"img_{i:02d}.png"] == split_of[f"img_{i:02d}_copie.png"]
+        assert manifest["dedup"] == {"method": "phash", "max_distance": 6}
+
+    def test_clusters_fill_the_split_furthest_below_target(self, test_data_dir):
+        """Test qu'un grand cluster mélangé en dernier ne vide pas val et test"""
+        splitter = DatasetSplitter(test_data_dir, test_data_dir / "dataset")
+        files = [Path(f"img_{i:02d}.png") for i in range(10)]
+        labels = [0] * 8 + [1, 2]
+
+        train, val, test = splitter.split_clusters(files, labels, random.Random(0))
+
+        assert train == files[:8]
+        assert sorted(val + test) == files[8:]
+        assert len(val) == len(test) == 1
+
+    def test_empty_split_is_logged(self, test_data_dir, caplog):
+        """Test l'avertissement quand un seul cluster regroupe tous les fichiers"""
+        splitter = DatasetSplitter(test_data_dir, test_data_dir / "dataset")
+        files = [Path(f"img_{i:02d}.png") for i in range(10)]
+
+        with caplog.at_level(logging.WARNING):
+            train, val, test = splitter.split_clusters(files, [0] * 10)
+
+        assert (train, val, test) == (files, [], [])
+        assert "Split val vide" in caplog.text
+        assert "Split test vide" in caplog.text
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageDraw
+
+from model.drift_monitor import (
+    MIN_SAMPLES,
+    REFERENCE_FILE,
+    DriftMonitor,
+    EmbeddingLog,
+    _write_json,
+    build_reference,
+    compute_drift,
+    embedding_statistics,
+    start_monitor,
+)
+from model.infer_siamese import SiamesePredictor
+from model.siamese_model import SiameseNetwork
+
+
+def test_ring_buffer_keeps_latest(tmp_path):
+    log = EmbeddingLog(capacity=4, embedding_dim=3, top_k=2)
+    for i in range(6):
+        log.record(np.full(3, i, dtype=np.float32), [0.9, 0.5, 0.1])
+
+    embeddings, scores, timestamps = log.snapshot()
+    assert len(log) == 4 and log.total == 6
+    # Du plus ancien au plus récent, les deux premiers ont été écrasés
+    assert embeddings[:, 0].tolist() == [2, 3, 4, 5]
+    assert scores.shape == (4, 2)
+    assert (np.diff(timestamps) >= 0).all()
+
+
+def test_flush_and_reopen(tmp_path):
+    log = EmbeddingLog(capacity=5, embedding_dim=3, top_k=2, checkpoint="abc")
+    for i in range(3):
+        log.record(np.full(3, i, dtype=np.float32), [0.8])
+    log.flush(tmp_path)
+    # Seules les nouvelles détections sont recopiées, y compris après un tour
+    for i in range(3, 8):
+        log.record(np.full(3, i, dtype=np.float32), [0.7, 0.6])
+    log.flush(tmp_path)
+
+    reopened = EmbeddingLog.open(tmp_path, 5, 3, top_k=2, checkpoint="abc")
+    assert reopened.total == 8
+    expected = log.snapshot()
+    for restored, original in zip(reopened.snapshot(), expected):
+        np.testing.assert_array_equal(restored, original)
+
+    # Un tampon d'un autre checkpoint n'est pas relu
+    other = EmbeddingLog.open(tmp_path, 5, 3, top_k=2, checkpoint="def")
+    assert other.total == 0
+
+
+def test_compute_drift():
+    rng = np.random.default_rng(0)
+    train = rng.normal(size=(500, 16)).astype(np.float32)
+    train_scores = np.stack([rng.uniform(0.7, 1.0, 500), rng.uniform(0.3, 0.6, 500)], 1)
+    reference = embedding_statistics(train, train_scores)
+
+    same = compute_drift(reference, rng.normal(size=(200, 16)), train_scores[:200])
+    assert not same["drift_detected"]
+    assert same["score_psi"] < 0.1
+
+    # Nouvelle famille de symboles : scores bas et écart faible
+    unknown_scores = np.stack([rng.uniform(0.3, 0.5, 200)] * 2, 1)
+    unknown = compute_drift(reference, rng.normal(size=(200, 16)), unknown_scores)
+    assert unknown["drift_detected"]
+    assert unknown["top1_mean"] < unknown["reference_top1_mean"]
+    assert unknown["margin_mean"] == pytest.approx(0.0)
+
+    # Photos dégradées : embeddings déplacés
+    shifted = compute_drift(
+        reference, rng.normal(loc=1.0, size=(200, 16)), train_scores[:200]
+    )
+    assert shifted["drift_detected"]
+    assert shifted["centroid_shift"] > 0.5
+
+
+def test_monitor_waits_for_samples(tmp_path):
+    log = EmbeddingLog(100, 4, top_k=2)
+    reference = embedding_statistics(np.zeros((10, 4)), np.ones((10, 2)))
+    monitor = DriftMonitor(log, reference, tmp_path)
+
+    for _ in range(MIN_SAMPLES - 1):
+        log.record(np.zeros(4), [1.0, 1.0])
+    assert monitor.run_once()["drift"] is None
+    log.record(np.zeros(4), [1.0, 1.0])
+    assert monitor.run_once()["drift"] is not None
+    assert (tmp_path / "state.json").exists()
+
+
+def test_predictor_logs_detections(device, templates_dir, sample_image, tmp_path):
+    torch.manual_seed(0)
+    for name, draw_shape in [("carre", "rectangle"), ("rond", "ellipse")]:
+        img = Image.new("L", (100, 100), color=255)
+        getattr(ImageDraw.Draw(img), draw_shape)([25, 25, 75, 75], fill=0)
+        (templates_dir / name).mkdir()
+        img.save(templates_dir / name / "template.png")
+
+    predictor = SiamesePredictor(SiameseNetwork(), device)
+    predictor.load_templates(templates_dir)
+    reference = build_reference(predictor, [Image.open(sample_image)] * 3)
+    _write_json(templates_dir / REFERENCE_FILE, reference)
+
+    monitor = start_monitor(predictor, tmp_path / "monitoring", interval=3600)
+    try:
+        assert monitor.reference == reference
+        prediction = predictor.predict(sample_image)
+    finally:
+        monitor.stop()
+
+    embeddings, scores, _ = monitor.log.snapshot()
+    assert monitor.log.total == 1
+    expected = predictor.embed(predictor.preprocess_image(Image.open(sample_image)))
+    np.testing.assert_allclose(embeddings[0], expected[0].numpy(), atol=1e-5)
+    assert scores[0, 0] == pytest.approx(prediction["similarity_score"])
+    assert scores[0, 0] >= scores[0, 1]
+    assert (tmp_path / "monitoring" / "embeddings.f32").exists()
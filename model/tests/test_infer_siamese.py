@@ -3,7 +3,7 @@ from pathlib import Path
 import numpy as np
 import pytest
 import torch
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from model.infer_siamese import SiamesePredictor, load_templates, predict_symbol
 from model.siamese_model import SiameseNetwork
@@ -58,6 +58,37 @@ class TestSiamesePredictor:
         assert 0 <= similarity <= 1  # La similarité doit être entre 0 et 1
         assert similarity > 0.9  # Images identiques doivent avoir une forte similarité
 
+    @pytest.mark.parametrize(
+        "precision,channels_last,min_cosine",
+        [("fp32", True, 0.9999), ("bf16", False, 0.99), ("bf16", True, 0.99)],
+    )
+    def test_embedding_parity(self, precision, channels_last, min_cosine):
+        """Test la parité des embeddings bf16 / channels_last avec fp32 NCHW"""
+        torch.manual_seed(0)
+        device = torch.device("cpu")
+        reference_model = SiameseNetwork()
+        model = SiameseNetwork()
+        model.load_state_dict(reference_model.state_dict())
+
+        reference = SiamesePredictor(reference_model, device)
+        predictor = SiamesePredictor(
+            model, device, precision=precision, channels_last=channels_last
+        )
+
+        batch = torch.rand(16, 1, 64, 64) * 2 - 1
+        expected = reference.embed(batch)
+        embeddings = predictor.embed(batch)
+
+        assert embeddings.dtype == torch.float32
+        assert embeddings.shape == expected.shape
+        cosine = torch.nn.functional.cosine_similarity(embeddings, expected)
+        assert cosine.min().item() >= min_cosine
+
+    def test_invalid_precision(self, device):
+        """Test le refus d'une précision inconnue"""
+        with pytest.raises(ValueError):
+            SiamesePredictor(SiameseNetwork(), device, precision="fp8")
+
     def test_find_closest_symbol(self, device, sample_image, templates_dir):
         """Test la recherche du symbole le plus proche"""
         model = SiameseNetwork()
@@ -103,6 +134,88 @@ class TestSiamesePredictor:
         assert "is_confident" in prediction
         assert isinstance(prediction["is_confident"], bool)
 
+    def test_add_templates(self, device, sample_image, templates_dir, mocker):
+        """Test l'ajout incrémental de templates (mémoire, dossier et cache)"""
+        from model.template_index import TemplateIndex
+
+        template_dir = templates_dir / "test_symbol"
+        template_dir.mkdir(exist_ok=True)
+        Image.open(sample_image).save(template_dir / "template.png")
+
+        predictor = SiamesePredictor(SiameseNetwork(), device)
+        predictor.checkpoint = "checkpoint"
+        predictor.load_templates(templates_dir)
+        assert len(TemplateIndex.load(templates_dir)) == 1
+
+        # Seules les nouvelles images sont encodées
+        embed_images = mocker.spy(predictor, "embed_images")
+        circle = Image.new("L", (100, 100), color=255)
+        ImageDraw.Draw(circle).ellipse([20, 20, 80, 80], fill=0)
+        added = predictor.add_templates(
+            "nouveau", [circle, circle.copy()], ["a.png", "b.png"]
+        )
+
+        assert added == 2
+        assert len(embed_images.call_args[0][0]) == 2
+        assert predictor.template_symbols == ["test_symbol", "nouveau", "nouveau"]
+        assert predictor.template_matrix.shape[0] == 3
+        assert (templates_dir / "nouveau" / "template.png").exists()
+        assert (templates_dir / "nouveau" / "template_1.png").exists()
+
+        index = TemplateIndex.load(templates_dir)
+        assert index.symbols == ["test_symbol", "nouveau", "nouveau"]
+        assert [row["source"] for row in index.rows[1:]] == ["a.png", "b.png"]
+
+        # Un redémarrage relit le cache sans réencoder les templates
+        restarted = SiamesePredictor(predictor.model, device)
+        restarted.checkpoint = "checkpoint"
+        restarted_embed = mocker.spy(restarted, "embed_images")
+        restarted.load_templates(templates_dir)
+        restarted_embed.assert_not_called()
+        assert restarted.template_symbols == index.symbols
+        assert torch.allclose(
+            restarted.template_matrix.cpu(), predictor.template_matrix.cpu()
+        )
+        symbol, _ = restarted.find_closest_symbol(sample_image)
+        assert symbol in ["test_symbol", "nouveau"]
+
+    def test_add_templates_failure_leaves_no_file(
+        self, device, sample_image, templates_dir, mocker
+    ):
+        """Test qu'un cache illisible ou un ajout en échec n'écrit aucune image"""
+        from model.template_index import EMBEDDINGS_FILE, TemplateIndex
+
+        template_dir = templates_dir / "test_symbol"
+        template_dir.mkdir(exist_ok=True)
+        Image.open(sample_image).save(template_dir / "template.png")
+        predictor = SiamesePredictor(SiameseNetwork(), device)
+        predictor.checkpoint = "checkpoint"
+        predictor.load_templates(templates_dir)
+        circle = Image.new("L", (100, 100), color=255)
+        ImageDraw.Draw(circle).ellipse([20, 20, 80, 80], fill=0)
+
+        # Ajout au cache en échec : les images écrites sont supprimées
+        mocker.patch.object(TemplateIndex, "append", side_effect=OSError("disque"))
+        with pytest.raises(OSError):
+            predictor.add_templates("test_symbol", [circle])
+        with pytest.raises(OSError):
+            predictor.add_templates("nouveau", [circle])
+        assert sorted(p.name for p in template_dir.iterdir()) == ["template.png"]
+        assert not (templates_dir / "nouveau").exists()
+
+        # Cache tronqué : refusé avant toute écriture
+        (templates_dir / EMBEDDINGS_FILE).write_bytes(b"")
+        with pytest.raises(ValueError):
+            predictor.add_templates("nouveau", [circle])
+        assert not (templates_dir / "nouveau").exists()
+        assert predictor.template_symbols == ["test_symbol"]
+
+    def test_add_templates_rejects_invalid_symbol(self, device):
+        """Test le refus d'un nom de symbole qui sortirait du dossier des templates"""
+        predictor = SiamesePredictor(SiameseNetwork(), device)
+        with pytest.raises(ValueError):
+            predictor.add_templates("../evil", [Image.new("L", (64, 64))])
+
 
 def test_load_templates(device, templates_dir):
     """Test le chargement des templates"""
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+from PIL import Image, ImageDraw
+
+from model.infer_siamese import SiamesePredictor
+from model.localize import crop_regions, detect_symbols, ink_mask, propose_regions
+from model.siamese_model import SiameseNetwork
+
+SHAPES = {
+    "carre": [100, 100, 150, 150],
+    "rond": [200, 50, 250, 100],
+    "triangle": [(120, 250), (170, 250), (145, 200)],
+}
+
+
+@pytest.fixture
+def diagram():
+    """Schéma de verre : contour circulaire et trois symboles séparés"""
+    img = Image.new("L", (400, 400), color=255)
+    draw = ImageDraw.Draw(img)
+    draw.ellipse([5, 5, 395, 395], outline=0, width=3)
+    draw.rectangle(SHAPES["carre"], fill=0)
+    draw.ellipse(SHAPES["rond"], fill=0)
+    draw.polygon(SHAPES["triangle"], fill=0)
+    draw.line([300, 300, 390, 300], fill=0, width=2)  # Trait de cote
+    return img
+
+
+@pytest.fixture
+def predictor(device, templates_dir):
+    torch.manual_seed(0)
+    for name, shape in SHAPES.items():
+        img = Image.new("L", (100, 100), color=255)
+        draw = ImageDraw.Draw(img)
+        if name == "triangle":
+            draw.polygon([(x - 95, y - 175) for x, y in shape], fill=0)
+        elif name == "rond":
+            draw.ellipse([25, 25, 75, 75], fill=0)
+        else:
+            draw.rectangle([25, 25, 75, 75], fill=0)
+        (templates_dir / name).mkdir()
+        img.save(templates_dir / name / "template.png")
+
+    predictor = SiamesePredictor(SiameseNetwork(), device)
+    predictor.load_templates(templates_dir)
+    return predictor
+
+
+def test_propose_regions(diagram):
+    boxes = propose_regions(np.asarray(diagram))
+
+    # Le contour du verre et le trait de cote sont écartés
+    assert len(boxes) == 3
+    found = {tuple(box) for box in boxes.tolist()}
+    assert (100, 100, 51, 51) in found
+    for x, y, w, h in boxes.tolist():
+        assert w < 100 and h < 100
+
+
+def test_propose_regions_blank_image():
+    blank = np.full((100, 100), 255, dtype=np.uint8)
+    assert propose_regions(blank).shape == (0, 4)
+
+
+def test_crop_regions_excludes_neighbours():
+    image = np.full((60, 60), 255, dtype=np.uint8)
+    image[10:30, 10:30] = 0
+    image[10:30, 34:50] = 0
+    ink = ink_mask(image)
+    _, labels = cv2.connectedComponents(ink)
+    ids = np.array([labels[15, 15]])
+    # Boîte volontairement large qui recouvre le voisin
+    crops = crop_regions(ink, labels, ids, np.array([[5, 5, 50, 30]]))
+    crop = np.asarray(crops[0])
+    assert (crop[5:25, 5:25] == 0).all()
+    assert (crop[:, 29:] == 255).all()
+
+
+def test_detect_symbols_single_forward(predictor, diagram, mocker):
+    forward = mocker.spy(predictor.model, "forward_once")
+    detections = detect_symbols(predictor, diagram)
+
+    assert forward.call_count == 1
+    assert forward.call_args[0][0].shape[0] == 3
+    assert len(detections) == 3
+    assert set(d["symbol"] for d in detections) <= set(SHAPES)
+    similarities = [d["similarity"] for d in detections]
+    assert similarities == sorted(similarities, reverse=True)
+    for detection in detections:
+        assert len(detection["box"]) == 4
+        assert isinstance(detection["is_confident"], bool)
+
+
+def test_classify_embeddings_matches_single_image(predictor, templates_dir):
+    image = Image.open(templates_dir / "rond" / "template.png")
+    embedding = predictor.embed(predictor.preprocess_image(image))
+
+    [(symbol, similarity)] = predictor.classify_embeddings(embedding)
+    similarities = predictor.template_similarities(embedding)
+    assert symbol == max(similarities, key=similarities.get)
+    assert similarity == pytest.approx(similarities[symbol], abs=1e-5)
@@ -0,0 +1,120 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from model.normalize_drawings import (
+    MANIFEST_NAME,
+    center_and_resize,
+    create_augmented_image,
+    process_images_in_folder,
+)
+
+
+def write_drawings(folder, category, count=3):
+    """Écrit quelques dessins (cercles noirs sur fond blanc) dans une catégorie"""
+    category_dir = folder / category
+    category_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        image = np.full((120, 90), 255, dtype=np.uint8)
+        cv2.circle(image, (40 + i, 60), 20 + i, 0, 3)
+        cv2.imwrite(str(category_dir / f"{i}.png"), image)
+
+
+@pytest.fixture
+def input_dir(test_data_dir):
+    """Dossier d'entrée avec deux catégories"""
+    input_dir = test_data_dir / "raw"
+    write_drawings(input_dir, "cercle")
+    write_drawings(input_dir, "rond")
+    return input_dir
+
+
+class TestNormalizeDrawings:
+    def test_center_and_resize(self):
+        """Test le centrage du tracé dans un canevas carré"""
+        image = np.full((100, 50), 255, dtype=np.uint8)
+        image[10:30, 10:20] = 0
+        canvas = center_and_resize(image, output_size=64)
+
+        assert canvas.shape == (64, 64)
+        assert canvas.min() == 0 and canvas.max() == 255
+
+    def test_seeded_augmentation(self):
+        """Test la reproductibilité d'une augmentation avec un générateur dédié"""
+        image = np.full((40, 40), 255, dtype=np.uint8)
+        image[10:30, 10:30] = 0
+        first = create_augmented_image(image, rng=np.random.default_rng(0))
+        second = create_augmented_image(image, rng=np.random.default_rng(0))
+
+        assert np.array_equal(first, second)
+
+    def test_parallel_matches_serial(self, input_dir, test_data_dir):
+        """Test que la sortie ne dépend pas du nombre de processus"""
+        serial_dir = test_data_dir / "serial"
+        parallel_dir = test_data_dir / "parallel"
+        process_images_in_folder(input_dir, serial_dir, num_augmentations=2)
+        process_images_in_folder(
+            input_dir, parallel_dir, num_augmentations=2, num_workers=2
+        )
+
+        serial_files = sorted(p.name for p in serial_dir.rglob("*.png"))
+        assert len(serial_files) == 18
+        assert serial_files == sorted(p.name for p in parallel_dir.rglob("*.png"))
+        for name in ["cercle/cercle_01_aug1.png", "rond/rond_03_aug2.png"]:
+            assert (serial_dir / name).read_bytes() == (
+                parallel_dir / name
+            ).read_bytes()
+
+    def test_incremental_run(self, input_dir, test_data_dir):
+        """Test que seules les sources ajoutées, modifiées ou supprimées sont traitées"""
+        output_dir = test_data_dir / "normalized"
+        first = process_images_in_folder(input_dir, output_dir, num_augmentations=1)
+        assert first == {"processed": 6, "skipped": 0, "removed": 0}
+
+        write_drawings(input_dir, "triangle", count=2)
+        (input_dir / "rond" / "2.png").unlink()
+        second = process_images_in_folder(input_dir, output_dir, num_augmentations=1)
+
+        assert second == {"processed": 2, "skipped": 5, "removed": 1}
+        assert not (output_dir / "rond" / "rond_03.png").exists()
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+        assert len(manifest["files"]) == 7
+
+    def test_renumbered_sources_are_reprocessed(self, input_dir, test_data_dir):
+        """Test qu'un fichier inséré ne laisse pas de sortie écrasée à jour"""
+        output_dir = test_data_dir / "normalized"
+        process_images_in_folder(input_dir, output_dir, num_augmentations=1)
+        (input_dir / "rond" / "0.png").unlink()
+        # Trié entre 0.png et 1.png : décale les numéros de 1.png et 2.png
+        image = np.full((120, 90), 255, dtype=np.uint8)
+        cv2.rectangle(image, (20, 30), (70, 90), 0, 3)
+        cv2.imwrite(str(input_dir / "cercle" / "05.png"), image)
+
+        summary = process_images_in_folder(input_dir, output_dir, num_augmentations=1)
+        reference = test_data_dir / "reference"
+        process_images_in_folder(input_dir, reference, num_augmentations=1)
+
+        assert summary == {"processed": 5, "skipped": 1, "removed": 1}
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+        assert manifest["files"]["cercle/1.png"]["outputs"] == [
+            "cercle/cercle_03.png",
+            "cercle/cercle_03_aug1.png",
+        ]
+        assert not (output_dir / "rond" / "rond_03.png").exists()
+        outputs = sorted(p.relative_to(output_dir) for p in output_dir.rglob("*.png"))
+        assert outputs == sorted(
+            p.relative_to(reference) for p in reference.rglob("*.png")
+        )
+        for path in outputs:
+            assert (output_dir / path).read_bytes() == (reference / path).read_bytes()
+
+    def test_params_change_rebuilds(self, input_dir, test_data_dir):
+        """Test qu'un changement de paramètres invalide le manifeste"""
+        output_dir = test_data_dir / "normalized"
+        process_images_in_folder(input_dir, output_dir, num_augmentations=1)
+        summary = process_images_in_folder(input_dir, output_dir, num_augmentations=2)
+
+        assert summary["processed"] == 6
+        assert (output_dir / "cercle" / "cercle_01_aug2.png").exists()
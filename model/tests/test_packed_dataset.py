@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from model.generate_pairs import PairGenerator
+from model.image_store import IndexedPairDataset
+from model.packed_dataset import IMAGES_FILE, PackedDataset, pack_directory
+
+
+@pytest.fixture
+def dataset_dir(test_data_dir, random_images):
+    """Arborescence model/dataset/{split}/{classe}/*.png"""
+    dataset_dir = test_data_dir / "dataset"
+    random_images(
+        dataset_dir,
+        {
+            f"{split}/{category}": count
+            for split, count in [("train", 4), ("test", 2)]
+            for category in ["cercle", "croix"]
+        },
+    )
+    return dataset_dir
+
+
+class TestPackedDataset:
+    def test_pack_directory(self, dataset_dir, test_data_dir):
+        """Test la conversion et la relecture en memmap"""
+        packed = pack_directory(dataset_dir, test_data_dir / "dataset.pack")
+        reopened = PackedDataset(test_data_dir / "dataset.pack")
+
+        assert len(reopened) == 12
+        assert isinstance(reopened.images, np.memmap)
+        assert reopened.classes == ["cercle", "croix"]
+        assert reopened.split_names == ["test", "train"]
+        assert len(reopened.indices("train")) == 8
+        i = reopened.paths.index("train/croix/croix_1.png")
+        expected = np.asarray(Image.open(dataset_dir / "train/croix/croix_1.png"))
+        assert np.array_equal(reopened.images[i], expected)
+        assert reopened.classes[reopened.labels[i]] == "croix"
+        assert packed.paths == reopened.paths
+
+    def test_append_without_rewrite(self, dataset_dir, test_data_dir):
+        """Test l'ajout incrémental : seules les nouvelles images sont écrites"""
+        pack_path = test_data_dir / "dataset.pack"
+        pack_directory(dataset_dir, pack_path)
+        size_before = (pack_path / IMAGES_FILE).stat().st_size
+
+        new_dir = dataset_dir / "train" / "triangle"
+        new_dir.mkdir()
+        Image.new("L", (64, 64), 255).save(new_dir / "triangle_0.png")
+        packed = pack_directory(dataset_dir, pack_path)
+
+        assert len(packed) == 13
+        assert packed.classes[-1] == "triangle"
+        assert (pack_path / IMAGES_FILE).stat().st_size == size_before + 64 * 64
+        assert packed.images[-1].min() == 255
+
+    def test_interrupted_append_is_ignored(self, test_data_dir):
+        """Test qu'un ajout non publié dans l'en-tête est ignoré puis écrasé"""
+        packed = PackedDataset.create(test_data_dir / "x.pack", image_size=8)
+        packed.append(
+            np.zeros((2, 8, 8), np.uint8), ["a", "b"], ["train"] * 2, ["0", "1"]
+        )
+        with open(packed.path / IMAGES_FILE, "ab") as f:
+            f.write(b"\x01" * 100)  # écriture partielle d'un ajout interrompu
+
+        reopened = PackedDataset(packed.path)
+        assert len(reopened) == 2
+        reopened.append(np.full((1, 8, 8), 7, np.uint8), ["a"], ["test"], ["2"])
+        assert (reopened.path / IMAGES_FILE).stat().st_size == 3 * 64
+        assert reopened.images[2].max() == 7
+        assert reopened.paths == ["0", "1", "2"]
+
+    def test_append_validation(self, test_data_dir):
+        """Test le rejet des images de mauvaise taille et des splits inconnus"""
+        packed = PackedDataset.create(test_data_dir / "x.pack", image_size=8)
+        with pytest.raises(ValueError):
+            packed.append(np.zeros((1, 4, 4), np.uint8), ["a"], ["train"], ["0"])
+        with pytest.raises(ValueError):
+            packed.append(np.zeros((1, 8, 8), np.uint8), ["a"], ["autre"], ["0"])
+
+    def test_pairs_and_loader(self, dataset_dir, test_data_dir):
+        """Test la génération de paires et le chargement depuis le dataset packé"""
+        pack_path = test_data_dir / "dataset.pack"
+        pack_directory(dataset_dir, pack_path)
+        pairs_dir = test_data_dir / "pairs"
+        PairGenerator(
+            dataset_dir, pairs_dir, ["train"], packed=pack_path
+        ).generate_all_pairs(pairs_per_category=3)
+
+        pairs = pd.read_csv(pairs_dir / "train_pairs.csv")
+        assert pairs.iloc[:, 0].str.startswith("train/").all()
+        dataset = IndexedPairDataset(
+            PackedDataset(pack_path).image_store(), pairs_dir / "train_pairs.csv"
+        )
+        img1, img2, label = dataset[0]
+        assert len(dataset) == 12
+        assert img1.shape == (1, 64, 64)
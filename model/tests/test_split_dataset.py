@@ -0,0 +1,117 @@
+import json
+
+import pandas as pd
+import pytest
+
+from model.generate_pairs import PairGenerator
+from model.image_store import ImageStore
+from model.split_dataset import (
+    MANIFEST_NAME,
+    DatasetSplitter,
+    link_file,
+    load_split_manifest,
+)
+from model.train_siamese import PairDataset, get_transform
+
+
+@pytest.fixture
+def normalized_dir(test_data_dir, random_images):
+    """Dossier d'images normalisées : trois catégories de dix images"""
+    input_dir = test_data_dir / "normalized"
+    layout = {category: 10 for category in ["cercle", "croix", "triangle"]}
+    random_images(input_dir, layout, "{category}_{i:02d}.png")
+    return input_dir
+
+
+def split_names(output_dir, split):
+    return sorted(p.name for p in (output_dir / split).rglob("*.png"))
+
+
+class TestDatasetSplitter:
+    def test_deterministic_split(self, normalized_dir, test_data_dir):
+        """Test que deux séparations de même graine sont identiques"""
+        first = test_data_dir / "first"
+        second = test_data_dir / "second"
+        DatasetSplitter(
+            normalized_dir, first, mode="manifest", seed=1
+        ).process_dataset()
+        DatasetSplitter(
+            normalized_dir, second, mode="manifest", seed=1
+        ).process_dataset()
+
+        manifest = json.loads((first / MANIFEST_NAME).read_text())
+        assert manifest == json.loads((second / MANIFEST_NAME).read_text())
+        assert [len(c["train"]) for c in manifest["categories"]] == [7, 7, 7]
+
+    def test_link_mode(self, normalized_dir, test_data_dir):
+        """Test que le mode link crée des liens physiques et nettoie les anciens splits"""
+        output_dir = test_data_dir / "dataset"
+        DatasetSplitter(
+            normalized_dir, output_dir, mode="link", seed=1
+        ).process_dataset()
+        train_file = next((output_dir / "train" / "cercle").iterdir())
+        source = normalized_dir / "cercle" / train_file.name
+
+        assert train_file.stat().st_ino == source.stat().st_ino
+        assert len(split_names(output_dir, "train")) == 21
+
+        DatasetSplitter(
+            normalized_dir, output_dir, mode="link", seed=2
+        ).process_dataset()
+        all_files = sum(
+            (split_names(output_dir, s) for s in ["train", "val", "test"]), []
+        )
+        assert len(all_files) == 30
+        assert len(set(all_files)) == 30
+
+    def test_link_file_fallback(self, normalized_dir, test_data_dir, mocker):
+        """Test le repli sur un lien symbolique si le lien physique échoue"""
+        mocker.patch("model.split_dataset.os.link", side_effect=OSError)
+        source = normalized_dir / "cercle" / "cercle_00.png"
+        dest = test_data_dir / "link.png"
+
+        assert link_file(source, dest) == "symlink"
+        assert dest.is_symlink()
+        assert link_file(source, dest) == "existing"
+
+    def test_manifest_consumers(self, normalized_dir, test_data_dir):
+        """Test la génération de paires, le dataset et le store depuis le manifeste"""
+        output_dir = test_data_dir / "dataset"
+        DatasetSplitter(normalized_dir, output_dir, mode="manifest").process_dataset()
+        manifest_path = output_dir / MANIFEST_NAME
+        assert not (output_dir / "train").exists()
+
+        pairs_dir = test_data_dir / "pairs"
+        PairGenerator(
+            output_dir, pairs_dir, ["train"], manifest=manifest_path
+        ).generate_all_pairs(pairs_per_category=5)
+        pairs = pd.read_csv(pairs_dir / "train_pairs.csv")
+        assert len(pairs) == 30
+
+        root_dir, splits = load_split_manifest(manifest_path)
+        dataset = PairDataset(
+            pairs_dir / "train_pairs.csv",
+            None,
+            transform=get_transform(64),
+            root_dir=root_dir,
+        )
+        img1, _, _ = dataset[0]
+        assert img1.shape == (1, 64, 64)
+
+        store = ImageStore.from_split_manifest(
+            manifest_path, test_data_dir / "cache" / "images", splits=["train"]
+        )
+        assert len(store) == 21
+        assert set(pairs.iloc[:, 0]).issubset(store.index)
+
+    def test_load_legacy_manifest(self, test_data_dir):
+        """Test la lecture de l'ancien format (liste de catégories)"""
+        legacy = [
+            {"category": "cercle", "train": ["cercle\\a.png"], "val": [], "test": []}
+        ]
+        path = test_data_dir / MANIFEST_NAME
+        path.write_text(json.dumps(legacy))
+
+        root_dir, splits = load_split_manifest(path)
+        assert root_dir == test_data_dir
+        assert splits["train"]["cercle"] == ["cercle/a.png"]
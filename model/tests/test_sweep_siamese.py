@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.image_store import ImageStore, IndexedPairDataset
+from model.siamese_model import ContrastiveLoss
+from model.sweep_siamese import build_trials, run_sweep
+
+
+@pytest.fixture
+def pair_files(test_data_dir, random_images):
+    """Crée quelques images et des fichiers de paires train/val"""
+    dataset_dir = test_data_dir / "dataset"
+    paths = random_images(dataset_dir, {"a": 3, "b": 3}, "{i}.png")
+
+    rows = [
+        (p1, p2, float(p1[0] == p2[0]))
+        for i, p1 in enumerate(paths)
+        for p2 in paths[i + 1 :]
+    ]
+    columns = ["image1", "image2", "label"]
+    train_csv = test_data_dir / "train_pairs.csv"
+    val_csv = test_data_dir / "val_pairs.csv"
+    pd.DataFrame(rows[:10], columns=columns).to_csv(train_csv, index=False)
+    pd.DataFrame(rows[10:], columns=columns).to_csv(val_csv, index=False)
+    return dataset_dir, train_csv, val_csv
+
+
+class TestSweep:
+    def test_build_trials_grid(self):
+        """Test le produit cartésien et les valeurs par défaut"""
+        trials = build_trials(
+            {"mode": "grid", "params": {"margin": [0.5, 1.0], "batch_size": [4, 8]}}
+        )
+
+        assert len(trials) == 4
+        assert {t["margin"] for t in trials} == {0.5, 1.0}
+        assert all(t["embedding_dim"] == 128 for t in trials)
+
+    def test_default_margin_matches_training(self):
+        """Test que la marge par défaut est celle de ContrastiveLoss"""
+        trials = build_trials({"mode": "grid", "params": {"batch_size": [4]}})
+
+        assert trials[0]["margin"] == ContrastiveLoss().margin == 2.0
+
+    def test_build_trials_random(self):
+        """Test le tirage reproductible dans un intervalle log"""
+        spec = {
+            "mode": "random",
+            "num_trials": 5,
+            "seed": 3,
+            "params": {"learning_rate": {"low": 1e-4, "high": 1e-2, "log": True}},
+        }
+        trials = build_trials(spec)
+
+        assert trials == build_trials(spec)
+        assert all(1e-4 <= t["learning_rate"] <= 1e-2 for t in trials)
+
+    def test_image_store_cache(self, pair_files, test_data_dir):
+        """Test que le store est relu en memmap et indexe les paires"""
+        dataset_dir, train_csv, val_csv = pair_files
+        cache = test_data_dir / "cache" / "images"
+        store = ImageStore.from_pair_csvs([train_csv, val_csv], dataset_dir, cache)
+        dataset = IndexedPairDataset(store, val_csv)
+        img1, img2, label = dataset[0]
+
+        assert isinstance(store.images, np.memmap)
+        assert len(store) == 6
+        assert img1.shape == (1, 64, 64)
+        assert -1.0 <= img1.min() and img1.max() <= 1.0
+        assert label.item() in (0.0, 1.0)
+
+    def test_run_sweep(self, pair_files, test_data_dir):
+        """Test un petit sweep en pool de processus et son classement"""
+        dataset_dir, train_csv, val_csv = pair_files
+        output_dir = test_data_dir / "sweep"
+        spec = {
+            "mode": "grid",
+            "epochs": 1,
+            "params": {"margin": [0.5, 2.0], "batch_size": [4], "embedding_dim": [16]},
+        }
+
+        leaderboard = run_sweep(
+            spec, dataset_dir, train_csv, val_csv, output_dir, max_workers=2
+        )
+
+        assert len(leaderboard) == 2
+        assert leaderboard[0]["f1_score"] >= leaderboard[1]["f1_score"]
+        saved = json.loads((output_dir / "leaderboard.json").read_text())
+        assert [r["trial_id"] for r in saved] == [r["trial_id"] for r in leaderboard]
+        assert (output_dir / "leaderboard.csv").exists()
+
+    def test_run_sweep_rejects_zero_epochs(self, pair_files, test_data_dir):
+        """Test qu'un sweep sans époque est refusé avant tout essai"""
+        dataset_dir, train_csv, val_csv = pair_files
+        spec = {"mode": "grid", "epochs": 0, "params": {"margin": [1.0]}}
+
+        with pytest.raises(ValueError):
+            run_sweep(spec, dataset_dir, train_csv, val_csv, test_data_dir / "sweep")
@@ -0,0 +1,97 @@
+import socket
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+
+from model.siamese_model import ContrastiveLoss, SiameseNetwork
+from model.train_siamese import SiameseTrainer, all_reduce_sum, is_main_process
+
+
+def make_pairs(num_pairs=8):
+    """Crée un petit dataset de paires aléatoires"""
+    img1 = torch.rand(num_pairs, 1, 64, 64) * 2 - 1
+    img2 = torch.rand(num_pairs, 1, 64, 64) * 2 - 1
+    labels = torch.randint(0, 2, (num_pairs,)).float()
+    return TensorDataset(img1, img2, labels)
+
+
+@pytest.fixture
+def process_group(monkeypatch):
+    """Groupe gloo mono-processus pour exercer le chemin DDP"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setenv("MASTER_ADDR", "127.0.0.1")
+    monkeypatch.setenv("MASTER_PORT", str(port))
+    dist.init_process_group("gloo", rank=0, world_size=1)
+    yield
+    dist.destroy_process_group()
+
+
+class TestSiameseTrainer:
+    def test_train_epoch(self, model_dir):
+        """Test une époque d'entraînement mono-processus"""
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+        )
+        loss = trainer.train_epoch(DataLoader(make_pairs(), batch_size=4))
+
+        assert loss >= 0
+        assert trainer.network is model
+
+    def test_train_epoch_bf16_channels_last(self, model_dir):
+        """Test une époque en bf16 autocast avec le format channels_last"""
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+            precision="bf16",
+            channels_last=True,
+        )
+        loss = trainer.train_epoch(DataLoader(make_pairs(), batch_size=4))
+        val_loss, accuracy = trainer.validate(DataLoader(make_pairs(), batch_size=4))
+
+        assert loss >= 0
+        assert val_loss >= 0
+        assert 0 <= accuracy <= 1
+        assert model.conv1.weight.dtype == torch.float32
+        assert model.conv1.weight.is_contiguous(memory_format=torch.channels_last)
+
+    def test_distributed_checkpoint(self, process_group, model_dir):
+        """Test que le checkpoint DDP contient les poids du réseau sans préfixe"""
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+            distributed=True,
+        )
+        dataset = make_pairs()
+        loader = DataLoader(
+            dataset, batch_size=4, sampler=DistributedSampler(dataset, shuffle=True)
+        )
+
+        trainer.train(loader, loader, num_epochs=1, save_frequency=1)
+
+        checkpoint = torch.load(model_dir / "best_model.pth")
+        assert is_main_process()
+        assert trainer.network is model
+        assert set(checkpoint["model_state_dict"]) == set(model.state_dict())
+
+    def test_all_reduce_sum_without_group(self):
+        """Test que l'agrégation est l'identité hors DDP"""
+        assert all_reduce_sum([1.0, 2.0]) == [1.0, 2.0]
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+import torch
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+from model.siamese_model import ContrastiveLoss, SiameseNetwork
+from model.train_siamese import SiameseTrainer
+from model.training_profiler import PHASES, TrainingProfiler, peak_rss_mb
+
+
+def make_loader(num_pairs=8, batch_size=4):
+    """Crée un DataLoader de paires aléatoires"""
+    dataset = TensorDataset(
+        torch.rand(num_pairs, 1, 64, 64),
+        torch.rand(num_pairs, 1, 64, 64),
+        torch.randint(0, 2, (num_pairs,)).float(),
+    )
+    return DataLoader(dataset, batch_size=batch_size)
+
+
+class TestTrainingProfiler:
+    def test_peak_rss(self):
+        """Test la lecture du pic de mémoire résidente"""
+        assert peak_rss_mb() > 0
+
+    def test_profiled_training(self, test_data_dir, model_dir):
+        """Test le rapport JSON et la trace Chrome d'un entraînement profilé"""
+        profiles_dir = test_data_dir / "profiles"
+        profiler = TrainingProfiler(
+            profiles_dir,
+            trace_steps=1,
+            trace_wait=0,
+            run_name="test_run",
+            config={"batch_size": 4},
+        )
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+            profiler=profiler,
+        )
+
+        trainer.train(make_loader(), make_loader(), num_epochs=2)
+
+        report = json.loads((profiles_dir / "test_run.json").read_text())
+        assert report["config"] == {"batch_size": 4}
+        assert len(report["epochs"]) == 2
+        epoch = report["epochs"][0]
+        assert epoch["steps"] == 2
+        assert epoch["samples"] == 8
+        assert epoch["samples_per_s"] > 0
+        assert set(epoch["phases"]) == set(PHASES)
+        assert epoch["phases"]["forward"]["total_s"] > 0
+        assert (profiles_dir / "test_run_trace.json").exists()
+
+    def test_report_written_when_training_fails(
+        self, test_data_dir, model_dir, monkeypatch
+    ):
+        """Test que le rapport et la trace sont écrits si une époque échoue"""
+        profiles_dir = test_data_dir / "profiles"
+        profiler = TrainingProfiler(
+            profiles_dir, trace_steps=5, trace_wait=0, run_name="crashed_run"
+        )
+        model = SiameseNetwork()
+        trainer = SiameseTrainer(
+            model,
+            ContrastiveLoss(),
+            optim.Adam(model.parameters()),
+            torch.device("cpu"),
+            model_dir,
+            profiler=profiler,
+        )
+
+        def fail(loader):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(trainer, "validate", fail)
+        with pytest.raises(KeyboardInterrupt):
+            trainer.train(make_loader(), make_loader(), num_epochs=2)
+
+        report = json.loads((profiles_dir / "crashed_run.json").read_text())
+        assert len(report["epochs"]) == 1
+        assert (profiles_dir / "crashed_run_trace.json").exists()
@@ -6,24 +6,49 @@ Ce script :
 - Entraîne le réseau siamois avec la perte contrastive
 - Évalue les performances sur l'ensemble de validation
 - Sauvegarde le meilleur modèle
+
+Lancement depuis la racine du dépôt (imports du paquet model) :
+    python -m model.train_siamese
+
+Entraînement multi-processus (CPU, backend gloo) :
+    torchrun --standalone --nproc_per_node=4 -m model.train_siamese
 """
+
+import argparse
+import contextlib
 import csv
 import logging
 import os
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import torch
+import torch.distributed as dist
 import torch.nn as nn
 import torch.nn.functional as F
 import torch.optim as optim
 from PIL import Image
-from siamese_model import ContrastiveLoss, SiameseNetwork
+from torch.nn.parallel import DistributedDataParallel
 from torch.utils.data import DataLoader, Dataset
+from torch.utils.data.distributed import DistributedSampler
 from torchvision import transforms
 
+from model.batch_augment import BatchAugmenter
+from model.image_store import IndexedPairDataset
+from model.packed_dataset import PackedDataset
+from model.siamese_model import (
+    PRECISIONS,
+    ContrastiveLoss,
+    SiameseNetwork,
+    autocast_context,
+    check_precision,
+    to_memory_format,
+)
+from model.split_dataset import load_split_manifest
+from model.training_profiler import TrainingProfiler
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 
@@ -31,17 +56,22 @@ logging.basicConfig(level=logging.INFO)
 class PairDataset(Dataset):
     """Dataset de paires d'images pour l'entraînement du réseau siamois"""
 
-    def __init__(self, csv_file, dataset_dir, transform=None):
+    def __init__(self, csv_file, dataset_dir, transform=None, root_dir=None):
         """
         Args:
             csv_file (str): Chemin vers le fichier CSV contenant les paires
             dataset_dir (str): Chemin vers le dossier contenant les images
             transform (callable, optional): Transformation à appliquer aux images
+            root_dir (str, optional): Dossier auquel les chemins du CSV sont relatifs
+                (dossier source d'un manifeste de séparation) ; prioritaire sur dataset_dir
         """
         self.pairs_df = pd.read_csv(csv_file)
-        self.dataset_dir = Path(
-            dataset_dir
-        ).parent  # On remonte d'un niveau car les chemins dans le CSV incluent train/test
+        if root_dir is not None:
+            self.dataset_dir = Path(root_dir)
+        else:
+            self.dataset_dir = Path(
+                dataset_dir
+            ).parent  # On remonte d'un niveau car les chemins dans le CSV incluent train/test
         self.transform = transform
 
     def __len__(self):
@@ -65,6 +95,57 @@ class PairDataset(Dataset):
         return img1, img2, torch.tensor(label, dtype=torch.float32)
 
 
+def setup_distributed() -> Tuple[int, int]:
+    """
+    Initialise le groupe de processus gloo lorsque le script est lancé via torchrun.
+
+    torchrun renseigne RANK, WORLD_SIZE et LOCAL_WORLD_SIZE ainsi que l'adresse
+    du processus maître. Sans ces variables, l'entraînement reste mono-processus.
+
+    Returns:
+        Tuple[int, int]: Rang du processus courant et nombre total de processus
+    """
+    world_size = int(os.environ.get("WORLD_SIZE", "1"))
+    rank = int(os.environ.get("RANK", "0"))
+
+    if world_size > 1 and not dist.is_initialized():
+        dist.init_process_group(backend="gloo")
+
+        # Répartit les cœurs entre les processus locaux pour éviter la sur-souscription
+        local_world_size = int(os.environ.get("LOCAL_WORLD_SIZE", world_size))
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // local_world_size))
+
+    return rank, world_size
+
+
+def cleanup_distributed():
+    """Détruit le groupe de processus s'il a été initialisé."""
+    if dist.is_initialized():
+        dist.destroy_process_group()
+
+
+def is_main_process() -> bool:
+    """Indique si le processus courant est le rang 0 (ou s'il n'y a pas de DDP)."""
+    return not dist.is_initialized() or dist.get_rank() == 0
+
+
+def all_reduce_sum(values: List[float]) -> List[float]:
+    """
+    Somme des valeurs sur l'ensemble des processus (identité hors DDP).
+
+    Args:
+        values (List[float]): Valeurs locales à agréger
+
+    Returns:
+        List[float]: Valeurs sommées sur tous les rangs
+    """
+    if not dist.is_initialized():
+        return values
+    tensor = torch.tensor(values, dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return tensor.tolist()
+
+
 class SiameseTrainer:
     """
     Classe gérant l'entraînement et l'évaluation du réseau siamois.
@@ -77,6 +158,11 @@ class SiameseTrainer:
         optimizer: optim.Optimizer,
         device: torch.device,
         model_dir: Path,
+        distributed: bool = False,
+        precision: str = "fp32",
+        channels_last: bool = False,
+        profiler: Optional[TrainingProfiler] = None,
+        augmenter: Optional[BatchAugmenter] = None,
     ):
         """
         Initialise le trainer.
@@ -87,16 +173,66 @@ class SiameseTrainer:
             optimizer (optim.Optimizer): L'optimiseur
             device (torch.device): Le device sur lequel effectuer les calculs
             model_dir (Path): Dossier où sauvegarder les modèles
+            distributed (bool): Si True, enveloppe le modèle dans un
+                DistributedDataParallel (le groupe de processus doit être initialisé)
+            precision (str): "fp32" ou "bf16" (autocast du forward)
+            channels_last (bool): Si True, poids et batches au format channels_last
+            profiler (TrainingProfiler, optional): Profileur de la boucle d'entraînement
+            augmenter (BatchAugmenter, optional): Augmentation appliquée à chaque
+                batch d'entraînement (nouvelles variantes à chaque époque)
         """
+        self.precision = check_precision(precision)
+        self.channels_last = channels_last
         self.model = model.to(device)
+        if channels_last:
+            self.model = self.model.to(memory_format=torch.channels_last)
+        self.distributed = distributed
+        if distributed:
+            # Les gradients de SiameseNetwork sont synchronisés à chaque backward
+            self.model = DistributedDataParallel(self.model)
         self.criterion = criterion
         self.optimizer = optimizer
         self.device = device
         self.model_dir = model_dir
         self.model_dir.mkdir(parents=True, exist_ok=True)
 
+        self.profiler = profiler
+        self.augmenter = augmenter
         self.best_val_loss = float("inf")
 
+    @property
+    def network(self) -> nn.Module:
+        """Réseau sous-jacent, sans l'enveloppe DistributedDataParallel."""
+        if isinstance(self.model, DistributedDataParallel):
+            return self.model.module
+        return self.model
+
+    def forward_pair(
+        self, img1: torch.Tensor, img2: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Forward d'un batch de paires avec la précision et le format mémoire configurés.
+
+        Args:
+            img1 (torch.Tensor): Premières images du batch
+            img2 (torch.Tensor): Deuxièmes images du batch
+
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: Embeddings en float32
+        """
+        img1 = to_memory_format(img1.to(self.device), self.channels_last)
+        img2 = to_memory_format(img2.to(self.device), self.channels_last)
+        with autocast_context(self.device, self.precision):
+            output1, output2 = self.model(img1, img2)
+        # La perte et les distances restent calculées en float32
+        return output1.float(), output2.float()
+
+    def _phase(self, name: str):
+        """Contexte de mesure d'une phase (sans effet si le profilage est désactivé)."""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(name)
+
     def train_epoch(self, train_loader: DataLoader) -> float:
         """
         Entraîne le modèle pendant une époque.
@@ -109,29 +245,43 @@ class SiameseTrainer:
         """
         self.model.train()
         total_loss = 0
+        if self.profiler is not None:
+            self.profiler.start_epoch()
 
         for batch_idx, (img1, img2, label) in enumerate(train_loader):
-            # Transfert des données sur le device
-            img1, img2 = img1.to(self.device), img2.to(self.device)
+            if self.profiler is not None:
+                self.profiler.start_step()
             label = label.to(self.device)
 
+            # Augmentation du batch (validation et test restent inchangés)
+            if self.augmenter is not None:
+                with self._phase("augment"):
+                    img1 = self.augmenter(img1)
+                    img2 = self.augmenter(img2)
+
             # Forward pass
-            self.optimizer.zero_grad()
-            output1, output2 = self.model(img1, img2)
-            loss = self.criterion(output1, output2, label)
+            with self._phase("forward"):
+                self.optimizer.zero_grad()
+                output1, output2 = self.forward_pair(img1, img2)
+                loss = self.criterion(output1, output2, label)
 
             # Backward pass
-            loss.backward()
-            self.optimizer.step()
+            with self._phase("backward"):
+                loss.backward()
+            with self._phase("optimizer"):
+                self.optimizer.step()
 
             total_loss += loss.item()
+            if self.profiler is not None:
+                self.profiler.end_step(label.size(0))
 
-            if batch_idx % 100 == 0:
+            if batch_idx % 100 == 0 and is_main_process():
                 logging.info(
                     f"Batch [{batch_idx}/{len(train_loader)}] - Loss: {loss.item():.6f}"
                 )
 
-        return total_loss / len(train_loader)
+        total_loss, num_batches = all_reduce_sum([total_loss, len(train_loader)])
+        return total_loss / num_batches
 
     def validate(
         self, val_loader: DataLoader, threshold: float = 1.0
@@ -153,11 +303,10 @@ class SiameseTrainer:
 
         with torch.no_grad():
             for img1, img2, label in val_loader:
-                img1, img2 = img1.to(self.device), img2.to(self.device)
                 label = label.to(self.device)
 
                 # Forward pass
-                output1, output2 = self.model(img1, img2)
+                output1, output2 = self.forward_pair(img1, img2)
                 loss = self.criterion(output1, output2, label)
 
                 # Calcul de l'accuracy
@@ -168,7 +317,10 @@ class SiameseTrainer:
 
                 total_loss += loss.item()
 
-        val_loss = total_loss / len(val_loader)
+        total_loss, num_batches, correct, total = all_reduce_sum(
+            [total_loss, len(val_loader), correct, total]
+        )
+        val_loss = total_loss / num_batches
         accuracy = correct / total
         return val_loss, accuracy
 
@@ -182,9 +334,13 @@ class SiameseTrainer:
         """
         if val_loss < self.best_val_loss:
             self.best_val_loss = val_loss
+            # En DDP, les poids sont identiques sur tous les rangs : seul le rang 0 écrit
+            if not is_main_process():
+                return
             checkpoint = {
                 "epoch": epoch,
-                "model_state_dict": self.model.state_dict(),
+                "model_state_dict": self.network.state_dict(),
+                "embedding_dim": self.network.fc2.out_features,
                 "optimizer_state_dict": self.optimizer.state_dict(),
                 "val_loss": val_loss,
             }
@@ -207,21 +363,34 @@ class SiameseTrainer:
             num_epochs (int): Nombre d'époques
             save_frequency (int): Fréquence de sauvegarde du modèle
         """
-        for epoch in range(num_epochs):
-            logging.info(f"\nÉpoque {epoch+1}/{num_epochs}")
-
-            # Entraînement
-            train_loss = self.train_epoch(train_loader)
-            logging.info(f"Perte moyenne en entraînement: {train_loss:.6f}")
-
-            # Validation
-            val_loss, val_accuracy = self.validate(val_loader)
-            logging.info(f"Perte en validation: {val_loss:.6f}")
-            logging.info(f"Accuracy en validation: {val_accuracy:.2%}")
-
-            # Sauvegarde du modèle
-            if (epoch + 1) % save_frequency == 0:
-                self.save_checkpoint(epoch, val_loss)
+        # Le rapport de profilage est écrit même si une époque échoue ou est interrompue
+        try:
+            for epoch in range(num_epochs):
+                if is_main_process():
+                    logging.info(f"\nÉpoque {epoch+1}/{num_epochs}")
+
+                # Nouveau mélange du sampler distribué à chaque époque
+                if isinstance(train_loader.sampler, DistributedSampler):
+                    train_loader.sampler.set_epoch(epoch)
+
+                # Entraînement
+                train_loss = self.train_epoch(train_loader)
+                if self.profiler is not None:
+                    self.profiler.end_epoch(epoch)
+
+                # Validation
+                val_loss, val_accuracy = self.validate(val_loader)
+                if is_main_process():
+                    logging.info(f"Perte moyenne en entraînement: {train_loss:.6f}")
+                    logging.info(f"Perte en validation: {val_loss:.6f}")
+                    logging.info(f"Accuracy en validation: {val_accuracy:.2%}")
+
+                # Sauvegarde du modèle
+                if (epoch + 1) % save_frequency == 0:
+                    self.save_checkpoint(epoch, val_loss)
+        finally:
+            if self.profiler is not None:
+                self.profiler.close()
 
 
 def get_transform(image_size):
@@ -233,58 +402,189 @@ def get_transform(image_size):
     )
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Analyse les options de la ligne de commande.
+
+    Args:
+        argv (list, optional): Arguments à analyser (sys.argv par défaut)
+
+    Returns:
+        argparse.Namespace: Options d'entraînement
+    """
+    parser = argparse.ArgumentParser(description="Entraînement du réseau siamois")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--learning-rate", type=float, default=0.001)
+    parser.add_argument(
+        "--margin",
+        type=float,
+        default=2.0,
+        help="Marge de la perte contrastive (défaut de ContrastiveLoss)",
+    )
+    parser.add_argument("--embedding-dim", type=int, default=128)
+    parser.add_argument(
+        "--split-manifest",
+        type=Path,
+        default=None,
+        help="Manifeste dataset_split.json : les chemins des paires sont relatifs "
+        "à son dossier source",
+    )
+    parser.add_argument(
+        "--packed",
+        type=Path,
+        default=None,
+        help="Dataset packé (python -m model.packed_dataset) : images lues en memmap "
+        "au lieu des fichiers PNG",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=list(PRECISIONS),
+        default="fp32",
+        help="Précision du forward (bf16 via autocast sur les Xeon récents)",
+    )
+    parser.add_argument(
+        "--channels-last",
+        action="store_true",
+        help="Utilise le format mémoire channels_last pour les convolutions",
+    )
+    parser.add_argument(
+        "--augment",
+        action="store_true",
+        help="Augmente chaque batch d'entraînement (rotation, déformation élastique, "
+        "bruit, contraste)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mesure attente données / forward / backward / optimizer et écrit "
+        "un rapport JSON dans model/profiles",
+    )
+    parser.add_argument(
+        "--trace-steps",
+        type=int,
+        default=0,
+        help="Avec --profile, nombre de pas tracés par torch.profiler (trace Chrome)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Fonction principale d'entraînement
     """
+    args = parse_args(argv)
+
     # Configuration
-    batch_size = 32
-    num_epochs = 30
-    learning_rate = 0.001
-    margin = 1.0
+    batch_size = args.batch_size
+    num_epochs = args.epochs
+    learning_rate = args.learning_rate
+    margin = args.margin
     image_size = 64
 
+    # DDP si lancé via torchrun (WORLD_SIZE > 1)
+    _, world_size = setup_distributed()
+    distributed = world_size > 1
+
     # Création des datasets
-    train_dataset = PairDataset(
-        csv_file="model/pairs/train_pairs.csv",
-        dataset_dir="model/dataset/train",
-        transform=get_transform(image_size),
+    if args.packed is not None:
+        store = PackedDataset(args.packed).image_store()
+        train_dataset = IndexedPairDataset(store, "model/pairs/train_pairs.csv")
+        test_dataset = IndexedPairDataset(store, "model/pairs/test_pairs.csv")
+    else:
+        root_dir = None
+        if args.split_manifest is not None:
+            root_dir, _ = load_split_manifest(args.split_manifest)
+        train_dataset = PairDataset(
+            csv_file="model/pairs/train_pairs.csv",
+            dataset_dir="model/dataset/train",
+            transform=get_transform(image_size),
+            root_dir=root_dir,
+        )
+
+        test_dataset = PairDataset(
+            csv_file="model/pairs/test_pairs.csv",
+            dataset_dir="model/dataset/test",
+            transform=get_transform(image_size),
+            root_dir=root_dir,
+        )
+
+    # Device (GPU si disponible, le mode distribué gloo reste sur CPU)
+    if distributed:
+        device = torch.device("cpu")
+    else:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    if is_main_process():
+        logging.info(f"Utilisation du device: {device} ({world_size} processus)")
+
+    # Chaque rang ne voit qu'une partition des paires
+    train_sampler = (
+        DistributedSampler(train_dataset, shuffle=True) if distributed else None
     )
-
-    test_dataset = PairDataset(
-        csv_file="model/pairs/test_pairs.csv",
-        dataset_dir="model/dataset/test",
-        transform=get_transform(image_size),
+    test_sampler = (
+        DistributedSampler(test_dataset, shuffle=False) if distributed else None
     )
-
-    # Device (GPU si disponible)
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    logging.info(f"Utilisation du device: {device}")
+    num_workers = max(1, 4 // world_size)
 
     # Chargement des données
     train_loader = DataLoader(
         train_dataset,
         batch_size=batch_size,
-        shuffle=True,
-        num_workers=4,
-        pin_memory=True,
+        shuffle=train_sampler is None,
+        sampler=train_sampler,
+        num_workers=num_workers,
+        pin_memory=device.type == "cuda",
     )
     test_loader = DataLoader(
         test_dataset,
         batch_size=batch_size,
         shuffle=False,
-        num_workers=4,
-        pin_memory=True,
+        sampler=test_sampler,
+        num_workers=num_workers,
+        pin_memory=device.type == "cuda",
     )
 
     # Création du modèle et des outils d'entraînement
-    model = SiameseNetwork()
-    criterion = ContrastiveLoss()
+    model = SiameseNetwork(embedding_dim=args.embedding_dim)
+    criterion = ContrastiveLoss(margin=margin)
     optimizer = optim.Adam(model.parameters(), lr=learning_rate)
 
+    # Profilage optionnel (rang 0 uniquement)
+    profiler = None
+    if args.profile and is_main_process():
+        profiler = TrainingProfiler(
+            Path("model/profiles"),
+            trace_steps=args.trace_steps,
+            config={
+                "batch_size": batch_size,
+                "learning_rate": learning_rate,
+                "margin": margin,
+                "embedding_dim": args.embedding_dim,
+                "precision": args.precision,
+                "channels_last": args.channels_last,
+                "augment": args.augment,
+                "world_size": world_size,
+                "num_workers": num_workers,
+            },
+        )
+
     # Création du trainer et lancement de l'entraînement
-    trainer = SiameseTrainer(model, criterion, optimizer, device, Path("model/models"))
-    trainer.train(train_loader, test_loader, num_epochs)
+    trainer = SiameseTrainer(
+        model,
+        criterion,
+        optimizer,
+        device,
+        Path("model/models"),
+        distributed=distributed,
+        precision=args.precision,
+        channels_last=args.channels_last,
+        profiler=profiler,
+        augmenter=BatchAugmenter() if args.augment else None,
+    )
+    try:
+        trainer.train(train_loader, test_loader, num_epochs)
+    finally:
+        cleanup_distributed()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Profilage optionnel de la boucle d'entraînement du réseau siamois.
+Ce module permet de :
+- Mesurer par pas le temps d'attente des données et les temps
+  augmentation/forward/backward/optimizer
+- Calculer le débit (paires/seconde) et la mémoire résidente maximale (RSS)
+- Encadrer une fenêtre de pas par torch.profiler et exporter une trace Chrome
+- Afficher un tableau récapitulatif par époque et écrire un rapport JSON comparable
+"""
+
+import contextlib
+import json
+import logging
+import resource
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import torch
+
+# Phases mesurées dans l'ordre d'affichage
+PHASES = ["data_wait", "augment", "forward", "backward", "optimizer"]
+
+
+def peak_rss_mb() -> float:
+    """
+    Retourne la mémoire résidente maximale du processus courant.
+
+    Returns:
+        float: Pic de RSS en mégaoctets
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class TrainingProfiler:
+    """
+    Collecte les temps de la boucle d'entraînement pas par pas.
+
+    Le trainer appelle start_epoch, puis pour chaque batch start_step,
+    phase("forward"|"backward"|"optimizer") et end_step, et enfin end_epoch.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        trace_steps: int = 0,
+        trace_wait: int = 5,
+        run_name: Optional[str] = None,
+        config: Optional[Dict] = None,
+    ):
+        """
+        Initialise le profileur.
+
+        Args:
+            output_dir (Path): Dossier des rapports JSON et des traces Chrome
+            trace_steps (int): Nombre de pas enregistrés par torch.profiler (0 = aucun)
+            trace_wait (int): Nombre de pas ignorés avant la fenêtre de trace
+            run_name (str, optional): Nom du run (horodatage par défaut)
+            config (Dict, optional): Paramètres du run, recopiés dans le rapport
+        """
+        self.output_dir = Path(output_dir)
+        self.run_name = run_name or datetime.now().strftime("train_%Y%m%d_%H%M%S")
+        self.config = config or {}
+        self.epochs: List[Dict] = []
+        self.trace_path: Optional[Path] = None
+
+        self._torch_profiler = None
+        if trace_steps > 0:
+            self.trace_path = self.output_dir / f"{self.run_name}_trace.json"
+            self._torch_profiler = torch.profiler.profile(
+                activities=[torch.profiler.ProfilerActivity.CPU],
+                schedule=torch.profiler.schedule(
+                    wait=trace_wait, warmup=1, active=trace_steps, repeat=1
+                ),
+                on_trace_ready=self._export_trace,
+                record_shapes=True,
+            )
+            self._torch_profiler.start()
+
+        self._reset_epoch()
+
+    def _reset_epoch(self):
+        self._totals: Dict[str, float] = defaultdict(float)
+        self._steps = 0
+        self._samples = 0
+        self._epoch_start = time.perf_counter()
+        self._last_step_end = self._epoch_start
+
+    def _export_trace(self, prof):
+        """Callback torch.profiler : écrit la trace Chrome de la fenêtre active."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        prof.export_chrome_trace(str(self.trace_path))
+        logging.info(f"Trace Chrome écrite dans {self.trace_path}")
+
+    def start_epoch(self):
+        """Démarre les compteurs d'une nouvelle époque."""
+        self._reset_epoch()
+
+    def start_step(self):
+        """Marque l'arrivée d'un batch : le temps écoulé depuis le pas précédent
+        est compté comme attente des données."""
+        now = time.perf_counter()
+        self._totals["data_wait"] += now - self._last_step_end
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Mesure la durée d'une phase du pas courant.
+
+        Args:
+            name (str): "augment", "forward", "backward" ou "optimizer"
+        """
+        start = time.perf_counter()
+        try:
+            with torch.profiler.record_function(name):
+                yield
+        finally:
+            self._totals[name] += time.perf_counter() - start
+
+    def end_step(self, batch_size: int):
+        """
+        Termine le pas courant.
+
+        Args:
+            batch_size (int): Nombre de paires du batch
+        """
+        self._steps += 1
+        self._samples += batch_size
+        self._last_step_end = time.perf_counter()
+        if self._torch_profiler is not None:
+            self._torch_profiler.step()
+
+    def end_epoch(self, epoch: int) -> Dict:
+        """
+        Clôt l'époque, affiche le tableau récapitulatif et mémorise les mesures.
+
+        Args:
+            epoch (int): Numéro de l'époque
+
+        Returns:
+            Dict: Mesures de l'époque
+        """
+        wall_time = time.perf_counter() - self._epoch_start
+        summary = {
+            "epoch": epoch,
+            "steps": self._steps,
+            "samples": self._samples,
+            "wall_time_s": wall_time,
+            "samples_per_s": self._samples / wall_time if wall_time > 0 else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": {
+                name: {
+                    "total_s": self._totals[name],
+                    "mean_ms": 1000 * self._totals[name] / max(self._steps, 1),
+                    "share": self._totals[name] / wall_time if wall_time > 0 else 0.0,
+                }
+                for name in PHASES
+            },
+        }
+        self.epochs.append(summary)
+        self.log_summary(summary)
+        return summary
+
+    @staticmethod
+    def log_summary(summary: Dict):
+        """Affiche le tableau des temps d'une époque."""
+        lines = [
+            f"Profil de l'époque {summary['epoch'] + 1} "
+            f"({summary['steps']} pas, {summary['samples_per_s']:.1f} paires/s, "
+            f"RSS max {summary['peak_rss_mb']:.0f} Mo)",
+            f"{'Phase':<10} | {'Total (s)':>9} | {'Moy. (ms)':>9} | {'Part':>6}",
+            "-" * 44,
+        ]
+        for name, phase in summary["phases"].items():
+            lines.append(
+                f"{name:<10} | {phase['total_s']:>9.3f} | "
+                f"{phase['mean_ms']:>9.2f} | {phase['share']:>6.1%}"
+            )
+        logging.info("\n".join(lines))
+
+    def close(self) -> Path:
+        """
+        Arrête torch.profiler et écrit le rapport JSON du run.
+
+        Returns:
+            Path: Chemin du rapport
+        """
+        if self._torch_profiler is not None:
+            self._torch_profiler.stop()
+            self._torch_profiler = None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        report_path = self.output_dir / f"{self.run_name}.json"
+        report = {
+            "run_name": self.run_name,
+            "config": self.config,
+            "trace": str(self.trace_path) if self.trace_path else None,
+            "epochs": self.epochs,
+        }
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logging.info(f"Rapport de profilage écrit dans {report_path}")
+        return report_path